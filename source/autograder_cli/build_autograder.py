@@ -2,7 +2,7 @@ import os
 import re
 import shutil
 from enum import Enum
-from typing import List, Dict, Callable
+from typing import List, Dict, Callable, Optional
 
 from autograder_platform.cli import AutograderCLITool
 from autograder_platform.config.Config import AutograderConfigurationBuilder, AutograderConfiguration
@@ -15,6 +15,7 @@ class FilesEnum(Enum):
     PRIVATE_DATA = 3
     STARTER_CODE = 4
     CONFIG_FILE = 5
+    PACKAGE_SNAPSHOT = 6
 
 
 class Build:
@@ -121,6 +122,7 @@ class Build:
             FilesEnum.PRIVATE_DATA: [],
             FilesEnum.STARTER_CODE: [],
             FilesEnum.CONFIG_FILE: [],
+            FilesEnum.PACKAGE_SNAPSHOT: [],
         }
 
         self._discoverTestFiles(config.allow_private,
@@ -139,8 +141,45 @@ class Build:
 
         files[FilesEnum.CONFIG_FILE] = [os.path.join(self.sourceDir, "config.toml")]
 
+        snapshotPath = self.getPackageSnapshotPath()
+        if snapshotPath is not None:
+            files[FilesEnum.PACKAGE_SNAPSHOT].append(snapshotPath)
+
         return files
 
+    def getPackageSnapshotPath(self) -> Optional[str]:
+        pythonConfig = self.config.config.python
+
+        if pythonConfig is None or pythonConfig.package_snapshot is None:
+            return None
+
+        return os.path.join(self.sourceDir, pythonConfig.package_snapshot)
+
+    def buildPackageSnapshot(self):
+        """
+        Description
+        ---
+
+        This function generates the package index snapshot that student requirements are checked against while grading.
+        This has to happen at build time, as Gradescope and PrairieLearn might not have network access.
+
+        The snapshot contains the extra packages and the snapshot packages from the python config.
+        It is not included in the student autograder.
+        """
+        snapshotPath = self.getPackageSnapshotPath()
+
+        if snapshotPath is None:
+            return
+
+        # only imported when needed so that building doesn't depend on the python implementation
+        from autograder_platform.StudentSubmissionImpl.Python.PythonValidators import PackageValidator
+
+        pythonConfig = self.config.config.python
+        packages = [package["name"] for package in pythonConfig.extra_packages] + pythonConfig.snapshot_packages
+
+        os.makedirs(os.path.dirname(os.path.abspath(snapshotPath)), exist_ok=True)
+        PackageValidator.buildSnapshot(packages, snapshotPath)
+
     @staticmethod
     def copy(src, dest):
         if os.path.isdir(src):
@@ -290,6 +329,8 @@ class Build:
         shutil.make_archive(distPath, "zip", root_dir=generationPath)
 
     def build(self):
+        self.buildPackageSnapshot()
+
         files = self.discoverFiles()
 
         self.createFolders()
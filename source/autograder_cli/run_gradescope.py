@@ -5,11 +5,11 @@ from typing import Dict, List
 
 from autograder_utils.ResultBuilders import gradescopeResultBuilder
 from autograder_utils.ResultFinalizers import gradescopeResultFinalizer
-from autograder_utils.JSONTestRunner import JSONTestRunner
 
 # CLI tools should only be able to import from the CLI part of the library
 from autograder_platform.cli import AutograderCLITool
 from autograder_platform.config.Config import AutograderConfigurationBuilder, AutograderConfiguration
+from autograder_platform.parallel_runner import ParallelJSONTestRunner, getDefaultJobCount
 
 
 class GradescopeAutograderCLI(AutograderCLITool):
@@ -96,6 +96,8 @@ class GradescopeAutograderCLI(AutograderCLITool):
                                  help="The location for the submission metadata JSON")
         self.parser.add_argument("--submission-directory", default="/autograder/submission",
                                  help="The directory where the student's submission is located")
+        self.parser.add_argument("--jobs", type=int, default=getDefaultJobCount(),
+                                 help="The number of test classes to run in parallel. Defaults to the number of available cores")
 
 
     def read_hash(self, metadata_path):
@@ -120,15 +122,18 @@ class GradescopeAutograderCLI(AutograderCLITool):
         if self.arguments is None:
             return True
 
+        self.run_startup_hooks()
+
         self.discover_tests()
 
         acceptable_hash = self.read_hash(self.arguments.metadata_path)
 
         with open(self.arguments.results_location, 'w') as w:
-            testRunner = JSONTestRunner(visibility='visible', stream=w,
-                                        result_builder=gradescopeResultBuilder,
-                                        result_finalizer=gradescopeResultFinalizer,
-                                        post_processor=lambda results: self.gradescope_post_processing(results, acceptable_hash))
+            testRunner = ParallelJSONTestRunner(jobs=self.arguments.jobs, config=self.config,
+                                                visibility='visible', stream=w,
+                                                result_builder=gradescopeResultBuilder,
+                                                result_finalizer=gradescopeResultFinalizer,
+                                                post_processor=lambda results: self.gradescope_post_processing(results, acceptable_hash))
 
             res = testRunner.run(self.tests)
 
@@ -273,6 +273,8 @@ class LocalAutograderCLI(AutograderCLITool):
 
         AutograderConfigurationProvider.set(self.config)
 
+        self.run_startup_hooks()
+
         self.discover_tests()
 
         self.print_info_message("Starting autograder")
@@ -2,11 +2,11 @@ import os
 
 from autograder_utils.ResultBuilders import prairieLearnResultBuilder
 from autograder_utils.ResultFinalizers import prairieLearnResultFinalizer
-from autograder_utils.JSONTestRunner import JSONTestRunner
 
 # CLI tools should only be able to import from the CLI part of the library
 from autograder_platform.cli import AutograderCLITool
 from autograder_platform.config.Config import AutograderConfigurationBuilder, AutograderConfiguration
+from autograder_platform.parallel_runner import ParallelJSONTestRunner, getDefaultJobCount
 
 
 class PrairieLearnAutograderCLI(AutograderCLITool):
@@ -24,6 +24,8 @@ class PrairieLearnAutograderCLI(AutograderCLITool):
                                  help="The location for the student tests")
         self.parser.add_argument("--submission-directory", default="/grade/student",
                                  help="The directory where the student's submission is located")
+        self.parser.add_argument("--jobs", type=int, default=getDefaultJobCount(),
+                                 help="The number of test classes to run in parallel. Defaults to the number of available cores")
 
     def set_config_arguments(self, configBuilder: AutograderConfigurationBuilder[AutograderConfiguration]):  # pragma: no cover
         if self.arguments is None:
@@ -41,12 +43,15 @@ class PrairieLearnAutograderCLI(AutograderCLITool):
         if self.arguments is None:
             return True
 
+        self.run_startup_hooks()
+
         self.discover_tests()
 
         with open(self.arguments.results_location, 'w') as w:
-            testRunner = JSONTestRunner(visibility='visible', stream=w,
-                                        result_builder=prairieLearnResultBuilder,
-                                        result_finalizer=prairieLearnResultFinalizer)
+            testRunner = ParallelJSONTestRunner(jobs=self.arguments.jobs, config=self.config,
+                                                visibility='visible', stream=w,
+                                                result_builder=prairieLearnResultBuilder,
+                                                result_finalizer=prairieLearnResultFinalizer)
 
             res = testRunner.run(self.tests)
 
@@ -0,0 +1,304 @@
+"""
+This module provides the store that data files are put in to sandboxes from.
+
+Each environment gets its own copy of every file that was added with :ref:`ExecutionEnvironmentBuilder.addFile`.
+When an assignment ships a large data file to a lot of tests, copying it in to every sandbox means copying the same
+bytes over and over. Instead, each file is copied in to the store once (by its hash), and sandboxes get the file from
+the store with the cheapest method that works:
+
+1. Files that were added as shared are hard linked to the store. These are read only.
+2. Every other file is reflinked (ie: copy-on-write on btrfs and xfs), so each sandbox still has its own copy.
+3. If neither of those work (ie: tmpfs, ext4, or the sandbox is on a different device), then the file is copied
+   directly from its source, without being stored at all.
+
+Whether links and reflinks work is only checked once for each device that sandboxes are on.
+
+Stored files are read only, but that doesn't stop a submission that is running as root (ie: on Gradescope). So the store
+also checks that a file hasn't changed each time that it is linked, and if it has, then the file is stored again from
+its source. A root submission that changes a shared file still affects any sandbox that is linked to it at the same
+time, so only files that tests never write should be shared.
+"""
+import atexit
+import errno
+import hashlib
+import os
+import shutil
+import stat
+import tempfile
+import threading
+from typing import Dict, Final, NamedTuple, Optional, Tuple
+
+from autograder_platform.Executors.SandboxManager import SandboxManager
+
+
+class Capabilities(NamedTuple):
+    canLink: bool
+    canReflink: bool
+
+
+class DataFileStore:
+    """
+    This class manages the stored data files for the entire program.
+    Similar to the configuration provider, there is only ever one store.
+
+    ``bytesCopied`` is how many bytes were actually copied in to sandboxes, and ``bytesSaved`` is how many bytes would
+    have been copied if the file had been copied rather than linked.
+    """
+    PREFIX: Final[str] = "autograder_store_"
+    READ_ONLY_MODE: Final[int] = stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH
+    # from linux/fs.h
+    FICLONE: Final[int] = 0x40049409
+
+    root: Optional[str] = None
+    """The directory that files are stored in. This is created in the sandbox root the first time that it is needed"""
+
+    sources: Dict[str, Tuple[Tuple[int, int, int, int], str]] = {}
+    """The hash of each source file, along with the stat that it was hashed at so it is only rehashed if it changed"""
+    stored: Dict[str, Tuple[int, int, int]] = {}
+    """The stat of each stored file when it was stored, so that changes made through a hard link are able to be found"""
+    capabilities: Dict[int, Capabilities] = {}
+    """If files in the store are able to be linked and reflinked to each device"""
+
+    bytesStored: int = 0
+    bytesCopied: int = 0
+    bytesSaved: int = 0
+    linked: int = 0
+    reflinked: int = 0
+    copied: int = 0
+
+    _lock: threading.RLock = threading.RLock()
+    _ownerPid: int = os.getpid()
+    _exitHandlerRegistered: bool = False
+
+    @classmethod
+    def configure(cls, root: str) -> None:
+        """
+        Description
+        ---
+        Sets where files are stored. Files that were already stored are removed.
+
+        The store should be on the same device as the sandboxes, as files can't be linked across devices.
+
+        :param root: the directory to put the store in
+        """
+        if not os.path.isdir(root) or not os.access(root, os.W_OK):
+            raise EnvironmentError(f"Data file store root '{root}' does not exist or is not writable!")
+
+        with cls._lock:
+            cls.clear()
+            cls.root = tempfile.mkdtemp(prefix=cls.PREFIX, dir=root)
+
+    @staticmethod
+    def _getSourceKey(fileStat: os.stat_result) -> Tuple[int, int, int, int]:
+        return fileStat.st_dev, fileStat.st_ino, fileStat.st_size, fileStat.st_mtime_ns
+
+    @staticmethod
+    def _getStoredKey(fileStat: os.stat_result) -> Tuple[int, int, int]:
+        return fileStat.st_size, fileStat.st_mtime_ns, fileStat.st_mode
+
+    @staticmethod
+    def hash(path: str) -> str:
+        with open(path, "rb") as r:
+            return hashlib.file_digest(r, "sha256").hexdigest()
+
+    @classmethod
+    def _getRoot(cls) -> str:
+        # the lock must already be held by the caller
+        if cls.root is None:
+            cls.root = tempfile.mkdtemp(prefix=cls.PREFIX, dir=SandboxManager._getRoot())
+
+        if not cls._exitHandlerRegistered:
+            atexit.register(cls.clear)
+            cls._exitHandlerRegistered = True
+
+        return cls.root
+
+    @classmethod
+    def _isIntact(cls, storedPath: str, digest: str) -> bool:
+        # the lock must already be held by the caller
+        try:
+            return cls._getStoredKey(os.stat(storedPath)) == cls.stored.get(digest)
+        except FileNotFoundError:
+            return False
+
+    @classmethod
+    def add(cls, src: str) -> str:
+        """
+        Description
+        ---
+        Stores a file if it hasn't already been stored. Files are only hashed again if they have changed since they
+        were last added.
+
+        :param src: the path to the file
+        :returns: the path to the stored file
+        """
+        src = os.path.realpath(src)
+        sourceKey = cls._getSourceKey(os.stat(src))
+
+        with cls._lock:
+            cached = cls.sources.get(src)
+
+            digest = cached[1] if cached is not None and cached[0] == sourceKey else cls.hash(src)
+            cls.sources[src] = (sourceKey, digest)
+
+            storedPath = os.path.join(cls._getRoot(), digest)
+
+            if cls._isIntact(storedPath, digest):
+                return storedPath
+
+            if os.path.exists(storedPath):
+                # the stored file was changed through a link, so it is replaced rather than changed again
+                os.unlink(storedPath)
+
+            tempPath = storedPath + ".tmp"
+            shutil.copyfile(src, tempPath)
+            os.chmod(tempPath, cls.READ_ONLY_MODE)
+            os.rename(tempPath, storedPath)
+
+            cls.stored[digest] = cls._getStoredKey(os.stat(storedPath))
+            cls.bytesStored += sourceKey[2]
+
+        return storedPath
+
+    @classmethod
+    def _reflink(cls, src: str, dest: str) -> bool:
+        try:
+            import fcntl
+        except ImportError:  # pragma: no cover
+            return False
+
+        with open(src, "rb") as r, open(dest, "wb") as w:
+            try:
+                fcntl.ioctl(w.fileno(), cls.FICLONE, r.fileno())
+            except OSError:
+                return False
+
+        return True
+
+    @classmethod
+    def _probe(cls, root: str) -> Capabilities:
+        # the lock must already be held by the caller
+        probe = os.path.join(root, "probe")
+        target = probe + ".target"
+
+        try:
+            with open(probe, "wb") as w:
+                w.write(b"probe")
+
+            canReflink = cls._reflink(probe, target)
+
+            if os.path.lexists(target):
+                os.unlink(target)
+
+            try:
+                os.link(probe, target)
+                canLink = True
+            except OSError:
+                canLink = False
+        finally:
+            for path in (probe, target):
+                if os.path.lexists(path):
+                    os.unlink(path)
+
+        return Capabilities(canLink, canReflink)
+
+    @classmethod
+    def getCapabilities(cls, directory: str) -> Capabilities:
+        """
+        Description
+        ---
+        Gets if files in the store are able to be linked or reflinked in to a directory.
+        This is only checked once for each device.
+
+        :param directory: the directory that the files would be put in
+        """
+        device = os.stat(directory).st_dev
+
+        with cls._lock:
+            if device in cls.capabilities:
+                return cls.capabilities[device]
+
+            root = cls._getRoot()
+
+            # neither links nor reflinks work across devices
+            if device != os.stat(root).st_dev:
+                cls.capabilities[device] = Capabilities(False, False)
+            else:
+                cls.capabilities[device] = cls._probe(root)
+
+            return cls.capabilities[device]
+
+    @classmethod
+    def materialize(cls, src: str, dest: str, shared: bool = False) -> None:
+        """
+        Description
+        ---
+        Puts a data file in to a sandbox.
+
+        If the file is shared, then it is hard linked to the store. Otherwise, it is reflinked if the filesystem
+        supports it. If neither work, then it is copied from its source without being stored.
+
+        :param src: the path to the original file
+        :param dest: where the file should be put in the sandbox
+        :param shared: if the file is able to be linked rather than copied
+        """
+        if os.path.lexists(dest):
+            os.unlink(dest)
+
+        capabilities = cls.getCapabilities(os.path.dirname(os.path.abspath(dest)))
+
+        if shared and capabilities.canLink:
+            storedPath = cls.add(src)
+
+            try:
+                os.link(storedPath, dest)
+            except OSError as ex:
+                # ie: the store has too many links to the file
+                if ex.errno not in (errno.EXDEV, errno.EPERM, errno.EMLINK, errno.ENOTSUP):
+                    raise
+            else:
+                with cls._lock:
+                    cls.linked += 1
+                    cls.bytesSaved += os.path.getsize(storedPath)
+                return
+
+        if capabilities.canReflink and cls._reflink(cls.add(src), dest):
+            os.chmod(dest, stat.S_IMODE(os.stat(src).st_mode))
+
+            with cls._lock:
+                cls.reflinked += 1
+                cls.bytesSaved += os.path.getsize(dest)
+            return
+
+        shutil.copy(src, dest)
+
+        with cls._lock:
+            cls.copied += 1
+            cls.bytesCopied += os.path.getsize(dest)
+
+    @classmethod
+    def _resetAfterFork(cls) -> None:
+        cls._ownerPid = os.getpid()
+        cls._lock = threading.RLock()
+
+    @classmethod
+    def clear(cls) -> None:
+        """
+        Removes every stored file. Files that were linked in to sandboxes are not affected.
+        This is called automatically when the program exits.
+        """
+        if os.getpid() != cls._ownerPid:
+            return
+
+        with cls._lock:
+            if cls.root is not None:
+                shutil.rmtree(cls.root, ignore_errors=True)
+
+            cls.root = None
+            cls.sources = {}
+            cls.stored = {}
+            cls.capabilities = {}
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=DataFileStore._resetAfterFork)
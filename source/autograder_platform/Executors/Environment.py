@@ -1,33 +1,232 @@
+import codecs
+import locale
+import mmap
 import os
-import tempfile
-from typing import Callable, Generic, List, Dict, Optional, Tuple, Type, TypeVar, Union, Any
+from typing import Callable, Generic, Iterator, List, Dict, Optional, Set, Tuple, Type, TypeVar, Union, Any
 
 import dataclasses
 
+from autograder_platform.Executors.SandboxManager import SandboxManager
+from autograder_platform.Executors.common import FileSystemChanges, FileSystemSnapshot
+
 ImplResults = TypeVar("ImplResults")
 
 
+class DeferredResult:
+    """
+    Description
+    ===========
+
+    This class wraps a result that hasn't been decoded yet. The loader is only called the first time that the result
+    is accessed. This allows submission processes to avoid decoding results that a test never looks at.
+    """
+    def __init__(self, loader: Callable[[], Any]):
+        self.loader = loader
+
+    @staticmethod
+    def resolve(value: Any) -> Any:
+        if isinstance(value, DeferredResult):
+            return value.loader()
+
+        return value
+
+
+class OutputFile:
+    """
+    Description
+    ===========
+
+    This class is a lazy handle to a file that was created by the student's submission.
+
+    The file isn't opened until it is first read, and then it is memory mapped rather than read, so checking if it is
+    binary, getting its size, or iterating over its lines doesn't load the entire file. Once the file has been decoded,
+    the decoded contents are cached.
+
+    The map is closed when the sandbox is cleaned up (see :ref:`Executor.cleanup`), as an open map stops the sandbox
+    from being renamed or removed on Windows. Contents that were decoded before then are still available, but the file
+    isn't able to be read again afterwards.
+    """
+    DEFAULT_MAX_SIZE: int = 128 * 2 ** 20
+    SNIFF_SIZE: int = 8192
+
+    def __init__(self, path: str, maxSize: Optional[int] = None, owner: Optional[object] = None):
+        """
+        :param path: the path to the file
+        :param maxSize: the max size of the file that is able to be read all at once
+        :param owner: the environment that the sandbox belongs to. This is kept so the sandbox isn't released while
+        the file is still able to be read. See :ref:`SandboxManager.acquire`.
+        """
+        self.path = path
+        self.owner = owner
+        self.maxSize = maxSize if maxSize is not None else OutputFile.DEFAULT_MAX_SIZE
+        self.encoding = locale.getpreferredencoding(False)
+        self._map: Optional[mmap.mmap] = None
+        self._size: Optional[int] = None
+        self._contents: Optional[Union[str, bytes]] = None
+        self._closed: bool = False
+
+    def _getMap(self) -> Optional[mmap.mmap]:
+        if self._closed:
+            raise AssertionError(f"File '{os.path.basename(self.path)}' was closed when the sandbox was cleaned up. "
+                                 f"Read it before cleaning up the sandbox.")
+
+        if self._size is None:
+            with open(self.path, "rb") as rb:
+                self._size = os.fstat(rb.fileno()).st_size
+
+                # empty files can't be mapped
+                if self._size:
+                    self._map = mmap.mmap(rb.fileno(), 0, access=mmap.ACCESS_READ)
+
+        return self._map
+
+    @property
+    def size(self) -> int:
+        self._getMap()
+
+        return self._size  # type: ignore
+
+    def isBinary(self) -> bool:
+        """
+        Checks if the file is binary by looking at only the start of it.
+        A file is binary if it contains a NUL byte or isn't valid in the default encoding.
+        """
+        fileMap = self._getMap()
+
+        if fileMap is None:
+            return False
+
+        start = fileMap[:self.SNIFF_SIZE]
+
+        if b"\0" in start:
+            return True
+
+        try:
+            # the start may end partway through a character, which isn't an error until the end of the file
+            codecs.getincrementaldecoder(self.encoding)().decode(start, final=len(start) == self._size)
+        except UnicodeDecodeError:
+            return True
+
+        return False
+
+    def readBytes(self) -> bytes:
+        """
+        Reads the entire file as bytes.
+
+        :raises AssertionError: if the file is larger than ``maxSize``
+        """
+        if self.size > self.maxSize:
+            raise AssertionError(f"File '{os.path.basename(self.path)}' is {self.size} bytes, which is larger than the "
+                                 f"max of {self.maxSize} bytes. Use iterLines instead.")
+
+        fileMap = self._getMap()
+
+        return fileMap[:] if fileMap is not None else b""
+
+    def read(self) -> Union[str, bytes]:
+        """
+        Reads the entire file. Text files are decoded (with universal newlines) and binary files are returned as bytes.
+
+        :raises AssertionError: if the file is larger than ``maxSize``
+        """
+        if self._contents is not None:
+            return self._contents
+
+        data = self.readBytes()
+
+        if self.isBinary():
+            self._contents = data
+            return data
+
+        try:
+            text = data.decode(self.encoding)
+        except UnicodeDecodeError:
+            self._contents = data
+            return data
+
+        if "\r" in text:
+            text = text.replace("\r\n", "\n").replace("\r", "\n")
+
+        self._contents = text
+
+        return text
+
+    def iterLines(self) -> Iterator[str]:
+        """
+        Iterates over the lines in the file without loading the entire file. Lines don't include their line ending.
+        This isn't limited by ``maxSize``.
+        """
+        fileMap = self._getMap()
+
+        if fileMap is None:
+            return
+
+        position = 0
+
+        while position < self._size:  # type: ignore
+            end = fileMap.find(b"\n", position)
+
+            if end == -1:
+                end = self._size
+
+            yield fileMap[position:end].rstrip(b"\r").decode(self.encoding, errors="replace")  # type: ignore
+
+            position = end + 1  # type: ignore
+
+    def close(self) -> None:
+        self._closed = True
+
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+
 class Results(Generic[ImplResults]):
     class Files:
-        def __init__(self, files: Optional[Dict[str, str]]):
+        def __init__(self, files: Optional[Dict[str, str]], deleted: Optional[Set[str]] = None,
+                     truncated: bool = False):
             self.files = files
-
-        def __getitem__(self, file: str) -> Union[str, bytes]:
+            self.deleted = deleted if deleted is not None else set()
+            self.truncated = truncated
+            self.handles: Dict[str, OutputFile] = {}
+            self.owner: Optional[object] = None
+            """
+            The environment that the sandbox belongs to. The sandbox is released when its environment is garbage
+            collected, so this is kept to stop that while the results are still around
+            """
+
+        def wasDeleted(self, file: str) -> bool:
+            """
+            Checks if a file that was in the sandbox before the submission was run was deleted by it.
+            """
+            return file in self.deleted
+
+        def open(self, file: str) -> OutputFile:
+            """
+            Gets the lazy handle to a file that was created by the student's submission. Handles are cached, so each
+            file is only opened and decoded once.
+
+            See :ref:`OutputFile`.
+            """
             if self.files is None:
                 raise AssertionError(f"Missing result data. Expected: 'files'.")
             if file not in self.files:
                 raise AssertionError(f"File '{file}' was not created by the student's submission!")
 
-            readFile: Union[str, bytes] = ""
+            if file not in self.handles:
+                self.handles[file] = OutputFile(self.files[file], owner=self.owner)
 
-            try:
-                with open(self.files[file], 'r') as r:
-                    readFile = r.read()
-            except UnicodeDecodeError:
-                with open(self.files[file], 'rb') as rb:
-                    readFile = rb.read()
+            return self.handles[file]
+
+        def __getitem__(self, file: str) -> Union[str, bytes]:
+            return self.open(file).read()
 
-            return readFile
+        def close(self) -> None:
+            """
+            Closes every handle that was opened. This is called when the sandbox is cleaned up.
+            """
+            for handle in self.handles.values():
+                handle.close()
 
     def __init__(self, stdout=None, return_val=None, file_out=None, exception=None, parameters=None,
                  impl_results=None) -> None:
@@ -40,6 +239,8 @@ class Results(Generic[ImplResults]):
 
     @property
     def stdout(self) -> List[str]:
+        self._stdout = DeferredResult.resolve(self._stdout)
+
         if self._stdout is None:
             raise AssertionError(f"No OUTPUT was created by the student's submission.\n"
                                  f"Are you missing an 'OUTPUT' statement?")
@@ -54,6 +255,8 @@ class Results(Generic[ImplResults]):
 
     @property
     def return_val(self) -> Optional[object]:
+        self._return_val = DeferredResult.resolve(self._return_val)
+
         return self._return_val
 
     @return_val.setter
@@ -65,11 +268,17 @@ class Results(Generic[ImplResults]):
         return self._files
 
     @file_out.setter
-    def file_out(self, value: Optional[Dict[str, str]]):
+    def file_out(self, value: Union[Dict[str, str], FileSystemChanges, None]):
+        if isinstance(value, FileSystemChanges):
+            self._files = Results.Files(value.getOutputFiles(), value.deleted, value.truncated)
+            return
+
         self._files = Results.Files(value)
 
     @property
     def exception(self) -> Optional[Exception]:
+        self._exception = DeferredResult.resolve(self._exception)
+
         return self._exception
 
     @exception.setter
@@ -78,6 +287,8 @@ class Results(Generic[ImplResults]):
 
     @property
     def parameter(self) -> Tuple[Any, ...]:
+        self._parameter = DeferredResult.resolve(self._parameter)
+
         if self._parameter is None:
             raise AssertionError("No parameters were set!")
 
@@ -89,6 +300,8 @@ class Results(Generic[ImplResults]):
 
     @property
     def impl_results(self) -> ImplResults:
+        self._impl_results = DeferredResult.resolve(self._impl_results)
+
         if self._impl_results is None:
             raise AssertionError("No implementation results were set!")
 
@@ -119,10 +332,14 @@ class ExecutionEnvironment(Generic[ImplEnvironment, ImplResults]):
     files: Dict[str, str] = dataclasses.field(default_factory=dict)
     """What files need to be added to the students submission. 
     The key is the file name, and the value is the file name with its relative path"""
+    shared_files: Set[str] = dataclasses.field(default_factory=set)
+    """The files (by their key in ``files``) that are linked in to the sandbox rather than copied"""
     impl_environment: Optional[ImplEnvironment] = None
     """The implementation environment options. Can be None"""
     timeout: int = 10
     """What timeout has been defined for this run of the student's submission"""
+    sandbox_snapshot: Optional[FileSystemSnapshot] = None
+    """The files that were in the sandbox before the student's submission was run"""
     resultData: Optional[Results[ImplResults]] = None
     """
     This dict contains the data that was generated from the student's submission. This should not be accessed
@@ -200,16 +417,21 @@ class ExecutionEnvironmentBuilder(Generic[ImplEnvironment, ImplResults]):
 
         return self
 
-    def addFile(self: Builder, fileSrc: str, fileDest: str) -> Builder:
+    def addFile(self: Builder, fileSrc: str, fileDest: str, shared: bool = False) -> Builder:
         """
         Description
         ---
         This function adds a file to be pulled into the environment.
 
+        Files are put in to sandboxes by the :ref:`DataFileStore`, and each sandbox gets its own copy of the file
+        (which is reflinked, if possible). Large files that the student's submission only reads are able to be
+        ``shared`` instead, in which case every sandbox is hard linked to the same read only copy.
+
         :param fileSrc: The path to the file, relative to the specified data root. 
         IE: if we had a file at ``tests/data/public/file.txt``, and data root was set to ``tests/data``, 
         then ``fileSrc`` should be ``./public/file.txt``.
         :param fileDest: The path relative to ``SANDBOX_LOCATION`` that the file should be dropped at.
+        :param shared: If the file should be linked rather than copied. The student's submission must not change it.
         """
         if fileSrc[0:2] == "./":
             fileSrc = fileSrc[2:]
@@ -218,6 +440,11 @@ class ExecutionEnvironmentBuilder(Generic[ImplEnvironment, ImplResults]):
 
         self.environment.files[fileSrc] = fileDest
 
+        if shared:
+            self.environment.shared_files.add(fileSrc)
+        else:
+            self.environment.shared_files.discard(fileSrc)
+
         return self
 
     def setTimeout(self: Builder, timeout: int) -> Builder:
@@ -246,9 +473,9 @@ class ExecutionEnvironmentBuilder(Generic[ImplEnvironment, ImplResults]):
         return self
 
     def _setAndResolveSandbox(self):
-        tempLocation = tempfile.mkdtemp(prefix="autograder_")
-
-        self.environment.sandbox_location = tempLocation
+        # the sandbox is given back to the manager when the environment is cleaned up or garbage collected.
+        # results from an execution keep the environment alive, so their files are still able to be read
+        self.environment.sandbox_location = SandboxManager.acquire(owner=self.environment)
 
         for src, dest in self.environment.files.items():
             self.environment.files[src] = os.path.join(self.environment.sandbox_location, dest)
@@ -1,9 +1,16 @@
+import asyncio
+import contextvars
 import shutil
 import os
 import sys
-from typing import Dict
+import threading
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+from typing import Dict, Optional, Set
 
+from autograder_platform.Executors.DataFileStore import DataFileStore
 from autograder_platform.Executors.Environment import ExecutionEnvironment
+from autograder_platform.Executors.SandboxManager import SandboxManager
+from autograder_platform.Executors.common import snapshotFileSystem
 
 from autograder_platform.StudentSubmission.SubmissionProcessFactory import SubmissionProcessFactory
 from autograder_platform.Tasks.TaskRunner import TaskRunner
@@ -13,30 +20,116 @@ from autograder_platform.config.Config import AutograderConfigurationProvider, A
 from autograder_platform.StudentSubmission.ISubmissionProcess import ISubmissionProcess
 
 
+class ExecutionFuture(Future):
+    """
+    Description
+    ===========
+
+    The future for an execution that was started with :ref:`Executor.executeInBackground`.
+
+    Unlike a normal future, an execution is able to be cancelled while it is running. Cancelling a running execution
+    kills the student's submission. Once the submission has stopped, the future is cancelled, just as if it had been
+    cancelled before it started. ``cancel`` returns False for submission processes that aren't able to be cancelled
+    (see :ref:`ISubmissionProcess.cancel`), and those are left to finish as usual.
+
+    A running execution can't be moved to the cancelled state with the public API of ``Future``, so it is finished with
+    a ``CancelledError`` instead. ``cancelled`` and ``exception`` treat that the same as a normal cancellation.
+    """
+    def __init__(self) -> None:
+        super().__init__()
+        self.submissionProcess: Optional[ISubmissionProcess] = None
+        self.cancelRequested: threading.Event = threading.Event()
+        self.cancelledWhileRunning: bool = False
+
+    def cancel(self) -> bool:
+        if super().cancel():
+            return True
+
+        if self.done():
+            return False
+
+        self.cancelRequested.set()
+
+        submissionProcess = self.submissionProcess
+
+        if submissionProcess is not None and not submissionProcess.cancel():
+            self.cancelRequested.clear()
+            return False
+
+        return True
+
+    def cancelled(self) -> bool:
+        return self.cancelledWhileRunning or super().cancelled()
+
+    def exception(self, timeout: Optional[float] = None) -> Optional[BaseException]:
+        exception = super().exception(timeout)
+
+        if self.cancelledWhileRunning:
+            raise CancelledError()
+
+        return exception
+
+    def setCancelled(self) -> None:
+        """
+        Finishes a running future as cancelled. ``Future.cancel`` only does this for futures that haven't started.
+        """
+        # this has to be set before the future finishes, as the waiters and callbacks check it
+        self.cancelledWhileRunning = True
+        self.set_exception(CancelledError())
+
+
 class Executor:
+    """
+    Description
+    ===========
+
+    This class runs student submissions.
+
+    The executor is safe to use from multiple threads at once, as long as each execution has its own environment.
+    Configuration is looked up with :ref:`AutograderConfigurationProvider.get`, so a config that has been scoped to the
+    calling context is respected.
+    """
+    DEFAULT_MAX_CONCURRENCY: int = os.cpu_count() or 1
+
+    maxConcurrency: int = DEFAULT_MAX_CONCURRENCY
+    _pool: Optional[ThreadPoolExecutor] = None
+    _poolLock: threading.Lock = threading.Lock()
+
     @staticmethod
-    def _copyFiles(files: Dict[str, str]):
+    def _copyFiles(files: Dict[str, str], sharedFiles: Optional[Set[str]] = None):
+        sharedFiles = sharedFiles if sharedFiles is not None else set()
+
         for src, dest in files.items():
             try:
                 os.makedirs(os.path.dirname(dest), exist_ok=True)
-                shutil.copy(src, dest)
+                DataFileStore.materialize(src, dest, src in sharedFiles)
             except OSError as ex:  # pragma: no coverage
                 raise EnvironmentError(f"Failed to move file '{src}' to '{dest}'. Error is: {ex}")  # pragma: no coverage
 
     @classmethod
-    def setup(cls, environment: ExecutionEnvironment, runner: TaskRunner, autograderConfig: AutograderConfiguration) -> ISubmissionProcess:
-        if not os.path.exists(environment.sandbox_location):
-            try:
-                os.mkdir(environment.sandbox_location)
-            except OSError as ex:  # pragma: no coverage
-                raise EnvironmentError(f"Failed to create sandbox for test run. Error is: {ex}")  # pragma: no coverage
+    def prepareSandbox(cls, environment: ExecutionEnvironment) -> None:
+        """
+        Creates the sandbox for the environment and puts the environment's files in to it from the :ref:`DataFileStore`.
+        """
+        try:
+            # another thread may be creating the same sandbox at the same time
+            os.makedirs(environment.sandbox_location, exist_ok=True)
+        except OSError as ex:  # pragma: no coverage
+            raise EnvironmentError(f"Failed to create sandbox for test run. Error is: {ex}")  # pragma: no coverage
 
+        if environment.files:
+            Executor._copyFiles(environment.files, environment.shared_files)
+
+        # this is diffed against once the submission is run to find the files that it changed
+        environment.sandbox_snapshot = snapshotFileSystem(environment.sandbox_location)
+
+    @classmethod
+    def setup(cls, environment: ExecutionEnvironment, runner: TaskRunner, autograderConfig: AutograderConfiguration) -> ISubmissionProcess:
         # TODO Logging
 
         process = SubmissionProcessFactory.createProcess(environment, runner, autograderConfig)
 
-        if environment.files:
-            Executor._copyFiles(environment.files)
+        cls.prepareSandbox(environment)
 
         return process
         
@@ -48,6 +141,117 @@ class Executor:
 
         cls.postRun(environment, submissionProcess, raiseExceptions)
 
+    @classmethod
+    def configureConcurrency(cls, maxConcurrency: int) -> None:
+        """
+        Description
+        ---
+        Sets how many executions started with ``executeInBackground`` or ``executeAsync`` are able to run at once.
+        Executions past this limit wait for a slot to be freed.
+
+        Executions that are already running are not affected.
+
+        :param maxConcurrency: the max number of executions to run at once
+        """
+        if maxConcurrency <= 0:
+            raise AttributeError(f"INVALID STATE: Max concurrency must be positive. Was {maxConcurrency}")
+
+        with cls._poolLock:
+            cls.maxConcurrency = maxConcurrency
+
+            if cls._pool is not None:
+                cls._pool.shutdown(wait=False)
+                cls._pool = None
+
+    @classmethod
+    def _getPool(cls) -> ThreadPoolExecutor:
+        with cls._poolLock:
+            # the workers in the pool are the semaphore that limits how many executions run at once
+            if cls._pool is None:
+                cls._pool = ThreadPoolExecutor(max_workers=cls.maxConcurrency, thread_name_prefix="Executor")
+
+            return cls._pool
+
+    @classmethod
+    def _executeInFuture(cls, future: ExecutionFuture, environment: ExecutionEnvironment, runner: TaskRunner,
+                         raiseExceptions: bool, autograderConfig: AutograderConfiguration) -> None:
+        if not future.set_running_or_notify_cancel():
+            return
+
+        try:
+            submissionProcess = cls.setup(environment, runner, autograderConfig)
+            future.submissionProcess = submissionProcess
+
+            # the future might have been cancelled before it knew about the process
+            if future.cancelRequested.is_set() and not submissionProcess.cancel():
+                submissionProcess.cleanup()
+                raise CancelledError()
+
+            submissionProcess.run()
+
+            if future.cancelRequested.is_set():
+                submissionProcess.cleanup()
+                raise CancelledError()
+
+            cls.postRun(environment, submissionProcess, raiseExceptions)
+        except BaseException as ex:
+            if isinstance(ex, CancelledError) and future.cancelRequested.is_set():
+                future.setCancelled()
+                return
+
+            future.set_exception(ex)
+            return
+
+        future.set_result(environment)
+
+    @classmethod
+    def executeInBackground(cls, environment: ExecutionEnvironment, runner: TaskRunner,
+                            raiseExceptions: bool = True) -> ExecutionFuture:
+        """
+        Description
+        ---
+        Starts executing the student's submission without waiting for it to finish.
+
+        Each execution that is running at the same time should have its own sandbox location, as the sandbox is
+        searched for files that the submission created.
+
+        :param environment: the environment to execute in. This is populated when the execution finishes
+        :param runner: the runner to execute
+        :param raiseExceptions: if exceptions raised by the student's submission should be raised by the future
+        :returns: the future for the populated environment. See :ref:`ExecutionFuture` for cancellation.
+        """
+        future = ExecutionFuture()
+
+        # the config is resolved now so that it is the same as it would be for a blocking execution
+        autograderConfig = AutograderConfigurationProvider.get()
+
+        # the worker runs in the caller's context so that any scoped configuration or import registries are kept
+        cls._getPool().submit(contextvars.copy_context().run,
+                              cls._executeInFuture, future, environment, runner, raiseExceptions, autograderConfig)
+
+        return future
+
+    @classmethod
+    async def executeAsync(cls, environment: ExecutionEnvironment, runner: TaskRunner,
+                           raiseExceptions: bool = True) -> ExecutionEnvironment:
+        """
+        Description
+        ---
+        Executes the student's submission without blocking the event loop.
+
+        Cancelling the awaiting task kills the student's submission.
+        This takes the same arguments as :ref:`Executor.executeInBackground`.
+
+        :returns: the populated environment
+        """
+        future = cls.executeInBackground(environment, runner, raiseExceptions)
+
+        try:
+            return await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+
     @classmethod
     def postRun(cls, environment: ExecutionEnvironment, 
                 submissionProcess: ISubmissionProcess, raiseExceptions: bool) -> None:
@@ -56,6 +260,10 @@ class Executor:
 
         submissionProcess.populateResults(environment)
 
+        if environment.resultData is not None:
+            # the results only have the paths to the files, so they keep the environment (and its sandbox) alive
+            environment.resultData.file_out.owner = environment
+
         if raiseExceptions:
             # Moving this into the actual submission process allows for each process type to
             # handle their exceptions differently
@@ -64,6 +272,18 @@ class Executor:
 
     @classmethod
     def cleanup(cls, environment: ExecutionEnvironment):
+        """
+        Removes the environment's sandbox. Sandboxes that were created by the :ref:`SandboxManager` are given back to
+        it, and are emptied in the background.
+
+        Any output files that were opened from the results are closed first, so the sandbox isn't held open by them.
+        """
+        if environment.resultData is not None:
+            environment.resultData.file_out.close()
+
+        if SandboxManager.release(environment.sandbox_location):
+            return
+
         if os.path.exists(environment.sandbox_location):
             try:
                 shutil.rmtree(environment.sandbox_location)
@@ -0,0 +1,366 @@
+"""
+This module provides the manager that all the sandboxes are created by.
+
+Every environment that is built gets its own sandbox. Creating a new directory in /tmp for each one, and never deleting
+it, fills the disk on long runs and makes every directory operation in /tmp slower. Instead, sandboxes are created
+under a configurable root (which should be a tmpfs if one is available), and are given back to the manager once the
+environment is finished with them.
+
+Sandboxes that are given back are emptied on a background thread, and are then either kept around to be handed out
+again or deleted. This keeps the (potentially slow) deletion off of the thread that is running the tests.
+"""
+import atexit
+import os
+import queue
+import secrets
+import shutil
+import tempfile
+import threading
+import weakref
+from typing import Dict, Final, List, Optional, Tuple
+
+
+class SandboxManager:
+    """
+    This class manages the sandboxes for the entire program.
+    Similar to the configuration provider, there is only ever one manager.
+
+    At most ``maxPooled`` empty sandboxes are kept around at once. If ``quotaBytes`` is set, then new sandboxes aren't
+    handed out while the sandboxes that are in use (or waiting to be deleted) take up more than that many bytes.
+    """
+    PREFIX: Final[str] = "autograder_"
+    DEFAULT_MAX_POOLED: Final[int] = 16
+    TMPFS_ROOTS: Final[Tuple[str, ...]] = ("/dev/shm", "/run/shm", "/tmp")
+
+    root: Optional[str] = None
+    """The directory that sandboxes are created in. If this is None, then the system's temp directory is used"""
+    maxPooled: int = DEFAULT_MAX_POOLED
+    quotaBytes: Optional[int] = None
+
+    live: Dict[str, Optional[weakref.finalize]] = {}
+    """The sandboxes that are in use, along with the finalizer that releases them when their owner is collected"""
+    pooled: List[str] = []
+    """The sandboxes that have been emptied and are able to be handed out again"""
+    pendingBytes: Dict[str, int] = {}
+    """The sandboxes that are waiting to be emptied or deleted, along with how large they were when they were released"""
+
+    created: int = 0
+    reused: int = 0
+    deleted: int = 0
+
+    _lock: threading.Lock = threading.Lock()
+    _queue: "queue.Queue[Tuple[str, bool]]" = queue.Queue()
+    _worker: Optional[threading.Thread] = None
+    _ownerPid: int = os.getpid()
+    _exitHandlerRegistered: bool = False
+
+    @classmethod
+    def configure(cls, root: Optional[str] = None, maxPooled: Optional[int] = None,
+                  quotaBytes: Optional[int] = None) -> None:
+        """
+        Description
+        ---
+        Configures where sandboxes are created and how many are kept around.
+
+        Changing the root only affects sandboxes that are created after this is called. Empty sandboxes that were
+        created under the old root are deleted.
+
+        :param root: the directory to create sandboxes in. See ``findTmpfsRoot``.
+        :param maxPooled: the max number of empty sandboxes to keep around
+        :param quotaBytes: the max number of bytes that sandboxes are able to use. Must be positive
+        """
+        if root is not None:
+            if not os.path.isdir(root) or not os.access(root, os.W_OK):
+                raise EnvironmentError(f"Sandbox root '{root}' does not exist or is not writable!")
+
+            root = os.path.abspath(root)
+
+        if maxPooled is not None and maxPooled < 0:
+            raise AttributeError(f"INVALID STATE: Max pooled sandboxes must be non-negative. Was {maxPooled}")
+
+        if quotaBytes is not None and quotaBytes <= 0:
+            raise AttributeError(f"INVALID STATE: Sandbox quota must be positive. Was {quotaBytes}")
+
+        with cls._lock:
+            if root is not None and root != cls._getRoot():
+                cls.root = root
+                cls._trimPooled(0)
+
+            if maxPooled is not None:
+                cls.maxPooled = maxPooled
+                cls._trimPooled(maxPooled)
+
+            if quotaBytes is not None:
+                cls.quotaBytes = quotaBytes
+
+    @classmethod
+    def _getRoot(cls) -> str:
+        return cls.root if cls.root is not None else os.path.abspath(tempfile.gettempdir())
+
+    @classmethod
+    def removeQuota(cls) -> None:
+        with cls._lock:
+            cls.quotaBytes = None
+
+    @classmethod
+    def findTmpfsRoot(cls) -> Optional[str]:
+        """
+        Finds a writable directory that is backed by memory rather than the disk.
+
+        :returns: the first of ``TMPFS_ROOTS`` that is a writable tmpfs, or None if none of them are
+        """
+        try:
+            with open("/proc/mounts", "r") as r:
+                mounts = {fields[1]: fields[2] for fields in (line.split() for line in r) if len(fields) > 2}
+        except OSError:
+            return None
+
+        for root in cls.TMPFS_ROOTS:
+            if mounts.get(root) == "tmpfs" and os.access(root, os.W_OK):
+                return root
+
+        return None
+
+    @staticmethod
+    def measure(path: str) -> int:
+        """
+        Gets the number of bytes that the files in a directory take up. Files that disappear while the directory is
+        being walked are ignored.
+        """
+        total = 0
+        directories = [path]
+
+        while directories:
+            try:
+                entries = list(os.scandir(directories.pop()))
+            except OSError:
+                continue
+
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        directories.append(entry.path)
+                    else:
+                        total += entry.stat(follow_symlinks=False).st_size
+                except OSError:
+                    pass
+
+        return total
+
+    @classmethod
+    def getLiveCount(cls) -> int:
+        with cls._lock:
+            return len(cls.live)
+
+    @classmethod
+    def getPooledCount(cls) -> int:
+        with cls._lock:
+            return len(cls.pooled)
+
+    @classmethod
+    def getLiveBytes(cls) -> int:
+        """
+        Gets the number of bytes that are used by the sandboxes that are in use or waiting to be deleted.
+        This is what the quota is enforced against. Sandboxes that are waiting to be deleted are only measured while a
+        quota is set.
+        """
+        with cls._lock:
+            live = list(cls.live.keys())
+            pending = sum(cls.pendingBytes.values())
+
+        return pending + sum(cls.measure(path) for path in live)
+
+    @classmethod
+    def isManaged(cls, path: str) -> bool:
+        with cls._lock:
+            return path in cls.live
+
+    @staticmethod
+    def _empty(path: str) -> None:
+        for entry in os.scandir(path):
+            if entry.is_dir(follow_symlinks=False):
+                shutil.rmtree(entry.path, ignore_errors=True)
+                continue
+
+            try:
+                os.unlink(entry.path)
+            except OSError:  # pragma: no cover
+                pass
+
+    @classmethod
+    def _work(cls) -> None:
+        while True:
+            path, recycle = cls._queue.get()
+
+            try:
+                if recycle:
+                    try:
+                        cls._empty(path)
+                    except OSError:  # pragma: no cover
+                        recycle = False
+
+                if not recycle:
+                    shutil.rmtree(path, ignore_errors=True)
+
+                with cls._lock:
+                    cls.pendingBytes.pop(path, None)
+
+                    if recycle and cls._getRoot() == os.path.dirname(path) and len(cls.pooled) < cls.maxPooled:
+                        cls.pooled.append(path)
+                        continue
+
+                    cls.deleted += 1
+
+                if recycle:
+                    shutil.rmtree(path, ignore_errors=True)
+            finally:
+                cls._queue.task_done()
+
+    @classmethod
+    def _schedule(cls, path: str, recycle: bool) -> None:
+        # the lock must already be held by the caller
+        if cls._worker is None or not cls._worker.is_alive():
+            cls._worker = threading.Thread(target=cls._work, name="SandboxManager", daemon=True)
+            cls._worker.start()
+
+        cls._queue.put((path, recycle))
+
+    @classmethod
+    def _trimPooled(cls, maxPooled: int) -> None:
+        # the lock must already be held by the caller
+        while len(cls.pooled) > maxPooled:
+            path = cls.pooled.pop()
+            cls.pendingBytes[path] = 0
+            cls._schedule(path, False)
+
+    @classmethod
+    def flush(cls) -> None:
+        """
+        Waits for all the sandboxes that have been released to be emptied or deleted.
+        """
+        cls._queue.join()
+
+    @classmethod
+    def _enforceQuota(cls) -> None:
+        if cls.quotaBytes is None:
+            return
+
+        if cls.getLiveBytes() < cls.quotaBytes:
+            return
+
+        # the deletions that are still pending might free up enough space
+        cls.flush()
+
+        liveBytes = cls.getLiveBytes()
+
+        if liveBytes >= cls.quotaBytes:
+            raise EnvironmentError(f"Sandbox quota of {cls.quotaBytes} bytes has been exceeded! "
+                                   f"{liveBytes} bytes are in use by {cls.getLiveCount()} sandboxes.")
+
+    @classmethod
+    def acquire(cls, owner: Optional[object] = None) -> str:
+        """
+        Description
+        ---
+        Gets an empty sandbox. If there are no pooled sandboxes, then a new one is created under ``root``.
+
+        The sandbox must be given back with ``release`` once it is no longer needed. If an owner is provided, then the
+        sandbox is released automatically when the owner is garbage collected.
+
+        :param owner: the object that the sandbox belongs to (ie: the execution environment)
+        :returns: the absolute path to the sandbox
+        :raises EnvironmentError: if the quota has been exceeded
+        """
+        cls._enforceQuota()
+
+        with cls._lock:
+            if not cls._exitHandlerRegistered:
+                atexit.register(cls.clear)
+                cls._exitHandlerRegistered = True
+
+            if cls.pooled:
+                path = cls.pooled.pop()
+                cls.reused += 1
+            else:
+                path = tempfile.mkdtemp(prefix=cls.PREFIX, dir=cls._getRoot())
+                cls.created += 1
+
+            cls.live[path] = weakref.finalize(owner, cls.release, path) if owner is not None else None
+
+        return path
+
+    @classmethod
+    def release(cls, path: str) -> bool:
+        """
+        Description
+        ---
+        Gives a sandbox back to the manager. The sandbox is moved out of the way right away, so its path no longer
+        exists once this returns. It is then emptied on the background thread and is either pooled (under a new name)
+        or deleted.
+
+        This is a noop for sandboxes that weren't created by the manager or have already been released.
+
+        :param path: the path that was returned by ``acquire``
+        :returns: True if the sandbox was released
+        """
+        # a forked child sees the parent's sandboxes, but they are still in use by the parent
+        if os.getpid() != cls._ownerPid:
+            return False
+
+        with cls._lock:
+            if path not in cls.live:
+                return False
+
+            finalizer = cls.live.pop(path)
+
+            if finalizer is not None:
+                finalizer.detach()
+
+            # renaming is cheap, and means that nothing that still has the old path is able to see the next user's files
+            releasedPath = os.path.join(os.path.dirname(path), cls.PREFIX + secrets.token_hex(8))
+
+            try:
+                os.rename(path, releasedPath)
+            except OSError:
+                # ie: the sandbox was already deleted by someone else
+                shutil.rmtree(path, ignore_errors=True)
+                cls.deleted += 1
+                return True
+
+            cls.pendingBytes[releasedPath] = cls.measure(releasedPath) if cls.quotaBytes is not None else 0
+
+            cls._schedule(releasedPath, len(cls.pooled) < cls.maxPooled)
+
+        return True
+
+    @classmethod
+    def _resetAfterFork(cls) -> None:
+        cls._ownerPid = os.getpid()
+        cls.live = {}
+        cls.pooled = []
+        cls.pendingBytes = {}
+        cls._lock = threading.Lock()
+        cls._queue = queue.Queue()
+        cls._worker = None
+
+    @classmethod
+    def clear(cls) -> None:
+        """
+        Waits for the pending deletions and then deletes every pooled sandbox.
+        This is called automatically when the program exits.
+
+        Sandboxes that are still in use are not affected.
+        """
+        if os.getpid() != cls._ownerPid:
+            return
+
+        cls.flush()
+
+        with cls._lock:
+            cls._trimPooled(0)
+
+        cls.flush()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=SandboxManager._resetAfterFork)
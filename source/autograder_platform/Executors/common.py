@@ -1,5 +1,6 @@
+import dataclasses
 import os
-from typing import Dict, Iterable, List, Optional
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 
 
 class MissingOutputDataException(Exception):
@@ -7,9 +8,15 @@ class MissingOutputDataException(Exception):
         super().__init__("Output results are NULL.\n"
                          f"Failed to parse results in output buffer: {outputFileName}.\n"
                          f"Submission possibly crashed or terminated before harness could write to output buffer: {outputFileName}.\n"
-                         f"Submission may have overrun buffer memory\n"
                          f"Likely causes: The presence of exit or quit in student's code; extra debugging print statements")
 
+class CorruptOutputDataException(Exception):
+    def __init__(self, outputFileName, reason):
+        super().__init__("Output results are CORRUPT.\n"
+                         f"Failed to parse results in output buffer: {outputFileName}.\n"
+                         f"Reason: {reason}.\n"
+                         f"Submission possibly terminated while the harness was writing to output buffer: {outputFileName}.")
+
 def filterStdOut(stdOut: Optional[List[str]]) -> Optional[List[str]]:
     """
     This function takes in a list representing the output from the program. It includes ALL output,
@@ -30,26 +37,140 @@ def filterStdOut(stdOut: Optional[List[str]]) -> Optional[List[str]]:
 
     return filteredOutput
 
-def detectFileSystemChanges(inFiles: Iterable[str], directoryToCheck: str) -> Dict[str, str]:
-    files = [os.path.join(directoryToCheck, file) for file in os.listdir(directoryToCheck)]
+MAX_SCANNED_ENTRIES: int = 10_000
+"""The max number of entries that are looked at when the sandbox is scanned. This stops a submission that creates a
+huge number of files from stalling the autograder"""
 
-    outputFiles: Dict[str, str] = {}
+FileSystemSnapshot = Dict[str, Tuple[int, int, int]]
+"""The inode, size, and mtime of each file in a directory, by its path relative to that directory"""
 
-    # This ignores subfolders
-    for path in files:
-        if os.path.isdir(path):
-            continue
 
-        if "__" in os.path.basename(path):
-            continue
+@dataclasses.dataclass
+class FileSystemChanges:
+    """
+    Description
+    ===========
+
+    This class holds the files that were changed in the sandbox by the student's submission.
+
+    The created and modified files map the path of the file (relative to the sandbox) to its actual path.
+    """
+    created: Dict[str, str] = dataclasses.field(default_factory=dict)
+    modified: Dict[str, str] = dataclasses.field(default_factory=dict)
+    deleted: Set[str] = dataclasses.field(default_factory=set)
+    truncated: bool = False
+    """If the scan stopped early because the sandbox had more than the max number of entries. 
+    Deleted files aren't reported if this is set"""
+
+    def getOutputFiles(self) -> Dict[str, str]:
+        return {**self.created, **self.modified}
+
+
+def _isIgnored(name: str) -> bool:
+    # ignores dunder files (ie: __pycache__) and hidden files
+    return "__" in name or name[0] == "."
 
-        # ignore hidden files
-        if os.path.basename(path)[0] == ".":
-            continue
 
-        if path in inFiles:
+def _scanFileSystem(directory: str, maxEntries: int) -> Tuple[FileSystemSnapshot, bool]:
+    snapshot: FileSystemSnapshot = {}
+    directories: List[str] = [""]
+    scanned = 0
+
+    while directories:
+        relativeDirectory = directories.pop()
+
+        try:
+            entries = os.scandir(os.path.join(directory, relativeDirectory))
+        except OSError:
             continue
 
-        outputFiles[os.path.basename(path)] = path
+        with entries:
+            for entry in entries:
+                scanned += 1
+
+                if scanned > maxEntries:
+                    return snapshot, True
+
+                if _isIgnored(entry.name):
+                    continue
+
+                relativePath = os.path.join(relativeDirectory, entry.name)
+
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        directories.append(relativePath)
+                        continue
 
-    return outputFiles
+                    fileStat = entry.stat()
+                except OSError:
+                    # ie: the file was deleted while we were looking at it, or it is a broken symlink
+                    continue
+
+                snapshot[relativePath] = (fileStat.st_ino, fileStat.st_size, fileStat.st_mtime_ns)
+
+    return snapshot, False
+
+
+def snapshotFileSystem(directory: str, maxEntries: int = MAX_SCANNED_ENTRIES) -> FileSystemSnapshot:
+    """
+    This function records every file in a directory (including subfolders) so that changes to it are able to be
+    found with :ref:`diffFileSystem`.
+
+    :param directory: the directory to snapshot
+    :param maxEntries: the max number of entries to look at
+    :returns: the snapshot of the directory
+    """
+    return _scanFileSystem(directory, maxEntries)[0]
+
+
+def diffFileSystem(directory: str, snapshot: Optional[FileSystemSnapshot] = None, inFiles: Iterable[str] = (),
+                   maxEntries: int = MAX_SCANNED_ENTRIES) -> FileSystemChanges:
+    """
+    This function finds the files that were created, modified, or deleted in a directory since a snapshot was taken.
+
+    If there is no snapshot, then every file in the directory, other than ``inFiles``, is reported as created.
+
+    :param directory: the directory to check
+    :param snapshot: the snapshot that was taken before the submission was run
+    :param inFiles: the files that were put in the directory for the submission
+    :param maxEntries: the max number of entries to look at
+    :returns: the changes to the directory
+    """
+    current, truncated = _scanFileSystem(directory, maxEntries)
+
+    changes = FileSystemChanges(truncated=truncated)
+
+    if snapshot is None:
+        inFiles = {os.path.normpath(file) for file in inFiles}
+
+        for relativePath in current.keys():
+            path = os.path.join(directory, relativePath)
+
+            if os.path.normpath(path) not in inFiles:
+                changes.created[relativePath] = path
+
+        return changes
+
+    for relativePath, fileStat in current.items():
+        previousStat = snapshot.get(relativePath)
+
+        if previousStat is None:
+            changes.created[relativePath] = os.path.join(directory, relativePath)
+        elif previousStat != fileStat:
+            changes.modified[relativePath] = os.path.join(directory, relativePath)
+
+    if not truncated:
+        changes.deleted = snapshot.keys() - current.keys()
+
+    return changes
+
+
+def detectFileSystemChanges(inFiles: Iterable[str], directoryToCheck: str,
+                            snapshot: Optional[FileSystemSnapshot] = None) -> Dict[str, str]:
+    """
+    This function finds the files that were created or modified by the student's submission.
+    See :ref:`diffFileSystem`.
+
+    :returns: the changed files, by their path relative to ``directoryToCheck``
+    """
+    return diffFileSystem(directoryToCheck, snapshot, inFiles).getOutputFiles()
@@ -1,5 +1,5 @@
 import abc
-from typing import Generic, List, Set, TypeVar, Dict
+from typing import Generic, Hashable, List, Set, Tuple, TypeVar, Dict
 
 from autograder_platform.StudentSubmission.common import ValidationError, ValidationHook
 
@@ -176,3 +176,18 @@ class AbstractStudentSubmission(abc.ABC, Generic[T]):
     def getSubmissionRoot(self) -> str:
         return self.submissionRoot
 
+    def getSettings(self) -> Tuple[Hashable, ...]:
+        """
+        Description
+        ---
+
+        Gets the settings that affect how this submission is loaded, built, and validated.
+
+        Two submissions with the same root, contents, and settings are built identically.
+        Subclasses that add their own settings should extend this.
+
+        :returns: a hashable representation of the settings
+        """
+        return tuple(sorted(type(validator).__qualname__
+                            for validators in self.validators.values() for validator in validators))
+
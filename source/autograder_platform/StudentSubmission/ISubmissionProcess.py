@@ -21,6 +21,21 @@ class ISubmissionProcess(abc.ABC):
     def cleanup(self):
         pass
 
+    def cancel(self) -> bool:
+        """
+        Description
+        ---
+        Cancels the submission. This is called from a different thread than ``run``.
+
+        If the submission is running, it should be killed, and ``run`` should return as soon as possible.
+        If the submission hasn't started yet, then it should never be started.
+
+        By default, submissions aren't able to be cancelled, and this does nothing.
+
+        :returns: True if the submission is able to be cancelled
+        """
+        return False
+
     @classmethod
     @abc.abstractmethod
     def processAndRaiseExceptions(cls, environment: ExecutionEnvironment):
@@ -1,4 +1,4 @@
-from typing import Dict, Type, Tuple, Optional, Callable
+from typing import Dict, List, Type, Tuple, Optional, Callable
 
 from autograder_platform.Executors.Environment import ExecutionEnvironment, ImplEnvironment, ImplResults
 
@@ -17,6 +17,39 @@ class SubmissionProcessFactory:
         Optional[Callable[[ImplEnvironment, AutograderConfiguration], None]]]] \
         = {}
 
+    startupHooks: List[Callable[[AutograderConfiguration], Optional[str]]] = []
+    """
+    The hooks that implementations run once the config has been loaded, before any tests are run.
+    Each hook is able to return a message for the CLI to print.
+    """
+
+    @classmethod
+    def registerStartupHook(cls, hook: Callable[[AutograderConfiguration], Optional[str]]) -> None:
+        if hook in cls.startupHooks:
+            return
+
+        cls.startupHooks.append(hook)
+
+    @classmethod
+    def runStartupHooks(cls, autograderConfig: AutograderConfiguration) -> List[str]:
+        """
+        Description
+        ---
+        Runs every registered startup hook. This should be called once the config has been loaded.
+
+        :param autograderConfig: the config that was loaded
+        :returns: the messages that the hooks returned
+        """
+        messages: List[str] = []
+
+        for hook in cls.startupHooks:
+            message = hook(autograderConfig)
+
+            if message is not None:
+                messages.append(message)
+
+        return messages
+
     @classmethod
     def register(cls, submission: Type[AbstractStudentSubmission], process: Type[ISubmissionProcess],
                  implEnvironment: Optional[Type[ImplEnvironment]] = None,
@@ -0,0 +1,155 @@
+"""
+This module provides the registry that built student submissions are cached in.
+
+Every test class normally loads, builds, and validates the student's submission in ``setUpClass``. With many test
+classes, this means that the submission is rediscovered, every validator is rerun, and the main file is recompiled for
+every class, even though nothing has changed. The registry caches the built submission, so only the first class
+actually does that work.
+
+Submissions are keyed by their type, their root, their settings (see :ref:`AbstractStudentSubmission.getSettings`),
+and a hash of the contents of their root. So if anything about the submission changes, it is rebuilt.
+Validation errors are cached as well, so a submission that failed validation fails every class without being revalidated.
+
+Only one thread builds each submission. Other threads that need the same submission wait for that build to finish,
+while different submissions are still able to be built at the same time.
+"""
+import hashlib
+import os
+import threading
+from concurrent.futures import Future
+from typing import Dict, Hashable, Tuple, TypeVar
+
+from autograder_platform.StudentSubmission.AbstractStudentSubmission import AbstractStudentSubmission
+from autograder_platform.StudentSubmission.common import ValidationError
+
+TSubmission = TypeVar("TSubmission", bound=AbstractStudentSubmission)
+
+
+class SubmissionRegistry:
+    """
+    This class manages the built submissions for the entire program.
+    Similar to the configuration provider, there is only ever one registry.
+    """
+    submissions: Dict[Hashable, AbstractStudentSubmission] = {}
+    validationErrors: Dict[Hashable, ValidationError] = {}
+    building: Dict[Hashable, "Future[AbstractStudentSubmission]"] = {}
+    """The submissions that are currently being built, so that other threads are able to wait for them"""
+
+    hits: int = 0
+    misses: int = 0
+
+    _lock: threading.Lock = threading.Lock()
+
+    @staticmethod
+    def hashSubmissionRoot(submissionRoot: str) -> str:
+        """
+        Hashes the paths and contents of every file in the submission root. Hidden files and python caches are ignored.
+
+        :param submissionRoot: the root of the submission
+        :returns: the hex digest of the hash
+        """
+        digest = hashlib.sha256()
+
+        for root, directories, files in os.walk(submissionRoot):
+            # sorting (and filtering) in place means that os.walk visits directories in a consistent order
+            directories[:] = sorted(directory for directory in directories
+                                    if not directory.startswith(".") and directory != "__pycache__")
+
+            for file in sorted(files):
+                if file.startswith("."):
+                    continue
+
+                path = os.path.join(root, file)
+
+                digest.update(os.path.relpath(path, submissionRoot).encode())
+                digest.update(b"\0")
+
+                with open(path, 'rb') as rb:
+                    digest.update(hashlib.sha256(rb.read()).digest())
+
+        return digest.hexdigest()
+
+    @classmethod
+    def buildKey(cls, submission: AbstractStudentSubmission) -> Tuple[Hashable, ...]:
+        submissionRoot = os.path.abspath(submission.getSubmissionRoot())
+
+        # if the root doesn't exist, then it fails validation every time, so there isn't anything to hash
+        contentHash = cls.hashSubmissionRoot(submissionRoot) if os.path.isdir(submissionRoot) else ""
+
+        return type(submission), submissionRoot, submission.getSettings(), contentHash
+
+    @classmethod
+    def getOrBuild(cls, submission: TSubmission) -> TSubmission:
+        """
+        Description
+        ---
+        Gets the built and validated submission that matches ``submission``.
+
+        If a matching submission hasn't been built yet, then ``submission`` is loaded, built, validated, and then cached.
+        Otherwise, ``submission`` is discarded and the cached submission is returned.
+
+        The submission should be fully configured (root, validators, settings, etc.) but not loaded.
+
+        :param submission: the submission to build
+        :returns: the built submission
+        :raises ValidationError: if the submission failed validation. This is also raised for every later call with a
+        matching submission, without validating it again.
+        """
+        key = cls.buildKey(submission)
+
+        # the lock is only held while checking the cache, so the build itself doesn't block unrelated submissions
+        with cls._lock:
+            if key in cls.validationErrors:
+                cls.hits += 1
+                raise cls.validationErrors[key].with_traceback(None)
+
+            if key in cls.submissions:
+                cls.hits += 1
+                return cls.submissions[key]  # type: ignore
+
+            pending = cls.building.get(key)
+
+            if pending is not None:
+                cls.hits += 1
+            else:
+                cls.misses += 1
+                future: "Future[AbstractStudentSubmission]" = Future()
+                cls.building[key] = future
+
+        if pending is not None:
+            # the same submission is already being built by another thread
+            exception = pending.exception()
+
+            if exception is not None:
+                raise exception.with_traceback(None)
+
+            return pending.result()  # type: ignore
+
+        try:
+            submission.load().build().validate()
+        except BaseException as ex:
+            with cls._lock:
+                if isinstance(ex, ValidationError):
+                    cls.validationErrors[key] = ex
+
+                cls.building.pop(key, None)
+
+            future.set_exception(ex)
+            raise
+
+        with cls._lock:
+            cls.submissions[key] = submission
+            cls.building.pop(key, None)
+
+        future.set_result(submission)
+
+        return submission
+
+    @classmethod
+    def clear(cls) -> None:
+        with cls._lock:
+            cls.submissions = {}
+            cls.validationErrors = {}
+            cls.building = {}
+            cls.hits = 0
+            cls.misses = 0
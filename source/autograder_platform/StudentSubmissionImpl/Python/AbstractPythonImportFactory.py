@@ -1,3 +1,4 @@
+import sys
 from importlib.abc import MetaPathFinder
 from typing import List
 
@@ -9,3 +10,13 @@ class AbstractModuleFinder(MetaPathFinder):
 
     def getModulesToReload(self) -> List[str]:
         return self.modulesToReload
+
+    def install(self) -> None:
+        """
+        Adds this finder to the front of ``sys.meta_path``, so that it takes priority over every other finder, and
+        removes the modules that it should reload from ``sys.modules``.
+        """
+        sys.meta_path.insert(0, self)
+
+        for module in self.getModulesToReload():
+            sys.modules.pop(module, None)
@@ -0,0 +1,189 @@
+"""
+This module provides the cache that compiled student and injected code is stored in.
+
+The student's main file, every module that it imports from its submission, and every injected method are compiled
+each time that they are built or imported. When regrading a batch of submissions, most of that code (starter code,
+injected helpers, etc.) is identical between students, and within one submission, the same files are imported by every
+test.
+
+Code objects are keyed by a hash of their source, the filename that they are compiled with, and the interpreter's cache
+tag, so a cached code object is only ever reused for exactly the same source compiled by the same version of Python.
+The most recently used code objects are kept in memory, and they can optionally be stored on disk (with ``marshal``)
+so that they are shared between runs.
+"""
+import hashlib
+import marshal
+import os
+import sys
+import tempfile
+import threading
+from collections import OrderedDict
+from types import CodeType
+from typing import Final, Optional, Union
+
+
+class BytecodeCache:
+    """
+    This class manages the compiled code for the entire program.
+    Similar to the configuration provider, there is only ever one cache.
+
+    At most ``maxEntries`` code objects are kept in memory, the least recently used code objects are evicted first.
+    If ``directory`` is set, then code objects are also written to and read from that directory.
+    """
+    DEFAULT_MAX_ENTRIES: Final[int] = 256
+    FILE_SUFFIX: Final[str] = ".marshal"
+
+    maxEntries: int = DEFAULT_MAX_ENTRIES
+    directory: Optional[str] = None
+
+    entries: "OrderedDict[str, CodeType]" = OrderedDict()
+
+    hits: int = 0
+    diskHits: int = 0
+    misses: int = 0
+
+    _lock: threading.Lock = threading.Lock()
+
+    @staticmethod
+    def buildKey(source: Union[str, bytes], filename: str) -> str:
+        """
+        Builds the key that a code object is cached under.
+
+        :param source: the source that is being compiled
+        :param filename: the filename that the source is being compiled with
+        :returns: the hex digest of the key
+        """
+        if isinstance(source, str):
+            source = source.encode("UTF-8", "surrogatepass")
+
+        digest = hashlib.sha256()
+        digest.update(str(sys.implementation.cache_tag).encode())
+        digest.update(b"\0")
+        digest.update(filename.encode("UTF-8", "surrogatepass"))
+        digest.update(b"\0")
+        digest.update(source)
+
+        return digest.hexdigest()
+
+    @classmethod
+    def configure(cls, maxEntries: Optional[int] = None, directory: Optional[str] = None) -> None:
+        """
+        Description
+        ---
+        Configures the cache.
+
+        :param maxEntries: the max number of code objects to keep in memory. If 0, nothing is kept in memory.
+        :param directory: the directory to store code objects in. It is created if it doesn't exist.
+        """
+        if maxEntries is not None:
+            if maxEntries < 0:
+                raise AttributeError(f"INVALID STATE: Max cache entries must be non-negative. Was {maxEntries}")
+
+            with cls._lock:
+                cls.maxEntries = maxEntries
+                cls._evict()
+
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+            cls.directory = directory
+
+    @classmethod
+    def getHitRate(cls) -> float:
+        """
+        :returns: the fraction of compilations that were served from the cache (either in memory or on disk)
+        """
+        total = cls.hits + cls.diskHits + cls.misses
+
+        if total == 0:
+            return 0.0
+
+        return (cls.hits + cls.diskHits) / total
+
+    @classmethod
+    def _evict(cls) -> None:
+        while len(cls.entries) > cls.maxEntries:
+            cls.entries.popitem(last=False)
+
+    @classmethod
+    def _readFromDisk(cls, key: str) -> Optional[CodeType]:
+        if cls.directory is None:
+            return None
+
+        try:
+            with open(os.path.join(cls.directory, key + cls.FILE_SUFFIX), 'rb') as rb:
+                code = marshal.load(rb)
+        # A missing or corrupt file is just a miss
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+
+        return code if isinstance(code, CodeType) else None
+
+    @classmethod
+    def _writeToDisk(cls, key: str, code: CodeType) -> None:
+        if cls.directory is None:
+            return
+
+        try:
+            fd, tempPath = tempfile.mkstemp(dir=cls.directory)
+
+            with os.fdopen(fd, 'wb') as wb:
+                marshal.dump(code, wb)
+
+            # replacing the file means that readers never see a partially written file
+            os.replace(tempPath, os.path.join(cls.directory, key + cls.FILE_SUFFIX))
+        except OSError:
+            # the disk cache is best effort
+            pass
+
+    @classmethod
+    def compile(cls, source: Union[str, bytes], filename: str) -> CodeType:
+        """
+        Description
+        ---
+        Compiles source in ``exec`` mode, reusing the code object from a previous compilation if the same source has
+        already been compiled with the same filename.
+
+        This raises exactly the same errors as the builtin ``compile``. Source that fails to compile isn't cached.
+
+        :param source: the source to compile
+        :param filename: the filename to compile the source with
+        :returns: the compiled code object
+        """
+        key = cls.buildKey(source, filename)
+
+        with cls._lock:
+            if key in cls.entries:
+                cls.hits += 1
+                cls.entries.move_to_end(key)
+                return cls.entries[key]
+
+        code = cls._readFromDisk(key)
+
+        if code is not None:
+            cacheHit = True
+        else:
+            cacheHit = False
+            code = compile(source, filename, "exec")
+            cls._writeToDisk(key, code)
+
+        with cls._lock:
+            if cacheHit:
+                cls.diskHits += 1
+            else:
+                cls.misses += 1
+
+            cls.entries[key] = code
+            cls._evict()
+
+        return code
+
+    @classmethod
+    def clear(cls) -> None:
+        """
+        Removes every code object from memory and resets the statistics. Code objects on disk are not removed.
+        """
+        with cls._lock:
+            cls.entries = OrderedDict()
+            cls.hits = 0
+            cls.diskHits = 0
+            cls.misses = 0
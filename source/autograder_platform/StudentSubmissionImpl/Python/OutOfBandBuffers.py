@@ -0,0 +1,145 @@
+"""
+This module provides out-of-band transfer for large buffers in the results (pickle protocol 5, see PEP 574).
+
+When a student's function returns something like a large bytearray or numpy array, the in-band path copies it
+several times (into the pickle, into the channel, out of the channel, and then into the unpickled object).
+Instead, large contiguous buffers are written once by the child into a single file in the system's temp directory
+(not shared memory), which the parent maps into memory. The parent then reconstructs the objects as views over that
+mapping, so the buffers are never copied in to the parent's heap unless the type requires it (ie: ``bytearray`` copies
+on reconstruction, but numpy arrays do not). If the temp directory isn't backed by memory, then the buffers are
+written to the disk, although the page cache normally means that the parent maps them without reading them back.
+
+The file is unlinked as soon as it is mapped, so it is cleaned up by the OS once the last view is released.
+The file is named after the output channel, so the parent is still able to remove it if the child is killed (or its
+output is corrupt) after the file was written but before the parent learned where it was.
+The parent always builds the path itself, as the metadata is written by the child, which runs the student's code.
+"""
+import mmap
+import os
+import pickle
+import secrets
+import tempfile
+from typing import Dict, Final, List, Optional, Tuple, TypedDict
+
+from autograder_platform.StudentSubmissionImpl.Python.SharedMemoryChannel import SharedMemoryChannel
+
+
+class OutOfBandMetadata(TypedDict):
+    fields: Dict[str, List[Tuple[int, int]]]
+
+
+class OutOfBandWriter:
+    """
+    Collects the out-of-band buffers for each field in the child, then writes them all to one file.
+    """
+    FILE_PREFIX: Final[str] = "autograder_oob_"
+
+    def __init__(self, owner: Optional[int] = None, channelName: Optional[str] = None):
+        """
+        :param owner: The PID of the process that is responsible for the file. Defaults to this process.
+        See :ref:`SharedMemoryChannel.owner` for why this would be set.
+        :param channelName: The name of the output channel that the metadata is written to. The file is named after it,
+        so that the parent is able to find it without the metadata. See ``discard``.
+        """
+        self.owner: int = owner if owner is not None else os.getpid()
+        self.path: str = self.buildPath(self.owner, channelName if channelName is not None else secrets.token_hex(4))
+        self.buffers: Dict[str, List[pickle.PickleBuffer]] = {}
+
+    @classmethod
+    def buildPath(cls, owner: int, channelName: str) -> str:
+        return os.path.join(tempfile.gettempdir(),
+                            f"{cls.FILE_PREFIX}{SharedMemoryChannel.buildTag(owner)}_{channelName.lstrip('/')}")
+
+    @classmethod
+    def discard(cls, owner: int, channelName: str) -> None:
+        """
+        Removes the file for a channel if it is still there. This is a noop if the file was already mapped, or if
+        nothing was written out-of-band.
+        """
+        try:
+            os.remove(cls.buildPath(owner, channelName))
+        except OSError:
+            pass
+
+    def add(self, field: str, buffers: List[pickle.PickleBuffer]) -> None:
+        if not buffers:
+            return
+
+        self.buffers[field] = buffers
+
+    def write(self) -> Optional[OutOfBandMetadata]:
+        """
+        Writes all the collected buffers.
+
+        :returns: The metadata that the parent needs to locate the buffers in the file, or None if there are no buffers
+        """
+        if not self.buffers:
+            return None
+
+        # the channel might have been used by an earlier execution that was killed before its file was removed
+        fd = os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_NOFOLLOW", 0) |
+                     getattr(os, "O_BINARY", 0), 0o600)
+
+        fields: Dict[str, List[Tuple[int, int]]] = {}
+        offset = 0
+
+        with os.fdopen(fd, 'wb') as w:
+            for field, buffers in self.buffers.items():
+                fields[field] = []
+
+                for buffer in buffers:
+                    raw = buffer.raw()
+                    w.write(raw)
+                    fields[field].append((offset, raw.nbytes))
+                    offset += raw.nbytes
+
+        return {"fields": fields}
+
+
+class OutOfBandReader:
+    """
+    Maps the file written by the :ref:`OutOfBandWriter` and hands out views over it for each field.
+    """
+
+    def __init__(self, metadata: Optional[OutOfBandMetadata], path: Optional[str] = None):
+        """
+        :param metadata: The metadata that was returned by ``OutOfBandWriter.write``
+        :param path: The path to the file, which must be built with ``OutOfBandWriter.buildPath``.
+        Required if there is any metadata.
+        :raises OSError: if the file is missing
+        :raises ValueError: if the file is empty
+        """
+        self.fields: Dict[str, List[Tuple[int, int]]] = {}
+        self.view: Optional[memoryview] = None
+
+        if metadata is None:
+            return
+
+        if path is None:
+            raise AttributeError("INVALID STATE: The path to the out-of-band buffers must be provided with their metadata")
+
+        self.fields = metadata["fields"]
+
+        with open(path, 'rb') as rb:
+            # ACCESS_COPY means that the reconstructed objects are still writable,
+            # but pages are only copied if they are actually written to
+            mapping = mmap.mmap(rb.fileno(), 0, access=mmap.ACCESS_COPY)
+
+        try:
+            os.remove(path)
+        # Windows doesn't allow mapped files to be removed, so we fall back to reading it in to memory
+        except OSError:  # pragma: no cover
+            contents = bytearray(mapping)  # pragma: no cover
+            mapping.close()  # pragma: no cover
+            os.remove(path)  # pragma: no cover
+
+            self.view = memoryview(contents)  # pragma: no cover
+            return  # pragma: no cover
+
+        self.view = memoryview(mapping)
+
+    def getBuffers(self, field: str) -> Optional[List[memoryview]]:
+        if self.view is None or field not in self.fields:
+            return None
+
+        return [self.view[offset:offset + length] for offset, length in self.fields[field]]
@@ -0,0 +1,176 @@
+"""
+This module provides :ref:`OutputSink`, which every backend uses as the submission's stdout.
+
+It must only ever import the standard library (and only modules that are already imported during startup), as it is
+also loaded by :ref:`PythonSpawnBootstrap` in an interpreter that hasn't imported the platform.
+"""
+import io
+
+
+class OutputSink(io.TextIOBase):
+    """
+    Description
+    ===========
+
+    This class is the stdout for the student's submission. Rather than keeping everything that was printed and
+    filtering it once the submission finishes, each line is filtered as soon as it is written, so only the OUTPUT lines
+    are kept. This matches ``filterStdOut``.
+
+    The line that is still being written is scanned for ``OUTPUT_MARKER`` as each write comes in. Until the marker is
+    found, only the end of the line (that the marker might start in) is kept, so a submission that writes a lot without
+    a line break doesn't grow the sink past ``maxCaptured``.
+
+    The unfiltered output is also kept, but only up to ``maxCaptured`` bytes, after which ``TRUNCATION_MARKER`` is added
+    and the rest is dropped. The total number of bytes and lines that were written is always counted.
+    """
+    DEFAULT_MAX_CAPTURED = 2 ** 20
+    TRUNCATION_MARKER = "\n[output truncated]\n"
+    OUTPUT_MARKER = "output "
+
+    def __init__(self, maxCaptured: int = DEFAULT_MAX_CAPTURED):
+        super().__init__()
+        self.maxCaptured = maxCaptured
+        self.lines: list[str] = []
+        """The filtered lines. This doesn't include the line that is still being written"""
+        self.pendingOutput: "str | None" = None
+        """The filtered text of the line that is still being written, or None if the marker hasn't been found in it"""
+        self.pendingTail = ""
+        """The end of the line that is still being written, which the marker might be split across"""
+        self.pendingStarted = False
+        self.skipLineFeed = False
+        """If the last write ended with a carriage return, which might be the start of a \\r\\n"""
+        self.captured: list[str] = []
+        self.capturedBytes = 0
+        self.truncated = False
+        self.byteCount = 0
+        self.completedLineCount = 0
+
+    def writable(self) -> bool:
+        return True
+
+    @property
+    def encoding(self) -> str:  # type: ignore
+        return "utf-8"
+
+    @staticmethod
+    def filterLine(line: str) -> "str | None":
+        index = line.lower().find(OutputSink.OUTPUT_MARKER)
+
+        if index == -1:
+            return None
+
+        return line[index + len(OutputSink.OUTPUT_MARKER):]
+
+    def _capture(self, text: str, size: int) -> None:
+        if self.truncated:
+            return
+
+        if self.capturedBytes + size <= self.maxCaptured:
+            self.captured.append(text)
+            self.capturedBytes += size
+            return
+
+        # the cap is in bytes, but this is close enough for text that isn't ascii
+        self.captured.append(text[:max(self.maxCaptured - self.capturedBytes, 0)])
+        self.captured.append(self.TRUNCATION_MARKER)
+        self.capturedBytes = self.maxCaptured
+        self.truncated = True
+
+    def _extendLine(self, text: str) -> None:
+        if not text:
+            return
+
+        self.pendingStarted = True
+
+        if self.pendingOutput is not None:
+            self.pendingOutput += text
+            return
+
+        # the first marker in the line must end in this text, as it would have already been found otherwise
+        line = self.pendingTail + text
+        filtered = self.filterLine(line)
+
+        if filtered is not None:
+            self.pendingOutput = filtered
+            self.pendingTail = ""
+            return
+
+        self.pendingTail = line[-(len(self.OUTPUT_MARKER) - 1):]
+
+    def _endLine(self) -> None:
+        if self.pendingOutput is not None:
+            self.lines.append(self.pendingOutput)
+
+        self.completedLineCount += 1
+        self.pendingOutput = None
+        self.pendingTail = ""
+        self.pendingStarted = False
+
+    def write(self, text: str) -> int:
+        if not isinstance(text, str):
+            raise TypeError(f"write() argument must be str, not {type(text).__name__}")
+
+        size = len(text) if text.isascii() else len(text.encode("utf-8", "surrogatepass"))
+        self.byteCount += size
+        self._capture(text, size)
+
+        remaining = text
+
+        # the line was already ended by the carriage return, so the line feed of a \r\n doesn't end another one
+        if self.skipLineFeed and text:
+            self.skipLineFeed = False
+
+            if remaining.startswith("\n"):
+                remaining = remaining[1:]
+
+        # line breaks are never printable, so most writes (ie: print's end) don't need to be split at all
+        if remaining.isprintable():
+            self._extendLine(remaining)
+            return len(text)
+
+        for line in remaining.splitlines(keepends=True):
+            content = line.splitlines()[0]
+
+            self._extendLine(content)
+
+            if content != line:
+                self._endLine()
+
+        self.skipLineFeed = remaining.endswith("\r")
+
+        return len(text)
+
+    def getOutput(self, start: int = 0) -> list[str]:
+        """
+        Gets the filtered lines, including the line that is still being written.
+
+        :param start: the number of filtered lines to skip (ie: the length of ``lines`` before a call)
+        """
+        lines = self.lines[start:]
+
+        if self.pendingOutput is not None:
+            lines.append(self.pendingOutput)
+
+        return lines
+
+    @property
+    def lineCount(self) -> int:
+        return self.completedLineCount + (1 if self.pendingStarted else 0)
+
+    def getvalue(self) -> str:
+        """
+        Gets the unfiltered output that was kept. This is at most ``maxCaptured`` bytes, plus the truncation marker.
+        """
+        return "".join(self.captured)
+
+    def getResults(self) -> dict:
+        """
+        :returns: the filtered lines and the stats about the output, using only types that marshal supports
+        """
+        return {
+            "lines": self.getOutput(),
+            "captured": self.getvalue(),
+            "truncated": self.truncated,
+            "byteCount": self.byteCount,
+            "lineCount": self.lineCount,
+        }
@@ -0,0 +1,271 @@
+"""
+This module provides the installer for the packages that a student's submission requires.
+
+Packages that are already installed (according to the installed distribution metadata) are skipped, so building the
+same submission again (ie: once per test class) doesn't run pip at all.
+
+Every package that is missing is installed in a single pip invocation, so pip only resolves the requirements once.
+Packages are installed from a local wheelhouse. If the wheelhouse doesn't have a wheel for every package yet, then they
+are downloaded (or built) in to it first, so the wheelhouse is able to be kept around (and shared between runs) to avoid
+hitting the index again. So pip is only invoked once if the wheels have already been cached, and twice if they haven't.
+
+Packages are installed from the wheelhouse without the index, so the wheelhouse must only be writable by this user.
+The default wheelhouse is per user, and is checked before it is used.
+
+Installs hold a lock on the wheelhouse, so processes that are building the same submission at the same time (ie: the
+workers of the parallel runner) install one at a time, and every process after the first finds the packages installed.
+"""
+import importlib
+import importlib.metadata
+import os
+import shutil
+import stat
+import subprocess
+import sys
+import sysconfig
+import tempfile
+from contextlib import contextmanager
+from typing import Dict, Final, Iterator, List, Optional
+
+from packaging.utils import InvalidWheelFilename, canonicalize_name, parse_wheel_filename
+from packaging.version import InvalidVersion, Version
+
+
+class PackageInstaller:
+    """
+    This class manages installing packages for the entire program.
+    Similar to the configuration provider, there is only ever one installer.
+    """
+    DEFAULT_WHEELHOUSE: Final[str] = os.path.join(
+        tempfile.gettempdir(), f"autograder_wheelhouse_{os.getuid()}" if hasattr(os, "getuid") else "autograder_wheelhouse")
+    LOCK_FILE: Final[str] = ".lock"
+
+    wheelhouse: str = DEFAULT_WHEELHOUSE
+
+    invocations: int = 0
+    """The number of times that pip has been invoked to install packages"""
+
+    @classmethod
+    def configure(cls, wheelhouse: Optional[str] = None) -> None:
+        if wheelhouse is not None:
+            cls.wheelhouse = wheelhouse
+
+    @staticmethod
+    def buildRequirement(package: str, version: str) -> str:
+        return f"{package}=={version}" if version else package
+
+    @staticmethod
+    def isSatisfied(package: str, version: str) -> bool:
+        """
+        Checks if a package is already installed.
+
+        :param package: the name of the package
+        :param version: the version of the package. If empty, any version is accepted
+        :returns: True if the package is installed with a matching version
+        """
+        try:
+            installedVersion = importlib.metadata.version(package)
+        except importlib.metadata.PackageNotFoundError:
+            return False
+
+        if not version:
+            return True
+
+        # versions are compared the same way that pip does, so ie: 1.0 is satisfied by 1.0.0
+        try:
+            return Version(installedVersion) == Version(version)
+        except InvalidVersion:
+            return installedVersion == version
+
+    @classmethod
+    def getMissingPackages(cls, packages: Dict[str, str]) -> Dict[str, str]:
+        return {package: version for package, version in packages.items() if not cls.isSatisfied(package, version)}
+
+    @staticmethod
+    def isExternallyManaged() -> bool:
+        """
+        Checks if pip refuses to install in to this interpreter without ``--break-system-packages`` (see PEP 668).
+        """
+        # virtual environments are never externally managed
+        if sys.prefix != sys.base_prefix:
+            return False
+
+        return os.path.isfile(os.path.join(sysconfig.get_path("stdlib"), "EXTERNALLY-MANAGED"))
+
+    @classmethod
+    def _ensureWheelhouse(cls) -> None:
+        """
+        Creates the wheelhouse if it doesn't exist, and checks that only this user is able to add wheels to it.
+
+        :raises EnvironmentError: if the wheelhouse belongs to another user or is writable by other users
+        """
+        os.makedirs(cls.wheelhouse, mode=0o700, exist_ok=True)
+
+        # ie: windows, where the temp directory already belongs to the user
+        if not hasattr(os, "getuid"):  # pragma: no cover
+            return
+
+        wheelhouseStat = os.lstat(cls.wheelhouse)
+
+        if stat.S_ISLNK(wheelhouseStat.st_mode) or wheelhouseStat.st_uid != os.getuid() \
+                or wheelhouseStat.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+            raise EnvironmentError(f"Wheelhouse '{cls.wheelhouse}' is not owned by this user or is writable by other "
+                                   f"users! Packages are installed from it without checking the index.")
+
+    @classmethod
+    def isInWheelhouse(cls, packages: Dict[str, str]) -> bool:
+        """
+        Checks if the wheelhouse has a wheel for every package. This doesn't check their dependencies, nor if the
+        wheels are compatible with this interpreter, so installing from the wheelhouse is still able to fail.
+
+        :param packages: maps the name of each package to its version. An empty version means any version.
+        """
+        available: Dict[str, List[Version]] = {}
+
+        for wheel in os.listdir(cls.wheelhouse):
+            try:
+                name, version, _, _ = parse_wheel_filename(wheel)
+            except InvalidWheelFilename:
+                continue
+
+            available.setdefault(name, []).append(version)
+
+        for package, version in packages.items():
+            versions = available.get(canonicalize_name(package))
+
+            if not versions:
+                return False
+
+            try:
+                if version and Version(version) not in versions:
+                    return False
+            except InvalidVersion:
+                return False
+
+        return True
+
+    @classmethod
+    def _runPip(cls, arguments: List[str]) -> None:
+        cls.invocations += 1
+        subprocess.check_call([sys.executable, "-m", "pip", *arguments],
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    @classmethod
+    def _installFromWheelhouse(cls, requirements: List[str]) -> None:
+        arguments = ["install", "--no-index", "--find-links", cls.wheelhouse, *requirements]
+
+        if cls.isExternallyManaged():
+            arguments.append("--break-system-packages")
+
+        cls._runPip(arguments)
+
+    @classmethod
+    def _addToWheelhouse(cls, directory: str) -> None:
+        for wheel in os.listdir(directory):
+            destination = os.path.join(cls.wheelhouse, wheel)
+
+            if os.path.exists(destination):
+                continue
+
+            try:
+                os.link(os.path.join(directory, wheel), destination)
+            except OSError:
+                shutil.copy2(os.path.join(directory, wheel), destination)
+
+    @classmethod
+    def resolveWheels(cls, requirements: List[str], directory: str) -> List[str]:
+        """
+        Description
+        ---
+        Resolves the requirements (and all of their dependencies) to wheels, without installing them.
+
+        The wheelhouse is tried first, and the index is only used if the wheelhouse can't satisfy every requirement.
+        Any wheels that are downloaded are added to the wheelhouse.
+
+        :param requirements: the requirements to resolve
+        :param directory: the (empty) directory to put the resolved wheels in
+        :returns: the paths to the resolved wheels
+        :raises Exception: if the requirements failed to resolve
+        """
+        cls._ensureWheelhouse()
+
+        arguments = ["wheel", "--wheel-dir", directory, "--find-links", cls.wheelhouse, *requirements]
+
+        try:
+            try:
+                cls._runPip(arguments + ["--no-index"])
+            except subprocess.CalledProcessError:
+                cls._runPip(arguments)
+        except subprocess.CalledProcessError:
+            raise Exception(f"Failed to resolve {', '.join(requirements)}!")
+
+        cls._addToWheelhouse(directory)
+
+        return [os.path.join(directory, wheel) for wheel in sorted(os.listdir(directory)) if wheel.endswith(".whl")]
+
+    @classmethod
+    @contextmanager
+    def _lockWheelhouse(cls) -> Iterator[None]:
+        try:
+            import fcntl
+        except ImportError:  # pragma: no cover
+            # ie: windows, where installs aren't serialized between processes
+            yield
+            return
+
+        cls._ensureWheelhouse()
+
+        with open(os.path.join(cls.wheelhouse, cls.LOCK_FILE), "a") as lockFile:
+            fcntl.flock(lockFile.fileno(), fcntl.LOCK_EX)
+
+            try:
+                yield
+            finally:
+                fcntl.flock(lockFile.fileno(), fcntl.LOCK_UN)
+
+    @classmethod
+    def install(cls, packages: Dict[str, str]) -> None:
+        """
+        Description
+        ---
+        Installs every package that isn't already installed.
+
+        :param packages: maps the name of each package to its version. An empty version means any version.
+        :raises Exception: if the packages failed to install
+        :raises EnvironmentError: if the wheelhouse isn't safe to install from
+        """
+        if not cls.getMissingPackages(packages):
+            return
+
+        cls._ensureWheelhouse()
+
+        with cls._lockWheelhouse():
+            # another process might have installed them while we were waiting for the lock
+            importlib.invalidate_caches()
+            missing = cls.getMissingPackages(packages)
+            requirements = [cls.buildRequirement(package, version) for package, version in missing.items()]
+
+            if not requirements:
+                return
+
+            installed = False
+
+            try:
+                # if every wheel has already been cached, then we don't need the index at all
+                if cls.isInWheelhouse(missing):
+                    try:
+                        cls._installFromWheelhouse(requirements)
+                        installed = True
+                    # ie: a dependency isn't in the wheelhouse
+                    except subprocess.CalledProcessError:
+                        pass
+
+                if not installed:
+                    cls._runPip(["wheel", "--wheel-dir", cls.wheelhouse, "--find-links", cls.wheelhouse,
+                                 *requirements])
+                    cls._installFromWheelhouse(requirements)
+            except subprocess.CalledProcessError:
+                raise Exception(f"Failed to install {', '.join(requirements)}!")
+
+        # the packages were installed after the import system looked at site packages
+        importlib.invalidate_caches()
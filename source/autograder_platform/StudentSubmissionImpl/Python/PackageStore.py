@@ -0,0 +1,185 @@
+"""
+This module provides the store that per-submission package overlays are built from.
+
+Installing a student's requirements in to the autograder's own interpreter means that submissions with conflicting
+requirements can't be graded at the same time, and that the packages have to be uninstalled afterwards.
+Instead, each set of requirements is resolved to wheels, and each wheel is unpacked once in to a content-addressed
+store (keyed by the hash of the wheel). The overlay for a submission is then just a directory of hardlinks in to the
+store, which is added to the front of ``sys.path`` in the submission's process.
+
+Overlays are keyed by their requirements, so submissions with the same requirements share an overlay.
+Overlays and the store are never modified once they have been created, so they are safe to use concurrently.
+As the overlays are linked to the store, stored files are read only, so that a submission isn't able to change the
+packages of every other submission by writing through a link (although this doesn't stop a submission that is running
+as root).
+
+Only the ``purelib`` and ``platlib`` parts of a wheel are made available. Scripts, headers, and data files are not.
+"""
+import hashlib
+import os
+import shutil
+import stat
+import sys
+import tempfile
+import threading
+import zipfile
+from typing import Dict, Final, Optional
+
+from autograder_platform.StudentSubmissionImpl.Python.PackageInstaller import PackageInstaller
+
+
+class PackageStore:
+    """
+    This class manages the package store and overlays for the entire program.
+    Similar to the configuration provider, there is only ever one store.
+    """
+    DEFAULT_ROOT: Final[str] = os.path.join(tempfile.gettempdir(), "autograder_package_store")
+    STORE_DIRECTORY: Final[str] = "store"
+    OVERLAY_DIRECTORY: Final[str] = "overlays"
+    CHUNK_SIZE: Final[int] = 2 ** 20
+    WRITE_MODE: Final[int] = stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH
+
+    root: str = DEFAULT_ROOT
+
+    linkedFiles: int = 0
+    copiedFiles: int = 0
+    """Files are only copied if they can't be hardlinked (ie: the store is on a different filesystem)"""
+
+    _lock: threading.Lock = threading.Lock()
+
+    @classmethod
+    def configure(cls, root: Optional[str] = None) -> None:
+        if root is not None:
+            cls.root = root
+
+    @staticmethod
+    def hashFile(path: str) -> str:
+        digest = hashlib.sha256()
+
+        with open(path, 'rb') as rb:
+            for chunk in iter(lambda: rb.read(PackageStore.CHUNK_SIZE), b""):
+                digest.update(chunk)
+
+        return digest.hexdigest()
+
+    @staticmethod
+    def buildOverlayKey(packages: Dict[str, str]) -> str:
+        requirements = sorted(PackageInstaller.buildRequirement(package.lower(), version)
+                              for package, version in packages.items())
+
+        digest = hashlib.sha256()
+        digest.update(str(sys.implementation.cache_tag).encode())
+
+        for requirement in requirements:
+            digest.update(b"\0")
+            digest.update(requirement.encode())
+
+        return digest.hexdigest()
+
+    @classmethod
+    def _publish(cls, temporaryPath: str, path: str) -> None:
+        """Atomically moves a finished directory in to place. If another process beat us to it, theirs is kept."""
+        try:
+            os.rename(temporaryPath, path)
+        except OSError:
+            if not os.path.isdir(path):
+                raise
+
+            shutil.rmtree(temporaryPath, ignore_errors=True)
+
+    @classmethod
+    def _unpackWheel(cls, wheel: str) -> str:
+        storePath = os.path.join(cls.root, cls.STORE_DIRECTORY, cls.hashFile(wheel))
+
+        if os.path.isdir(storePath):
+            return storePath
+
+        temporaryPath = tempfile.mkdtemp(dir=os.path.dirname(storePath))
+
+        with zipfile.ZipFile(wheel) as zipFile:
+            zipFile.extractall(temporaryPath)
+
+        # the contents of '<name>.data/purelib' and '<name>.data/platlib' belong in the root of site packages
+        for entry in os.listdir(temporaryPath):
+            if not entry.endswith(".data"):
+                continue
+
+            for scheme in ("purelib", "platlib"):
+                schemePath = os.path.join(temporaryPath, entry, scheme)
+
+                if not os.path.isdir(schemePath):
+                    continue
+
+                shutil.copytree(schemePath, temporaryPath, dirs_exist_ok=True)
+
+            shutil.rmtree(os.path.join(temporaryPath, entry))
+
+        for root, _, files in os.walk(temporaryPath):
+            for file in files:
+                path = os.path.join(root, file)
+                os.chmod(path, stat.S_IMODE(os.lstat(path).st_mode) & ~cls.WRITE_MODE)
+
+        cls._publish(temporaryPath, storePath)
+
+        return storePath
+
+    @classmethod
+    def _linkTree(cls, source: str, destination: str) -> None:
+        for root, _, files in os.walk(source):
+            destinationRoot = os.path.join(destination, os.path.relpath(root, source))
+            os.makedirs(destinationRoot, exist_ok=True)
+
+            for file in files:
+                destinationFile = os.path.join(destinationRoot, file)
+
+                # if two wheels provide the same file, then the first one wins, as it would with pip
+                if os.path.exists(destinationFile):
+                    continue
+
+                try:
+                    os.link(os.path.join(root, file), destinationFile)
+                    linked = True
+                except OSError:
+                    shutil.copy2(os.path.join(root, file), destinationFile)
+                    linked = False
+
+                with cls._lock:
+                    if linked:
+                        cls.linkedFiles += 1
+                    else:
+                        cls.copiedFiles += 1
+
+    @classmethod
+    def getOverlay(cls, packages: Dict[str, str]) -> str:
+        """
+        Description
+        ---
+        Gets the overlay that provides every package (and its dependencies), building it if it doesn't already exist.
+
+        :param packages: maps the name of each package to its version. An empty version means any version.
+        :returns: the path to the overlay. This should be added to the front of ``sys.path``
+        :raises Exception: if the packages failed to resolve
+        """
+        overlayPath = os.path.join(cls.root, cls.OVERLAY_DIRECTORY, cls.buildOverlayKey(packages))
+
+        if os.path.isdir(overlayPath):
+            return overlayPath
+
+        os.makedirs(os.path.join(cls.root, cls.STORE_DIRECTORY), exist_ok=True)
+        os.makedirs(os.path.dirname(overlayPath), exist_ok=True)
+
+        requirements = [PackageInstaller.buildRequirement(package, version) for package, version in packages.items()]
+
+        temporaryPath = tempfile.mkdtemp(dir=os.path.dirname(overlayPath))
+
+        try:
+            with tempfile.TemporaryDirectory() as wheelDirectory:
+                for wheel in PackageInstaller.resolveWheels(requirements, wheelDirectory):
+                    cls._linkTree(cls._unpackWheel(wheel), temporaryPath)
+        except BaseException:
+            shutil.rmtree(temporaryPath, ignore_errors=True)
+            raise
+
+        cls._publish(temporaryPath, overlayPath)
+
+        return overlayPath
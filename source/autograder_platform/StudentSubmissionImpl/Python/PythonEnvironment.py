@@ -1,12 +1,39 @@
 import dataclasses
-from typing import List, Dict, Optional, TypeVar
+from typing import TYPE_CHECKING, List, Dict, Optional, TypeVar
 from importlib import import_module
 
 from autograder_platform.StudentSubmissionImpl.Python.AbstractPythonImportFactory import AbstractModuleFinder
 from autograder_platform.StudentSubmissionImpl.Python.PythonModuleMockImportFactory import MockedModuleFinder
+from autograder_platform.StudentSubmissionImpl.Python.OutputSink import OutputSink
+from autograder_platform.StudentSubmissionImpl.Python.Serializer import AbstractSerializer, FastPathSerializer
 from autograder_platform.TestingFramework.SingleFunctionMock import SingleFunctionMock
 from autograder_platform.config.Config import AutograderConfiguration
 
+if TYPE_CHECKING:
+    from autograder_platform.StudentSubmissionImpl.Python.PythonSubmissionTemplate import PythonSubmissionTemplate
+
+
+@dataclasses.dataclass
+class CapturedOutput:
+    """
+    Description
+    ===========
+
+    This class holds the unfiltered stdout from the student's submission, along with how much was actually written.
+    Only the first ``max_captured_stdout`` bytes are kept. See :ref:`OutputSink`.
+    """
+    captured: str = ""
+    """The unfiltered output that was kept. If it was truncated, then this ends with the truncation marker"""
+    truncated: bool = False
+    byte_count: int = 0
+    """The number of bytes that were written, including the ones that weren't kept"""
+    line_count: int = 0
+    """The number of lines that were written, including the ones that weren't kept"""
+
+    @classmethod
+    def fromSink(cls, results: Dict) -> "CapturedOutput":
+        return cls(results["captured"], results["truncated"], results["byteCount"], results["lineCount"])
+
 
 class PythonResults():
     class Mocks():
@@ -21,8 +48,9 @@ class PythonResults():
 
             return self.mocks[mockName]
 
-    def __init__(self, mocks=None):
+    def __init__(self, mocks=None, output=None):
         self.mocks = mocks
+        self.output = output
 
     @property
     def mocks(self) -> Mocks:
@@ -32,15 +60,40 @@ class PythonResults():
     def mocks(self, value: Optional[Dict[str, SingleFunctionMock]]):
         self._mocks = PythonResults.Mocks(value)
 
+    @property
+    def output(self) -> CapturedOutput:
+        if self._output is None:
+            raise AssertionError("No output was captured from the student's submission!")
+
+        return self._output
+
+    @output.setter
+    def output(self, value: Optional[CapturedOutput]):
+        self._output = value
+
 
 @dataclasses.dataclass
 class PythonEnvironment():
-    buffer_size: int = 2**20
+    buffer_size: int = 2**16
     """Buffer size set from the config file. This shouldn't be set directly"""
+    use_zygote: bool = False
+    """If the submission should be forked from the zygote. This shouldn't be set directly"""
+    preload_modules: List[str] = dataclasses.field(default_factory=list)
+    """The modules to preload in the zygote. This shouldn't be set directly"""
     import_loader: List[AbstractModuleFinder] = dataclasses.field(default_factory=list)
     """The import loader. This shouldn't be set directly"""
     mocks: Dict[str, Optional[SingleFunctionMock]] = dataclasses.field(default_factory=dict)
     """What mocks have been defined for this run of the student's submission"""
+    serializer: AbstractSerializer = dataclasses.field(default_factory=FastPathSerializer)
+    """The serializer used to move stdin and results to and from the student's submission"""
+    template: Optional["PythonSubmissionTemplate"] = None
+    """The template that the student's submission should be forked from. If None, the submission is imported as usual"""
+    use_subinterpreter: bool = False
+    """If the submission should be run in a pooled sub-interpreter rather than a new process, when it is able to be"""
+    use_spawned_process: bool = False
+    """If module entrypoints should be run in a minimal interpreter that is started with posix_spawn"""
+    max_captured_stdout: int = OutputSink.DEFAULT_MAX_CAPTURED
+    """The max number of bytes of unfiltered stdout to keep. OUTPUT lines are always kept"""
 
 
 def configMapper(env: PythonEnvironment, config: AutograderConfiguration):
@@ -48,6 +101,8 @@ def configMapper(env: PythonEnvironment, config: AutograderConfiguration):
         raise AttributeError("INVALID STATE: Implementation environment mapping FAILED! Python config is NONE when should be defined!")
 
     env.buffer_size = config.config.python.buffer_size
+    env.use_zygote = config.config.python.use_zygote
+    env.preload_modules = config.config.python.preload_modules
 
 
 Builder = TypeVar("Builder", bound="PythonEnvironmentBuilder")
@@ -100,6 +155,85 @@ class PythonEnvironmentBuilder():
 
         return self
 
+    def setSerializer(self: Builder, serializer: AbstractSerializer) -> Builder:
+        """
+        Description
+        ---
+        This sets the serializer that is used to move data to and from the student's submission.
+
+        By default, stdlib pickle is tried first and dill is only used for objects that pickle can't handle.
+
+        :param serializer: the serializer to use
+        """
+        self.environment.serializer = serializer
+
+        return self
+
+    def setTemplate(self: Builder, template: "PythonSubmissionTemplate") -> Builder:
+        """
+        Description
+        ---
+        This sets the template that the student's submission is forked from, rather than imported in a new process.
+
+        Runners that can't be forked from the template (ie: module entrypoints) are still run as usual.
+
+        :param template: the template to fork from. This is normally started once in ``setUpClass``
+        """
+        self.environment.template = template
+
+        return self
+
+    def setUseSubInterpreter(self: Builder, useSubInterpreter: bool = True) -> Builder:
+        """
+        Description
+        ---
+        This sets if the student's submission should be run in a sub-interpreter inside the autograder, rather than in
+        a new process.
+
+        This is meant for the large number of tests that just call a function and check what it returned.
+        The sub-interpreter shares the autograder's working directory, so runners that need the sandbox as their
+        working directory (ie: tests that provide files) as well as module entrypoints are still run in a new process.
+        This must only be set for tests that don't write files, as the student's submission isn't able to change the
+        filesystem while it is running in a sub-interpreter (a ``PermissionError`` is raised instead).
+        See :ref:`SubInterpreterSubmissionProcess` for the other limitations.
+
+        :param useSubInterpreter: if a sub-interpreter should be used
+        """
+        self.environment.use_subinterpreter = useSubInterpreter
+
+        return self
+
+    def setUseSpawnedProcess(self: Builder, useSpawnedProcess: bool = True) -> Builder:
+        """
+        Description
+        ---
+        This sets if module entrypoints should be run in a minimal interpreter (``python -I -S``) that is started with
+        ``posix_spawn``, rather than with multiprocessing. See :ref:`SpawnedSubmissionProcess`.
+
+        Function entrypoints are not affected.
+
+        :param useSpawnedProcess: if a spawned interpreter should be used
+        """
+        self.environment.use_spawned_process = useSpawnedProcess
+
+        return self
+
+    def setMaxCapturedStdout(self: Builder, maxCapturedStdout: int) -> Builder:
+        """
+        Description
+        ---
+        This sets how many bytes of the unfiltered stdout are kept from the student's submission.
+        Lines containing OUTPUT are always kept, regardless of this. See :ref:`PythonResults.output`.
+
+        :param maxCapturedStdout: the max number of bytes to keep. Must be non-negative
+        """
+        if maxCapturedStdout < 0:
+            raise AttributeError(f"INVALID STATE: Max captured stdout must be non-negative. Was {maxCapturedStdout}")
+
+        self.environment.max_captured_stdout = maxCapturedStdout
+
+        return self
+
     def _processAndValidateModuleMocks(self):
         for moduleName in self.moduleMocks.keys():
             try:
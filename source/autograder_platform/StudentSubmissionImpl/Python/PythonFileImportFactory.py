@@ -1,12 +1,15 @@
 import os
 
+from contextlib import contextmanager
+from contextvars import ContextVar
 from importlib.machinery import ModuleSpec
 from types import ModuleType, CodeType
-from typing import Dict, Optional, List
+from typing import Dict, Iterator, Optional, List
 from importlib.abc import Loader
 from importlib.util import spec_from_file_location
 
 from autograder_platform.StudentSubmissionImpl.Python.AbstractPythonImportFactory import AbstractModuleFinder
+from autograder_platform.StudentSubmissionImpl.Python.BytecodeCache import BytecodeCache
 
 class ModuleFinder(AbstractModuleFinder):
     def __init__(self) -> None:
@@ -16,7 +19,8 @@ class ModuleFinder(AbstractModuleFinder):
     def addModule(self, fullname, path):
         for mod in fullname.split('.'):
             self.knownModules[mod] = path
-            self.modulesToReload.append(mod)
+            if mod not in self.modulesToReload:
+                self.modulesToReload.append(mod)
 
     def find_spec(self, fullname, path, target=None):
         if fullname not in self.knownModules:
@@ -41,22 +45,71 @@ class ModuleLoader(Loader):
         with open(self.filename) as r:
             data = r.read()
         
-        compiledImport: CodeType = compile(data, self.filename, "exec")
+        compiledImport: CodeType = BytecodeCache.compile(data, self.filename)
         exec(compiledImport, vars(module))
     
 class PythonFileImportFactory:
+    """
+    This class collects the files that should be importable by the student's submission, and then builds the import
+    handler for them.
+
+    Files are registered in to the current context's registry if one has been created with ``scoped``, otherwise, they
+    are registered in to the registry for the entire program.
+
+    Both registries keep every file that has been registered until the registry is dropped, and ``buildImport``
+    always returns the current one, so files registered in one place (ie: ``setUpClass``) are importable by every later
+    handler. A scoped registry is dropped when its ``with`` block exits, and ``reset`` empties the current registry.
+
+    A registry holds one entry per import name, so registering the same name again replaces the file rather than
+    growing the registry. Registering many distinct names without ever calling ``reset`` (or leaving ``scoped``) will
+    grow it for the life of the program.
+    """
     moduleFinder: ModuleFinder = ModuleFinder()
+    scopedModuleFinder: ContextVar[Optional[ModuleFinder]] = ContextVar("scopedModuleFinder", default=None)
+
+    @classmethod
+    def _getModuleFinder(cls) -> ModuleFinder:
+        scopedModuleFinder = cls.scopedModuleFinder.get()
+
+        return scopedModuleFinder if scopedModuleFinder is not None else cls.moduleFinder
 
     @classmethod
     def registerFile(cls, pathToFile: str, importName: str):
-        if cls.moduleFinder == None:
+        moduleFinder = cls._getModuleFinder()
+
+        if moduleFinder == None:
             raise AttributeError("Invalid State: Module finder is none")
-        if "addModule" in vars(cls.moduleFinder):
+        if "addModule" in vars(moduleFinder):
             raise AttributeError("Invalid ModuleFinder for registration")
 
-        cls.moduleFinder.addModule(importName, pathToFile)
-    
+        moduleFinder.addModule(importName, pathToFile)
+
     @classmethod
-    def buildImport(cls):
-        return cls.moduleFinder
+    @contextmanager
+    def scoped(cls) -> Iterator[None]:
+        """
+        Description
+        ---
+        Creates a registry for the current context (ie: a thread or an asyncio task) until the ``with`` block exits.
+        Files that are registered in this context aren't visible to any other context.
+        """
+        token = cls.scopedModuleFinder.set(ModuleFinder())
 
+        try:
+            yield
+        finally:
+            cls.scopedModuleFinder.reset(token)
+
+    @classmethod
+    def reset(cls) -> None:
+        """
+        Empties the current context's registry. Handlers that were already built keep their files.
+        """
+        if cls.scopedModuleFinder.get() is not None:
+            cls.scopedModuleFinder.set(ModuleFinder())
+        else:
+            cls.moduleFinder = ModuleFinder()
+
+    @classmethod
+    def buildImport(cls):
+        return cls._getModuleFinder()
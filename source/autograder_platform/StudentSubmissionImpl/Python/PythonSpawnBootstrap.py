@@ -0,0 +1,167 @@
+"""
+This module is the entrypoint for submissions that are run by :ref:`SpawnedSubmissionProcess`.
+
+It is run as a script by a new interpreter that was started with ``-I -S``, so it must only ever import the standard
+library at the top level. Even then, only modules that are already imported during startup are imported up front;
+the request and results are sent with marshal, and pickle is only imported if there is an exception or mocks to send.
+The platform (and dill) are only imported when the request needs them (ie: for mocks).
+
+The request is read from ``REQUEST_FD`` and the results are written to ``RESULT_FD``. Both are inherited from the
+parent, as is stdin, which is a pipe that the parent writes the test's input to.
+
+The submission's stdout is an :ref:`OutputSink`, which is loaded with ``loadOutputSink`` as it can't be imported without
+importing the platform.
+"""
+import _sitebuiltins
+import builtins
+import marshal
+import os
+import sys
+
+REQUEST_FD = 3
+RESULT_FD = 4
+
+CHUNK_SIZE = 2 ** 16
+
+OUTPUT_SINK_FILE = "OutputSink.py"
+OUTPUT_SINK_MODULE = "autograder_platform.StudentSubmissionImpl.Python.OutputSink"
+
+
+def loadOutputSink() -> type:
+    """
+    Loads :ref:`OutputSink` from the file next to this one. Importing it normally would import the platform's packages
+    (and so the entire implementation), and importlib isn't imported during startup, so the file is compiled directly.
+
+    The module is registered under its normal name, so if the platform is imported later (ie: for mocks), it uses the
+    same class.
+    """
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), OUTPUT_SINK_FILE)
+
+    with open(path, "rb") as r:
+        code = compile(r.read(), path, "exec")
+
+    module = type(sys)(OUTPUT_SINK_MODULE)
+    module.__file__ = path
+    sys.modules[OUTPUT_SINK_MODULE] = module
+
+    exec(code, vars(module))
+
+    return module.OutputSink
+
+
+def readAll(fd: int) -> bytes:
+    chunks: list[bytes] = []
+
+    while True:
+        chunk = os.read(fd, CHUNK_SIZE)
+
+        if not chunk:
+            break
+
+        chunks.append(chunk)
+
+    os.close(fd)
+
+    return b"".join(chunks)
+
+
+def writeAll(fd: int, data: bytes) -> None:
+    view = memoryview(data)
+
+    while view:
+        view = view[os.write(fd, view):]
+
+    os.close(fd)
+
+
+def run(request: dict) -> dict:
+    """
+    Runs the submission as ``__main__`` and collects the results.
+
+    :param request: the request from :ref:`SpawnedSubmissionProcess`
+    :returns: the results. Fields that need pickle are pickled on their own so that the parent is able to decode them
+    separately
+    """
+    # -S means that site packages were never added, so the parent's path is used as is
+    sys.path[:] = request["path"]
+
+    # site also adds these, and submissions (wrongly, but commonly) use them
+    builtins.exit = _sitebuiltins.Quitter("exit", "Ctrl-D (i.e. EOF)")  # type: ignore
+    builtins.quit = _sitebuiltins.Quitter("quit", "Ctrl-D (i.e. EOF)")  # type: ignore
+
+    os.chdir(request["executionDirectory"])
+    sys.path.append(os.getcwd())
+
+    importHandlers: list = []
+
+    if request["importHandlers"] is not None:
+        import dill
+
+        importHandlers = dill.loads(request["importHandlers"])
+
+    for importHandler in importHandlers:
+        importHandler.install()
+
+    stdout = loadOutputSink()(request["maxCapturedStdout"])
+    sys.stdout = stdout
+
+    exception = None
+    mocks: dict = {}
+
+    try:
+        exec(marshal.loads(request["code"]), {"__name__": "__main__"})
+    except Exception as ex:
+        exception = ex
+
+    if request["mocks"] and exception is None:
+        from autograder_platform.StudentSubmissionImpl.Python.Runners import PythonTaskLibrary
+
+        try:
+            mocks = PythonTaskLibrary.resolveMocks(dict.fromkeys(request["mocks"]))
+        except Exception as ex:
+            exception = ex
+
+    sys.stdout = sys.__stdout__
+
+    for importHandler in importHandlers:
+        sys.meta_path.remove(importHandler)
+
+    results: dict = {
+        "stdout": stdout.getResults(),
+        "mocks": None,
+        "exception": None,
+        "exceptionDescription": f"{type(exception).__qualname__}: {exception}" if exception is not None else None,
+    }
+
+    if exception is None and not mocks:
+        return results
+
+    # dill is only used if it was already needed, otherwise importing it would cost more than the rest of the run
+    if "dill" in sys.modules:
+        dumps = sys.modules["dill"].dumps
+    else:
+        import pickle
+        dumps = pickle.dumps
+
+    if mocks:
+        results["mocks"] = dumps(mocks)
+
+    try:
+        results["exception"] = dumps(exception)
+    except Exception:
+        # ie: exceptions that were defined in the submission. The parent falls back to the description instead
+        pass
+
+    return results
+
+
+def main() -> None:
+    request = marshal.loads(readAll(REQUEST_FD))
+
+    results = run(request)
+
+    writeAll(RESULT_FD, marshal.dumps(results))
+
+
+if __name__ == "__main__":
+    main()
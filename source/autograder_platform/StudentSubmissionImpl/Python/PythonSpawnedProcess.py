@@ -0,0 +1,311 @@
+"""
+This module provides a lightweight backend for submissions that are run with a module entrypoint.
+
+Module entrypoints only need stdin in, and stdout, exceptions, and files out. Running them with multiprocessing means
+paying for multiprocessing's bootstrapping, importing the platform in the child, and pickling the entire runner
+with dill. Instead, a minimal interpreter is started with ``posix_spawn`` and ``python -I -S``, which runs
+:ref:`PythonSpawnBootstrap`. The submission is sent to it as a marshalled code object, along with the names of
+the mocks to resolve, over an inherited pipe. stdin is fed through another pipe, and the results come back over a third.
+
+The child skips ``site``, so it is given the parent's ``sys.path`` rather than building its own.
+
+Import handlers (ie: module mocks) are still sent with dill, so the child only imports dill and the platform when a
+test actually uses them.
+
+This relies on ``os.posix_spawn``, so it is only available on POSIX platforms.
+"""
+import marshal
+import os
+import select
+import signal
+import sys
+import threading
+import time
+from types import CodeType
+from typing import Any, Dict, Final, List, Optional, Tuple
+
+import dill
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    # ie: windows, which doesn't have posix_spawn either
+    fcntl = None  # type: ignore
+
+from autograder_platform.Executors.Environment import ExecutionEnvironment, Results
+from autograder_platform.Executors.common import MissingOutputDataException, diffFileSystem
+from autograder_platform.StudentSubmissionImpl.Python import PythonSpawnBootstrap
+from autograder_platform.StudentSubmissionImpl.Python.OutputSink import OutputSink
+from autograder_platform.StudentSubmissionImpl.Python.PythonEnvironment import CapturedOutput, PythonEnvironment, \
+    PythonResults
+from autograder_platform.StudentSubmissionImpl.Python.PythonSubInterpreter import SubInterpreterSubmissionProcess
+from autograder_platform.Tasks.TaskRunner import TaskRunner
+
+
+class SpawnedSubmissionProcess(SubInterpreterSubmissionProcess):
+    """
+    Description
+    ===========
+
+    This class runs the student's submission in an interpreter that is started with ``posix_spawn`` when it is enabled
+    and the runner uses a module entrypoint. Otherwise, the runner is passed on to the other backends.
+
+    The child is started with ``-I -S``, so environment variables like ``PYTHONPATH`` and the user's site packages
+    don't affect it.
+    """
+    MAIN_TASK: Final[str] = "main"
+    PACKAGE_OVERLAY_TASK: Final[str] = "package_overlay"
+    RESOLVE_MOCKS_TASK: Final[str] = "resolve_mocks"
+
+    INTERPRETER_FLAGS: Final[Tuple[str, ...]] = ("-I", "-S")
+    BOOTSTRAP_PATH: Final[str] = os.path.abspath(PythonSpawnBootstrap.__file__)
+
+    RESULT_NAME: Final[str] = "spawned process results"
+
+    def __init__(self):
+        super().__init__()
+        self.useSpawn: bool = False
+        self.request: bytes = b""
+        self.stdin: bytes = b""
+        self.pid: Optional[int] = None
+        self.resultBytes: Optional[bytes] = None
+        self.stdout: Optional[List[str]] = None
+        self.output: Optional[CapturedOutput] = None
+        self.mocks: Optional[Dict[str, Any]] = None
+
+    @classmethod
+    def isSupported(cls) -> bool:
+        return fcntl is not None and hasattr(os, "posix_spawn")
+
+    @classmethod
+    def canSpawn(cls, environment: ExecutionEnvironment[PythonEnvironment, PythonResults], runner: TaskRunner) -> bool:
+        """
+        Checks if a runner is able to be run in a spawned interpreter in this environment.
+        """
+        return environment.impl_environment is not None and environment.impl_environment.use_spawned_process \
+            and cls.isSupported() \
+            and runner.hasTask(cls.MAIN_TASK) \
+            and not runner.hasTask(cls.IMPORT_TASK)
+
+    @classmethod
+    def buildRequest(cls, runner: TaskRunner, executionDirectory: str, importHandlers: List[Any],
+                     maxCapturedStdout: int = OutputSink.DEFAULT_MAX_CAPTURED) -> bytes:
+        """
+        Builds the request for the bootstrap from the runner's tasks, rather than sending the entire runner.
+        """
+        submission: CodeType = runner.getTask(cls.MAIN_TASK).inputs[0]()
+
+        path = list(sys.path)
+
+        if runner.hasTask(cls.PACKAGE_OVERLAY_TASK):
+            path.insert(0, runner.getTask(cls.PACKAGE_OVERLAY_TASK).inputs[0]())
+
+        mocks: List[str] = []
+
+        if runner.hasTask(cls.RESOLVE_MOCKS_TASK):
+            mocks = [name for name, mock in runner.getTask(cls.RESOLVE_MOCKS_TASK).inputs[0]().items() if mock is None]
+
+        return marshal.dumps({
+            "path": path,
+            "executionDirectory": os.path.abspath(executionDirectory),
+            "code": marshal.dumps(submission),
+            "importHandlers": dill.dumps(importHandlers, dill.HIGHEST_PROTOCOL) if importHandlers else None,
+            "mocks": mocks,
+            "maxCapturedStdout": maxCapturedStdout,
+        })
+
+    def setup(self, environment: ExecutionEnvironment[PythonEnvironment, PythonResults], runner: TaskRunner):
+        """
+        Description
+        ---
+        This function builds the request for the spawned interpreter if the runner is able to be run in one.
+        Otherwise, the runner is set up for the other backends.
+
+        No shared memory is used by the spawned interpreter, so none is allocated for it.
+        """
+        self.useSpawn = self.canSpawn(environment, runner)
+
+        if not self.useSpawn:
+            super().setup(environment, runner)
+            return
+
+        self.runner = runner
+        self.executionDirectory = environment.sandbox_location
+        self.importHandlers = environment.impl_environment.import_loader
+        self.timeoutTime = environment.timeout
+
+        self.request = self.buildRequest(runner, self.executionDirectory, self.importHandlers,
+                                         environment.impl_environment.max_captured_stdout)
+        self.stdin = "".join(line + "\n" for line in environment.stdin).encode()
+
+    @staticmethod
+    def _moveAbove(fd: int, minimum: int) -> int:
+        # The child's ends are moved to fixed fds. If one of ours is already at (or below) one of those fds,
+        # then it could be overwritten before it is moved, so it is moved out of the way first.
+        if fd > minimum:
+            return fd
+
+        newFd = fcntl.fcntl(fd, fcntl.F_DUPFD_CLOEXEC, minimum + 1)
+        os.close(fd)
+
+        return newFd
+
+    @staticmethod
+    def _write(fd: int, data: bytes) -> None:
+        try:
+            PythonSpawnBootstrap.writeAll(fd, data)
+        except OSError:
+            # the child exited (or was killed) before reading everything, which isn't our problem
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+    def _feed(self, requestFd: int, stdinFd: int) -> None:
+        self._write(requestFd, self.request)
+        self._write(stdinFd, self.stdin)
+
+    def _readResults(self, resultFd: int) -> Optional[bytes]:
+        """
+        Reads the results until the child closes its end or the timeout passes.
+
+        :returns: the results, or None if the child timed out
+        """
+        deadline = time.monotonic() + self.timeoutTime
+        chunks: List[bytes] = []
+
+        while True:
+            remaining = deadline - time.monotonic()
+
+            if remaining <= 0:
+                return None
+
+            readable, _, _ = select.select([resultFd], [], [], remaining)
+
+            if not readable:
+                return None
+
+            chunk = os.read(resultFd, PythonSpawnBootstrap.CHUNK_SIZE)
+
+            if not chunk:
+                return b"".join(chunks)
+
+            chunks.append(chunk)
+
+    def _spawn(self) -> None:
+        minimum = max(PythonSpawnBootstrap.REQUEST_FD, PythonSpawnBootstrap.RESULT_FD)
+
+        requestRead, requestWrite = (self._moveAbove(fd, minimum) for fd in os.pipe())
+        resultRead, resultWrite = (self._moveAbove(fd, minimum) for fd in os.pipe())
+        stdinRead, stdinWrite = (self._moveAbove(fd, minimum) for fd in os.pipe())
+
+        try:
+            with self._cancelLock:
+                if self.cancelled:
+                    return
+
+                # dup2 clears close-on-exec, so only these fds (and stdout and stderr) are inherited by the child
+                self.pid = os.posix_spawn(sys.executable,
+                                          [sys.executable, *self.INTERPRETER_FLAGS, self.BOOTSTRAP_PATH],
+                                          dict(os.environ),
+                                          file_actions=[
+                                              (os.POSIX_SPAWN_DUP2, stdinRead, 0),
+                                              (os.POSIX_SPAWN_DUP2, requestRead, PythonSpawnBootstrap.REQUEST_FD),
+                                              (os.POSIX_SPAWN_DUP2, resultWrite, PythonSpawnBootstrap.RESULT_FD),
+                                          ])
+        finally:
+            for fd in (requestRead, resultWrite, stdinRead):
+                os.close(fd)
+
+            if self.pid is None:
+                for fd in (requestWrite, resultRead, stdinWrite):
+                    os.close(fd)
+
+        pid = self.pid
+
+        # the pipes may be larger than their buffers, so they are written while we are reading the results
+        feeder = threading.Thread(target=self._feed, args=(requestWrite, stdinWrite), daemon=True)
+        feeder.start()
+
+        try:
+            self.resultBytes = self._readResults(resultRead)
+        finally:
+            os.close(resultRead)
+
+        if self.resultBytes is None:
+            self.timeoutOccurred = True
+            os.kill(pid, signal.SIGKILL)
+
+        with self._cancelLock:
+            self.pid = None
+
+        os.waitpid(pid, 0)
+        feeder.join()
+
+    def run(self):
+        if not self.useSpawn:
+            super().run()
+            return
+
+        self._spawn()
+
+    def cancel(self) -> bool:
+        """
+        Kills the spawned interpreter if it is running, or prevents it from starting if it isn't.
+        """
+        if not self.useSpawn:
+            return super().cancel()
+
+        with self._cancelLock:
+            self.cancelled = True
+
+            # the pid is cleared before the child is reaped, so this never kills a reused pid
+            if self.pid is not None:
+                os.kill(self.pid, signal.SIGKILL)
+
+        return True
+
+    def cleanup(self):
+        """
+        This function decodes the results from the spawned interpreter.
+        """
+        if not self.useSpawn:
+            super().cleanup()
+            return
+
+        if self.timeoutOccurred:
+            self.exception = TimeoutError(f"Submission timed out after {self.timeoutTime} seconds")
+            return
+
+        if not self.resultBytes:
+            self.exception = MissingOutputDataException(self.RESULT_NAME)
+            return
+
+        results: Dict[str, Any] = marshal.loads(self.resultBytes)
+
+        # the child already filtered the OUTPUT lines
+        self.stdout = results["stdout"]["lines"]
+        self.output = CapturedOutput.fromSink(results["stdout"])
+        self.mocks = dill.loads(results["mocks"]) if results["mocks"] is not None else {}
+
+        try:
+            self.exception = dill.loads(results["exception"]) if results["exception"] is not None else None
+        except Exception:
+            self.exception = None
+
+        if self.exception is None and results["exceptionDescription"] is not None:
+            self.exception = Exception(results["exceptionDescription"])
+
+    def populateResults(self, environment: ExecutionEnvironment):
+        if not self.useSpawn:
+            super().populateResults(environment)
+            return
+
+        fileOut = diffFileSystem(environment.sandbox_location, environment.sandbox_snapshot, environment.files.values())
+
+        environment.resultData = Results(
+            stdout=self.stdout,
+            exception=self.exception,
+            impl_results=PythonResults(mocks=self.mocks, output=self.output),
+            file_out=fileOut,
+        )
@@ -0,0 +1,677 @@
+"""
+This module provides a backend that runs student submissions in sub-interpreters inside the autograder.
+
+Most tests just call a function from the student's submission and check what it returned. For those tests, starting an
+entire process (and importing the platform in it) costs far more than the test itself.
+Instead, the runner is run in a sub-interpreter. Sub-interpreters have their own modules, ``sys.path``, and stdio,
+so the submission still gets a clean import, but they are created in the autograder's own process.
+Sub-interpreters are pooled, and each one imports the platform once when it is created. After each run, every module
+that was imported by the run is removed and ``sys`` is restored, so the next run starts from the same state.
+
+Results are still returned through the same shared memory channels as a regular process, so the parent doesn't know
+the difference.
+
+The timeout is enforced by a watchdog thread inside the sub-interpreter, which raises a ``TimeoutError`` in the runner's
+thread. Code that is blocked in C (ie: ``time.sleep``) can't be interrupted until it returns to python, so if a run
+doesn't stop shortly after its timeout, it is reported as timed out and its sub-interpreter is abandoned rather than
+reused. Abandoned sub-interpreters are destroyed once they finish, and the run's channels are only given back to the
+pool after that, as the run still writes its results to them when it stops.
+
+Python 3.11 doesn't have a public API for sub-interpreters, nor does it give them their own GIL
+(see PEP 684 and PEP 734), so this uses the private ``_xxsubinterpreters`` module. On interpreters that don't provide it
+with the API that 3.11 has (ie: 3.12 moved the channels to a different module, and 3.13 removed it), submissions are
+always run as regular processes.
+
+Sub-interpreters share the process with the autograder, so they are NOT a security boundary, and state outside the
+interpreter (ie: the working directory, environment variables, and file descriptors) is shared as well.
+This is why the sub-interpreter must be requested with :ref:`PythonEnvironmentBuilder.setUseSubInterpreter`.
+As the runner isn't in the sandbox, any files that it wrote would never be found, so while the runner is running, anything
+that would change the filesystem raises a ``PermissionError`` instead.
+
+On 3.11, forking while the process has any sub-interpreters hangs the child, so the pool is emptied whenever the
+autograder forks (ie: when a submission is run as a regular process). Mixing both kinds of runs works, but the
+sub-interpreters have to be created again afterwards. Forking also waits for any abandoned sub-interpreters to finish.
+"""
+import ctypes
+import gc
+import importlib
+import os
+import pickle
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from multiprocessing import resource_tracker
+from typing import Any, Callable, Dict, Final, List, Optional, Set, Tuple
+
+import dill
+
+try:
+    import _xxsubinterpreters as interpreters
+except ImportError:  # pragma: no cover
+    interpreters = None
+
+from autograder_platform.Executors.Environment import ExecutionEnvironment
+from autograder_platform.StudentSubmissionImpl.Python.PythonEnvironment import PythonEnvironment, PythonResults
+from autograder_platform.StudentSubmissionImpl.Python.PythonSubmissionProcess import RunnableStudentSubmission, \
+    StudentSubmissionProcess
+from autograder_platform.StudentSubmissionImpl.Python.PythonZygote import PythonZygote
+from autograder_platform.Tasks.TaskRunner import TaskRunner
+
+
+class SubInterpreter:
+    """
+    A single sub-interpreter, along with the channels that the parent uses to talk to it.
+
+    Each sub-interpreter is created and run on its own thread, as on 3.11, scripts are always run with the thread
+    state of the thread that created the sub-interpreter. Running them from any other thread means that the runner
+    can't be interrupted, as its thread state isn't the one that belongs to the thread that it is running on.
+
+    The thread isn't a daemon, as the autograder can't exit while a sub-interpreter is still running.
+    Instead, it stops once the main thread has exited.
+    """
+    POLL_INTERVAL: Final[float] = .1
+
+    def __init__(self) -> None:
+        if not PythonSubInterpreterPool.isSupported():  # pragma: no cover
+            raise EnvironmentError("Sub-interpreters are not supported by this interpreter!")
+
+        self.id: Any = None
+        self.control: Any = None
+        """The parent sends to this to cancel the current run"""
+        self.status: Any = None
+        """The sub-interpreter sends how each run finished to this"""
+
+        self.requests: "queue.SimpleQueue[Optional[Tuple[str, Dict[str, Any], Future]]]" = queue.SimpleQueue()
+
+        self.exited: bool = False
+        self.exitCallbacks: List[Callable[[], None]] = []
+        self._exitLock: threading.Lock = threading.Lock()
+
+        created: Future = Future()
+
+        self.thread = threading.Thread(target=self._serve, args=(created,), name="Sub-interpreter")
+        self.thread.start()
+
+        created.result()
+
+    def _serve(self, created: Future) -> None:
+        try:
+            self.id = interpreters.create(isolated=False)  # type: ignore
+            self.control = interpreters.channel_create()  # type: ignore
+            self.status = interpreters.channel_create()  # type: ignore
+        except BaseException as ex:  # pragma: no cover
+            created.set_exception(ex)
+            return
+
+        created.set_result(None)
+
+        while True:
+            try:
+                request = self.requests.get(timeout=self.POLL_INTERVAL)
+            except queue.Empty:
+                if threading.main_thread().is_alive():
+                    continue
+
+                break
+
+            if request is None:
+                break
+
+            source, shared, future = request
+
+            try:
+                interpreters.run_string(self.id, source, shared)  # type: ignore
+                future.set_result(None)
+            except BaseException as ex:
+                future.set_exception(ex)
+
+        try:
+            # the channels are destroyed first, as they remember which interpreters used them
+            for channel in (self.control, self.status):
+                interpreters.channel_destroy(channel)  # type: ignore
+
+            interpreters.destroy(self.id)  # type: ignore
+        finally:
+            with self._exitLock:
+                self.exited = True
+                callbacks, self.exitCallbacks = self.exitCallbacks, []
+
+            for callback in callbacks:
+                callback()
+
+    def addExitCallback(self, callback: Callable[[], None]) -> None:
+        """
+        Calls ``callback`` once the sub-interpreter has been destroyed, or right away if it already has been.
+        This is called from the sub-interpreter's thread.
+        """
+        with self._exitLock:
+            if not self.exited:
+                self.exitCallbacks.append(callback)
+                return
+
+        callback()
+
+    def submit(self, source: str, **shared: Any) -> Future:
+        """
+        Runs ``source`` in the sub-interpreter with ``shared`` as its globals.
+
+        :returns: a future that is finished once the source has been run
+        """
+        future: Future = Future()
+        self.requests.put((source, shared, future))
+
+        return future
+
+    def drainControl(self) -> None:
+        while interpreters.channel_recv(self.control, None) is not None:  # type: ignore
+            pass
+
+    def destroy(self, wait: bool = False) -> None:
+        """
+        Destroys the sub-interpreter once it has finished what it is currently running.
+
+        :param wait: if this should wait for it to be destroyed
+        """
+        self.requests.put(None)
+
+        if wait:
+            self.thread.join()
+
+
+class PythonSubInterpreterPool:
+    """
+    This class manages the sub-interpreters for the entire program.
+    Similar to the configuration provider, there is only ever one pool.
+    """
+    DEFAULT_MAX_IDLE: Final[int] = 4
+
+    PLATFORM_MODULES: Final[List[str]] = PythonZygote.PLATFORM_MODULES
+    """The modules that are imported in every sub-interpreter when it is created"""
+
+    WARMUP_SOURCE: Final[str] = \
+        "import pickle, sys\n" \
+        "sys.path[:] = pickle.loads(path)\n" \
+        "from autograder_platform.StudentSubmissionImpl.Python.PythonSubInterpreter import PythonSubInterpreterPool\n" \
+        "PythonSubInterpreterPool._warmup(request)\n"
+
+    maxIdle: int = DEFAULT_MAX_IDLE
+
+    idle: List[SubInterpreter] = []
+
+    running: int = 0
+    """The number of sub-interpreters that have been acquired and not yet released or abandoned"""
+    abandoned: int = 0
+    """The number of sub-interpreters that were abandoned and haven't been destroyed yet"""
+    created: int = 0
+    reused: int = 0
+
+    baseline: Optional[Tuple[Set[str], List[str], List[Any]]] = None
+    """
+    Only set inside a sub-interpreter. The modules, path, and meta path that each run is restored to
+    """
+    readOnly: bool = False
+    """Only set inside a sub-interpreter. If the runner is currently running, so the filesystem can't be changed"""
+
+    WRITE_FLAGS: Final[int] = os.O_WRONLY | os.O_RDWR | os.O_APPEND | os.O_CREAT | os.O_TRUNC
+    WRITE_MODES: Final[str] = "wax+"
+    GUARDED_EVENTS: Final[Set[str]] = {"os.chdir", "os.chmod", "os.chown", "os.link", "os.mkdir", "os.remove",
+                                       "os.rename", "os.rmdir", "os.symlink", "os.truncate", "os.utime",
+                                       "shutil.rmtree"}
+    """The audit events (other than opening a file to write to it) that change the filesystem"""
+
+    _condition: threading.Condition = threading.Condition(threading.Lock())
+    _registered: bool = False
+
+    REQUIRED_API: Final[Tuple[str, ...]] = ("create", "destroy", "run_string", "RunFailedError",
+                                            "channel_create", "channel_destroy", "channel_send", "channel_recv")
+    """
+    What is used from ``_xxsubinterpreters``. On 3.12, the module still exists, but the channels were moved to
+    ``_xxinterpchannels``, so only checking that the module imports isn't enough
+    """
+
+    @classmethod
+    def isSupported(cls) -> bool:
+        # the sub-interpreters share the parent's resource tracker, which only exists on posix
+        return os.name == "posix" and interpreters is not None \
+            and all(hasattr(interpreters, name) for name in cls.REQUIRED_API)
+
+    @classmethod
+    def configure(cls, maxIdle: Optional[int] = None) -> None:
+        if maxIdle is not None:
+            if maxIdle < 0:
+                raise AttributeError(f"INVALID STATE: Max idle sub-interpreters must be at least 0. Was {maxIdle}")
+
+            cls.maxIdle = maxIdle
+
+    @staticmethod
+    def _warmup(request: bytes) -> None:
+        """
+        Runs inside a new sub-interpreter (after this module has been imported in it) to finish setting it up.
+        """
+        trackerFd, trackerPid = pickle.loads(request)
+
+        # The channels are registered with the resource tracker when they are attached. Each interpreter has its own
+        # copy of the tracker module, so without this, the sub-interpreter would start a second tracker which would
+        # unlink the parent's channels when the autograder exits.
+        # noinspection PyProtectedMember
+        tracker = resource_tracker._resource_tracker  # type: ignore
+        tracker._fd = trackerFd
+        tracker._pid = trackerPid
+
+        for module in PythonSubInterpreterPool.PLATFORM_MODULES:
+            importlib.import_module(module)
+
+        # audit hooks added from python only apply to the interpreter that added them
+        sys.addaudithook(PythonSubInterpreterPool._guardFileSystem)
+
+        PythonSubInterpreterPool.baseline = (set(sys.modules), list(sys.path), list(sys.meta_path))
+
+    @staticmethod
+    def _guardFileSystem(event: str, args: Tuple[Any, ...]) -> None:
+        """
+        Runs inside a sub-interpreter for every audit event. While the runner is running, anything that would change
+        the filesystem raises a ``PermissionError``, as the runner is in the autograder's working directory rather than
+        the sandbox, so any files that it wrote would never be found.
+        """
+        if not PythonSubInterpreterPool.readOnly:
+            return
+
+        if event == "open":
+            path, mode, flags = args
+
+            # already open file descriptors (ie: stdout) aren't a change to the filesystem
+            if isinstance(path, int):
+                return
+
+            if mode is None and not flags & PythonSubInterpreterPool.WRITE_FLAGS:
+                return
+
+            if mode is not None and not any(char in mode for char in PythonSubInterpreterPool.WRITE_MODES):
+                return
+        elif event not in PythonSubInterpreterPool.GUARDED_EVENTS:
+            return
+
+        raise PermissionError(f"Submissions that are run in a sub-interpreter aren't able to change the filesystem "
+                              f"({event}). Don't use a sub-interpreter for tests that write files.")
+
+    @staticmethod
+    def _restore() -> None:
+        """
+        Runs inside a sub-interpreter after each run to restore it to the state that it was in after it was created.
+        """
+        if PythonSubInterpreterPool.baseline is None:  # pragma: no cover
+            return
+
+        modules, path, metaPath = PythonSubInterpreterPool.baseline
+
+        PythonSubInterpreterPool.readOnly = False
+
+        for module in list(sys.modules):
+            if module not in modules:
+                del sys.modules[module]
+
+        sys.path[:] = path
+        sys.meta_path[:] = metaPath
+        sys.stdin = sys.__stdin__
+        sys.stdout = sys.__stdout__
+
+        importlib.invalidate_caches()
+        gc.collect()
+
+    @classmethod
+    def _create(cls) -> SubInterpreter:
+        # ours is shared with the sub-interpreter, so it must be running first
+        resource_tracker.ensure_running()
+
+        # noinspection PyProtectedMember
+        tracker = resource_tracker._resource_tracker  # type: ignore
+
+        interpreter = SubInterpreter()
+
+        try:
+            interpreter.submit(cls.WARMUP_SOURCE, path=pickle.dumps(list(sys.path)),
+                               request=pickle.dumps((tracker._fd, tracker._pid))).result()
+        except BaseException:
+            interpreter.destroy()
+            raise
+
+        return interpreter
+
+    @classmethod
+    def _register(cls) -> None:
+        if cls._registered:
+            return
+
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(before=cls._beforeFork, after_in_parent=cls._afterFork,
+                                after_in_child=cls._afterFork)
+
+        cls._registered = True
+
+    @classmethod
+    def _beforeFork(cls) -> None:
+        # On 3.11, a child that is forked while the parent has any sub-interpreters hangs before it is able to run.
+        # So every sub-interpreter is destroyed first, after waiting for any that are running to finish, and for any
+        # that were abandoned to be destroyed once they stop. This is held until the fork is done so that none are
+        # created in the meantime.
+        cls._condition.acquire()
+        cls._condition.wait_for(lambda: cls.running == 0 and cls.abandoned == 0)
+
+        cls._destroyIdle(wait=True)
+
+    @classmethod
+    def _afterFork(cls) -> None:
+        cls._condition.release()
+
+    @classmethod
+    def _destroyIdle(cls, wait: bool = False) -> None:
+        """This must be called while holding the lock"""
+        idle, cls.idle = cls.idle, []
+
+        for interpreter in idle:
+            interpreter.destroy(wait)
+
+    @classmethod
+    def _finish(cls) -> None:
+        """This must be called while holding the lock"""
+        cls.running -= 1
+        cls._condition.notify_all()
+
+    @classmethod
+    def acquire(cls) -> SubInterpreter:
+        """
+        Description
+        ---
+        Gets an idle sub-interpreter, creating one if there aren't any.
+
+        :raises EnvironmentError: if sub-interpreters aren't supported
+        """
+        if not cls.isSupported():
+            raise EnvironmentError("Sub-interpreters are not supported by this interpreter!")
+
+        with cls._condition:
+            cls._register()
+
+            cls.running += 1
+
+            if cls.idle:
+                cls.reused += 1
+                return cls.idle.pop()
+
+            cls.created += 1
+
+        try:
+            return cls._create()
+        except BaseException:
+            with cls._condition:
+                cls._finish()
+
+            raise
+
+    @classmethod
+    def release(cls, interpreter: SubInterpreter) -> None:
+        """
+        Returns a sub-interpreter that has finished running to the pool. If the pool is full, it is destroyed instead.
+        """
+        interpreter.drainControl()
+
+        with cls._condition:
+            if len(cls.idle) < cls.maxIdle:
+                cls.idle.append(interpreter)
+            else:
+                interpreter.destroy()
+
+            cls._finish()
+
+    @classmethod
+    def abandon(cls, interpreter: SubInterpreter) -> None:
+        """
+        Gives up on a sub-interpreter that is still running. It is destroyed once it stops.
+        Until then, the autograder isn't able to fork.
+        """
+        with cls._condition:
+            cls.abandoned += 1
+            cls._finish()
+
+        interpreter.addExitCallback(cls._abandonedDestroyed)
+        interpreter.destroy()
+
+    @classmethod
+    def _abandonedDestroyed(cls) -> None:
+        with cls._condition:
+            cls.abandoned -= 1
+            cls._condition.notify_all()
+
+    @classmethod
+    def clear(cls) -> None:
+        """
+        Destroys every idle sub-interpreter.
+        """
+        with cls._condition:
+            cls._destroyIdle(wait=True)
+
+
+class GuardedSubmissionProcess(StudentSubmissionProcess):
+    """
+    The submission process that is used inside a sub-interpreter. The filesystem is guarded while the runner is running
+    (see :ref:`PythonSubInterpreterPool._guardFileSystem`), but not while the results are being written.
+    """
+    def _setup(self) -> None:
+        super()._setup()
+
+        PythonSubInterpreterPool.readOnly = True
+
+    def _teardown(self, *args: Any) -> None:
+        PythonSubInterpreterPool.readOnly = False
+
+        super()._teardown(*args)
+
+
+class SubInterpreterSubmissionProcess(RunnableStudentSubmission):
+    """
+    Description
+    ===========
+
+    This class runs the student's submission in a pooled sub-interpreter when it is enabled and the runner is able
+    to be run in one. Otherwise, the submission is run as a regular process.
+
+    Runners that don't import the submission (ie: module entrypoints), runners that use a template, and tests that
+    provide files are always run as regular processes, as they rely on the process (or its working directory) being
+    their own. Runners that are run in a sub-interpreter aren't able to change the filesystem.
+    """
+    IMPORT_TASK: Final[str] = "import"
+
+    STATUS_FINISHED: Final[bytes] = b"finished"
+    STATUS_TIMED_OUT: Final[bytes] = b"timed_out"
+    STATUS_CANCELLED: Final[bytes] = b"cancelled"
+
+    INTERRUPT_INTERVAL: Final[float] = .05
+    """How often the watchdog checks if the run should be interrupted, and how often it is repeated if it is ignored"""
+    INTERRUPT_GRACE: Final[float] = 1
+    """How long the parent waits after the timeout for the run to be interrupted, before the interpreter is abandoned"""
+
+    RUN_SOURCE: Final[str] = \
+        "from autograder_platform.StudentSubmissionImpl.Python.PythonSubInterpreter import " \
+        "SubInterpreterSubmissionProcess\n" \
+        "SubInterpreterSubmissionProcess._runChild(request, control, status)\n"
+
+    def __init__(self):
+        super().__init__()
+        self.useSubInterpreter: bool = False
+        self.interpreter: Optional[SubInterpreter] = None
+        self.abandonedInterpreter: Optional[SubInterpreter] = None
+        """The sub-interpreter that this run was abandoned in, which may still write to its channels"""
+
+    @classmethod
+    def canRun(cls, environment: ExecutionEnvironment[PythonEnvironment, PythonResults], runner: TaskRunner) -> bool:
+        """
+        Checks if a runner is able to be run in a sub-interpreter in this environment.
+        """
+        return environment.impl_environment is not None and environment.impl_environment.use_subinterpreter \
+            and PythonSubInterpreterPool.isSupported() \
+            and environment.impl_environment.template is None \
+            and runner.hasTask(cls.IMPORT_TASK) \
+            and not environment.files
+
+    def setup(self, environment: ExecutionEnvironment[PythonEnvironment, PythonResults], runner: TaskRunner):
+        """
+        Description
+        ---
+        This function allocates the shared memory that will be passed to the student's submission, and decides if the
+        submission is able to be run in a sub-interpreter.
+        """
+        super().setup(environment, runner)
+
+        self.useSubInterpreter = self.canRun(environment, runner)
+
+    @staticmethod
+    def _runChild(request: bytes, control: Any, status: Any) -> None:
+        """
+        Runs inside the sub-interpreter. This runs the runner and reports how it finished to ``status``.
+        """
+        result = SubInterpreterSubmissionProcess.STATUS_FINISHED
+
+        try:
+            runner, inputDataMemName, outputDataMemName, executionDirectory, importHandlers, serializer, timeout, \
+                maxCapturedStdout = dill.loads(request)
+
+            process = GuardedSubmissionProcess(runner, executionDirectory, importHandlers, timeout,
+                                               serializer=serializer, changeDirectory=False)
+            process.setInputDataMemName(inputDataMemName)
+            process.setOutputDataMenName(outputDataMemName)
+            process.setMaxCapturedStdout(maxCapturedStdout)
+
+            target = threading.get_ident()
+            finished = threading.Event()
+            # held while interrupting, so that an interrupt is never sent after the runner has finished
+            lock = threading.Lock()
+            statuses: List[bytes] = []
+
+            def interrupt(exception: Optional[type]) -> None:
+                ctypes.pythonapi.PyThreadState_SetAsyncExc(ctypes.c_ulong(target),
+                                                           ctypes.py_object(exception) if exception else None)
+
+            def watch() -> None:
+                deadline = time.monotonic() + timeout
+
+                while not finished.wait(SubInterpreterSubmissionProcess.INTERRUPT_INTERVAL):
+                    with lock:
+                        if finished.is_set():
+                            return
+
+                        if not statuses:
+                            if interpreters.channel_recv(control, None) is not None:  # type: ignore
+                                statuses.append(SubInterpreterSubmissionProcess.STATUS_CANCELLED)
+                            elif time.monotonic() >= deadline:
+                                statuses.append(SubInterpreterSubmissionProcess.STATUS_TIMED_OUT)
+                            else:
+                                continue
+
+                        # this is repeated until the runner stops, in case the submission catches it
+                        interrupt(TimeoutError)
+
+            watchdog = threading.Thread(target=watch, name="Sub-interpreter Watchdog")
+            watchdog.start()
+
+            try:
+                process.run()
+            except BaseException:
+                pass
+
+            while True:
+                # the interrupt may land anywhere in here, so this is retried until any pending interrupt is cleared
+                try:
+                    with lock:
+                        finished.set()
+
+                    interrupt(None)
+                    break
+                except BaseException:
+                    continue
+
+            watchdog.join()
+
+            if statuses:
+                result = statuses[0]
+        finally:
+            interpreters.channel_send(status, result)  # type: ignore
+            PythonSubInterpreterPool._restore()
+
+    def run(self):
+        if not self.useSubInterpreter:
+            super().run()
+            return
+
+        if self.runner is None or self.inputChannel is None or self.outputChannel is None:
+            raise AttributeError("INVALID STATE: Sub-interpreter has not be initialized!")
+
+        request = dill.dumps((self.runner, self.inputChannel.name, self.outputChannel.name, self.executionDirectory,
+                              self.importHandlers, self.serializer, self.timeoutTime, self.maxCapturedStdout),
+                             dill.HIGHEST_PROTOCOL)
+
+        interpreter = PythonSubInterpreterPool.acquire()
+
+        # this is held while starting so that a cancellation either prevents the start or is able to interrupt it
+        with self._cancelLock:
+            if self.cancelled:
+                PythonSubInterpreterPool.release(interpreter)
+                return
+
+            self.interpreter = interpreter
+
+        future = interpreter.submit(self.RUN_SOURCE, request=request, control=interpreter.control,
+                                    status=interpreter.status)
+
+        try:
+            future.result(self.timeoutTime + self.INTERRUPT_GRACE)
+        except FutureTimeoutError:
+            # it is stuck somewhere that it can't be interrupted
+            self.timeoutOccurred = True
+        except interpreters.RunFailedError:  # type: ignore # pragma: no cover
+            pass
+
+        with self._cancelLock:
+            self.interpreter = None
+
+        if self.timeoutOccurred:
+            self.abandonedInterpreter = interpreter
+            PythonSubInterpreterPool.abandon(interpreter)
+            return
+
+        status = interpreters.channel_recv(interpreter.status, None)  # type: ignore
+
+        self.timeoutOccurred = status == self.STATUS_TIMED_OUT
+
+        PythonSubInterpreterPool.release(interpreter)
+
+    def _deallocate(self):
+        if self.abandonedInterpreter is None or self.inputChannel is None or self.outputChannel is None:
+            super()._deallocate()
+            return
+
+        # the abandoned run still writes its results once it stops, so the channels aren't given back to the pool
+        # until then. Otherwise, the next execution that borrowed them could read the abandoned run's results
+        inputChannel, outputChannel = self.inputChannel, self.outputChannel
+
+        self.abandonedInterpreter.addExitCallback(lambda: self._releaseChannels(inputChannel, outputChannel))
+
+        self.inputChannel = None
+        self.outputChannel = None
+
+    def cancel(self) -> bool:
+        """
+        Interrupts the student's submission if it is running in a sub-interpreter, or prevents it from starting if it
+        isn't running yet.
+        """
+        if not self.useSubInterpreter:
+            return super().cancel()
+
+        with self._cancelLock:
+            self.cancelled = True
+
+            if self.interpreter is not None:
+                interpreters.channel_send(self.interpreter.control, self.STATUS_CANCELLED)  # type: ignore
+
+        return True
@@ -3,8 +3,12 @@ import re
 import sys
 import subprocess
 from types import CodeType
-from typing import Dict, Iterable, List, Optional, TypeVar
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple, TypeVar
 from autograder_platform.StudentSubmission.AbstractStudentSubmission import AbstractStudentSubmission
+from autograder_platform.StudentSubmissionImpl.Python.BytecodeCache import BytecodeCache
+from autograder_platform.StudentSubmissionImpl.Python.PackageInstaller import PackageInstaller
+from autograder_platform.StudentSubmissionImpl.Python.PackageStore import PackageStore
+from autograder_platform.StudentSubmissionImpl.Python.PythonSubmissionImportFactory import PythonSubmissionImportFactory, SubmissionModuleFinder
 from autograder_platform.StudentSubmissionImpl.Python.PythonValidators import PythonFileValidator, PackageValidator, RequirementsValidator
 from autograder_platform.StudentSubmissionImpl.Python.common import FileTypeMap
 
@@ -44,12 +48,15 @@ class PythonSubmission(AbstractStudentSubmission[CodeType]):
         self.testFilesEnabled: bool = False
         self.requirementsEnabled: bool = False
         self.looseMainMatchingEnabled: bool = False
+        self.isolatedRequirementsEnabled: bool = False
 
         self.discoveredFileMap: Dict[FileTypeMap, List[str]] = {}
 
         self.extraPackages: Dict[str, str] = {}
+        self.packageOverlay: Optional[str] = None
 
         self.entryPoint: Optional[CodeType] = None
+        self.moduleFinder: Optional[SubmissionModuleFinder] = None
 
         self.addValidator(PythonFileValidator(self.ALLOWED_STRICT_MAIN_NAMES))
         self.addValidator(RequirementsValidator())
@@ -67,6 +74,20 @@ class PythonSubmission(AbstractStudentSubmission[CodeType]):
         self.looseMainMatchingEnabled = enableLooseMainMatching
         return self
 
+    def enableIsolatedRequirements(self: Builder, enableIsolatedRequirements: bool = True) -> Builder:
+        """
+        Description
+        ---
+        Installs the submission's packages in to an overlay that only this submission's processes use, rather than in
+        to the autograder's interpreter. This allows submissions with conflicting requirements to be graded at the same
+        time. See :ref:`PackageStore` for more information.
+
+        :param enableIsolatedRequirements: if the packages should be isolated
+        :returns: self
+        """
+        self.isolatedRequirementsEnabled = enableIsolatedRequirements
+        return self
+
     def addPackage(self: Builder, packageName: str, packageVersion: Optional[str] = None) -> Builder:
         self.extraPackages[packageName] = packageVersion if packageVersion is not None else ""
         return self
@@ -125,20 +146,11 @@ class PythonSubmission(AbstractStudentSubmission[CodeType]):
         if not self.getRequirementsEnabled() or not self.extraPackages:
             return
 
-        for package, version in self.extraPackages.items():
-            try:
-                subprocess.check_call([sys.executable, "-m", "pip", "install",
-                                       f"{package}=={version}" if version else package],
-                                      stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-            # this isn't testable :( – basically this reattempts install if it fails by adding the magic flag
-            except subprocess.CalledProcessError as _:  # pragma: no cover
-                try:  # pragma: no cover
-                    subprocess.check_call([sys.executable, "-m", "pip", "install",  # pragma: no cover
-                                           f"{package}=={version}" if version else package, "--break-system-packages"], # pragma: no cover
-
-                                          stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)  # pragma: no cover
-                except subprocess.CalledProcessError as error:  # pragma: no cover
-                    raise Exception(f"Failed to install '{package}'!")  # pragma: no cover
+        if self.getIsolatedRequirementsEnabled():
+            self.packageOverlay = PackageStore.getOverlay(self.extraPackages)
+            return
+
+        PackageInstaller.install(self.extraPackages)
 
     def _identifyMainFile(self) -> str:
         if self.getLooseMainMatchingEnabled():
@@ -156,7 +168,7 @@ class PythonSubmission(AbstractStudentSubmission[CodeType]):
             return r.read()
 
     def _compileFile(self, filePath, code: str) -> CodeType:
-        return compile(code, filePath, "exec")
+        return BytecodeCache.compile(code, filePath)
 
     def doLoad(self):
         self._discoverSubmittedFiles(self.getSubmissionRoot())
@@ -169,18 +181,31 @@ class PythonSubmission(AbstractStudentSubmission[CodeType]):
 
         self.entryPoint = self._compileFile(mainFilePath, mainFileCode)
 
-        # Huge todo here - This will be a seperate story i think
-        # Basically by creating a meta hook in the import system, we can resolve modules from the students submission.
-        # This also allows us to mock out imported libraries.
-        # Im thinking this might be a seperate module as there is a decent amount of machinary that we need to override.
+        self.moduleFinder = PythonSubmissionImportFactory.buildImport(
+            self.getSubmissionRoot(), self.discoveredFileMap.get(FileTypeMap.PYTHON_FILES, []))
 
     def getExecutableSubmission(self) -> CodeType:
         if self.entryPoint is None:
             raise RuntimeError("Submission has not been built! No entrypoint has been defined!")
         return self.entryPoint
 
+    def getModuleFinder(self) -> SubmissionModuleFinder:
+        """
+        Description
+        ---
+        Gets the import handler that serves every module in the student's submission from memory.
+
+        This should be added to the environment with :ref:`PythonEnvironmentBuilder.addImportHandler` to allow the
+        student's submission to import its own modules without them being copied into the sandbox.
+
+        :returns: the import handler
+        """
+        if self.moduleFinder is None:
+            raise RuntimeError("Submission has not been built! No modules have been compiled!")
+        return self.moduleFinder
+
     def TEST_ONLY_removeRequirements(self):
-        if not self.getRequirementsEnabled() or not self.extraPackages:
+        if not self.getRequirementsEnabled() or not self.extraPackages or self.getIsolatedRequirementsEnabled():
             return
 
         for package in self.extraPackages.keys():
@@ -197,8 +222,26 @@ class PythonSubmission(AbstractStudentSubmission[CodeType]):
     def getLooseMainMatchingEnabled(self) -> bool:
         return self.looseMainMatchingEnabled
 
+    def getIsolatedRequirementsEnabled(self) -> bool:
+        return self.isolatedRequirementsEnabled
+
     def getDiscoveredFileMap(self) -> Dict[FileTypeMap, List[str]]:
         return self.discoveredFileMap
 
     def getExtraPackages(self) -> Dict[str, str]:
         return self.extraPackages
+
+    def getPackageOverlay(self) -> Optional[str]:
+        """
+        :returns: the path to the submission's package overlay, or None if the packages aren't isolated
+        """
+        return self.packageOverlay
+
+    def getSettings(self) -> Tuple[Hashable, ...]:
+        return super().getSettings() + (
+            self.getTestFilesEnabled(),
+            self.getRequirementsEnabled(),
+            self.getLooseMainMatchingEnabled(),
+            self.getIsolatedRequirementsEnabled(),
+            tuple(sorted(self.getExtraPackages().items())),
+        )
@@ -0,0 +1,136 @@
+"""
+This module provides the import handler that serves the student's own modules from memory.
+
+Every python file in the student's submission is compiled once when the submission is built, and the compiled code is
+kept in an index on the handler. When the submission imports one of its own modules, the code is served from that
+index, so multi-file submissions don't need their files copied into the sandbox or read from disk for every test.
+
+Files in subdirectories are imported as packages, ie: ``utils/helpers.py`` is imported as ``utils.helpers``.
+Directories without an ``__init__.py`` are treated like namespace packages.
+
+The handler is added to the end of ``sys.meta_path``, so it only serves the modules that the rest of the import system
+isn't able to find. A submission with a file named after an installed package (ie: ``numpy.py``) doesn't replace that
+package for the autograder.
+
+The code is stored marshalled, so the handler is able to be pickled and sent to a child with any start method.
+"""
+import marshal
+import os
+import sys
+from importlib.abc import Loader
+from importlib.machinery import ModuleSpec
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from autograder_platform.StudentSubmissionImpl.Python.AbstractPythonImportFactory import AbstractModuleFinder
+from autograder_platform.StudentSubmissionImpl.Python.BytecodeCache import BytecodeCache
+
+
+class SubmissionModuleFinder(AbstractModuleFinder, Loader):
+    def __init__(self, modules: Dict[str, Tuple[Optional[str], bool, bytes]]) -> None:
+        """
+        :param modules: the index of modules. Maps the full name of each module to its origin, if it is a package,
+        and its marshalled code (which is empty for namespace packages).
+        """
+        super().__init__()
+        self.modules: Dict[str, Tuple[Optional[str], bool, bytes]] = modules
+
+    def find_spec(self, fullname, path, target=None) -> Optional[ModuleSpec]:
+        if fullname not in self.modules:
+            return None
+
+        origin, isPackage, _ = self.modules[fullname]
+
+        spec = ModuleSpec(fullname, self, origin=origin, is_package=isPackage)
+        spec.has_location = origin is not None
+
+        return spec
+
+    def create_module(self, spec: ModuleSpec):
+        return None
+
+    def exec_module(self, module) -> None:
+        _, _, code = self.modules[module.__name__]
+
+        if not code:
+            return
+
+        exec(marshal.loads(code), vars(module))
+
+    def getModulesToReload(self) -> List[str]:
+        # only modules that were actually imported from a submission are reloaded, so an installed module that has the
+        # same name as one of the student's files is left alone
+        return [name for name in self.modules
+                if isinstance(getattr(sys.modules.get(name), "__loader__", None), SubmissionModuleFinder)]
+
+    def install(self) -> None:
+        sys.meta_path.append(self)
+
+        for module in self.getModulesToReload():
+            sys.modules.pop(module, None)
+
+
+class PythonSubmissionImportFactory:
+    INIT_FILE: str = "__init__.py"
+
+    @staticmethod
+    def getModuleName(submissionRoot: str, path: str) -> Optional[List[str]]:
+        """
+        Gets the parts of the name that a file in the submission is imported as.
+
+        :returns: the parts of the name, or None if the file isn't able to be imported
+        """
+        parts = os.path.relpath(path, submissionRoot).split(os.sep)
+
+        if parts[-1] == PythonSubmissionImportFactory.INIT_FILE:
+            parts = parts[:-1]
+        else:
+            parts[-1] = os.path.splitext(parts[-1])[0]
+
+        if not parts or not all(part.isidentifier() for part in parts):
+            return None
+
+        # students shouldn't be able to replace the standard library for the autograder
+        if parts[0] in sys.stdlib_module_names or parts[0] in sys.builtin_module_names:
+            return None
+
+        return parts
+
+    @classmethod
+    def buildImport(cls, submissionRoot: str, files: Iterable[str]) -> SubmissionModuleFinder:
+        """
+        Description
+        ---
+        Compiles every file and builds the import handler that serves them.
+
+        Files that aren't able to be imported (ie: their name isn't a valid identifier) or that fail to compile are
+        skipped. Those files are left to the rest of the import system, just as they would be without this handler.
+
+        :param submissionRoot: the root of the submission that module names are relative to
+        :param files: the python files to serve
+        :returns: the import handler
+        """
+        modules: Dict[str, Tuple[Optional[str], bool, bytes]] = {}
+
+        for path in files:
+            parts = cls.getModuleName(submissionRoot, path)
+
+            if parts is None:
+                continue
+
+            try:
+                with open(path, 'r', encoding="UTF-8") as r:
+                    code = BytecodeCache.compile(r.read(), path)
+            except (SyntaxError, ValueError, OSError):
+                continue
+
+            # every parent directory is a package, even if it doesn't have an __init__
+            for i in range(1, len(parts)):
+                packageName = ".".join(parts[:i])
+                if packageName not in modules:
+                    modules[packageName] = (None, True, b"")
+
+            isPackage = os.path.basename(path) == cls.INIT_FILE
+
+            modules[".".join(parts)] = (path, isPackage, marshal.dumps(code))
+
+        return SubmissionModuleFinder(modules)
@@ -9,27 +9,37 @@ before attempting to even connect to the object.
 :date: 3/7/23
 """
 
-from typing import Any, Dict, Optional, TextIO, Tuple, List, Union
-from autograder_platform.Executors.Environment import ExecutionEnvironment, Results
+from typing import TYPE_CHECKING, Any, Dict, Optional, TextIO, Tuple, List, Union
+from autograder_platform.Executors.Environment import DeferredResult, ExecutionEnvironment, Results
 
 from autograder_platform.StudentSubmission.ISubmissionProcess import ISubmissionProcess
 
 import dill
 import multiprocessing
-import multiprocessing.shared_memory as shared_memory
 import os
+import pickle
 import sys
+import threading
 from io import StringIO
 
-from autograder_platform.Executors.common import MissingOutputDataException, detectFileSystemChanges, filterStdOut
-from autograder_platform.StudentSubmissionImpl.Python.common import PythonTaskResult
+from autograder_platform.Executors.common import CorruptOutputDataException, MissingOutputDataException, \
+    diffFileSystem
+from autograder_platform.StudentSubmissionImpl.Python.common import PythonTaskResult, SerializationMethod
 from autograder_platform.Tasks.TaskRunner import TaskRunner
 from autograder_platform.TestingFramework.SingleFunctionMock import SingleFunctionMock
-from autograder_platform.StudentSubmissionImpl.Python.PythonEnvironment import PythonEnvironment, PythonResults
+from autograder_platform.StudentSubmissionImpl.Python.PythonEnvironment import CapturedOutput, PythonEnvironment, \
+    PythonResults
+from autograder_platform.StudentSubmissionImpl.Python.OutputSink import OutputSink
 from autograder_platform.StudentSubmissionImpl.Python.AbstractPythonImportFactory import AbstractModuleFinder
+from autograder_platform.StudentSubmissionImpl.Python.PythonZygote import PythonZygote
+from autograder_platform.StudentSubmissionImpl.Python.SharedMemoryChannel import SharedMemoryChannel
+from autograder_platform.StudentSubmissionImpl.Python.SharedMemoryPool import SharedMemoryPool
+from autograder_platform.StudentSubmissionImpl.Python.ResultFrame import ResultFrame
+from autograder_platform.StudentSubmissionImpl.Python.Serializer import AbstractSerializer, FastPathSerializer
+from autograder_platform.StudentSubmissionImpl.Python.OutOfBandBuffers import OutOfBandReader, OutOfBandWriter
 
-dill.Pickler.dumps, dill.Pickler.loads = dill.dumps, dill.loads  # type: ignore
-multiprocessing.reduction.dump = dill.dump  # type: ignore
+if TYPE_CHECKING:
+    from autograder_platform.StudentSubmissionImpl.Python.PythonSubmissionTemplate import PythonSubmissionTemplate
 
 class StudentSubmissionProcess(multiprocessing.Process):
     """
@@ -58,7 +68,8 @@ class StudentSubmissionProcess(multiprocessing.Process):
     """
 
     def __init__(self, runner: TaskRunner, executionDirectory: str, importHandlers: List[AbstractModuleFinder],
-                 timeout: int = 10):
+                 timeout: int = 10, startMethod: Optional[str] = None,
+                 serializer: Optional[AbstractSerializer] = None, changeDirectory: bool = True):
         """
         This constructs a new student submission process with the name "Student Submission".
 
@@ -74,6 +85,15 @@ class StudentSubmissionProcess(multiprocessing.Process):
 
         :param timeout: The _timeout for join. Basically, it will wait *at most* this amount of time for the child to
         terminate. After this period passes, the child must be killed by the parent.
+
+        :param startMethod: The multiprocessing start method to use for this process. If None, the platform default
+        is used. See :ref:`PythonZygote` for why this would be set.
+
+        :param serializer: The serializer to use for stdin and the results. Defaults to :ref:`FastPathSerializer`.
+
+        :param changeDirectory: If the process should move to the execution directory. The working directory is shared
+        by the entire process, so this is disabled when the runner is run in a sub-interpreter rather than a new process.
+        The execution directory is still added to the path.
         """
         super().__init__(name="Student Submission")
         self.runner: TaskRunner = runner
@@ -82,6 +102,33 @@ class StudentSubmissionProcess(multiprocessing.Process):
         self.executionDirectory: str = executionDirectory
         self.importHandlers: List[AbstractModuleFinder] = importHandlers
         self.timeout: int = timeout
+        self.startMethod: Optional[str] = startMethod
+        self.serializer: AbstractSerializer = serializer if serializer is not None else FastPathSerializer()
+        self.initialStdout: str = ""
+        self.maxCapturedStdout: int = OutputSink.DEFAULT_MAX_CAPTURED
+        self.changeDirectory: bool = changeDirectory
+
+    DILL_FIELDS: Tuple[str, ...] = ("runner", "importHandlers", "serializer")
+    """The fields that need dill (ie: the runner's lambdas) to be sent to the child when it is spawned"""
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Only these fields are serialized with dill. This means that multiprocessing's own reducer doesn't have to be
+        # replaced with dill for the entire program, which would affect every other process that the program starts.
+        state = self.__dict__.copy()
+        state["_dillState"] = dill.dumps({field: state.pop(field) for field in self.DILL_FIELDS}, dill.HIGHEST_PROTOCOL)
+
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        dillState = dill.loads(state.pop("_dillState"))
+
+        self.__dict__.update(state)
+        self.__dict__.update(dillState)
+
+    def _Popen(self, processObj):
+        # multiprocessing calls this as `self._Popen(self)` when the process is started,
+        # so we are able to pick the context per process rather than changing it for the entire program
+        return multiprocessing.get_context(self.startMethod).Process._Popen(processObj)
 
     def setInputDataMemName(self, inputSharedMemName):
         """
@@ -104,6 +151,21 @@ class StudentSubmissionProcess(multiprocessing.Process):
         """
         self.outputDataMemName = outputDataMemName
 
+    def setInitialStdout(self, initialStdout: str):
+        """
+        Sets the output that stdout should already contain when the runner starts.
+
+        :param initialStdout: The output that was printed before this process was created.
+        This is used when the student's submission was imported in a :ref:`PythonSubmissionTemplate`.
+        """
+        self.initialStdout = initialStdout
+
+    def setMaxCapturedStdout(self, maxCapturedStdout: int):
+        """
+        Sets how many bytes of unfiltered stdout the child keeps. See :ref:`OutputSink`.
+        """
+        self.maxCapturedStdout = maxCapturedStdout
+
     def _setup(self) -> None:
         """
         Sets up the child input output redirection. The stdin is read from the shared memory object defined in the parent
@@ -112,77 +174,83 @@ class StudentSubmissionProcess(multiprocessing.Process):
 
         This method also moves the process to the execution directory
 
-        stdout is also redirected here, but because we don't care about its contents, we just overwrite it completely.
+        stdout is also redirected here, to an :ref:`OutputSink` that filters the OUTPUT lines as they are written.
 
         This method also injects whatever import MetaPathFinders
         """
-        # This may error? so we are going to catch it and log the error
-        try:
-            os.chdir(self.executionDirectory)
-        except OSError as ex:  # pragma: no coverage
-            print(f"ERROR: Failed to change directory to sandbox folder.\n{ex}", file=sys.stderr)  # pragma: no coverage
-
+        if self.changeDirectory:
+            # This may error? so we are going to catch it and log the error
+            try:
+                os.chdir(self.executionDirectory)
+            except OSError as ex:  # pragma: no coverage
+                print(f"ERROR: Failed to change directory to sandbox folder.\n{ex}", file=sys.stderr)  # pragma: no coverage
 
-        sys.path.append(os.getcwd())
+        sys.path.append(os.getcwd() if self.changeDirectory else os.path.abspath(self.executionDirectory))
 
         for importHandler in self.importHandlers:
-            sys.meta_path.insert(0, importHandler)
+            importHandler.install()
 
-            mods = importHandler.getModulesToReload()
-            for mod in mods:
-                if mod not in sys.modules:
-                    continue
-
-                del sys.modules[mod]
-
-        sharedInput = shared_memory.SharedMemory(self.inputDataMemName)
-        deserializedData = dill.loads(sharedInput.buf.tobytes())
+        inputChannel = SharedMemoryChannel.attach(self.inputDataMemName)
+        deserializedData = self.serializer.loads(inputChannel.read())
+        inputChannel.close()
         # Reformat the stdin so that we
         sys.stdin = StringIO("".join([line + "\n" for line in deserializedData]))
 
-        sys.stdout = StringIO()
+        sys.stdout = OutputSink(self.maxCapturedStdout)
+        sys.stdout.write(self.initialStdout)
 
-    def _teardown(self, stdout: Union[StringIO, TextIO], exception: Optional[Exception],
+    def _teardown(self, stdout: Union[OutputSink, StringIO, TextIO], exception: Optional[Exception],
                   returnValue: object, parameters: Optional[Tuple[object, ...]],
                   mocks: Optional[Dict[str, Optional[SingleFunctionMock]]]) -> None:
         """
         This function takes the results from the child process and serializes them.
-        Then is stored in the shared memory object that the parent is able to access.
+        Then is stored in the output channel that the parent is able to access.
 
-        :param stdout: The raw io from the stdout.
+        :param stdout: The sink that stdout was written to. If the submission replaced it, then its contents are
+        filtered now instead.
         :param exception: Any exceptions that were thrown
         :param returnValue: The return value from the function
         :param mocks: The mocks from the submission after they have been hydrated
         """
 
-        if isinstance(stdout, TextIO):
-            stdout.seek(0)
-            stdout = StringIO(stdout.read())
+        if not isinstance(stdout, OutputSink):
+            sink = OutputSink(self.maxCapturedStdout)
+
+            if hasattr(stdout, "getvalue"):
+                sink.write(stdout.getvalue())
 
-        # Pickle both the exceptions and the return value
+            stdout = sink
+
+        # Each field is pickled on its own so that the parent only has to unpickle what it uses
         dataToSerialize: Dict[str, Any] = {
-            "stdout": stdout.getvalue().splitlines(),
+            "stdout": stdout.getResults(),
             "parameters": parameters,
             "return_val": returnValue,
             "exception": exception,
-            "impl_results": {
-                "mocks": mocks,
-            },
+            "mocks": mocks,
         }
 
         for importHandler in self.importHandlers:
             sys.meta_path.remove(importHandler)
 
-        serializedData = dill.dumps(dataToSerialize, dill.HIGHEST_PROTOCOL)
-        sharedOutput = shared_memory.SharedMemory(self.outputDataMemName)
+        outputChannel = SharedMemoryChannel.attach(self.outputDataMemName)
 
-        if sharedOutput.size < sys.getsizeof(serializedData):
-            print(f"FATAL ERROR: Submission generated output is LARGER than buffer size of {sharedOutput.size} bytes. Output size is {sys.getsizeof(serializedData)} bytes!", file=sys.stderr)
-            sharedOutput.close()
-            return
+        # Large buffers (ie: numpy arrays) are written out-of-band so that the parent can map them rather than copy them
+        outOfBandWriter = OutOfBandWriter(outputChannel.owner, outputChannel.name)
+        serializedFields: Dict[str, bytes] = {}
+
+        for field, value in dataToSerialize.items():
+            outOfBand: List[pickle.PickleBuffer] = []
+            serializedFields[field] = self.serializer.dumps(value, outOfBand)
+            outOfBandWriter.add(field, outOfBand)
+
+        serializedFields["buffers"] = self.serializer.dumps(outOfBandWriter.write())
 
-        sharedOutput.buf[:len(serializedData)] = serializedData
-        sharedOutput.close()
+        serializedData = ResultFrame.encode(serializedFields)
+
+        # If the output is larger than the channel, it will be spilled to a temp file that the parent cleans up
+        outputChannel.write(serializedData)
+        outputChannel.close()
 
     def run(self):
         self._setup()
@@ -220,17 +288,24 @@ class StudentSubmissionProcess(multiprocessing.Process):
 class RunnableStudentSubmission(ISubmissionProcess):
 
     def __init__(self):
-        self.inputSharedMem: Optional[shared_memory.SharedMemory] = None
-        self.outputSharedMem: Optional[shared_memory.SharedMemory] = None
+        self.inputChannel: Optional[SharedMemoryChannel] = None
+        self.outputChannel: Optional[SharedMemoryChannel] = None
 
         self.runner: Optional[TaskRunner] = None
         self.executionDirectory: str = "."
+        self.importHandlers: List[AbstractModuleFinder] = []
+        self.template: Optional["PythonSubmissionTemplate"] = None
         self.studentSubmissionProcess: Optional[StudentSubmissionProcess] = None
         self.exception: Optional[Exception] = None
-        self.outputData: Dict[str, Any] = {}
+        self.outputFrame: Optional[ResultFrame] = None
+        self.outOfBandReader: Optional[OutOfBandReader] = None
         self.timeoutOccurred: bool = False
         self.timeoutTime: int = 0
         self.bufferSize: int = 0
+        self.maxCapturedStdout: int = OutputSink.DEFAULT_MAX_CAPTURED
+        self.serializer: AbstractSerializer = FastPathSerializer()
+        self.cancelled: bool = False
+        self._cancelLock: threading.Lock = threading.Lock()
 
     def setup(self, environment: ExecutionEnvironment[PythonEnvironment, PythonResults], runner: TaskRunner):
         """
@@ -243,35 +318,72 @@ class RunnableStudentSubmission(ISubmissionProcess):
         the issue with windows GC cleaning up the memory before we are done with it as there will be at least one
         active hook for each memory resource til ``cleanup`` is called.
 
+        If the zygote is enabled, then it is started here if it isn't already running.
 
+        If a template is set and is able to run the runner, then the submission is forked from the template instead.
         """
-        self.studentSubmissionProcess = \
-            StudentSubmissionProcess(runner, environment.sandbox_location,
-                                     environment.impl_environment.import_loader,
-                                     environment.timeout)
+        self.serializer = environment.impl_environment.serializer
+        self.runner = runner
+        self.executionDirectory = environment.sandbox_location
+        self.importHandlers = environment.impl_environment.import_loader
+        self.maxCapturedStdout = environment.impl_environment.max_captured_stdout
+
+        template = environment.impl_environment.template
+
+        if template is not None and template.canRun(runner, self.importHandlers):
+            self.template = template
+        else:
+            startMethod: Optional[str] = None
+
+            if environment.impl_environment.use_zygote and PythonZygote.isSupported() and PythonZygote.isUseful():
+                PythonZygote.start(environment.impl_environment.preload_modules)
+                startMethod = PythonZygote.START_METHOD
+
+            self.studentSubmissionProcess = \
+                StudentSubmissionProcess(runner, self.executionDirectory, self.importHandlers,
+                                         environment.timeout, startMethod, self.serializer)
+            self.studentSubmissionProcess.setMaxCapturedStdout(self.maxCapturedStdout)
 
         self.bufferSize = environment.impl_environment.buffer_size
 
         if self.bufferSize <= 0:
             raise AttributeError("INVALID STATE: Buffer size is ZERO. No data can be collected from the student's submission.")
 
-        self.inputSharedMem = shared_memory.SharedMemory(create=True, size=self.bufferSize)
-        self.outputSharedMem = shared_memory.SharedMemory(create=True, size=self.bufferSize)
+        # channels are borrowed from the pool rather than created so that segments are reused across executions
+        self.inputChannel = SharedMemoryPool.acquire(self.bufferSize)
+        self.outputChannel = SharedMemoryPool.acquire(self.bufferSize)
 
-        self.studentSubmissionProcess.setInputDataMemName(self.inputSharedMem.name)
-        self.studentSubmissionProcess.setOutputDataMenName(self.outputSharedMem.name)
+        # When forking from a template, the channel names are sent with the runner instead
+        if self.studentSubmissionProcess is not None:
+            self.studentSubmissionProcess.setInputDataMemName(self.inputChannel.name)
+            self.studentSubmissionProcess.setOutputDataMenName(self.outputChannel.name)
 
-        serializedStdin = dill.dumps(environment.stdin, dill.HIGHEST_PROTOCOL)
+        serializedStdin = self.serializer.dumps(environment.stdin)
 
-        self.inputSharedMem.buf[:len(serializedStdin)] = serializedStdin
+        self.inputChannel.write(serializedStdin)
 
         self.timeoutTime = environment.timeout
 
     def run(self):
+        if self.template is not None and self.runner is not None \
+                and self.inputChannel is not None and self.outputChannel is not None:
+            if self.cancelled:
+                return
+
+            self.timeoutOccurred = self.template.run(self.runner, self.inputChannel.name, self.outputChannel.name,
+                                                     self.executionDirectory, self.importHandlers, self.serializer,
+                                                     self.timeoutTime)
+            return
+
         if self.studentSubmissionProcess is None:
             raise AttributeError("Process has not be initialized!")
 
-        self.studentSubmissionProcess.start()
+        # this is held while starting so that a cancellation either prevents the start or sees the started process
+        with self._cancelLock:
+            if self.cancelled:
+                return
+
+            self.studentSubmissionProcess.start()
 
         self.studentSubmissionProcess.join()
 
@@ -279,28 +391,49 @@ class RunnableStudentSubmission(ISubmissionProcess):
             self.studentSubmissionProcess.terminate()
             self.timeoutOccurred = True
 
+    def cancel(self) -> bool:
+        """
+        Kills the student's submission if it is running, or prevents it from starting if it isn't.
+        """
+        with self._cancelLock:
+            self.cancelled = True
+
+            if self.template is not None:
+                self.template.cancel()
+            elif self.studentSubmissionProcess is not None and self.studentSubmissionProcess.pid is not None:
+                self.studentSubmissionProcess.kill()
+
+        return True
+
+    @staticmethod
+    def _releaseChannels(inputChannel: SharedMemoryChannel, outputChannel: SharedMemoryChannel) -> None:
+        # if the child was killed or its output is corrupt, then the out-of-band file was never mapped
+        OutOfBandWriter.discard(outputChannel.owner, outputChannel.name)
+
+        # `release` removes any data that was spilled out of the channel and resets it for the next execution.
+        #  If the pool is full, then the segment is closed and unlinked
+        SharedMemoryPool.release(inputChannel)
+        SharedMemoryPool.release(outputChannel)
+
     def _deallocate(self):
-        if self.inputSharedMem is None or self.outputSharedMem is None:
+        if self.inputChannel is None or self.outputChannel is None:
             return
 
-        # `close` closes the current hook
-        self.inputSharedMem.close()
-        # `unlink` tells the gc that it is ok to clean up this resource
-        #  On windows, `unlink` is a noop
-        self.inputSharedMem.unlink()
+        self._releaseChannels(self.inputChannel, self.outputChannel)
 
-        self.outputSharedMem.close()
-        self.outputSharedMem.unlink()
+        self.inputChannel = None
+        self.outputChannel = None
 
     def cleanup(self):
         """
-        This function cleans up the shared memory object by closing the parent hook and then unlinking it.
+        This function reads the results out of the output channel and then returns both channels to the
+        :ref:`SharedMemoryPool`.
 
-        After it is unlinked, the python garbage collector cleans it up.
-        On windows, the GC runs as soon as the last hook is closed and `unlink` is a noop
+        Segments that the pool doesn't keep are closed and unlinked, after which the python garbage collector cleans
+        them up. On windows, the GC runs as soon as the last hook is closed and `unlink` is a noop
         """
 
-        if self.inputSharedMem is None or self.outputSharedMem is None:
+        if self.inputChannel is None or self.outputChannel is None:
             return
 
         if self.timeoutOccurred:
@@ -308,39 +441,74 @@ class RunnableStudentSubmission(ISubmissionProcess):
             self._deallocate()
             return
 
-        # This prolly isn't the best memory wise, but according to some chuckle head on reddit, this is superfast
-        outputBytes = self.outputSharedMem.buf.tobytes()
+        outputBytes = self.outputChannel.read()
 
-        if outputBytes == bytearray(self.bufferSize):
-            self.exception = MissingOutputDataException(self.outputSharedMem.name)
+        if outputBytes is None:
+            self.exception = MissingOutputDataException(self.outputChannel.name)
             self._deallocate()
             return
 
-        deserializedData: Dict[str, Any] = dill.loads(outputBytes)
+        try:
+            # Only the frame is validated here, the fields are unpickled when they are accessed
+            self.outputFrame = ResultFrame(outputBytes, self.outputChannel.name)
+            # The out-of-band buffers are mapped now so that the file is unlinked even if no field is ever accessed.
+            # The path is built here, as the metadata came from the student's submission
+            self.outOfBandReader = OutOfBandReader(
+                self.outputFrame.decode("buffers", self.serializer.loads),  # type: ignore
+                OutOfBandWriter.buildPath(self.outputChannel.owner, self.outputChannel.name))
+        except CorruptOutputDataException as ex:
+            self.exception = ex
+        # ie: the out-of-band file is missing or empty, or the metadata didn't unpickle
+        except Exception as ex:
+            self.outputFrame = None
+            self.exception = CorruptOutputDataException(self.outputChannel.name,
+                                                        f"Failed to load out-of-band buffers: {ex!r}")
+        finally:
+            self._deallocate()
 
-        self.outputData = deserializedData
+    def populateResults(self, environment: ExecutionEnvironment):
+        fileOut = diffFileSystem(environment.sandbox_location, environment.sandbox_snapshot, environment.files.values())
 
-        self._deallocate()
+        if self.outputFrame is None:
+            environment.resultData = Results(file_out=fileOut, exception=self.exception,
+                                             impl_results=PythonResults(mocks=None))
+            return
 
-    def populateResults(self, environment: ExecutionEnvironment):
-        if not self.outputData:
-            self.outputData = {
-                "stdout": None,
-                "parameters": None,
-                "return_val": None,
-                "exception": self.exception,
-                "impl_results": {
-                    "mocks": None,
-                },
-            }
+        frame = self.outputFrame
+        outOfBandReader = self.outOfBandReader if self.outOfBandReader is not None else OutOfBandReader(None)
+
+        def decode(field: str) -> Any:
+            return frame.decode(field, lambda data: self.serializer.loads(data, outOfBandReader.getBuffers(field)))
 
-        self.outputData["file_out"] = detectFileSystemChanges(environment.files.values(), environment.sandbox_location)
-        self.outputData["stdout"] = filterStdOut(self.outputData["stdout"])
+        # the child already filtered the OUTPUT lines, and stdout is shared by two results, so it is only decoded once
+        stdout: Dict[str, Any] = {}
 
-        if "impl_results" in self.outputData:
-            self.outputData["impl_results"] = PythonResults(**self.outputData["impl_results"])
+        def decodeStdout() -> Dict[str, Any]:
+            if not stdout:
+                stdout.update(decode("stdout"))
+
+            return stdout
+
+        environment.resultData = Results(
+            stdout=DeferredResult(lambda: decodeStdout()["lines"]),
+            parameters=DeferredResult(lambda: decode("parameters")),
+            return_val=DeferredResult(lambda: decode("return_val")),
+            exception=DeferredResult(lambda: decode("exception")),
+            impl_results=DeferredResult(lambda: PythonResults(mocks=decode("mocks"),
+                                                              output=CapturedOutput.fromSink(decodeStdout()))),
+            file_out=fileOut,
+        )
+
+    def getSerializationMethods(self) -> Dict[str, SerializationMethod]:
+        """
+        Gets which method the student's submission used to serialize each of the result fields.
+
+        :returns: the method for each field, or an empty dict if no results were collected.
+        """
+        if self.outputFrame is None:
+            return {}
 
-        environment.resultData = Results(**self.outputData)
+        return {field: self.serializer.getMethod(self.outputFrame.getField(field)) for field in ResultFrame.FIELDS}
 
     @classmethod
     def processAndRaiseExceptions(cls, environment: ExecutionEnvironment):
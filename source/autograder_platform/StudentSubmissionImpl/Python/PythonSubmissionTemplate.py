@@ -0,0 +1,324 @@
+"""
+This module provides the template that a student's submission is able to be forked from.
+
+Normally, every test imports the student's submission in a brand-new process. For submissions that do a lot of work at
+the top level (reading data files, building large tables, etc.) that work is repeated for every single test.
+Instead, a test class is able to start a template that imports the submission once and then waits.
+Each test is then run in a child that is forked from the template after the import has happened.
+As the child is forked, each test gets its own copy-on-write copy of the module, so tests are still isolated from
+each other.
+
+Only the ``import`` task is skipped in the child. Injected code, mocks, setup methods, and the entrypoint are all still
+run per test. Runners that don't import the submission (ie: module entrypoints) are run as usual.
+
+Anything that the submission printed while it was being imported is included at the start of every test's stdout,
+just as it would be if the submission was imported in each test. Any stdin that the submission reads while it is being
+imported comes from the template's environment rather than the test's.
+
+This relies on ``os.fork``, so it is only available on POSIX platforms.
+"""
+import multiprocessing
+import os
+import signal
+import sys
+import threading
+from io import StringIO
+from multiprocessing import resource_tracker
+from multiprocessing.connection import Connection
+from multiprocessing.process import BaseProcess
+from types import CodeType, ModuleType
+from typing import Final, List, Optional
+
+import dill
+
+from autograder_platform.Executors.Environment import ExecutionEnvironment, ExecutionEnvironmentBuilder
+from autograder_platform.Executors.Executor import Executor
+from autograder_platform.StudentSubmissionImpl.Python.AbstractPythonImportFactory import AbstractModuleFinder
+from autograder_platform.StudentSubmissionImpl.Python.PythonEnvironment import PythonEnvironment, PythonResults
+from autograder_platform.StudentSubmissionImpl.Python.PythonSubmission import PythonSubmission
+from autograder_platform.StudentSubmissionImpl.Python.PythonSubmissionProcess import StudentSubmissionProcess
+from autograder_platform.StudentSubmissionImpl.Python.Runners import PythonTaskLibrary
+from autograder_platform.StudentSubmissionImpl.Python.Serializer import AbstractSerializer
+from autograder_platform.Tasks.Task import Task
+from autograder_platform.Tasks.TaskRunner import TaskRunner
+
+
+class PythonSubmissionTemplate:
+    """
+    Description
+    ===========
+
+    This class manages the template process for a single student submission.
+
+    The template is normally started in ``setUpClass`` and stopped in ``tearDownClass``, and then passed to each test's
+    environment with :ref:`PythonEnvironmentBuilder.setTemplate`.
+
+    The template is communicated with over a pipe. For each test, the parent sends the runner, the template forks a
+    child to run it, and then reports the PID of the child and then its exit status. The parent is responsible for
+    killing the child if it times out.
+
+    A template runs one child at a time. Tests that share a template from multiple threads wait for each other in
+    ``run``.
+    """
+    START_METHOD: Final[str] = "fork"
+    IMPORT_TASK: Final[str] = "import"
+    PACKAGE_OVERLAY_TASK: Final[str] = "package_overlay"
+    RESPONSE_TIMEOUT: Final[int] = 5
+    """How long to wait for the template to acknowledge a request before it is considered dead"""
+
+    def __init__(self, submission: PythonSubmission,
+                 environment: Optional[ExecutionEnvironment[PythonEnvironment, PythonResults]] = None):
+        """
+        :param submission: The student's submission to import
+        :param environment: The environment to import the submission in. This controls the files and stdin that are
+        available while the submission is being imported, and how long the import is allowed to take.
+        """
+        self.submission: CodeType = submission.getExecutableSubmission()
+        self.environment: ExecutionEnvironment[PythonEnvironment, PythonResults] = \
+            environment if environment is not None else ExecutionEnvironmentBuilder[PythonEnvironment, PythonResults]().build()
+
+        self.process: Optional[BaseProcess] = None
+        self.connection: Optional[Connection] = None
+        self.childPid: Optional[int] = None
+        """The PID of the child that is currently running, if any"""
+        self.runLock: threading.Lock = threading.Lock()
+        """Held for an entire request, so that requests from different threads don't interleave on the pipe"""
+
+    @classmethod
+    def isSupported(cls) -> bool:
+        return cls.START_METHOD in multiprocessing.get_all_start_methods()
+
+    def isRunning(self) -> bool:
+        return self.process is not None and self.process.is_alive()
+
+    def getImportHandlers(self) -> List[AbstractModuleFinder]:
+        return self.environment.impl_environment.import_loader \
+            if self.environment.impl_environment is not None else []
+
+    def canRun(self, runner: TaskRunner, importHandlers: Optional[List[AbstractModuleFinder]] = None) -> bool:
+        """
+        Checks if a runner can be forked from this template.
+
+        The runner must import the submission, and it must be the same submission that the template imported.
+        Runners that use a package overlay aren't able to be forked, as the template imported the submission without it.
+
+        The test's import handlers (ie: module mocks) must be the exact same ones that the template imported the
+        submission with, as anything that the submission imported at the top level was resolved by the template's.
+
+        :param runner: the runner to check
+        :param importHandlers: the import handlers from the test's environment
+        """
+        if not self.isRunning() or not runner.hasTask(self.IMPORT_TASK) or runner.hasTask(self.PACKAGE_OVERLAY_TASK):
+            return False
+
+        templateHandlers = self.getImportHandlers()
+        importHandlers = importHandlers if importHandlers is not None else []
+
+        if len(importHandlers) != len(templateHandlers) \
+                or any(handler is not templateHandler for handler, templateHandler in zip(importHandlers, templateHandlers)):
+            return False
+
+        importTask = runner.getTask(self.IMPORT_TASK)
+
+        return [getInput() for getInput in importTask.inputs] == [self.submission]
+
+    @staticmethod
+    def _runChild(request: bytes, module: ModuleType, importStdout: str) -> None:
+        exitCode = 0
+
+        try:
+            runner, inputDataMemName, outputDataMemName, executionDirectory, importHandlers, serializer = \
+                dill.loads(request)
+
+            runner.replace(Task(PythonSubmissionTemplate.IMPORT_TASK, lambda: module, []))
+
+            process = StudentSubmissionProcess(runner, executionDirectory, importHandlers, serializer=serializer)
+            process.setInputDataMemName(inputDataMemName)
+            process.setOutputDataMenName(outputDataMemName)
+            process.setInitialStdout(importStdout)
+
+            # This runs the submission in this process, it doesn't start another one
+            process.run()
+        except BaseException:
+            exitCode = 1
+        finally:
+            # The child must never return into the template's loop
+            os._exit(exitCode)
+
+    @staticmethod
+    def _serve(connection: Connection, parentConnection: Connection, submission: CodeType, executionDirectory: str,
+               importHandlers: List[AbstractModuleFinder], stdin: List[str]) -> None:
+        # The parent's end is inherited when forking, it must be closed so that we see EOF if the parent is killed
+        parentConnection.close()
+
+        # This mirrors the setup in the StudentSubmissionProcess so that the import behaves the same as it normally would
+        os.chdir(executionDirectory)
+        sys.path.append(os.getcwd())
+
+        for importHandler in importHandlers:
+            importHandler.install()
+
+        sys.stdin = StringIO("".join([line + "\n" for line in stdin]))
+        sys.stdout = StringIO()
+
+        try:
+            module = PythonTaskLibrary.attemptToImport(submission)
+        # SystemExit is included here, as that is what students normally call to 'exit'
+        except BaseException:
+            connection.send(False)
+            return
+
+        importStdout = sys.stdout.getvalue()
+
+        connection.send(True)
+
+        while True:
+            try:
+                request: Optional[bytes] = connection.recv()
+            except EOFError:
+                return
+
+            if request is None:
+                return
+
+            pid = os.fork()
+
+            if pid == 0:
+                PythonSubmissionTemplate._runChild(request, module, importStdout)
+
+            connection.send(pid)
+
+            _, status = os.waitpid(pid, 0)
+
+            connection.send(status)
+
+    def start(self) -> bool:
+        """
+        Description
+        ---
+        Starts the template and imports the student's submission in it.
+
+        If the submission fails to import or doesn't finish importing before the environment's timeout, then the
+        template is stopped, and every test is run as usual. This means that the failure is reported by each test in
+        exactly the same way that it would be without the template.
+
+        :returns: True if the submission was imported and the template is running
+        :raises EnvironmentError: if the template is not supported on this platform
+        """
+        if not self.isSupported():
+            raise EnvironmentError(f"Submission templates are not supported on this platform! Start method '{self.START_METHOD}' is not available.")
+
+        if self.isRunning():
+            return True
+
+        Executor.prepareSandbox(self.environment)
+
+        # The children attach to the channels, which registers them with the resource tracker.
+        # If the tracker isn't already running, then each child would start its own, which would unlink the
+        # channels when the child exits. Starting it now means that the template and its children share ours.
+        resource_tracker.ensure_running()
+
+        importHandlers = self.getImportHandlers()
+
+        self.connection, childConnection = multiprocessing.Pipe()
+
+        self.process = multiprocessing.get_context(self.START_METHOD).Process(
+            target=self._serve, name="Submission Template", daemon=True,
+            args=(childConnection, self.connection, self.submission, self.environment.sandbox_location, importHandlers,
+                  self.environment.stdin))
+
+        self.process.start()
+        childConnection.close()
+
+        if not self.connection.poll(self.environment.timeout) or not self.connection.recv():
+            self.stop()
+            return False
+
+        return True
+
+    def run(self, runner: TaskRunner, inputDataMemName: str, outputDataMemName: str, executionDirectory: str,
+            importHandlers: List[AbstractModuleFinder], serializer: AbstractSerializer, timeout: int) -> bool:
+        """
+        Description
+        ---
+        Runs a runner in a child that is forked from the template and waits for it to finish.
+
+        This takes the same arguments as the :ref:`StudentSubmissionProcess`.
+
+        :returns: True if the child timed out and was killed
+        :raises EnvironmentError: if the template is not running, has stopped responding, or has died
+        """
+        with self.runLock:
+            if not self.isRunning() or self.connection is None:
+                raise EnvironmentError("Submission template is not running!")
+
+            try:
+                return self._run(self.connection, dill.dumps(
+                    (runner, inputDataMemName, outputDataMemName, executionDirectory, importHandlers, serializer),
+                    dill.HIGHEST_PROTOCOL), timeout)
+            except (EOFError, OSError) as ex:
+                self.stop()
+                raise EnvironmentError(f"Submission template died while running the submission! Error is: {ex}")
+
+    def _run(self, connection: Connection, request: bytes, timeout: int) -> bool:
+        connection.send(request)
+
+        if not connection.poll(self.RESPONSE_TIMEOUT):
+            self.stop()
+            raise EnvironmentError("Submission template stopped responding!")
+
+        pid: int = connection.recv()
+        self.childPid = pid
+
+        try:
+            if connection.poll(timeout):
+                connection.recv()
+                return False
+
+            self.cancel()
+
+            # wait for the template to clean up the child
+            connection.recv()
+
+            return True
+        finally:
+            self.childPid = None
+
+    def cancel(self) -> None:
+        """
+        Kills the child that is currently running, if any. ``run`` returns as soon as the template has cleaned it up.
+        """
+        pid = self.childPid
+
+        if pid is None:
+            return
+
+        try:
+            # SigKill - cant be caught
+            os.kill(pid, signal.SIGKILL)
+        except ProcessLookupError:  # pragma: no cover
+            pass
+
+    def stop(self) -> None:
+        """
+        Stops the template and removes its sandbox. This is a noop if the template isn't running.
+        """
+        if self.connection is not None:
+            try:
+                self.connection.send(None)
+            except OSError:  # pragma: no cover
+                pass
+
+            self.connection.close()
+            self.connection = None
+
+        if self.process is not None:
+            self.process.join(timeout=self.RESPONSE_TIMEOUT)
+
+            if self.process.is_alive():
+                self.process.kill()
+                self.process.join()
+
+            self.process = None
+
+        Executor.cleanup(self.environment)
@@ -1,9 +1,13 @@
 import importlib.util
-from typing import Callable, Dict, List
-import requests
+import json
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Final, Iterable, List, Optional, Set, Tuple
 import os
 from autograder_platform.StudentSubmission.AbstractValidator import AbstractValidator
 from autograder_platform.StudentSubmission.common import ValidationHook
+from autograder_platform.config.Config import AutograderConfiguration, AutograderConfigurationProvider, PythonConfiguration
 from autograder_platform.StudentSubmissionImpl.Python.common import FileTypeMap, InvalidPackageError, InvalidRequirementsFileError, MissingMainFileError, NoPyFilesError, TooManyFilesError
 
 class PythonFileValidator(AbstractValidator):
@@ -93,8 +97,41 @@ class RequirementsValidator(AbstractValidator):
             )
 
 class PackageValidator(AbstractValidator):
+    """
+    Description
+    ===========
+
+    This validator checks that every package that the student requires actually exists.
+
+    Packages are checked against (in order):
+    1. The installed packages
+    2. The results of previous lookups. These are shared between every submission in the program.
+    3. The local package index snapshot, if one has been loaded with ``configure``
+    4. The package index. All of the remaining packages are looked up concurrently.
+
+    The snapshot is only able to confirm that a package exists. As it can be older than the index, a package (or version)
+    that isn't in the snapshot is still looked up in the index.
+
+    If ``offline`` is set, then step 4 is skipped and any package that wasn't found is reported as invalid.
+
+    The snapshot is a JSON file that maps the normalized name of each package to a list of its versions.
+    It is generated when the autograder is built (see ``buildSnapshot``), and is loaded from the ``python`` section of
+    the autograder config when the validator is set up.
+    """
 
     PYPI_BASE = "https://pypi.org/pypi/"
+    DEFAULT_TIMEOUT: Final[float] = 5.0
+    MAX_WORKERS: Final[int] = 8
+
+    indexUrl: str = PYPI_BASE
+    timeout: float = DEFAULT_TIMEOUT
+    offline: bool = False
+    snapshot: Dict[str, Set[str]] = {}
+
+    results: Dict[Tuple[str, str], bool] = {}
+    """The results of previous lookups, keyed by normalized package name and version"""
+    _lock: threading.Lock = threading.Lock()
+    _configuredFrom: Optional[AutograderConfiguration] = None
 
     @staticmethod
     def getValidationHook() -> ValidationHook:
@@ -104,27 +141,195 @@ class PackageValidator(AbstractValidator):
         super().__init__()
         self.packages: Dict[str, str] = {}
 
-    def setup(self, studentSubmission):
-        self.packages = studentSubmission.getExtraPackages()
+    @staticmethod
+    def normalizeName(package: str) -> str:
+        return re.sub(r"[-_.]+", "-", package).lower()
+
+    @classmethod
+    def configure(cls, snapshotPath: Optional[str] = None, indexUrl: Optional[str] = None,
+                  timeout: Optional[float] = None, offline: Optional[bool] = None) -> None:
+        """
+        Description
+        ---
+        Configures how packages are looked up for every submission.
+
+        :param snapshotPath: the path to the local package index snapshot to load
+        :param indexUrl: the base url of the package index (which must support the PyPI JSON API)
+        :param timeout: how long to wait for each lookup, in seconds
+        :param offline: if the package index should never be contacted
+        """
+        if snapshotPath is not None:
+            with open(snapshotPath, 'r') as r:
+                snapshot = json.load(r)
+
+            cls.snapshot = {cls.normalizeName(package): set(versions) for package, versions in snapshot.items()}
+
+        if indexUrl is not None:
+            cls.indexUrl = indexUrl if indexUrl.endswith("/") else indexUrl + "/"
+
+        if timeout is not None:
+            cls.timeout = timeout
+
+        if offline is not None:
+            cls.offline = offline
+
+    @classmethod
+    def configureFromConfig(cls, config: AutograderConfiguration) -> None:
+        """
+        Description
+        ---
+        Configures how packages are looked up from the ``python`` section of the autograder config.
+        This is only done once for each config, so the snapshot isn't loaded again for every submission.
+
+        The snapshot is only shipped with the Gradescope and PrairieLearn autograders, so it is skipped if it doesn't
+        exist (ie: when students are running the autograder locally).
+
+        :param config: the autograder config
+        """
+        pythonConfig = config.config.python
+
+        if cls._configuredFrom is config or not isinstance(pythonConfig, PythonConfiguration):
+            return
 
-    def run(self):
+        cls._configuredFrom = config
 
-        for package, version in self.packages.items():
-            if importlib.util.find_spec(package) != None:
-                continue
+        snapshotPath: Optional[str] = None
+
+        if pythonConfig.package_snapshot is not None:
+            snapshotPath = os.path.join(config.autograder_root, pythonConfig.package_snapshot)
+
+            if not os.path.isfile(snapshotPath):
+                snapshotPath = None
+
+        cls.configure(snapshotPath=snapshotPath, offline=pythonConfig.offline_package_lookup)
+
+    @classmethod
+    def reset(cls) -> None:
+        with cls._lock:
+            cls.indexUrl = cls.PYPI_BASE
+            cls.timeout = cls.DEFAULT_TIMEOUT
+            cls.offline = False
+            cls.snapshot = {}
+            cls.results = {}
+            cls._configuredFrom = None
+
+    @classmethod
+    def buildSnapshot(cls, packages: Iterable[str], snapshotPath: str) -> None:
+        """
+        Description
+        ---
+        Looks up every version of each package and writes them as a snapshot. This is meant to be run when the
+        autograder is being built, while network access is still available.
+
+        Packages that don't exist are left out of the snapshot.
+
+        :param packages: the packages to look up
+        :param snapshotPath: where to write the snapshot
+        """
+        import requests
+
+        def getVersions(package: str) -> Optional[List[str]]:
+            response = requests.get(url=cls.indexUrl + cls.normalizeName(package) + "/json", timeout=cls.timeout)
+
+            if response.status_code != 200:
+                return None
+
+            return sorted(response.json()["releases"].keys())
+
+        with ThreadPoolExecutor(max_workers=cls.MAX_WORKERS) as executor:
+            packages = list(packages)
+            versions = executor.map(getVersions, packages)
+
+            snapshot = {cls.normalizeName(package): packageVersions
+                        for package, packageVersions in zip(packages, versions) if packageVersions is not None}
 
-            url = self.PYPI_BASE + package + "/"
+        with open(snapshotPath, 'w') as w:
+            json.dump(snapshot, w)
 
-            if version:
-                url += version + "/"
+    @classmethod
+    def _lookup(cls, package: str, version: str) -> Optional[bool]:
+        # requests is only imported when it is needed, as some of its compiled dependencies can't be loaded in to
+        # sub-interpreters, which import this module. See :ref:`PythonSubInterpreterPool`.
+        import requests
 
-            url += "json"
+        url = cls.indexUrl + package + "/"
 
-            if requests.get(url=url).status_code == 200:
+        if version:
+            url += version + "/"
+
+        url += "json"
+
+        try:
+            return requests.get(url=url, timeout=cls.timeout).status_code == 200
+        except requests.RequestException:
+            # we don't know if the package exists, so this isn't cached
+            return None
+
+    @classmethod
+    def checkPackages(cls, packages: Dict[str, str]) -> Dict[str, bool]:
+        """
+        Description
+        ---
+        Checks if each package exists, without considering the installed packages.
+
+        :param packages: maps the name of each package to its version. An empty version means any version.
+        :returns: if each package exists
+        """
+        exists: Dict[str, bool] = {}
+        toLookup: List[Tuple[str, str]] = []
+
+        for package, version in packages.items():
+            key = (cls.normalizeName(package), version)
+
+            with cls._lock:
+                if key in cls.results:
+                    exists[package] = cls.results[key]
+                    continue
+
+            if key[0] in cls.snapshot and (not version or version in cls.snapshot[key[0]]):
+                exists[package] = True
                 continue
 
-            self.addError(InvalidPackageError(package, version))
+            if cls.offline:
+                exists[package] = False
+                continue
 
+            toLookup.append((package, version))
 
-        
+        if not toLookup:
+            return exists
+
+        with ThreadPoolExecutor(max_workers=min(cls.MAX_WORKERS, len(toLookup))) as executor:
+            lookups = executor.map(lambda packageAndVersion: cls._lookup(*packageAndVersion), toLookup)
+
+            for (package, version), result in zip(toLookup, lookups):
+                exists[package] = bool(result)
+
+                if result is None:
+                    continue
+
+                with cls._lock:
+                    cls.results[(cls.normalizeName(package), version)] = result
+
+        return exists
+
+    def setup(self, studentSubmission):
+        self.packages = studentSubmission.getExtraPackages()
+
+        try:
+            config = AutograderConfigurationProvider.get()
+        except AttributeError:
+            # the lookups are left as they were configured directly
+            return
+
+        self.configureFromConfig(config)
+
+    def run(self):
+        packagesToCheck = {package: version for package, version in self.packages.items()
+                           if importlib.util.find_spec(package) is None}
+
+        for package, exists in self.checkPackages(packagesToCheck).items():
+            if exists:
+                continue
 
+            self.addError(InvalidPackageError(package, packagesToCheck[package]))
@@ -0,0 +1,88 @@
+"""
+This module provides the zygote that student submission processes are forked from.
+
+Starting a fresh interpreter for every execution means that every child has to re-import the platform and import
+whatever heavy libraries the submission uses before any student code is run.
+The zygote is a single long-lived process that does all of that work once. Each submission process is then forked from
+it, so children start with everything already imported and only pay for the fork.
+
+This is built on top of multiprocessing's 'forkserver' start method, so it is only available on platforms that
+support it. On all other platforms, the default start method is used.
+
+The zygote only helps where the default start method starts a new interpreter (ie: 'spawn' on macOS). Where the
+default is 'fork', the parent already has everything imported, and forking it directly is about 10x faster than going
+through the zygote (roughly 5ms vs 50ms per submission on linux). So the zygote is never used there, even if it is
+enabled. See ``isUseful``.
+
+multiprocessing doesn't provide a public way to stop or restart the forkserver, so the zygote is started once, with the
+modules that it was first asked for, and then runs until the program exits.
+"""
+
+import multiprocessing
+import threading
+from typing import Final, List, Optional
+
+
+class PythonZygote:
+    """
+    This class manages the zygote for the entire program.
+    Similar to the configuration provider, there is only ever one zygote running at a time.
+    """
+    START_METHOD: Final[str] = "forkserver"
+
+    PLATFORM_MODULES: Final[List[str]] = [
+        "autograder_platform.StudentSubmissionImpl.Python.PythonSubmissionProcess",
+        "autograder_platform.StudentSubmissionImpl.Python.Runners",
+    ]
+    """The modules that are always preloaded in the zygote"""
+
+    WARMUP_MODULE: Final[str] = "autograder_platform.StudentSubmissionImpl.Python.PythonZygoteWarmup"
+    """The module that finalizes the zygote. This must always be imported last"""
+
+    preloadModules: Optional[List[str]] = None
+
+    _lock: threading.RLock = threading.RLock()
+
+    @classmethod
+    def isSupported(cls) -> bool:
+        return cls.START_METHOD in multiprocessing.get_all_start_methods()
+
+    @staticmethod
+    def isUseful() -> bool:
+        """
+        Checks if forking from the zygote is faster than the default start method. This is only the case if the default
+        start method doesn't fork, as forking the parent directly is much faster than forking the zygote.
+        """
+        return multiprocessing.get_context().get_start_method() != "fork"
+
+    @classmethod
+    def isRunning(cls) -> bool:
+        return cls.preloadModules is not None
+
+    @classmethod
+    def start(cls, preloadModules: List[str]) -> None:
+        """
+        Description
+        ---
+        Starts the zygote with the requested modules preloaded.
+
+        If the zygote is already running, this is a noop, even if it was started with different modules, as it can't be
+        restarted. Modules that weren't preloaded (or that fail to import) are imported by the child if needed.
+
+        :param preloadModules: the extra modules that should be imported in the zygote
+        :raises EnvironmentError: if the zygote is not supported on this platform
+        """
+        if not cls.isSupported():
+            raise EnvironmentError(f"Zygote is not supported on this platform! Start method '{cls.START_METHOD}' is not available.")
+
+        with cls._lock:
+            if cls.isRunning():
+                return
+
+            # importing this on platforms that don't support it is a bad idea
+            import multiprocessing.forkserver
+
+            multiprocessing.set_forkserver_preload(cls.PLATFORM_MODULES + preloadModules + [cls.WARMUP_MODULE])
+            multiprocessing.forkserver.ensure_running()
+
+            cls.preloadModules = list(preloadModules)
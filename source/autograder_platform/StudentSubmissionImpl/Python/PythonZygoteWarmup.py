@@ -0,0 +1,11 @@
+"""
+This module finalizes the zygote. It should ONLY ever be imported by the zygote as the last preloaded module.
+
+Everything that has been imported so far is moved to the permanent generation, which means that the GC in the
+forked children never touches those objects. This keeps the pages shared with the zygote instead of being copied
+on the first collection.
+"""
+import gc
+
+gc.collect()
+gc.freeze()
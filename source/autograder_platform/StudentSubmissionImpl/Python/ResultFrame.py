@@ -0,0 +1,122 @@
+"""
+This module provides the framed layout that results are written in by the student's submission.
+
+Rather than serializing all the results as one object, each field is serialized on its own and written after a table
+that stores the offset and length of each field. This means that the parent only needs to deserialize the fields that
+a test actually accesses, and it is able to do that directly from a memoryview over the frame.
+
+The frame is laid out as::
+
+    | magic | version | field count | checksum | payload length | field table | payload |
+
+The checksum is a CRC32 of the payload, so a frame that was only partially written is detected rather than
+deserialized as garbage.
+
+The ``buffers`` field describes where any out-of-band buffers for the other fields were written.
+See :ref:`OutOfBandBuffers` for more info.
+"""
+import struct
+import zlib
+from typing import Callable, Dict, Final, Optional, Tuple, Union
+
+from autograder_platform.Executors.common import CorruptOutputDataException
+
+BytesLike = Union[bytes, bytearray, memoryview]
+
+
+class ResultFrame:
+    MAGIC: Final[bytes] = b"AGRF"
+    VERSION: Final[int] = 2
+
+    HEADER: Final[struct.Struct] = struct.Struct("<4sBBIQ")
+    """magic, version, field count, checksum, payload length"""
+    FIELD: Final[struct.Struct] = struct.Struct("<QQ")
+    """offset, length. The offset is relative to the start of the payload"""
+
+    FIELDS: Final[Tuple[str, ...]] = ("stdout", "parameters", "return_val", "exception", "mocks", "buffers")
+
+    @classmethod
+    def encode(cls, fields: Dict[str, BytesLike]) -> bytes:
+        """
+        Description
+        ---
+        Encodes the already serialized fields into a frame.
+
+        :param fields: The serialized fields. Every field in ``FIELDS`` must be present.
+        :returns: the encoded frame
+        """
+        table = bytearray()
+        offset = 0
+
+        for name in cls.FIELDS:
+            length = len(fields[name])
+            table += cls.FIELD.pack(offset, length)
+            offset += length
+
+        payload = b"".join(fields[name] for name in cls.FIELDS)
+
+        header = cls.HEADER.pack(cls.MAGIC, cls.VERSION, len(cls.FIELDS), zlib.crc32(payload), len(payload))
+
+        return header + table + payload
+
+    def __init__(self, frame: BytesLike, name: str = "output"):
+        """
+        Description
+        ---
+        Validates the frame and reads the field table. No fields are deserialized here.
+
+        :param frame: The encoded frame
+        :param name: The name of where the frame came from. Used for error messages.
+        :raises CorruptOutputDataException: If the frame is malformed or the checksum doesn't match
+        """
+        self.frame: memoryview = memoryview(frame)
+        self.name: str = name
+        self.decoded: Dict[str, object] = {}
+
+        if len(self.frame) < self.HEADER.size:
+            raise CorruptOutputDataException(name, "Frame is smaller than the header")
+
+        magic, version, fieldCount, checksum, payloadLength = self.HEADER.unpack_from(self.frame, 0)
+
+        if magic != self.MAGIC or version != self.VERSION or fieldCount != len(self.FIELDS):
+            raise CorruptOutputDataException(name, "Invalid frame header")
+
+        payloadStart = self.HEADER.size + self.FIELD.size * fieldCount
+
+        if len(self.frame) < payloadStart + payloadLength:
+            raise CorruptOutputDataException(name, "Frame is truncated")
+
+        self.payload: memoryview = self.frame[payloadStart:payloadStart + payloadLength]
+
+        if zlib.crc32(self.payload) != checksum:
+            raise CorruptOutputDataException(name, "Checksum mismatch")
+
+        self.offsets: Dict[str, Tuple[int, int]] = {
+            field: self.FIELD.unpack_from(self.frame, self.HEADER.size + self.FIELD.size * i)
+            for i, field in enumerate(self.FIELDS)
+        }
+
+    def getField(self, field: str) -> memoryview:
+        """
+        Gets the raw serialized field as a view over the frame. No data is copied.
+
+        :param field: the name of the field
+        """
+        if field not in self.offsets:
+            raise AttributeError(f"Field '{field}' does not exist in the result frame!")
+
+        offset, length = self.offsets[field]
+
+        return self.payload[offset:offset + length]
+
+    def decode(self, field: str, loads: Callable[[memoryview], object]) -> Optional[object]:
+        """
+        Deserializes a field. Each field is only ever deserialized once.
+
+        :param field: the name of the field
+        :param loads: the function to deserialize the field with
+        """
+        if field not in self.decoded:
+            self.decoded[field] = loads(self.getField(field))
+
+        return self.decoded[field]
@@ -1,10 +1,20 @@
+import copy
+import importlib
+import importlib.machinery
+import os
+import signal
+import sys
+import threading
 from importlib import import_module
 from types import CodeType, ModuleType
-from typing import TypeVar, Tuple, List, Final, Optional, Dict, Callable, TypedDict
+from typing import TypeVar, Tuple, List, Final, Optional, Dict, Callable, TypedDict, Union
 
+from autograder_platform.Executors.common import filterStdOut
 from autograder_platform.StudentSubmission.common import InvalidRunner, MissingFunctionDefinition
 from autograder_platform.StudentSubmissionImpl.Python import PythonSubmission
-from autograder_platform.StudentSubmissionImpl.Python.common import PythonTaskResult
+from autograder_platform.StudentSubmissionImpl.Python.BytecodeCache import BytecodeCache
+from autograder_platform.StudentSubmissionImpl.Python.OutputSink import OutputSink
+from autograder_platform.StudentSubmissionImpl.Python.common import PythonCallResult, PythonTaskResult
 from autograder_platform.Tasks.TaskRunner import TaskRunner
 from autograder_platform.Tasks.Task import Task
 from autograder_platform.TestingFramework.SingleFunctionMock import SingleFunctionMock
@@ -69,6 +79,57 @@ class PythonTaskLibrary:
 
         return module
 
+    @staticmethod
+    def getOverlayModules(packageOverlay: str) -> List[str]:
+        """
+        Gets the names of the top level modules and packages that an overlay provides.
+        """
+        modules: List[str] = []
+        suffixes = importlib.machinery.SOURCE_SUFFIXES + importlib.machinery.EXTENSION_SUFFIXES
+
+        for entry in os.listdir(packageOverlay):
+            # ie: '<name>.dist-info' or 'numpy.libs', which aren't importable
+            if os.path.isdir(os.path.join(packageOverlay, entry)):
+                if "." not in entry and entry != "__pycache__":
+                    modules.append(entry)
+                continue
+
+            for suffix in suffixes:
+                if entry.endswith(suffix):
+                    modules.append(entry[:-len(suffix)])
+                    break
+
+        return modules
+
+    @staticmethod
+    def addPackageOverlay(packageOverlay: str) -> None:
+        """
+        Adds the overlay to the front of the path, so it takes priority over anything installed in the interpreter,
+        as it would in a virtual environment.
+
+        Anything that the overlay provides that the autograder already imported (ie: that was preloaded in the zygote)
+        is removed from ``sys.modules`` first, so that the submission imports the overlay's version.
+        Extension modules aren't able to be loaded again, so those raise an error instead.
+
+        :raises ImportError: if a package that the overlay provides was already imported and includes extension modules
+        """
+        overlayModules = set(PythonTaskLibrary.getOverlayModules(packageOverlay))
+        loaded = [name for name in sys.modules if name.partition(".")[0] in overlayModules]
+
+        for name in loaded:
+            origin = getattr(getattr(sys.modules[name], "__spec__", None), "origin", None) or ""
+
+            if origin.endswith(tuple(importlib.machinery.EXTENSION_SUFFIXES)):
+                raise ImportError(f"'{name.partition('.')[0]}' was already imported by the autograder and it includes "
+                                  f"extension modules, so the version that was requested by the submission can't be "
+                                  f"loaded. Don't preload it in the zygote.")
+
+        for name in loaded:
+            del sys.modules[name]
+
+        sys.path.insert(0, packageOverlay)
+        importlib.invalidate_caches()
+
     @staticmethod
     def applyInjectedCode(module: ModuleType, codeToInject: List[CodeType]) -> None:
         for code in codeToInject:
@@ -111,6 +172,105 @@ class PythonTaskLibrary:
 
         return {"return_val": returnVal, "parameters": processedParameters}
 
+    @staticmethod
+    def callWithTimeout(function: Callable[[], object], timeout: Optional[float]) -> object:
+        """
+        Calls the function, raising a ``TimeoutError`` in it if it doesn't return within ``timeout`` seconds.
+
+        This relies on ``SIGALRM``, which is only able to be handled on the main thread of the main interpreter. On
+        platforms that don't support it, or anywhere else (ie: in a sub-interpreter), the call is only bounded by the
+        timeout of the entire execution.
+        """
+        if timeout is None or not hasattr(signal, "setitimer") \
+                or threading.current_thread() is not threading.main_thread():
+            return function()
+
+        def onTimeout(signum, frame):
+            raise TimeoutError(f"Call timed out after {timeout} seconds")
+
+        try:
+            previousHandler = signal.signal(signal.SIGALRM, onTimeout)
+        except ValueError:
+            # ie: a sub-interpreter, where even its main thread isn't allowed to handle signals
+            return function()
+
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+
+        try:
+            return function()
+        finally:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previousHandler)
+
+    @staticmethod
+    def runBatch(module: ModuleType, methodToRun: str, parameterSets: List[List[Parameter]],
+                 mocks: Dict[str, Optional[SingleFunctionMock]], timeout: Optional[float],
+                 prepareModule: Optional[Callable[[], ModuleType]]) -> List[PythonCallResult]:
+        """
+        Description
+        ---
+        Calls the method once for each parameter set and collects the results of each call.
+
+        Exceptions raised by a call are recorded in that call's results rather than ending the batch. This includes
+        ``SystemExit``, as that is what students normally call to 'exit', and ``KeyboardInterrupt``.
+
+        :param module: the module to run the first call in
+        :param methodToRun: the name of the method to call
+        :param parameterSets: the parameters for each call
+        :param mocks: the mocks that were applied to the module. These are reset after each call
+        :param timeout: the timeout for each call, or None if only the entire execution should be bounded
+        :param prepareModule: If provided, each call after the first is run in a fresh module from this.
+        This isolates the module level state of each call.
+        :returns: the results of each call, in the same order as ``parameterSets``
+        """
+        results: List[PythonCallResult] = []
+
+        for i, parameters in enumerate(parameterSets):
+            if prepareModule is not None and i != 0:
+                module = prepareModule()
+
+            # the sink has already filtered the output, so each call only needs to know where its lines start
+            outputSink: Optional[OutputSink] = sys.stdout if isinstance(sys.stdout, OutputSink) else None
+            outputStart = len(outputSink.lines) if outputSink is not None else \
+                len(sys.stdout.getvalue()) if hasattr(sys.stdout, "getvalue") else 0
+
+            returnVal: object = None
+            processedParameters: Optional[Tuple[object, ...]] = None
+            exception: Optional[BaseException] = None
+
+            try:
+                method = PythonTaskLibrary.getMethod(module, methodToRun)
+                processedParameters = tuple([parameter.get(module) for parameter in parameters])
+
+                returnVal = PythonTaskLibrary.callWithTimeout(
+                    lambda: method(*processedParameters), timeout)  # type: ignore
+            except (Exception, SystemExit, KeyboardInterrupt) as ex:
+                exception = ex
+
+            stdout: List[str]
+
+            if outputSink is not None:
+                stdout = outputSink.getOutput(outputStart)
+            elif hasattr(sys.stdout, "getvalue"):
+                stdout = filterStdOut(sys.stdout.getvalue()[outputStart:].splitlines())  # type: ignore
+            else:
+                stdout = []
+
+            resolvedMocks = PythonTaskLibrary.resolveMocks(mocks)
+
+            results.append({
+                "return_val": returnVal,
+                "parameters": processedParameters,
+                "stdout": stdout,
+                "exception": exception,
+                "mocks": {name: copy.copy(mock) for name, mock in resolvedMocks.items()},
+            })
+
+            for mock in resolvedMocks.values():
+                mock.reset()
+
+        return results
+
     @staticmethod
     def runMain(submission: CodeType) -> None:
         # Currently parameters are unsupported :(
@@ -157,12 +317,16 @@ class PythonRunnerBuilder:
 
     def __init__(self: Builder, submission: PythonSubmission):
         self.submission: Final[CodeType] = submission.getExecutableSubmission()
+        self.packageOverlay: Final[Optional[str]] = submission.getPackageOverlay()
         self.parameters: List[Parameter] = []
         self.mocks: Dict[str, Optional[SingleFunctionMock]] = {}
         self.injectedMethods: Dict[str, CodeType] = {}
         self.setupMethods: List[str] = []
         self.useModuleEntrypoint: bool = False
         self.functionEntrypoint: Optional[str] = None
+        self.parameterSets: List[List[Parameter]] = []
+        self.callTimeout: Optional[float] = None
+        self.isolateCalls: bool = False
 
     def addParameter(self: Builder, value: object = None, parameter: Optional[Parameter] = None) -> Builder:
         if parameter is None:
@@ -172,6 +336,50 @@ class PythonRunnerBuilder:
 
         return self
 
+    def addParameterSet(self: Builder, parameters: List[Union[Parameter, object]]) -> Builder:
+        """
+        Description
+        ---
+        Adds a set of parameters to call the entrypoint with. When parameter sets are added, the entrypoint is called
+        once per set in a single execution, and the return value of the execution is a list of
+        :ref:`PythonCallResult`, one for each set in the order that they were added.
+
+        :param parameters: The parameters for a single call. Values that aren't a :ref:`Parameter` are wrapped in one.
+        """
+        self.parameterSets.append([parameter if isinstance(parameter, Parameter) else Parameter(parameter)
+                                   for parameter in parameters])
+
+        return self
+
+    def setCallTimeout(self: Builder, timeout: float) -> Builder:
+        """
+        Description
+        ---
+        Sets the timeout for each call when running parameter sets. The environment's timeout still applies to the
+        entire batch.
+
+        :param timeout: the number of seconds that each call is allowed to run for
+        """
+        if timeout <= 0:
+            raise InvalidRunner(f"Call timeout must be greater than zero. Was {timeout}")
+
+        self.callTimeout = timeout
+
+        return self
+
+    def setIsolateCalls(self: Builder, isolateCalls: bool = True) -> Builder:
+        """
+        Description
+        ---
+        Sets if each call should be run in a freshly imported module when running parameter sets.
+        This prevents module level state from leaking between calls, but the import is repeated for each call.
+
+        :param isolateCalls: if calls should be isolated
+        """
+        self.isolateCalls = isolateCalls
+
+        return self
+
     def addMock(self: Builder, name: str, mock: SingleFunctionMock) -> Builder:
         if name in self.mocks:
             raise InvalidRunner(f"Mock '{name}' has already been added to the runner.")
@@ -205,7 +413,7 @@ class PythonRunnerBuilder:
 
         if src is not None:
             try:
-                code = compile(src, name, "exec")
+                code = BytecodeCache.compile(src, name)
             except SyntaxError as syntaxError:
                 raise InvalidRunner(
                     f"Syntax Error when compiling injected method!\nEnsure that you are using dill.getsource(..., lstrip=True,...)\n{syntaxError}")
@@ -230,6 +438,17 @@ class PythonRunnerBuilder:
 
         return self
 
+    def _prepareModule(self) -> ModuleType:
+        # This repeats the import, injection, mock, and setup tasks for isolated calls
+        module = PythonTaskLibrary.attemptToImport(self.submission)
+        PythonTaskLibrary.applyInjectedCode(module, list(self.injectedMethods.values()))
+        PythonTaskLibrary.applyMocks(module, self.mocks)
+
+        for method in self.setupMethods:
+            PythonTaskLibrary.runMethod(module, PythonTaskLibrary.getMethod(module, method), [])
+
+        return module
+
     def build(self) -> TaskRunner:
         if not self.functionEntrypoint and not self.useModuleEntrypoint:
             raise InvalidRunner(f"No entrypoint defined!")
@@ -242,8 +461,17 @@ class PythonRunnerBuilder:
             raise InvalidRunner(
                 f"Incompatible options! No parameters can be defined when using module entrypoint. Use a environment mock of the 'sys' module instead.")
 
+        if self.parameterSets and self.useModuleEntrypoint:
+            raise InvalidRunner(f"Incompatible options! Parameter sets can only be used with a function entrypoint.")
+
+        if self.parameterSets and self.parameters:
+            raise InvalidRunner(f"Incompatible options! Parameters and parameter sets cannot both be defined.")
+
         taskRunner = TaskRunner(PythonSubmission)
 
+        if self.packageOverlay is not None:
+            taskRunner.add(Task("package_overlay", PythonTaskLibrary.addPackageOverlay, [lambda: self.packageOverlay]))
+
         if self.useModuleEntrypoint:
             taskRunner.add(Task("main", PythonTaskLibrary.runMain, [lambda: self.submission]))
             taskRunner.add(Task("resolve_mocks", PythonTaskLibrary.resolveMocks, [lambda: self.mocks]))
@@ -264,6 +492,19 @@ class PythonRunnerBuilder:
                                 [lambda: taskRunner.getResult("import"), lambda: taskRunner.getResult(f"get_{method}"),
                                  lambda: []]))
 
+        if self.parameterSets:
+            taskRunner.add(Task("run_batch", PythonTaskLibrary.runBatch,
+                                [lambda: taskRunner.getResult("import"), lambda: self.functionEntrypoint,
+                                 lambda: self.parameterSets, lambda: self.mocks, lambda: self.callTimeout,
+                                 lambda: self._prepareModule if self.isolateCalls else None]))
+
+            taskRunner.add(Task("resolve_mocks", PythonTaskLibrary.resolveMocks, [lambda: self.mocks]))
+            taskRunner.add(Task("results", PythonTaskLibrary.aggregateResults,
+                                [lambda: {"return_val": taskRunner.getResult("run_batch"), "parameters": None},
+                                 lambda: taskRunner.getResult("resolve_mocks")]), isOverallResultTask=True)
+
+            return taskRunner
+
         taskRunner.add(Task(f"get_{self.functionEntrypoint}", PythonTaskLibrary.getMethod,
                             [lambda: taskRunner.getResult("import"), lambda: self.functionEntrypoint]))
         taskRunner.add(Task(f"run_{self.functionEntrypoint}", PythonTaskLibrary.runMethod,
@@ -0,0 +1,187 @@
+"""
+This module provides the serializers that are used to move data to and from the student's submission.
+
+Every serialized object is prefixed with a single byte that records which method was used to serialize it,
+so the other side is always able to deserialize it regardless of which serializer it was configured with.
+
+These serializers are only used for the data that goes through the channels (stdin and the results). The submission
+process itself is sent to a spawned child with multiprocessing's normal reducer, and only the fields that need dill
+(ie: the runner's lambdas) are serialized with dill. See :ref:`StudentSubmissionProcess.DILL_FIELDS`.
+multiprocessing's reducer is not replaced with dill for the entire program.
+"""
+import abc
+import io
+import pickle
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+import dill
+
+from autograder_platform.StudentSubmissionImpl.Python.common import SerializationMethod
+
+BytesLike = Union[bytes, bytearray, memoryview]
+
+
+class AbstractSerializer(abc.ABC):
+    def __init__(self):
+        self.methodCounts: Dict[SerializationMethod, int] = {method: 0 for method in SerializationMethod}
+
+    @abc.abstractmethod
+    def doDumps(self, obj: object,
+                outOfBand: Optional[List[pickle.PickleBuffer]]) -> Tuple[SerializationMethod, bytes]:
+        raise NotImplementedError()
+
+    def dumps(self, obj: object, outOfBand: Optional[List[pickle.PickleBuffer]] = None) -> bytes:
+        """
+        Serializes the object and records which method was used.
+
+        :param obj: the object to serialize
+        :param outOfBand: If provided, large buffers are appended to this list rather than serialized in-band.
+        These buffers must be passed to ``loads`` in the same order. Serializers that don't support out-of-band buffers
+        ignore this.
+        :returns: the serialized object, prefixed with the method that was used
+        """
+        method, data = self.doDumps(obj, outOfBand)
+
+        self.methodCounts[method] += 1
+
+        return bytes((method.value,)) + data
+
+    @staticmethod
+    def getMethod(data: BytesLike) -> SerializationMethod:
+        return SerializationMethod(data[0])
+
+    @staticmethod
+    def loads(data: BytesLike, buffers: Optional[List[memoryview]] = None) -> object:
+        """
+        Deserializes an object that was serialized by any serializer.
+
+        :param data: the serialized object
+        :param buffers: the out-of-band buffers that were collected when the object was serialized
+        """
+        method = AbstractSerializer.getMethod(data)
+        body = memoryview(data)[1:]
+
+        if method == SerializationMethod.PICKLE and buffers is None:
+            return pickle.loads(body)
+
+        if method == SerializationMethod.PICKLE:
+            return _OutOfBandUnpickler(io.BytesIO(body), buffers=buffers).load()
+
+        return dill.loads(body)
+
+    def getMethodCounts(self) -> Dict[SerializationMethod, int]:
+        return self.methodCounts
+
+
+class DillSerializer(AbstractSerializer):
+    """
+    This serializer always uses dill. This is slower, but matches how the autograder used to serialize everything.
+    """
+    def doDumps(self, obj: object,
+                outOfBand: Optional[List[pickle.PickleBuffer]]) -> Tuple[SerializationMethod, bytes]:
+        return SerializationMethod.DILL, dill.dumps(obj, dill.HIGHEST_PROTOCOL)
+
+
+class _OutOfBandPickler(pickle.Pickler):
+    """
+    ``bytearray`` is always pickled in-band by the stdlib, even with protocol 5, and the C pickler handles it before
+    ``reducer_override`` is called. ``persistent_id`` is checked before that, so large ones are replaced with a
+    ``PickleBuffer`` as their persistent id, which pickle then hands to the buffer callback like any other buffer.
+    """
+    def __init__(self, file, threshold: int, **kwargs):
+        super().__init__(file, **kwargs)
+        self.threshold: int = threshold
+
+    def persistent_id(self, obj):
+        if type(obj) is bytearray and len(obj) >= self.threshold:
+            return pickle.PickleBuffer(obj)
+
+        return None
+
+
+class _OutOfBandUnpickler(pickle.Unpickler):
+    def persistent_load(self, pid):
+        # The only persistent ids are the bytearrays from the _OutOfBandPickler
+        return bytearray(pid)
+
+
+class FastPathSerializer(AbstractSerializer):
+    """
+    This serializer attempts to use the C accelerated pickle first, and only falls back to dill if pickle can't handle
+    the object. Most of what crosses the process boundary is plain data (lists of strings, ints, etc.), which pickle is
+    much faster at.
+
+    Objects that only dill can handle (lambdas, functions and classes defined in the student's submission, etc.)
+    are still serialized, just through the slower path.
+
+    When out-of-band buffers are requested, contiguous buffers that are at least ``OUT_OF_BAND_THRESHOLD`` bytes
+    (ie: large bytearrays or numpy arrays) are kept out of the pickle so that they can be transferred without copying.
+    Objects that support out-of-band pickling (ie: numpy arrays) are handled by the plain ``pickle.dumps``.
+    ``bytearray`` needs the ``_OutOfBandPickler``, but its ``persistent_id`` slows down every object, so it is only
+    used if the plain pickle looks like it contains a large bytearray.
+    """
+    PICKLE_PROTOCOL = 5
+    OUT_OF_BAND_THRESHOLD = 2 ** 16
+    BYTEARRAY_CANDIDATE_RATIO = 64
+    """If more than 1 in this many bytes look like a ``BYTEARRAY8`` opcode, then they aren't all checked"""
+
+    def _mightContainLargeBytearray(self, data: bytes) -> bool:
+        # BYTEARRAY8 is followed by the length as an 8 byte unsigned int. The opcode is just a byte, so other data is
+        # able to look like it. A false positive only costs pickling the object again.
+        if len(data) < self.OUT_OF_BAND_THRESHOLD:
+            return False
+
+        if data.count(pickle.BYTEARRAY8) > len(data) // self.BYTEARRAY_CANDIDATE_RATIO:
+            return True
+
+        index = data.find(pickle.BYTEARRAY8)
+
+        while index != -1:
+            if self.OUT_OF_BAND_THRESHOLD <= int.from_bytes(data[index + 1:index + 9], "little") <= len(data):
+                return True
+
+            index = data.find(pickle.BYTEARRAY8, index + 1)
+
+        return False
+
+    def _buildBufferCallback(self, buffers: List[pickle.PickleBuffer]) -> Callable[[pickle.PickleBuffer], bool]:
+        def bufferCallback(buffer: pickle.PickleBuffer) -> bool:
+            try:
+                size = buffer.raw().nbytes
+            # non-contiguous buffers can't be written as-is, so they have to stay in-band
+            except BufferError:
+                return True
+
+            if size < self.OUT_OF_BAND_THRESHOLD:
+                return True
+
+            buffers.append(buffer)
+            return False
+
+        return bufferCallback
+
+    def doDumps(self, obj: object,
+                outOfBand: Optional[List[pickle.PickleBuffer]]) -> Tuple[SerializationMethod, bytes]:
+        buffers: List[pickle.PickleBuffer] = []
+
+        try:
+            if outOfBand is None:
+                return SerializationMethod.PICKLE, pickle.dumps(obj, protocol=self.PICKLE_PROTOCOL)
+
+            data = pickle.dumps(obj, protocol=self.PICKLE_PROTOCOL, buffer_callback=self._buildBufferCallback(buffers))
+
+            if self._mightContainLargeBytearray(data):
+                buffers = []
+
+                file = io.BytesIO()
+                _OutOfBandPickler(file, self.OUT_OF_BAND_THRESHOLD, protocol=self.PICKLE_PROTOCOL,
+                                  buffer_callback=self._buildBufferCallback(buffers)).dump(obj)
+                data = file.getvalue()
+        # pickle can raise just about anything when it fails to locate or reduce an object
+        except Exception:
+            return SerializationMethod.DILL, dill.dumps(obj, dill.HIGHEST_PROTOCOL)
+
+        # buffers are only kept if pickle succeeded, otherwise dill has serialized them in-band
+        outOfBand.extend(buffers)
+
+        return SerializationMethod.PICKLE, data
@@ -0,0 +1,248 @@
+"""
+This module provides the channel that is used to move data between the parent and the student's submission.
+
+The channel is backed by a small shared memory segment. If the data fits in the segment, then it is written inline.
+Otherwise, the data is spilled to a temp file and only the path to that file is written to the segment.
+This means that the shared memory that is used scales with the number of concurrent executions,
+and the temp files scale with the actual size of the output rather than the worst case.
+
+Segments and spill files are named with a recognizable prefix, the PID of the process that owns them, and the namespace
+that the PID belongs to, so that any that are leaked when the owner is killed are able to be found and reclaimed.
+See :ref:`SharedMemoryJanitor`.
+
+Each channel only ever spills to one file, which is named after its segment. So the owner removes exactly that file,
+rather than whatever path is in the segment (which the child is able to write anything to), and it is able to remove it
+even if the child was killed after the file was created but before the header was written.
+"""
+import hashlib
+import os
+import secrets
+import struct
+import tempfile
+from multiprocessing import shared_memory
+from typing import Final, Optional, Tuple, Type, TypeVar
+
+Channel = TypeVar("Channel", bound="SharedMemoryChannel")
+
+
+def _buildNamespace() -> str:
+    # a PID only identifies a process in the PID namespace that it is in, and only until the machine is rebooted
+    try:
+        with open("/proc/sys/kernel/random/boot_id", "r") as r:
+            bootId = r.read().strip()
+
+        pidNamespace = os.readlink("/proc/self/ns/pid")
+    except OSError:
+        # ie: macOS, which doesn't have PID namespaces
+        return "0" * 6
+
+    return hashlib.sha256(f"{bootId}:{pidNamespace}".encode()).hexdigest()[:6]
+
+
+class SharedMemoryChannel:
+    """
+    Description
+    ===========
+
+    The segment is laid out as a fixed size header followed by the body.
+    The header is the kind of data that was written and the number of bytes in the body.
+
+    - ``EMPTY``: nothing has been written. A newly created segment is zeroed, so this is the default state.
+    - ``INLINE``: the body is the data
+    - ``SPILLED``: the body is the path to the file that contains the data
+
+    The header is always written last, so a process that is killed part way through a write is read as ``EMPTY``.
+    """
+    HEADER: Final[struct.Struct] = struct.Struct("<BQ")
+
+    EMPTY: Final[int] = 0
+    INLINE: Final[int] = 1
+    SPILLED: Final[int] = 2
+
+    SEGMENT_PREFIX: Final[str] = "agshm_"
+    """
+    The prefix for segment names. This is intentionally short, as some platforms limit segment names to 31 characters.
+    """
+    SPILL_PREFIX: Final[str] = "autograder_spill_"
+    NAMESPACE: Final[str] = _buildNamespace()
+    """
+    Identifies the PID namespace and boot that owners' PIDs belong to. Names from a different namespace (ie: another
+    container that shares /dev/shm or /tmp) are never reclaimed, as their PIDs can't be checked from this one.
+    """
+
+    def __init__(self, sharedMemory: shared_memory.SharedMemory):
+        self.sharedMemory: shared_memory.SharedMemory = sharedMemory
+
+    @classmethod
+    def create(cls: Type[Channel], size: int) -> Channel:
+        """
+        Creates a new channel. This should only be called by the parent, which is responsible for unlinking it.
+
+        :param size: The size of the shared memory segment, including the header.
+        """
+        if size <= cls.HEADER.size:
+            raise AttributeError(f"INVALID STATE: Channel size must be larger than {cls.HEADER.size} bytes. Was {size}")
+
+        return cls(shared_memory.SharedMemory(name=cls.buildName(), create=True, size=size))
+
+    @classmethod
+    def attach(cls: Type[Channel], name: str) -> Channel:
+        """
+        Attaches to an existing channel. This is called by the child.
+
+        :param name: The name of the shared memory segment that backs the channel
+        """
+        return cls(shared_memory.SharedMemory(name))
+
+    @classmethod
+    def buildTag(cls, owner: int) -> str:
+        """
+        Builds the tag that segment and file names that are owned by ``owner`` start with (after their prefix).
+
+        :returns: the tag, in the form ``<owner>_<namespace>``
+        """
+        return f"{owner}_{cls.NAMESPACE}"
+
+    @classmethod
+    def buildName(cls, owner: Optional[int] = None) -> str:
+        """
+        Builds a unique name for a segment that is owned by ``owner``.
+
+        :param owner: the PID of the owner. Defaults to this process.
+        :returns: the name, in the form ``<prefix><owner>_<namespace>_<random>``
+        """
+        return f"{cls.SEGMENT_PREFIX}{cls.buildTag(owner if owner is not None else os.getpid())}_{secrets.token_hex(4)}"
+
+    @staticmethod
+    def getTag(name: str, prefix: str) -> Optional[Tuple[int, str]]:
+        """
+        Gets the PID of the owner and its namespace from a segment or file name that was tagged with ``prefix``.
+
+        :param name: the segment or file name
+        :param prefix: the prefix that the name was tagged with
+        :returns: the PID and the namespace, or None if the name wasn't created by the autograder
+        """
+        if not name.startswith(prefix):
+            return None
+
+        parts = name[len(prefix):].split("_", 2)
+
+        if len(parts) < 2 or not parts[0].isdigit():
+            return None
+
+        return int(parts[0]), parts[1]
+
+    @classmethod
+    def getOwner(cls, name: str, prefix: str) -> Optional[int]:
+        """
+        Gets the PID of the owner from a segment or file name that was tagged with ``prefix``.
+
+        :returns: the PID, or None if the name wasn't created by the autograder
+        """
+        tag = cls.getTag(name, prefix)
+
+        return tag[0] if tag is not None else None
+
+    @property
+    def name(self) -> str:
+        return self.sharedMemory.name
+
+    @property
+    def owner(self) -> int:
+        """
+        The PID of the process that created this channel. The child writes its spill files on behalf of the owner,
+        so they are only reclaimed once the owner is dead, rather than as soon as the child exits.
+        """
+        owner = self.getOwner(self.name.lstrip("/"), self.SEGMENT_PREFIX)
+
+        return owner if owner is not None else os.getpid()
+
+    @property
+    def spillPath(self) -> str:
+        """The path that this channel spills to, in the form ``<temp dir>/<prefix><owner>_<namespace>_<segment name>``"""
+        return os.path.join(tempfile.gettempdir(),
+                            f"{self.SPILL_PREFIX}{self.buildTag(self.owner)}_{self.name.lstrip('/')}")
+
+    @property
+    def capacity(self) -> int:
+        """The number of bytes that can be written inline"""
+        return self.sharedMemory.size - self.HEADER.size
+
+    def _readHeader(self):
+        return self.HEADER.unpack_from(self.sharedMemory.buf, 0)
+
+    def _readBody(self, length: int) -> bytes:
+        return bytes(self.sharedMemory.buf[self.HEADER.size:self.HEADER.size + length])
+
+    def _writeBody(self, kind: int, body: bytes) -> None:
+        self.sharedMemory.buf[self.HEADER.size:self.HEADER.size + len(body)] = body
+        self.HEADER.pack_into(self.sharedMemory.buf, 0, kind, len(body))
+
+    def _spill(self, data: bytes) -> None:
+        path = self.spillPath
+        encodedPath = path.encode()
+
+        if len(encodedPath) > self.capacity:  # pragma: no cover
+            raise EnvironmentError(f"Spill path '{path}' does not fit in channel '{self.name}'")  # pragma: no cover
+
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_NOFOLLOW", 0) |
+                     getattr(os, "O_BINARY", 0), 0o600)
+
+        with os.fdopen(fd, 'wb') as w:
+            w.write(data)
+
+        self._writeBody(self.SPILLED, encodedPath)
+
+    def write(self, data: bytes) -> None:
+        """
+        Writes the data to the channel. If the data doesn't fit in the segment, then it is spilled to a temp file.
+
+        :param data: the data to write
+        """
+        if len(data) > self.capacity:
+            self._spill(data)
+            return
+
+        self._writeBody(self.INLINE, data)
+
+    def wasSpilled(self) -> bool:
+        return self._readHeader()[0] == self.SPILLED
+
+    def read(self) -> Optional[bytes]:
+        """
+        Reads the data from the channel.
+
+        :returns: The data, or None if nothing was written to the channel
+        """
+        kind, length = self._readHeader()
+
+        if kind == self.EMPTY:
+            return None
+
+        if kind == self.INLINE:
+            return self._readBody(length)
+
+        with open(self.spillPath, 'rb') as rb:
+            return rb.read()
+
+    def discard(self) -> None:
+        """
+        Removes any spilled data and resets the channel to ``EMPTY``.
+        This should be called by the owner of the channel once the data is no longer needed.
+
+        The spill file is removed even if the header says nothing was spilled, as the child might have been killed
+        part way through spilling.
+        """
+        try:
+            os.remove(self.spillPath)
+        # ie: nothing was spilled
+        except OSError:
+            pass
+
+        self.HEADER.pack_into(self.sharedMemory.buf, 0, self.EMPTY, 0)
+
+    def close(self) -> None:
+        self.sharedMemory.close()
+
+    def unlink(self) -> None:
+        self.sharedMemory.unlink()
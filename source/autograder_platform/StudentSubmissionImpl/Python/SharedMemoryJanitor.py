@@ -0,0 +1,173 @@
+"""
+This module provides the janitor that reclaims shared memory segments and temp files that were leaked.
+
+Segments are normally returned to the :ref:`SharedMemoryPool` and unlinked when the autograder exits, but if the
+autograder is SIGKILLed (ie: the container runs out of memory or the run times out), that never happens.
+On a long-lived machine, /dev/shm eventually fills up, and later runs fail to allocate their channels.
+
+Everything that the autograder allocates is tagged with the PID of its owner and the PID namespace (and boot) that the
+PID belongs to (see :ref:`SharedMemoryChannel`), so the janitor is able to safely reclaim anything whose owner is no
+longer running. Anything that was tagged in a different namespace (ie: by another container that shares /dev/shm) is
+left alone, as a PID from another namespace might belong to a live process that isn't visible from this one.
+
+This is only supported on POSIX platforms. On windows, segments are freed by the OS once the last handle is closed.
+"""
+import os
+import tempfile
+import threading
+from typing import Final, List, Optional, Tuple
+
+from autograder_platform.config.Config import AutograderConfiguration
+from autograder_platform.StudentSubmissionImpl.Python.OutOfBandBuffers import OutOfBandWriter
+from autograder_platform.StudentSubmissionImpl.Python.SharedMemoryChannel import SharedMemoryChannel
+
+
+class SharedMemoryJanitor:
+    """
+    This class manages the janitor for the entire program.
+    Similar to the configuration provider, there is only ever one janitor running at a time.
+    """
+    SHARED_MEMORY_DIRECTORY: Final[str] = "/dev/shm"
+    DEFAULT_INTERVAL: Final[float] = 300.0
+
+    bytesReclaimed: int = 0
+    """The total number of bytes that have been reclaimed by this process"""
+
+    _thread: Optional[threading.Thread] = None
+    _stopEvent: Optional[threading.Event] = None
+
+    @staticmethod
+    def isSupported() -> bool:
+        return os.name == "posix"
+
+    @staticmethod
+    def isOwnerAlive(owner: int) -> bool:
+        try:
+            # signal 0 only checks that the process exists
+            os.kill(owner, 0)
+        except ProcessLookupError:
+            return False
+        # the process exists, but is owned by another user
+        except PermissionError:
+            return True
+
+        return True
+
+    @classmethod
+    def getLocations(cls) -> List[Tuple[str, List[str]]]:
+        """
+        Gets the directories that the janitor sweeps, along with the prefixes that the autograder tags names with in
+        each directory.
+        """
+        return [
+            (cls.SHARED_MEMORY_DIRECTORY, [SharedMemoryChannel.SEGMENT_PREFIX]),
+            (tempfile.gettempdir(), [SharedMemoryChannel.SPILL_PREFIX, OutOfBandWriter.FILE_PREFIX]),
+        ]
+
+    @classmethod
+    def _sweepDirectory(cls, directory: str, prefixes: List[str]) -> int:
+        reclaimed = 0
+
+        try:
+            entries = list(os.scandir(directory))
+        except OSError:
+            return 0
+
+        for entry in entries:
+            for prefix in prefixes:
+                tag = SharedMemoryChannel.getTag(entry.name, prefix)
+
+                if tag is None or tag[1] != SharedMemoryChannel.NAMESPACE or cls.isOwnerAlive(tag[0]):
+                    continue
+
+                try:
+                    size = entry.stat().st_size
+                    # on linux, removing the file from /dev/shm is the same as unlinking the segment
+                    os.remove(entry.path)
+                # it's possible that something else reclaimed it first
+                except OSError:
+                    break
+
+                reclaimed += size
+                break
+
+        return reclaimed
+
+    @classmethod
+    def sweep(cls) -> int:
+        """
+        Description
+        ---
+        Reclaims every segment and temp file that was created by the autograder and whose owner is no longer running.
+
+        :returns: the number of bytes that were reclaimed
+        """
+        if not cls.isSupported():
+            return 0
+
+        reclaimed = sum(cls._sweepDirectory(directory, prefixes) for directory, prefixes in cls.getLocations())
+
+        cls.bytesReclaimed += reclaimed
+
+        return reclaimed
+
+    @classmethod
+    def isRunning(cls) -> bool:
+        return cls._thread is not None and cls._thread.is_alive()
+
+    @classmethod
+    def _run(cls, interval: float, stopEvent: threading.Event) -> None:
+        while not stopEvent.wait(interval):
+            cls.sweep()
+
+    @classmethod
+    def start(cls, interval: float = DEFAULT_INTERVAL) -> int:
+        """
+        Description
+        ---
+        Sweeps once, then starts sweeping in the background every ``interval`` seconds.
+
+        If the janitor is already running, then this only sweeps.
+
+        :param interval: the number of seconds between each sweep
+        :returns: the number of bytes that were reclaimed by the initial sweep
+        """
+        if interval <= 0:
+            raise AttributeError(f"INVALID STATE: Janitor interval must be greater than zero. Was {interval}")
+
+        reclaimed = cls.sweep()
+
+        if not cls.isSupported() or cls.isRunning():
+            return reclaimed
+
+        cls._stopEvent = threading.Event()
+        cls._thread = threading.Thread(target=cls._run, args=(interval, cls._stopEvent),
+                                       name="Shared Memory Janitor", daemon=True)
+        cls._thread.start()
+
+        return reclaimed
+
+    @classmethod
+    def stop(cls) -> None:
+        if cls._thread is None or cls._stopEvent is None:
+            return
+
+        cls._stopEvent.set()
+        cls._thread.join()
+
+        cls._thread = None
+        cls._stopEvent = None
+
+    @classmethod
+    def startupHook(cls, _: AutograderConfiguration) -> Optional[str]:
+        """
+        Reclaims any shared memory that was leaked by previous runs that were killed,
+        then keeps reclaiming it in the background for the rest of the run.
+        This is registered as a startup hook by the python implementation. See :ref:`SubmissionProcessFactory`.
+        """
+        reclaimed = cls.start()
+
+        if not reclaimed:
+            return None
+
+        return f"Reclaimed {reclaimed} bytes of shared memory leaked by previous runs"
@@ -0,0 +1,188 @@
+"""
+This module provides the pool that shared memory channels are borrowed from.
+
+Creating, zeroing, and then unlinking two segments for every execution is surprisingly expensive when a lot of
+executions are happening at once, and it fragments /dev/shm. Instead, segments are kept around after they are used
+and handed out again to the next execution that needs a segment of the same size.
+
+Segments are bucketed by size (rounded up to the next power of two), so the same segment is able to be used for
+executions with slightly different buffer sizes. Between uses, only the header of the channel is reset.
+"""
+import atexit
+import os
+import threading
+import time
+from typing import Dict, Final, List, Optional, Tuple
+
+from autograder_platform.StudentSubmissionImpl.Python.SharedMemoryChannel import SharedMemoryChannel
+
+
+class SharedMemoryPool:
+    """
+    This class manages the idle segments for the entire program.
+    Similar to the configuration provider, there is only ever one pool.
+
+    At most ``maxIdle`` segments are kept idle at once, and any segment that has been idle for longer than
+    ``idleTimeout`` seconds is unlinked the next time that the pool is used.
+    """
+    DEFAULT_MAX_IDLE: Final[int] = 16
+    DEFAULT_IDLE_TIMEOUT: Final[float] = 60.0
+
+    maxIdle: int = DEFAULT_MAX_IDLE
+    idleTimeout: float = DEFAULT_IDLE_TIMEOUT
+
+    idle: Dict[int, List[Tuple[float, SharedMemoryChannel]]] = {}
+    """The idle channels for each bucket, along with when they were released"""
+
+    created: int = 0
+    reused: int = 0
+
+    _lock: threading.Lock = threading.Lock()
+    _exitHandlerRegistered: bool = False
+
+    @staticmethod
+    def getBucketSize(size: int) -> int:
+        """
+        Gets the size of the segment that will actually be allocated for the requested size.
+
+        :param size: the requested size of the segment
+        :returns: the next power of two that is at least ``size``
+        """
+        return 1 << max(size - 1, 0).bit_length()
+
+    @classmethod
+    def configure(cls, maxIdle: Optional[int] = None, idleTimeout: Optional[float] = None) -> None:
+        if maxIdle is not None:
+            if maxIdle < 0:
+                raise AttributeError(f"INVALID STATE: Max idle segments must be non-negative. Was {maxIdle}")
+
+            cls.maxIdle = maxIdle
+
+        if idleTimeout is not None:
+            if idleTimeout < 0:
+                raise AttributeError(f"INVALID STATE: Idle timeout must be non-negative. Was {idleTimeout}")
+
+            cls.idleTimeout = idleTimeout
+
+    @classmethod
+    def getIdleCount(cls) -> int:
+        with cls._lock:
+            return sum(len(channels) for channels in cls.idle.values())
+
+    @staticmethod
+    def _destroy(channel: SharedMemoryChannel) -> None:
+        channel.discard()
+        channel.close()
+
+        try:
+            channel.unlink()
+        # the segment may have already been reclaimed by something else
+        except FileNotFoundError:  # pragma: no cover
+            pass
+
+    @classmethod
+    def _reclaimExpired(cls, now: float) -> int:
+        # the lock must already be held by the caller
+        reclaimed = 0
+
+        for bucket in list(cls.idle.keys()):
+            keep: List[Tuple[float, SharedMemoryChannel]] = []
+
+            for releasedAt, channel in cls.idle[bucket]:
+                if now - releasedAt < cls.idleTimeout:
+                    keep.append((releasedAt, channel))
+                    continue
+
+                cls._destroy(channel)
+                reclaimed += 1
+
+            if keep:
+                cls.idle[bucket] = keep
+            else:
+                del cls.idle[bucket]
+
+        return reclaimed
+
+    @classmethod
+    def reclaimIdle(cls) -> int:
+        """
+        Unlinks all the segments that have been idle for longer than ``idleTimeout``.
+
+        :returns: the number of segments that were reclaimed
+        """
+        with cls._lock:
+            return cls._reclaimExpired(time.monotonic())
+
+    @classmethod
+    def acquire(cls, size: int) -> SharedMemoryChannel:
+        """
+        Description
+        ---
+        Borrows a channel that is at least ``size`` bytes. If there are no idle channels in that bucket, then a new one
+        is created. The channel must be given back with ``release`` once it is no longer needed.
+
+        :param size: The size of the shared memory segment, including the header.
+        :returns: an empty channel
+        """
+        bucket = cls.getBucketSize(size)
+
+        with cls._lock:
+            cls._reclaimExpired(time.monotonic())
+
+            if cls.idle.get(bucket):
+                _, channel = cls.idle[bucket].pop()
+                cls.reused += 1
+                return channel
+
+            if not cls._exitHandlerRegistered:
+                atexit.register(cls.clear)
+                cls._exitHandlerRegistered = True
+
+            cls.created += 1
+
+        return SharedMemoryChannel.create(bucket)
+
+    @classmethod
+    def release(cls, channel: SharedMemoryChannel) -> None:
+        """
+        Description
+        ---
+        Gives a channel back to the pool. Any data that was spilled is removed and the header is reset, so the next
+        borrower sees an empty channel. If the pool is full, then the channel is unlinked instead.
+
+        :param channel: the channel that was returned by ``acquire``
+        """
+        channel.discard()
+
+        with cls._lock:
+            now = time.monotonic()
+            cls._reclaimExpired(now)
+
+            if sum(len(channels) for channels in cls.idle.values()) >= cls.maxIdle:
+                cls._destroy(channel)
+                return
+
+            cls.idle.setdefault(channel.sharedMemory.size, []).append((now, channel))
+
+    @classmethod
+    def _resetAfterFork(cls) -> None:
+        # a forked child inherits the parent's idle segments, which are still owned (and handed out) by the parent.
+        # so the child forgets about them without unlinking them
+        cls.idle = {}
+        cls._lock = threading.Lock()
+
+    @classmethod
+    def clear(cls) -> None:
+        """
+        Unlinks every idle segment. This is called automatically when the program exits.
+        """
+        with cls._lock:
+            for channels in cls.idle.values():
+                for _, channel in channels:
+                    cls._destroy(channel)
+
+            cls.idle = {}
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=SharedMemoryPool._resetAfterFork)
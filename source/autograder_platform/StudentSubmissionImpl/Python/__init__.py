@@ -2,6 +2,8 @@ from autograder_platform.StudentSubmission.SubmissionProcessFactory import Submi
 from autograder_platform.StudentSubmissionImpl.Python.PythonEnvironment import PythonEnvironment, configMapper
 
 from autograder_platform.StudentSubmissionImpl.Python.PythonSubmission import PythonSubmission
-from autograder_platform.StudentSubmissionImpl.Python.PythonSubmissionProcess import RunnableStudentSubmission
+from autograder_platform.StudentSubmissionImpl.Python.PythonSpawnedProcess import SpawnedSubmissionProcess
+from autograder_platform.StudentSubmissionImpl.Python.SharedMemoryJanitor import SharedMemoryJanitor
 
-SubmissionProcessFactory.register(PythonSubmission, RunnableStudentSubmission, PythonEnvironment, configMapper)
+SubmissionProcessFactory.register(PythonSubmission, SpawnedSubmissionProcess, PythonEnvironment, configMapper)
+SubmissionProcessFactory.registerStartupHook(SharedMemoryJanitor.startupHook)
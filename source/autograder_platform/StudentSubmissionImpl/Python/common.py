@@ -1,5 +1,5 @@
 from enum import Enum
-from typing import Iterable, TypedDict, Tuple, Dict, Optional
+from typing import Iterable, List, TypedDict, Tuple, Dict, Optional
 
 from autograder_platform.TestingFramework.SingleFunctionMock import SingleFunctionMock
 
@@ -9,11 +9,25 @@ class FileTypeMap(Enum):
     PYTHON_FILES = 2
     REQUIREMENTS = 3
 
+class SerializationMethod(Enum):
+    PICKLE = 1
+    DILL = 2
+
 class PythonTaskResult(TypedDict):
     return_val: object
     parameters: Optional[Tuple[object, ...]]
     mocks: Dict[str, SingleFunctionMock]
 
+class PythonCallResult(TypedDict):
+    """The results of a single call when running a batch of parameter sets"""
+    return_val: object
+    parameters: Optional[Tuple[object, ...]]
+    stdout: List[str]
+    """The filtered output that was printed during this call only"""
+    exception: Optional[BaseException]
+    mocks: Dict[str, SingleFunctionMock]
+    """The state of the mocks after this call. The mocks are reset between calls"""
+
 class NoPyFilesError(Exception):
     def __init__(self) -> None:
         super().__init__(
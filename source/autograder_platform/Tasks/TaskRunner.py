@@ -24,6 +24,27 @@ class TaskRunner:
         if isOverallResultTask:
             self.overallResultTask = task.getName()
 
+    def hasTask(self, taskName: str) -> bool:
+        return taskName in self.tasks
+
+    def getTask(self, taskName: str) -> Task:
+        if taskName not in self.tasks:
+            raise TaskDoesNotExist(taskName)
+
+        return self.tasks[taskName]
+
+    def replace(self, task: Task):
+        """
+        Replaces an existing task with the same name, keeping its place in the run order.
+
+        :param task: the task to use instead
+        :raises TaskDoesNotExist: if there isn't a task with the same name
+        """
+        if task.getName() not in self.tasks:
+            raise TaskDoesNotExist(task.getName())
+
+        self.tasks[task.getName()] = task
+
     def getResult(self, taskName: str) -> object:
         if taskName not in self.tasks:
             raise TaskDoesNotExist(taskName)
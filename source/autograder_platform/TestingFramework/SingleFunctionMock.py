@@ -26,6 +26,13 @@ class SingleFunctionMock:
     def setSpyFunction(self, initialFunctionName: Callable):
         self.spyFunction = initialFunctionName
 
+    def reset(self):
+        """
+        Resets the recorded calls. The side effects start from the beginning again.
+        """
+        self.calledTimes = 0
+        self.calledWith = []
+
 
     def __call__(self, *args, **kwargs):
         self.calledTimes += 1
@@ -8,6 +8,7 @@ from unittest import TestSuite
 import autograder_platform
 from autograder_platform.config.Config import AutograderConfigurationBuilder, AutograderConfigurationProvider, \
     AutograderConfiguration
+from autograder_platform.StudentSubmission.SubmissionProcessFactory import SubmissionProcessFactory
 
 class AutograderCLITool(abc.ABC):
 
@@ -80,6 +81,14 @@ class AutograderCLITool(abc.ABC):
 
         AutograderConfigurationProvider.set(self.config)
 
+    def run_startup_hooks(self):  # pragma: no cover
+        """
+        Runs the startup hooks that the submission implementations registered (ie: reclaiming leaked shared memory).
+        This must be called after the config has been loaded.
+        """
+        for message in SubmissionProcessFactory.runStartupHooks(self.config):
+            self.print_info_message(message)
+
     def discover_tests(self):  # pragma: no cover
         self.tests = unittest.loader.defaultTestLoader.discover(self.config.config.test_directory)
 
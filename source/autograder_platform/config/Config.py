@@ -1,6 +1,8 @@
 import importlib
 import os
-from typing import Dict, Generic, List, Optional as OptionalType, TypeVar, Any
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Generic, Iterator, List, Optional as OptionalType, TypeVar, Any
 from dataclasses import dataclass
 
 from schema import And, Optional, Or, Regex, Schema, SchemaError
@@ -55,7 +57,34 @@ class PythonConfiguration:
     """
     buffer_size: int
     """
-    The size of the output buffer when the autograder runs
+    The size of the shared memory buffers used to pass data to and from the student's submission.
+    Data that is larger than this is spilled to a temp file, so this should be sized for the common case
+    """
+    use_zygote: bool
+    """
+    If submission processes should be forked from a pre-warmed zygote process rather than started from scratch.
+    This only helps on platforms where new processes are spawned by default (ie: macOS). It is ignored where processes
+    are forked by default (ie: linux), as that is faster, and on platforms that don't support it (ie: Windows)
+    """
+    preload_modules: List[str]
+    """
+    The modules that should be imported in the zygote before any submissions are forked from it.
+    IE: ``numpy`` or ``matplotlib``. Only used when ``use_zygote`` is set
+    """
+    package_snapshot: OptionalType[str]
+    """
+    The path (relative to the autograder root) of the package index snapshot that student requirements are checked
+    against. The snapshot is generated when the autograder is built. If this is not set, then no snapshot is used
+    """
+    snapshot_packages: List[str]
+    """
+    The packages that should be put in the package snapshot, along with the ``extra_packages``.
+    IE: the packages that students are expected to require
+    """
+    offline_package_lookup: bool
+    """
+    If the package index should never be contacted while grading.
+    Packages that aren't installed and aren't in the snapshot are reported as invalid
     """
 
 
@@ -184,7 +213,12 @@ class AutograderConfigurationSchema(BaseSchema[AutograderConfiguration]):
                             "name": str,
                             "version": str,
                         }],
-                        Optional("buffer_size", default=2 ** 20): And(int, lambda x: x >= 2 ** 20)
+                        Optional("buffer_size", default=2 ** 16): And(int, lambda x: x >= 2 ** 12),
+                        Optional("use_zygote", default=False): bool,
+                        Optional("preload_modules", default=lambda: []): [str],
+                        Optional("package_snapshot", default=None): And(str, lambda x: len(x) >= 1),
+                        Optional("snapshot_packages", default=lambda: []): [str],
+                        Optional("offline_package_lookup", default=False): bool,
                     }, None),
                     Optional("c", default=None): Or({
                         "use_makefile": bool,
@@ -348,11 +382,21 @@ class AutograderConfigurationProvider:
 
     This class allows access to the same config across the entire program.
     This is using a similar pattern to singletons, however, it's a bit better as it's a separate provider.
+
+    A config can also be scoped to the current context (ie: a thread or an asyncio task) with ``scoped``.
+    Scoped configs take priority over the config for the entire program, which allows a single process to grade
+    multiple assignments at once.
     """
     config: OptionalType[AutograderConfiguration] = None
+    scopedConfig: ContextVar[OptionalType[AutograderConfiguration]] = ContextVar("scopedConfig", default=None)
 
     @classmethod
     def get(cls) -> AutograderConfiguration:
+        scopedConfig = cls.scopedConfig.get()
+
+        if scopedConfig is not None:
+            return scopedConfig
+
         if cls.config is None:
             raise AttributeError("Configuration has not been set!")
 
@@ -365,6 +409,26 @@ class AutograderConfigurationProvider:
 
         cls.config = config
 
+    @classmethod
+    @contextmanager
+    def scoped(cls, config: AutograderConfiguration) -> Iterator[AutograderConfiguration]:
+        """
+        Description
+        ---
+        Sets the config for the current context until the ``with`` block exits.
+
+        New threads don't inherit the context, so the context should be copied in to them
+        (ie: with ``contextvars.copy_context().run``).
+
+        :param config: the config to use in this context
+        """
+        token = cls.scopedConfig.set(config)
+
+        try:
+            yield config
+        finally:
+            cls.scopedConfig.reset(token)
+
     @classmethod
     def reset(cls):
         cls.config = None
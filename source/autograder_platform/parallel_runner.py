@@ -0,0 +1,291 @@
+"""
+This module provides a test runner that is able to run test classes in parallel.
+
+Each test already isolates the student's submission in its own child process, so the serial runner spends most of its
+time waiting on a single child. This runner spreads the test classes across a pool of worker processes and then merges
+the results back together in the order that the tests were discovered. This means that the results passed to the
+result finalizers and the post processor are the same as they would be with the serial runner.
+
+The first test class is always run in the parent before any workers are started. Anything that it only does once per
+process (ie: building the submission in the :ref:`SubmissionRegistry` and installing its requirements) is then
+inherited by the workers, rather than every worker doing it again at the same time.
+"""
+import json
+import os
+import sys
+import time
+import unittest
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypedDict, Union
+from unittest.signals import registerResult
+
+from autograder_utils.JSONTestResult import JSONTestResult
+from autograder_utils.JSONTestRunner import JSONTestRunner
+
+from autograder_platform.config.Config import AutograderConfiguration, AutograderConfigurationProvider
+
+
+class TestGroupResult(TypedDict):
+    """The results of a group of tests. Tests are referred to by their id, as the test objects stay in the worker"""
+    tests: List[Dict[str, Any]]
+    leaderboard: List[Dict[str, Any]]
+    testsRun: int
+    failures: List[Tuple[str, str]]
+    errors: List[Tuple[str, str]]
+    unexpectedSuccesses: List[str]
+
+
+def getDefaultJobCount() -> int:
+    """
+    Gets the number of cores that are actually available to this process.
+    This respects cpu sets in containers where ``os.cpu_count`` will report the cores on the host.
+    """
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+
+    return os.cpu_count() or 1  # pragma: no cover
+
+
+class _PlaceholderTest(unittest.TestCase):
+    """
+    Stands in for a test that only existed in the worker (ie: a subtest, or a class fixture that failed) so that the
+    merged failures and errors are still ``(TestCase, str)`` pairs, just like they are from the serial runner.
+    """
+
+    def __init__(self, testId: str):
+        super().__init__()
+        self.testId = testId
+
+    def id(self) -> str:
+        return self.testId
+
+    def __str__(self) -> str:
+        return self.testId
+
+    def shortDescription(self) -> Optional[str]:
+        return None
+
+
+def _initializeWorker(config: Optional[AutograderConfiguration]) -> None:
+    # workers created via spawn don't inherit the config, and workers that are forked already have it.
+    if config is None:
+        return
+
+    AutograderConfigurationProvider.reset()
+    AutograderConfigurationProvider.set(config)
+
+
+def _collectResults(result: JSONTestResult, tests: List[Dict[str, Any]],
+                    leaderboard: List[Dict[str, Any]]) -> TestGroupResult:
+    return {
+        "tests": tests,
+        "leaderboard": leaderboard,
+        "testsRun": result.testsRun,
+        "failures": [(test.id(), error) for test, error in result.failures],
+        "errors": [(test.id(), error) for test, error in result.errors],
+        "unexpectedSuccesses": [test.id() for test in result.unexpectedSuccesses],
+    }
+
+
+def _runTests(suite: unittest.TestSuite, descriptions: bool, buffer: bool, failfast: bool,
+              failurePrefix: str, resultBuilder: Callable[..., Dict[str, Any]]) -> TestGroupResult:
+    tests: List[Dict[str, Any]] = []
+    leaderboard: List[Dict[str, Any]] = []
+
+    result = JSONTestResult(None, descriptions, 1, tests, leaderboard, failurePrefix, resultBuilder)
+    result.buffer = buffer
+    result.failfast = failfast
+
+    result.startTestRun()
+    try:
+        suite(result)
+    finally:
+        result.stopTestRun()
+
+    return _collectResults(result, tests, leaderboard)
+
+
+def runTestGroup(testIds: List[str], descriptions: bool, buffer: bool, failfast: bool,
+                 failurePrefix: str, resultBuilder: Callable[..., Dict[str, Any]]) -> TestGroupResult:
+    """
+    Description
+    ---
+    Runs a single group of tests in a worker.
+
+    Tests are passed by their id rather than as objects as the tests are loaded again in the worker.
+
+    :param testIds: The ids of the tests to run. These are expected to all be from the same test class
+    :returns: The results of the tests in the order that they were run
+    """
+    suite = unittest.defaultTestLoader.loadTestsFromNames(testIds)
+
+    return _runTests(suite, descriptions, buffer, failfast, failurePrefix, resultBuilder)
+
+
+class ParallelJSONTestRunner(JSONTestRunner):
+    """
+    Description
+    ===========
+
+    This class is a drop in replacement for the ``JSONTestRunner`` that runs each test class in a worker process.
+
+    Tests are grouped by their class so that class level fixtures still run exactly once per class.
+    Tests that can't be loaded by name in a worker (ie: tests that failed to import) are run in the parent process.
+
+    When ``jobs`` is 1, this behaves exactly like the ``JSONTestRunner``.
+
+    With ``failfast``, each worker stops at its first failure, and the results of every group after the first group
+    that failed (in discovery order) are discarded, so only the tests that the serial runner would have run are reported.
+    """
+
+    def __init__(self, jobs: int = 1, config: Optional[AutograderConfiguration] = None, **kwargs):
+        super().__init__(**kwargs)
+        self.jobs: int = jobs
+        self.config: Optional[AutograderConfiguration] = config
+
+    @staticmethod
+    def _flattenSuite(suite: Union[unittest.TestSuite, unittest.TestCase]) -> List[unittest.TestCase]:
+        if isinstance(suite, unittest.TestCase):
+            return [suite]
+
+        tests: List[unittest.TestCase] = []
+        for test in suite:
+            tests.extend(ParallelJSONTestRunner._flattenSuite(test))
+
+        return tests
+
+    @staticmethod
+    def groupTests(suite: Union[unittest.TestSuite, unittest.TestCase]) -> List[List[unittest.TestCase]]:
+        """
+        Description
+        ---
+        Groups the tests in the suite by their test class, keeping the order that they were discovered in.
+
+        :param suite: the suite to group
+        :returns: the test groups in discovery order
+        """
+        groups: List[List[unittest.TestCase]] = []
+
+        for test in ParallelJSONTestRunner._flattenSuite(suite):
+            if groups and type(groups[-1][0]) is type(test):
+                groups[-1].append(test)
+                continue
+
+            groups.append([test])
+
+        return groups
+
+    @staticmethod
+    def isLoadableByName(test: unittest.TestCase) -> bool:
+        testClass = type(test)
+
+        module = sys.modules.get(testClass.__module__)
+
+        if module is None or getattr(module, testClass.__qualname__, None) is not testClass:
+            return False
+
+        # tests that failed to load are resolved dynamically, so they wont exist on the class
+        return callable(getattr(testClass, test._testMethodName, None))
+
+    def _runLocally(self, group: List[unittest.TestCase]) -> TestGroupResult:
+        return _runTests(unittest.TestSuite(group), self.descriptions, self.buffer, self.failfast,
+                         self.failure_prefix, self.result_builder)
+
+    def _buildCrashedGroupResult(self, group: List[unittest.TestCase], ex: BaseException) -> TestGroupResult:
+        # if a worker dies, then every test in that group is reported as an error rather than silently dropped
+        tests: List[Dict[str, Any]] = []
+        leaderboard: List[Dict[str, Any]] = []
+
+        result = JSONTestResult(None, self.descriptions, 1, tests, leaderboard, self.failure_prefix,
+                                self.result_builder)
+
+        for test in group:
+            result.startTest(test)
+            result.addError(test, (type(ex), ex, None))
+            result.stopTest(test)
+
+        return _collectResults(result, tests, leaderboard)
+
+    def _shouldStop(self, groupResult: TestGroupResult) -> bool:
+        return self.failfast and bool(groupResult["failures"] or groupResult["errors"])
+
+    def _runGroups(self, groups: List[List[unittest.TestCase]]) -> List[TestGroupResult]:
+        groupResults: List[TestGroupResult] = [self._runLocally(groups[0])]
+
+        remainingGroups = groups[1:]
+
+        if not remainingGroups or self._shouldStop(groupResults[0]):
+            return groupResults
+
+        futures: List[Optional[Future]] = []
+
+        with ProcessPoolExecutor(max_workers=min(self.jobs, len(remainingGroups)),
+                                 initializer=_initializeWorker, initargs=(self.config,)) as executor:
+            for group in remainingGroups:
+                if not self.isLoadableByName(group[0]):
+                    futures.append(None)
+                    continue
+
+                futures.append(executor.submit(runTestGroup, [test.id() for test in group], self.descriptions,
+                                               self.buffer, self.failfast, self.failure_prefix, self.result_builder))
+
+            # results are collected in discovery order, so the merged results are deterministic
+            for group, future in zip(remainingGroups, futures):
+                if future is None:
+                    groupResults.append(self._runLocally(group))
+                else:
+                    try:
+                        groupResults.append(future.result())
+                    except Exception as ex:
+                        groupResults.append(self._buildCrashedGroupResult(group, ex))
+
+                if self._shouldStop(groupResults[-1]):
+                    executor.shutdown(wait=True, cancel_futures=True)
+                    break
+
+        return groupResults
+
+    @staticmethod
+    def _resolveTests(testsById: Dict[str, unittest.TestCase], entries: List[Tuple[str, str]]) \
+            -> List[Tuple[unittest.TestCase, str]]:
+        return [(testsById.get(testId) or _PlaceholderTest(testId), error) for testId, error in entries]
+
+    def run(self, test):
+        if self.jobs <= 1:
+            return super().run(test)
+
+        result = self._makeResult()
+        registerResult(result)
+        startTime = time.time()
+
+        groups = self.groupTests(test)
+
+        groupResults = self._runGroups(groups) if groups else []
+
+        testsById: Dict[str, unittest.TestCase] = {test.id(): test for group in groups for test in group}
+
+        for groupResult in groupResults:
+            result.results.extend(groupResult["tests"])
+            result.leaderboard.extend(groupResult["leaderboard"])
+            result.testsRun += groupResult["testsRun"]
+            result.failures.extend(self._resolveTests(testsById, groupResult["failures"]))
+            result.errors.extend(self._resolveTests(testsById, groupResult["errors"]))
+            result.unexpectedSuccesses.extend(testsById.get(testId) or _PlaceholderTest(testId)
+                                              for testId in groupResult["unexpectedSuccesses"])
+
+            if self._shouldStop(groupResult):
+                result.shouldStop = True
+
+        stopTime = time.time()
+        timeTaken = stopTime - startTime
+
+        self.json_data["execution_time"] = format(timeTaken, "0.2f")
+
+        self.result_finalizer(self.json_data)
+
+        if self.post_processor is not None:
+            self.post_processor(self.json_data)
+
+        json.dump(self.json_data, self.stream, indent=4)
+        self.stream.write('\n')
+        return result
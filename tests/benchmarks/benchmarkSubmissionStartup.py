@@ -0,0 +1,123 @@
+"""
+Compares how long it takes to run a trivial module entrypoint with each of the process backends.
+
+The submission only reads a line and prints it, so this is almost entirely the cost of starting the submission's
+process and collecting its results.
+
+Run with ``python -m tests.benchmarks.benchmarkSubmissionStartup [--iterations N]``. This is not run with the tests.
+"""
+import argparse
+import multiprocessing
+import shutil
+import statistics
+import time
+from typing import Callable, Dict, List
+from unittest.mock import MagicMock
+
+from autograder_platform.Executors.Environment import ExecutionEnvironmentBuilder, getResults
+from autograder_platform.Executors.Executor import Executor
+from autograder_platform.StudentSubmissionImpl.Python import PythonSubmission
+from autograder_platform.StudentSubmissionImpl.Python.PythonEnvironment import PythonEnvironmentBuilder
+from autograder_platform.StudentSubmissionImpl.Python.PythonSpawnedProcess import SpawnedSubmissionProcess
+from autograder_platform.StudentSubmissionImpl.Python.PythonZygote import PythonZygote
+from autograder_platform.StudentSubmissionImpl.Python.Runners import PythonRunnerBuilder
+from autograder_platform.config.Config import AutograderConfigurationProvider
+
+PROGRAM = \
+    "line = input()\n" \
+    "print('OUTPUT', line)\n"
+
+
+def buildConfig(useZygote: bool) -> MagicMock:
+    config = MagicMock()
+    config.config.python.buffer_size = 2 ** 16
+    config.config.python.use_zygote = useZygote
+    config.config.python.preload_modules = []
+
+    return config
+
+
+def runOnce(submission: PythonSubmission, useSpawnedProcess: bool) -> float:
+    environment = ExecutionEnvironmentBuilder() \
+        .setStdin(["startup"]) \
+        .setImplEnvironment(PythonEnvironmentBuilder,
+                            lambda builder: builder.setUseSpawnedProcess(useSpawnedProcess).build()) \
+        .build()
+
+    runner = PythonRunnerBuilder(submission).setEntrypoint(module=True).build()
+
+    start = time.perf_counter()
+    Executor.execute(environment, runner)
+    elapsed = time.perf_counter() - start
+
+    if getResults(environment).stdout != ["startup"]:
+        raise AssertionError("Submission produced the wrong output!")
+
+    shutil.rmtree(environment.sandbox_location, ignore_errors=True)
+
+    return elapsed
+
+
+def measure(name: str, iterations: int, run: Callable[[], float]) -> Dict[str, float]:
+    # the first run pays for one time setup (ie: starting the zygote), which isn't what we are measuring
+    run()
+
+    samples: List[float] = [run() for _ in range(iterations)]
+
+    return {
+        "name": name,  # type: ignore
+        "mean": statistics.mean(samples) * 1000,
+        "median": statistics.median(samples) * 1000,
+        "min": min(samples) * 1000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=50)
+    arguments = parser.parse_args()
+
+    submission = PythonSubmission()
+    code = compile(PROGRAM, "benchmark", "exec")
+    submission.getExecutableSubmission = lambda: code
+
+    results: List[Dict[str, float]] = []
+
+    AutograderConfigurationProvider.set(buildConfig(useZygote=False))
+
+    results.append(measure(f"multiprocessing ({multiprocessing.get_start_method()})", arguments.iterations,
+                           lambda: runOnce(submission, useSpawnedProcess=False)))
+
+    if SpawnedSubmissionProcess.isSupported():
+        results.append(measure("posix_spawn (python -I -S)", arguments.iterations,
+                               lambda: runOnce(submission, useSpawnedProcess=True)))
+
+    if multiprocessing.get_start_method() != "spawn":
+        # this is the default on macOS and Windows
+        AutograderConfigurationProvider.reset()
+        AutograderConfigurationProvider.set(buildConfig(useZygote=False))
+        multiprocessing.set_start_method("spawn", force=True)
+
+        results.append(measure("multiprocessing (spawn)", arguments.iterations,
+                               lambda: runOnce(submission, useSpawnedProcess=False)))
+
+    # the zygote is only used where the default start method doesn't fork, so this is measured after switching to spawn
+    if PythonZygote.isSupported() and PythonZygote.isUseful():
+        AutograderConfigurationProvider.reset()
+        AutograderConfigurationProvider.set(buildConfig(useZygote=True))
+
+        results.append(measure("multiprocessing (zygote)", arguments.iterations,
+                               lambda: runOnce(submission, useSpawnedProcess=False)))
+
+    AutograderConfigurationProvider.reset()
+
+    print(f"{'backend':<32}{'mean (ms)':>12}{'median (ms)':>14}{'min (ms)':>12}")
+
+    for result in results:
+        print(f"{result['name']:<32}{result['mean']:>12.2f}{result['median']:>14.2f}{result['min']:>12.2f}")
+
+    print(f"\n{arguments.iterations} iterations each")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+import asyncio
+import os
+import shutil
+import time
+import unittest
+from concurrent.futures import CancelledError
+from unittest.mock import MagicMock
+
+from autograder_platform.Executors.Environment import ExecutionEnvironment, ExecutionEnvironmentBuilder, getResults
+from autograder_platform.Executors.Executor import ExecutionFuture, Executor
+from autograder_platform.StudentSubmission.ISubmissionProcess import ISubmissionProcess
+from autograder_platform.StudentSubmissionImpl.Python import PythonSubmission
+from autograder_platform.StudentSubmissionImpl.Python.Runners import PythonRunnerBuilder
+from autograder_platform.config.Config import AutograderConfigurationProvider
+
+
+class TestAsyncExecutions(unittest.TestCase):
+    PROGRAM = \
+        "def double(x):\n" \
+        "    return x * 2\n" \
+        "def spin():\n" \
+        "    while True:\n" \
+        "        pass\n"
+
+    @classmethod
+    def setUpClass(cls):
+        configMock = MagicMock()
+        configMock.config.python.buffer_size = 2 ** 16
+        configMock.config.python.use_zygote = False
+        configMock.config.python.preload_modules = []
+        AutograderConfigurationProvider.set(configMock)
+
+    @classmethod
+    def tearDownClass(cls):
+        AutograderConfigurationProvider.reset()
+        Executor.configureConcurrency(Executor.DEFAULT_MAX_CONCURRENCY)
+
+    def setUp(self) -> None:
+        self.submission = PythonSubmission()
+        code = compile(self.PROGRAM, "test_code", "exec")
+        self.submission.getExecutableSubmission = lambda: code
+
+        self.sandboxes = []
+
+    def tearDown(self) -> None:
+        for sandbox in self.sandboxes:
+            if os.path.exists(sandbox):
+                shutil.rmtree(sandbox)
+
+    def buildEnvironment(self, timeout: int = 10) -> ExecutionEnvironment:
+        environment = ExecutionEnvironmentBuilder() \
+            .setTimeout(timeout) \
+            .build()
+
+        environment.sandbox_location = f"./sandbox_{len(self.sandboxes)}"
+        self.sandboxes.append(environment.sandbox_location)
+
+        return environment
+
+    def buildRunner(self, function: str, *parameters):
+        builder = PythonRunnerBuilder(self.submission).setEntrypoint(function=function)
+
+        for parameter in parameters:
+            builder.addParameter(parameter)
+
+        return builder.build()
+
+    def testExecuteAsyncConcurrently(self):
+        async def runAll():
+            return await asyncio.gather(*[Executor.executeAsync(self.buildEnvironment(), self.buildRunner("double", i))
+                                          for i in range(4)])
+
+        environments = asyncio.run(runAll())
+
+        self.assertEqual([0, 2, 4, 6], [getResults(environment).return_val for environment in environments])
+
+    def testExecuteInBackground(self):
+        environment = self.buildEnvironment()
+
+        future = Executor.executeInBackground(environment, self.buildRunner("double", 21))
+
+        self.assertIs(environment, future.result(timeout=10))
+        self.assertEqual(42, getResults(environment).return_val)
+
+    def testCancelKillsSubmission(self):
+        future = Executor.executeInBackground(self.buildEnvironment(timeout=60), self.buildRunner("spin"))
+
+        time.sleep(.5)
+
+        start = time.monotonic()
+        self.assertTrue(future.cancel())
+
+        with self.assertRaises(CancelledError):
+            future.result(timeout=10)
+
+        self.assertLess(time.monotonic() - start, 10)
+        self.assertTrue(future.cancelled())
+
+    def testCancelNotSupported(self):
+        class UncancellableProcess(ISubmissionProcess):
+            def setup(self, environment, runner):
+                pass
+
+            def run(self):
+                pass
+
+            def populateResults(self, environment):
+                pass
+
+            def cleanup(self):
+                pass
+
+            @classmethod
+            def processAndRaiseExceptions(cls, environment):
+                pass
+
+        future = ExecutionFuture()
+        future.set_running_or_notify_cancel()
+        future.submissionProcess = UncancellableProcess()
+
+        self.assertFalse(future.cancel())
+        self.assertFalse(future.cancelRequested.is_set())
+        self.assertFalse(future.cancelled())
+
+    def testSetCancelledWhileRunning(self):
+        future = ExecutionFuture()
+        future.set_running_or_notify_cancel()
+
+        seenCancelled = []
+        future.add_done_callback(lambda f: seenCancelled.append(f.cancelled()))
+
+        future.setCancelled()
+
+        self.assertTrue(future.done())
+        self.assertTrue(future.cancelled())
+        self.assertEqual([True], seenCancelled)
+        self.assertFalse(future.cancel())
+
+        with self.assertRaises(CancelledError):
+            future.exception(timeout=0)
+
+        async def awaitFuture():
+            with self.assertRaises(asyncio.CancelledError):
+                await asyncio.wrap_future(future)
+
+        asyncio.run(awaitFuture())
+
+    def testCancelAsyncTask(self):
+        async def runAndCancel():
+            task = asyncio.create_task(
+                Executor.executeAsync(self.buildEnvironment(timeout=60), self.buildRunner("spin")))
+
+            await asyncio.sleep(.5)
+            task.cancel()
+
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        start = time.monotonic()
+        asyncio.run(runAndCancel())
+
+        self.assertLess(time.monotonic() - start, 10)
+
+    def testConcurrencyLimited(self):
+        Executor.configureConcurrency(1)
+
+        first = Executor.executeInBackground(self.buildEnvironment(timeout=60), self.buildRunner("spin"))
+        second = Executor.executeInBackground(self.buildEnvironment(), self.buildRunner("double", 1))
+
+        time.sleep(.5)
+
+        # the second execution can't start until the first one is done
+        self.assertFalse(second.running())
+        self.assertFalse(second.done())
+
+        first.cancel()
+
+        self.assertEqual(2, getResults(second.result(timeout=10)).return_val)
+
+    def testInvalidConcurrency(self):
+        with self.assertRaises(AttributeError):
+            Executor.configureConcurrency(0)
+
+    def testScopedConfigUsedInBackground(self):
+        scopedConfig = MagicMock()
+        scopedConfig.config.python.buffer_size = 2 ** 12
+        scopedConfig.config.python.use_zygote = False
+        scopedConfig.config.python.preload_modules = []
+
+        environment = self.buildEnvironment()
+
+        with AutograderConfigurationProvider.scoped(scopedConfig):
+            future = Executor.executeInBackground(environment, self.buildRunner("double", 2))
+
+        future.result(timeout=10)
+
+        self.assertEqual(2 ** 12, environment.impl_environment.buffer_size)
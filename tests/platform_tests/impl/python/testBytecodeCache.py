@@ -0,0 +1,85 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from autograder_platform.StudentSubmissionImpl.Python.BytecodeCache import BytecodeCache
+
+
+class TestBytecodeCache(unittest.TestCase):
+    def setUp(self) -> None:
+        BytecodeCache.clear()
+
+    def tearDown(self) -> None:
+        BytecodeCache.clear()
+        BytecodeCache.maxEntries = BytecodeCache.DEFAULT_MAX_ENTRIES
+        BytecodeCache.directory = None
+
+    def testSameSourceReused(self):
+        first = BytecodeCache.compile("x = 1\n", "main.py")
+        second = BytecodeCache.compile("x = 1\n", "main.py")
+
+        self.assertIs(first, second)
+        self.assertEqual(1, BytecodeCache.hits)
+        self.assertEqual(1, BytecodeCache.misses)
+        self.assertEqual(.5, BytecodeCache.getHitRate())
+
+    def testDifferentFilenameNotReused(self):
+        first = BytecodeCache.compile("x = 1\n", "main.py")
+        second = BytecodeCache.compile("x = 1\n", "other.py")
+
+        self.assertIsNot(first, second)
+        self.assertEqual("other.py", second.co_filename)
+
+    def testLeastRecentlyUsedEvicted(self):
+        BytecodeCache.configure(maxEntries=2)
+
+        first = BytecodeCache.compile("x = 1\n", "a.py")
+        BytecodeCache.compile("x = 2\n", "b.py")
+        BytecodeCache.compile("x = 1\n", "a.py")
+        BytecodeCache.compile("x = 3\n", "c.py")
+
+        self.assertEqual(2, len(BytecodeCache.entries))
+        self.assertIs(first, BytecodeCache.compile("x = 1\n", "a.py"))
+        self.assertNotIn(BytecodeCache.buildKey("x = 2\n", "b.py"), BytecodeCache.entries)
+
+    def testSyntaxErrorNotCached(self):
+        with self.assertRaises(SyntaxError):
+            BytecodeCache.compile("x = \n", "main.py")
+
+        self.assertEqual(0, len(BytecodeCache.entries))
+
+    def testDiskCacheShared(self):
+        directory = tempfile.mkdtemp()
+
+        try:
+            BytecodeCache.configure(directory=directory)
+
+            BytecodeCache.compile("x = 1\n", "main.py")
+            BytecodeCache.clear()
+
+            namespace = {}
+            exec(BytecodeCache.compile("x = 1\n", "main.py"), namespace)
+
+            self.assertEqual(1, namespace["x"])
+            self.assertEqual(1, BytecodeCache.diskHits)
+            self.assertEqual(0, BytecodeCache.misses)
+        finally:
+            shutil.rmtree(directory)
+
+    def testCorruptDiskEntryRecompiled(self):
+        directory = tempfile.mkdtemp()
+
+        try:
+            BytecodeCache.configure(directory=directory)
+
+            with open(os.path.join(directory, BytecodeCache.buildKey("x = 1\n", "main.py") + BytecodeCache.FILE_SUFFIX), 'wb') as wb:
+                wb.write(b"garbage")
+
+            namespace = {}
+            exec(BytecodeCache.compile("x = 1\n", "main.py"), namespace)
+
+            self.assertEqual(1, namespace["x"])
+            self.assertEqual(1, BytecodeCache.misses)
+        finally:
+            shutil.rmtree(directory)
@@ -21,6 +21,8 @@ class TestFullExecutions(unittest.TestCase):
     def setUpClass(cls):
         configMock = MagicMock()
         configMock.config.python.buffer_size = 2 ** 20
+        configMock.config.python.use_zygote = False
+        configMock.config.python.preload_modules = []
         AutograderConfigurationProvider.set(configMock)
 
     @classmethod
@@ -171,6 +173,40 @@ class TestFullExecutions(unittest.TestCase):
 
         self.assertEqual(expectedOutput, actualOutput)
 
+    def testSubmissionModulesFullExecution(self):
+        os.mkdir(os.path.join(self.PYTHON_PROGRAM_DIRECTORY, "utils"))
+
+        with open(os.path.join(self.PYTHON_PROGRAM_DIRECTORY, "utils", "helpers.py"), 'w') as w:
+            w.writelines("def fun1():\n"
+                         "  return 10\n")
+
+        with open(os.path.join(self.PYTHON_PROGRAM_DIRECTORY, "main.py"), 'w') as w:
+            w.writelines(
+                "from utils.helpers import fun1\n" \
+                "def run():\n" \
+                "    return fun1()\n"
+            )
+
+        submission = PythonSubmission() \
+            .setSubmissionRoot(self.PYTHON_PROGRAM_DIRECTORY) \
+            .load() \
+            .build() \
+            .validate()
+
+        runner = PythonRunnerBuilder(submission) \
+            .setEntrypoint(function="run") \
+            .build()
+
+        environment = ExecutionEnvironmentBuilder[PythonEnvironment, PythonResults]() \
+            .setImplEnvironment(PythonEnvironmentBuilder, lambda x: x \
+                                .addImportHandler(submission.getModuleFinder()) \
+                                .build()) \
+            .build()
+
+        Executor.execute(environment, runner)
+
+        self.assertEqual(10, getResults(environment).return_val)
+
     def testMockedImportFullExecution(self):
         # This test is flaky on windows - rerunning it helps.
         # It seems to be due to how windows implements the package cache when installing
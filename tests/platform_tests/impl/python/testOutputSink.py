@@ -0,0 +1,101 @@
+import unittest
+
+from autograder_platform.Executors.common import filterStdOut
+from autograder_platform.StudentSubmissionImpl.Python.OutputSink import OutputSink
+
+
+class TestOutputSink(unittest.TestCase):
+    def setUp(self) -> None:
+        self.sink = OutputSink()
+
+    def testLinesFilteredAsWritten(self):
+        print("OUTPUT 1", file=self.sink)
+        print("not output", file=self.sink)
+
+        self.assertEqual(["1"], self.sink.lines)
+
+        print("output 2", file=self.sink)
+
+        self.assertEqual(["1", "2"], self.sink.getOutput())
+        self.assertEqual(3, self.sink.lineCount)
+
+    def testLineSplitAcrossWrites(self):
+        self.sink.write("OUT")
+        self.sink.write("PUT a")
+
+        # the line hasn't finished, but it is still included
+        self.assertEqual([], self.sink.lines)
+        self.assertEqual(["a"], self.sink.getOutput())
+
+        self.sink.write("b\r")
+        self.sink.write("\nOUTPUT c")
+
+        self.assertEqual(["ab", "c"], self.sink.getOutput())
+        self.assertEqual(2, self.sink.lineCount)
+
+    def testMatchesFilterStdOut(self):
+        text = "OUTPUT a\r\nb\rOutput  c\x0cno output\n\nOUTPUT\nyOUTPUT z"
+
+        for chunkSize in (1, 2, 3, 7, len(text)):
+            sink = OutputSink()
+
+            for i in range(0, len(text), chunkSize):
+                sink.write(text[i:i + chunkSize])
+
+            self.assertEqual(filterStdOut(text.splitlines()), sink.getOutput())
+            self.assertEqual(len(text.splitlines()), sink.lineCount)
+
+    def testCarriageReturnAcrossWrites(self):
+        for chunks in (["a\r", "\n", "\n"], ["a\r", "\r\n"], ["a\r", "", "\nb"]):
+            sink = OutputSink()
+
+            for chunk in chunks:
+                sink.write(chunk)
+
+            self.assertEqual(len("".join(chunks).splitlines()), sink.lineCount)
+
+    def testLongLineWithoutMarkerNotKept(self):
+        for _ in range(1000):
+            self.sink.write("x" * 1000)
+
+        self.assertLess(len(self.sink.pendingTail), len(OutputSink.OUTPUT_MARKER))
+        self.assertIsNone(self.sink.pendingOutput)
+        self.assertEqual(1, self.sink.lineCount)
+
+        # the marker is still found if it is split across writes
+        self.sink.write("OUT")
+        self.sink.write("PUT kept\n")
+
+        self.assertEqual(["kept"], self.sink.getOutput())
+
+    def testGetOutputFromStart(self):
+        print("OUTPUT 1", file=self.sink)
+
+        start = len(self.sink.lines)
+
+        print("OUTPUT 2", file=self.sink)
+
+        self.assertEqual(["2"], self.sink.getOutput(start))
+
+    def testCapturedOutputTruncated(self):
+        sink = OutputSink(maxCaptured=10)
+
+        sink.write("0123456789")
+        self.assertFalse(sink.truncated)
+
+        sink.write("abcdef\n")
+        sink.write("OUTPUT kept\n")
+
+        self.assertTrue(sink.truncated)
+        self.assertEqual("0123456789" + OutputSink.TRUNCATION_MARKER, sink.getvalue())
+        self.assertEqual(["kept"], sink.getOutput())
+        self.assertEqual(len("0123456789abcdef\nOUTPUT kept\n"), sink.byteCount)
+
+    def testBytesCounted(self):
+        self.sink.write("é\n")
+
+        self.assertEqual(3, self.sink.byteCount)
+
+    def testOnlyStrWritable(self):
+        with self.assertRaises(TypeError):
+            self.sink.write(b"bytes")  # type: ignore
@@ -0,0 +1,131 @@
+import importlib.metadata
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from autograder_platform.StudentSubmissionImpl.Python.PackageInstaller import PackageInstaller
+
+
+class TestPackageInstaller(unittest.TestCase):
+    def setUp(self) -> None:
+        PackageInstaller.invocations = 0
+
+        self.wheelhouse = tempfile.mkdtemp()
+        PackageInstaller.configure(wheelhouse=self.wheelhouse)
+
+    def tearDown(self) -> None:
+        PackageInstaller.configure(wheelhouse=PackageInstaller.DEFAULT_WHEELHOUSE)
+
+        shutil.rmtree(self.wheelhouse)
+
+    def addWheel(self, name: str, version: str):
+        with open(os.path.join(self.wheelhouse, f"{name}-{version}-py3-none-any.whl"), "w"):
+            pass
+
+    def testInstalledPackageSatisfied(self):
+        self.assertTrue(PackageInstaller.isSatisfied("dill", ""))
+        self.assertTrue(PackageInstaller.isSatisfied("dill", importlib.metadata.version("dill")))
+
+    def testWrongVersionNotSatisfied(self):
+        self.assertFalse(PackageInstaller.isSatisfied("dill", "0.0.0"))
+        self.assertFalse(PackageInstaller.isSatisfied("does-not-exist", ""))
+
+    @patch("importlib.metadata.version", return_value="1.0.0")
+    def testEquivalentVersionSatisfied(self, _):
+        self.assertTrue(PackageInstaller.isSatisfied("package", "1.0"))
+        self.assertTrue(PackageInstaller.isSatisfied("package", "1.0.0"))
+        self.assertFalse(PackageInstaller.isSatisfied("package", "1.0.1"))
+        self.assertFalse(PackageInstaller.isSatisfied("package", "not a version"))
+
+    @patch("subprocess.check_call")
+    def testSatisfiedPackagesNotInstalled(self, checkCall):
+        PackageInstaller.install({"dill": ""})
+
+        checkCall.assert_not_called()
+        self.assertEqual(0, PackageInstaller.invocations)
+
+    def testWheelhouseChecked(self):
+        self.addWheel("does_not_exist", "1.0.0")
+
+        self.assertTrue(PackageInstaller.isInWheelhouse({"Does-Not-Exist": "1.0"}))
+        self.assertTrue(PackageInstaller.isInWheelhouse({"does-not-exist": ""}))
+        self.assertFalse(PackageInstaller.isInWheelhouse({"does-not-exist": "2.0"}))
+        self.assertFalse(PackageInstaller.isInWheelhouse({"does-not-exist2": ""}))
+
+    @patch("subprocess.check_call")
+    def testMissingPackagesInstalledTogether(self, checkCall):
+        self.addWheel("does_not_exist", "1.0")
+        self.addWheel("does_not_exist2", "2.0")
+
+        PackageInstaller.install({"dill": "", "does-not-exist": "1.0", "does-not-exist2": ""})
+
+        self.assertEqual(1, checkCall.call_count)
+
+        arguments = checkCall.call_args.args[0]
+        self.assertIn("--no-index", arguments)
+        self.assertIn("does-not-exist==1.0", arguments)
+        self.assertIn("does-not-exist2", arguments)
+        self.assertNotIn("dill", arguments)
+
+    @patch("subprocess.check_call")
+    def testMissingWheelsDownloaded(self, checkCall):
+        # the wheelhouse is empty, so it isn't tried before the wheels are downloaded
+        PackageInstaller.install({"does-not-exist": ""})
+
+        self.assertEqual(2, PackageInstaller.invocations)
+        self.assertEqual("wheel", checkCall.call_args_list[0].args[0][3])
+        self.assertEqual("install", checkCall.call_args_list[1].args[0][3])
+
+    @patch("subprocess.check_call")
+    def testMissingDependencyDownloaded(self, checkCall):
+        self.addWheel("does_not_exist", "1.0")
+        # ie: a dependency of the package isn't in the wheelhouse
+        checkCall.side_effect = [subprocess.CalledProcessError(1, "pip"), None, None]
+
+        PackageInstaller.install({"does-not-exist": ""})
+
+        self.assertEqual(3, PackageInstaller.invocations)
+        self.assertEqual("wheel", checkCall.call_args_list[1].args[0][3])
+
+    @patch("subprocess.check_call")
+    def testBreakSystemPackagesOnlyWhenExternallyManaged(self, checkCall):
+        self.addWheel("does_not_exist", "1.0")
+
+        with patch.object(PackageInstaller, "isExternallyManaged", return_value=False):
+            PackageInstaller.install({"does-not-exist": ""})
+
+        self.assertNotIn("--break-system-packages", checkCall.call_args.args[0])
+
+        with patch.object(PackageInstaller, "isExternallyManaged", return_value=True):
+            PackageInstaller.install({"does-not-exist": ""})
+
+        self.assertIn("--break-system-packages", checkCall.call_args.args[0])
+        self.assertEqual(2, PackageInstaller.invocations)
+
+    @unittest.skipUnless(hasattr(os, "getuid"), "Wheelhouse ownership is only checked on posix")
+    @patch("subprocess.check_call")
+    def testWritableWheelhouseRejected(self, checkCall):
+        os.chmod(self.wheelhouse, 0o777)
+
+        with self.assertRaises(EnvironmentError):
+            PackageInstaller.install({"does-not-exist": ""})
+
+        checkCall.assert_not_called()
+
+    @patch("subprocess.check_call")
+    def testFailedInstallRaises(self, checkCall):
+        checkCall.side_effect = subprocess.CalledProcessError(1, "pip")
+
+        with self.assertRaises(Exception):
+            PackageInstaller.install({"does-not-exist": ""})
+
+    @patch("subprocess.check_call")
+    def testInstalledWhileWaitingForLock(self, checkCall):
+        # ie: another worker installed it while this one was waiting for the wheelhouse
+        with patch.object(PackageInstaller, "isSatisfied", side_effect=[False, True]):
+            PackageInstaller.install({"does-not-exist": ""})
+
+        checkCall.assert_not_called()
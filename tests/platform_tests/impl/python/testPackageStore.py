@@ -0,0 +1,157 @@
+import json
+import os
+import shutil
+import stat
+import sys
+import tempfile
+import unittest
+import zipfile
+from unittest.mock import MagicMock
+
+from autograder_platform.Executors.Environment import ExecutionEnvironment, ExecutionEnvironmentBuilder, getResults
+from autograder_platform.Executors.Executor import Executor
+from autograder_platform.StudentSubmissionImpl.Python import PythonSubmission
+from autograder_platform.StudentSubmissionImpl.Python.PackageInstaller import PackageInstaller
+from autograder_platform.StudentSubmissionImpl.Python.PackageStore import PackageStore
+from autograder_platform.StudentSubmissionImpl.Python.PythonValidators import PackageValidator
+from autograder_platform.StudentSubmissionImpl.Python.Runners import PythonRunnerBuilder, PythonTaskLibrary
+from autograder_platform.config.Config import AutograderConfigurationProvider
+
+
+class TestPackageStore(unittest.TestCase):
+    PACKAGE_NAME = "agtestpkg"
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        configMock = MagicMock()
+        configMock.config.python.buffer_size = 2 ** 20
+        configMock.config.python.use_zygote = False
+        configMock.config.python.preload_modules = []
+        AutograderConfigurationProvider.set(configMock)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        AutograderConfigurationProvider.reset()
+
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+        self.wheelhouse = os.path.join(self.directory, "wheelhouse")
+        self.submissionRoot = os.path.join(self.directory, "submission")
+
+        os.mkdir(self.wheelhouse)
+        os.mkdir(self.submissionRoot)
+
+        self.writeWheel()
+
+        PackageInstaller.configure(wheelhouse=self.wheelhouse)
+        PackageStore.configure(root=os.path.join(self.directory, "store"))
+        PackageInstaller.invocations = 0
+
+    def tearDown(self) -> None:
+        PackageInstaller.configure(wheelhouse=PackageInstaller.DEFAULT_WHEELHOUSE)
+        PackageStore.configure(root=PackageStore.DEFAULT_ROOT)
+        PackageValidator.reset()
+
+        if os.path.exists(ExecutionEnvironment.sandbox_location):
+            shutil.rmtree(ExecutionEnvironment.sandbox_location)
+
+        # stored files are read only, which stops them from being removed on windows
+        shutil.rmtree(self.directory, onerror=lambda function, path, _: (os.chmod(path, stat.S_IWRITE), function(path)))
+
+    def writeWheel(self):
+        distInfo = f"{self.PACKAGE_NAME}-1.0.dist-info"
+
+        with zipfile.ZipFile(os.path.join(self.wheelhouse, f"{self.PACKAGE_NAME}-1.0-py3-none-any.whl"), 'w') as w:
+            w.writestr(f"{self.PACKAGE_NAME}/__init__.py", "VALUE = 42\n")
+            w.writestr(f"{self.PACKAGE_NAME}-1.0.data/purelib/agtestextra.py", "VALUE = 7\n")
+            w.writestr(f"{distInfo}/METADATA", f"Metadata-Version: 2.1\nName: {self.PACKAGE_NAME}\nVersion: 1.0\n")
+            w.writestr(f"{distInfo}/WHEEL",
+                       "Wheel-Version: 1.0\nGenerator: test\nRoot-Is-Purelib: true\nTag: py3-none-any\n")
+            w.writestr(f"{distInfo}/RECORD", "")
+
+    def testOverlayLinkedFromStore(self):
+        overlay = PackageStore.getOverlay({self.PACKAGE_NAME: "1.0"})
+
+        packageFile = os.path.join(overlay, self.PACKAGE_NAME, "__init__.py")
+
+        self.assertTrue(os.path.isfile(packageFile))
+        self.assertTrue(os.path.isfile(os.path.join(overlay, "agtestextra.py")))
+        self.assertGreaterEqual(os.stat(packageFile).st_nlink, 2)
+
+    def testStoredFilesReadOnly(self):
+        overlay = PackageStore.getOverlay({self.PACKAGE_NAME: "1.0"})
+
+        self.assertFalse(os.stat(os.path.join(overlay, self.PACKAGE_NAME, "__init__.py")).st_mode & PackageStore.WRITE_MODE)
+
+    def testOverlayModules(self):
+        overlay = PackageStore.getOverlay({self.PACKAGE_NAME: "1.0"})
+
+        self.assertEqual({self.PACKAGE_NAME, "agtestextra"}, set(PythonTaskLibrary.getOverlayModules(overlay)))
+
+    def testLoadedOverlayModuleEvicted(self):
+        overlay = PackageStore.getOverlay({self.PACKAGE_NAME: "1.0"})
+        path = list(sys.path)
+
+        # ie: the autograder imported a different version before the submission's process was forked
+        sys.modules[self.PACKAGE_NAME] = MagicMock(VALUE=1)
+
+        try:
+            PythonTaskLibrary.addPackageOverlay(overlay)
+
+            self.assertNotIn(self.PACKAGE_NAME, sys.modules)
+            self.assertEqual(42, __import__(self.PACKAGE_NAME).VALUE)
+        finally:
+            sys.modules.pop(self.PACKAGE_NAME, None)
+            sys.path[:] = path
+
+    def testOverlayReused(self):
+        first = PackageStore.getOverlay({self.PACKAGE_NAME: "1.0"})
+        invocations = PackageInstaller.invocations
+
+        second = PackageStore.getOverlay({self.PACKAGE_NAME.upper(): "1.0"})
+
+        self.assertEqual(first, second)
+        self.assertEqual(invocations, PackageInstaller.invocations)
+
+    def testMissingPackageRaises(self):
+        PackageInstaller.configure(wheelhouse=os.path.join(self.directory, "empty"))
+
+        with self.assertRaises(Exception):
+            # the index is also unreachable or doesn't have this package, so both attempts fail
+            PackageStore.getOverlay({"agtestpkg-does-not-exist": "1.0"})
+
+    def testSubmissionUsesOverlay(self):
+        snapshotPath = os.path.join(self.directory, "snapshot.json")
+
+        with open(snapshotPath, 'w') as w:
+            json.dump({self.PACKAGE_NAME: ["1.0"]}, w)
+
+        PackageValidator.configure(snapshotPath=snapshotPath)
+
+        with open(os.path.join(self.submissionRoot, "requirements.txt"), 'w') as w:
+            w.write(f"{self.PACKAGE_NAME}==1.0\n")
+
+        with open(os.path.join(self.submissionRoot, "main.py"), 'w') as w:
+            w.write(f"import {self.PACKAGE_NAME}\n"
+                    "def run():\n"
+                    f"    return {self.PACKAGE_NAME}.VALUE\n")
+
+        submission = PythonSubmission() \
+            .setSubmissionRoot(self.submissionRoot) \
+            .enableRequirements() \
+            .enableIsolatedRequirements() \
+            .load() \
+            .build() \
+            .validate()
+
+        self.assertIsNotNone(submission.getPackageOverlay())
+
+        runner = PythonRunnerBuilder(submission) \
+            .setEntrypoint(function="run") \
+            .build()
+
+        environment = ExecutionEnvironmentBuilder().build()
+
+        Executor.execute(environment, runner)
+
+        self.assertEqual(42, getResults(environment).return_val)
@@ -0,0 +1,144 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+import requests
+
+from autograder_platform.StudentSubmissionImpl.Python.PythonValidators import PackageValidator
+from autograder_platform.StudentSubmissionImpl.Python.common import InvalidPackageError
+from autograder_platform.config.Config import AutograderConfigurationProvider, PythonConfiguration
+
+
+class TestPackageValidator(unittest.TestCase):
+    def setUp(self) -> None:
+        PackageValidator.reset()
+
+        self.snapshotPath = os.path.join(tempfile.mkdtemp(), "snapshot.json")
+
+        with open(self.snapshotPath, 'w') as w:
+            json.dump({"Pip_Install.Test": ["0.4", "0.5"]}, w)
+
+    def tearDown(self) -> None:
+        PackageValidator.reset()
+
+        os.remove(self.snapshotPath)
+        os.rmdir(os.path.dirname(self.snapshotPath))
+
+    @staticmethod
+    def runValidator(packages):
+        submission = MagicMock()
+        submission.getExtraPackages.return_value = packages
+
+        validator = PackageValidator()
+        validator.setup(submission)
+        validator.run()
+
+        return validator.collectErrors()
+
+    @patch("requests.get")
+    def testSnapshotUsedBeforeIndex(self, get):
+        PackageValidator.configure(snapshotPath=self.snapshotPath)
+
+        self.assertEqual([], self.runValidator({"pip-install-test": "0.5", "Pip_Install_Test": ""}))
+
+        get.assert_not_called()
+
+    @patch("requests.get")
+    def testVersionMissingFromSnapshotLookedUp(self, get):
+        get.return_value.status_code = 200
+
+        PackageValidator.configure(snapshotPath=self.snapshotPath)
+
+        # ie: the version was released after the snapshot was built
+        self.assertEqual([], self.runValidator({"pip_install_test": "1.0"}))
+
+        get.assert_called_once()
+        self.assertTrue(get.call_args.kwargs["url"].endswith("/1.0/json"))
+
+        get.return_value.status_code = 404
+
+        errors = self.runValidator({"pip-install-test": "2.0"})
+
+        self.assertEqual(1, len(errors))
+        self.assertIsInstance(errors[0], InvalidPackageError)
+
+    @patch("requests.get")
+    def testOfflineRejectsUnknownPackages(self, get):
+        PackageValidator.configure(snapshotPath=self.snapshotPath, offline=True)
+
+        errors = self.runValidator({"pip-install-test": "", "pip_install_test": "1.0", "does-not-exist": ""})
+
+        get.assert_not_called()
+        self.assertEqual(2, len(errors))
+
+    @patch("requests.get")
+    def testConfiguredFromConfig(self, get):
+        config = MagicMock()
+        config.autograder_root = os.path.dirname(self.snapshotPath)
+        config.config.python = PythonConfiguration(
+            extra_packages=[], buffer_size=2 ** 16, use_zygote=False, preload_modules=[],
+            package_snapshot=os.path.basename(self.snapshotPath), snapshot_packages=[], offline_package_lookup=True,
+        )
+
+        with AutograderConfigurationProvider.scoped(config):
+            errors = self.runValidator({"pip-install-test": "0.4", "does-not-exist": ""})
+
+        get.assert_not_called()
+        self.assertTrue(PackageValidator.offline)
+        self.assertEqual(1, len(errors))
+
+    def testMissingSnapshotSkipped(self):
+        config = MagicMock()
+        config.autograder_root = os.path.dirname(self.snapshotPath)
+        config.config.python = PythonConfiguration(
+            extra_packages=[], buffer_size=2 ** 16, use_zygote=False, preload_modules=[],
+            package_snapshot="does_not_exist.json", snapshot_packages=[], offline_package_lookup=False,
+        )
+
+        PackageValidator.configureFromConfig(config)
+
+        self.assertEqual({}, PackageValidator.snapshot)
+
+    @patch("requests.get")
+    def testLookupsCachedBetweenSubmissions(self, get):
+        get.return_value.status_code = 200
+
+        self.assertEqual([], self.runValidator({"does-exist": "1.0", "also-exists": ""}))
+        self.assertEqual([], self.runValidator({"does-exist": "1.0"}))
+
+        self.assertEqual(2, get.call_count)
+        self.assertTrue(all(call.kwargs["timeout"] == PackageValidator.DEFAULT_TIMEOUT for call in get.call_args_list))
+
+    @patch("requests.get")
+    def testNetworkErrorsNotCached(self, get):
+        get.side_effect = requests.ConnectionError()
+
+        self.assertEqual(1, len(self.runValidator({"does-exist": ""})))
+
+        get.side_effect = None
+        get.return_value.status_code = 200
+
+        self.assertEqual([], self.runValidator({"does-exist": ""}))
+
+    @patch("requests.get")
+    def testInstalledPackagesNotLookedUp(self, get):
+        self.assertEqual([], self.runValidator({"dill": ""}))
+
+        get.assert_not_called()
+
+    @patch("requests.get")
+    def testBuildSnapshot(self, get):
+        def respond(url, timeout):
+            response = MagicMock()
+            response.status_code = 200 if "does-exist" in url else 404
+            response.json.return_value = {"releases": {"1.0": [], "2.0": []}}
+            return response
+
+        get.side_effect = respond
+
+        PackageValidator.buildSnapshot(["Does_Exist", "does-not-exist"], self.snapshotPath)
+
+        with open(self.snapshotPath, 'r') as r:
+            self.assertEqual({"does-exist": ["1.0", "2.0"]}, json.load(r))
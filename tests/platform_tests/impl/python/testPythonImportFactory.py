@@ -1,10 +1,13 @@
+import contextvars
 import importlib
 import os
+import pickle
 import shutil
 import sys
 import unittest
 
 from autograder_platform.StudentSubmissionImpl.Python.PythonFileImportFactory import PythonFileImportFactory
+from autograder_platform.StudentSubmissionImpl.Python.PythonSubmissionImportFactory import PythonSubmissionImportFactory
 
 class TestPythonImportFactory(unittest.TestCase):
     TEST_FILE_DIRECTORY: str = "./sandbox"
@@ -48,3 +51,142 @@ class TestPythonImportFactory(unittest.TestCase):
 
         del sys.meta_path[0]
 
+
+
+class TestPythonSubmissionImportFactory(unittest.TestCase):
+    TEST_FILE_DIRECTORY: str = "./sandbox"
+
+    def setUp(self) -> None:
+        if os.path.exists(self.TEST_FILE_DIRECTORY):
+            shutil.rmtree(self.TEST_FILE_DIRECTORY)
+        os.makedirs(os.path.join(self.TEST_FILE_DIRECTORY, "shapes"))
+
+        self.files = {
+            "geometry.py": "from shapes.square import area\n",
+            os.path.join("shapes", "__init__.py"): "SIDES = 4\n",
+            os.path.join("shapes", "square.py"): "def area(a):\n    return a * a\n",
+            "math.py": "raise RuntimeError()\n",
+            "broken.py": "def broken(:\n",
+            "dill.py": "raise RuntimeError()\n",
+        }
+
+        for filename, contents in self.files.items():
+            with open(os.path.join(self.TEST_FILE_DIRECTORY, filename), 'w') as w:
+                w.write(contents)
+
+        self.moduleFinder = PythonSubmissionImportFactory.buildImport(
+            self.TEST_FILE_DIRECTORY, [os.path.join(self.TEST_FILE_DIRECTORY, filename) for filename in self.files])
+
+    def tearDown(self) -> None:
+        if self.moduleFinder in sys.meta_path:
+            sys.meta_path.remove(self.moduleFinder)
+
+        for module in self.moduleFinder.getModulesToReload():
+            sys.modules.pop(module, None)
+
+        if os.path.exists(self.TEST_FILE_DIRECTORY):
+            shutil.rmtree(self.TEST_FILE_DIRECTORY)
+
+    def testModulesIndexed(self):
+        self.assertEqual({"geometry", "shapes", "shapes.square", "dill"}, set(self.moduleFinder.modules.keys()))
+
+    def testImportsFromMemory(self):
+        shutil.rmtree(self.TEST_FILE_DIRECTORY)
+        sys.meta_path.insert(0, self.moduleFinder)
+
+        geometry = importlib.import_module("geometry")
+        shapes = importlib.import_module("shapes")
+
+        self.assertEqual(9, geometry.area(3))
+        self.assertEqual(4, shapes.SIDES)
+
+    def testInstalledPackagesNotShadowed(self):
+        import dill
+
+        self.moduleFinder.install()
+
+        self.assertIs(self.moduleFinder, sys.meta_path[-1])
+        self.assertIs(dill, importlib.import_module("dill"))
+        self.assertEqual(9, importlib.import_module("geometry").area(3))
+
+    def testOnlyImportedModulesReloaded(self):
+        import dill
+
+        self.assertEqual([], self.moduleFinder.getModulesToReload())
+
+        self.moduleFinder.install()
+        importlib.import_module("geometry")
+
+        self.assertEqual({"geometry", "shapes", "shapes.square"}, set(self.moduleFinder.getModulesToReload()))
+
+        # installing again must not evict the installed package that has the same name as the student's file
+        sys.meta_path.remove(self.moduleFinder)
+        self.moduleFinder.install()
+
+        self.assertIs(dill, sys.modules["dill"])
+        self.assertNotIn("geometry", sys.modules)
+
+    def testPicklable(self):
+        moduleFinder = pickle.loads(pickle.dumps(self.moduleFinder))
+
+        self.assertEqual(self.moduleFinder.modules, moduleFinder.modules)
+
+
+class TestPythonFileImportFactoryScoping(unittest.TestCase):
+    def tearDown(self) -> None:
+        PythonFileImportFactory.reset()
+
+    def testGlobalRegistryAccumulates(self):
+        PythonFileImportFactory.registerFile("first.py", "first")
+        first = PythonFileImportFactory.buildImport()
+
+        PythonFileImportFactory.registerFile("second.py", "second")
+        second = PythonFileImportFactory.buildImport()
+
+        self.assertIs(first, second)
+        self.assertIn("first", second.knownModules)
+        self.assertIn("second", second.knownModules)
+
+    def testReset(self):
+        PythonFileImportFactory.registerFile("first.py", "first")
+        first = PythonFileImportFactory.buildImport()
+
+        PythonFileImportFactory.reset()
+
+        self.assertIn("first", first.knownModules)
+        self.assertNotIn("first", PythonFileImportFactory.buildImport().knownModules)
+
+    def testScopedRegistryAccumulates(self):
+        with PythonFileImportFactory.scoped():
+            # ie: registered in setUpClass, then built for each test
+            PythonFileImportFactory.registerFile("first.py", "first")
+            first = PythonFileImportFactory.buildImport()
+            second = PythonFileImportFactory.buildImport()
+
+            PythonFileImportFactory.reset()
+
+            third = PythonFileImportFactory.buildImport()
+
+        self.assertIs(first, second)
+        self.assertIn("first", second.knownModules)
+        self.assertNotIn("first", third.knownModules)
+
+    def testReregisteringDoesNotGrow(self):
+        for _ in range(3):
+            PythonFileImportFactory.registerFile("first.py", "package.first")
+
+        moduleFinder = PythonFileImportFactory.buildImport()
+
+        self.assertEqual(["package", "first"], moduleFinder.getModulesToReload())
+        self.assertEqual(2, len(moduleFinder.knownModules))
+
+    def testScopedRegistryIsolated(self):
+        with PythonFileImportFactory.scoped():
+            PythonFileImportFactory.registerFile("scoped.py", "scoped")
+
+            otherContext = contextvars.Context().run(PythonFileImportFactory.buildImport)
+            scoped = PythonFileImportFactory.buildImport()
+
+        self.assertIn("scoped", scoped.knownModules)
+        self.assertNotIn("scoped", otherContext.knownModules)
+        self.assertNotIn("scoped", PythonFileImportFactory.buildImport().knownModules)
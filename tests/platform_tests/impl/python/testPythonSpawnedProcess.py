@@ -0,0 +1,188 @@
+import os
+import shutil
+import subprocess
+import sys
+import unittest
+from unittest.mock import MagicMock
+
+from autograder_platform.Executors.Environment import ExecutionEnvironment, ExecutionEnvironmentBuilder, getResults
+from autograder_platform.Executors.Executor import Executor
+from autograder_platform.Executors.common import MissingOutputDataException
+from autograder_platform.StudentSubmissionImpl.Python import PythonSubmission
+from autograder_platform.StudentSubmissionImpl.Python.PythonEnvironment import PythonEnvironment, \
+    PythonEnvironmentBuilder, PythonResults
+from autograder_platform.StudentSubmissionImpl.Python.PythonSpawnedProcess import SpawnedSubmissionProcess
+from autograder_platform.StudentSubmissionImpl.Python.Runners import PythonRunnerBuilder
+from autograder_platform.TestingFramework.SingleFunctionMock import SingleFunctionMock
+from autograder_platform.config.Config import AutograderConfigurationProvider
+
+
+@unittest.skipUnless(SpawnedSubmissionProcess.isSupported(), "posix_spawn is not supported on this platform")
+class TestPythonSpawnedProcess(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        configMock = MagicMock()
+        configMock.config.python.buffer_size = 2 ** 16
+        configMock.config.python.use_zygote = False
+        configMock.config.python.preload_modules = []
+        AutograderConfigurationProvider.set(configMock)
+
+    @classmethod
+    def tearDownClass(cls):
+        AutograderConfigurationProvider.reset()
+
+    def setUp(self) -> None:
+        self.submission = PythonSubmission()
+
+    def tearDown(self) -> None:
+        if os.path.exists(ExecutionEnvironment.sandbox_location):
+            shutil.rmtree(ExecutionEnvironment.sandbox_location)
+
+    def setProgram(self, program: str):
+        code = compile(program, "test_code", "exec")
+        self.submission.getExecutableSubmission = lambda: code
+
+    @staticmethod
+    def buildEnvironment(stdin=None, timeout: int = 10, builder=lambda x: x) \
+            -> ExecutionEnvironment[PythonEnvironment, PythonResults]:
+        return ExecutionEnvironmentBuilder[PythonEnvironment, PythonResults]() \
+            .setStdin(stdin if stdin is not None else []) \
+            .setTimeout(timeout) \
+            .setImplEnvironment(PythonEnvironmentBuilder,
+                                lambda x: builder(x.setUseSpawnedProcess()).build()) \
+            .build()
+
+    def testStdIO(self):
+        self.setProgram(
+            "first = input()\n"
+            "second = input()\n"
+            "print('OUTPUT', first)\n"
+            "print('not output')\n"
+            "print('OUTPUT', second)\n")
+
+        environment = self.buildEnvironment(["a", "b"])
+        runner = PythonRunnerBuilder(self.submission).setEntrypoint(module=True).build()
+
+        self.assertTrue(SpawnedSubmissionProcess.canSpawn(environment, runner))
+
+        Executor.execute(environment, runner)
+
+        self.assertEqual(["a", "b"], getResults(environment).stdout)
+
+    def testFilesWritten(self):
+        self.setProgram(
+            "with open('out.txt', 'w') as w:\n"
+            "    w.write('written')\n")
+
+        environment = self.buildEnvironment()
+
+        Executor.execute(environment, PythonRunnerBuilder(self.submission).setEntrypoint(module=True).build())
+
+        self.assertEqual("written", getResults(environment).file_out["out.txt"])
+
+    def testException(self):
+        self.setProgram("raise ValueError('bad value')\n")
+
+        environment = self.buildEnvironment()
+
+        Executor.execute(environment, PythonRunnerBuilder(self.submission).setEntrypoint(module=True).build(),
+                         raiseExceptions=False)
+
+        exception = getResults(environment).exception
+
+        self.assertIsInstance(exception, ValueError)
+        self.assertEqual("bad value", str(exception))
+
+    def testSubmissionExceptionDescribed(self):
+        self.setProgram(
+            "class StudentError(Exception):\n"
+            "    pass\n"
+            "raise StudentError('custom')\n")
+
+        environment = self.buildEnvironment()
+
+        Executor.execute(environment, PythonRunnerBuilder(self.submission).setEntrypoint(module=True).build(),
+                         raiseExceptions=False)
+
+        self.assertIn("StudentError: custom", str(getResults(environment).exception))
+
+    def testTimeout(self):
+        self.setProgram(
+            "while True:\n"
+            "    pass\n")
+
+        environment = self.buildEnvironment(timeout=1)
+
+        Executor.execute(environment, PythonRunnerBuilder(self.submission).setEntrypoint(module=True).build(),
+                         raiseExceptions=False)
+
+        self.assertIsInstance(getResults(environment).exception, TimeoutError)
+
+    def testExitIsMissingOutput(self):
+        self.setProgram("exit(0)\n")
+
+        environment = self.buildEnvironment()
+
+        Executor.execute(environment, PythonRunnerBuilder(self.submission).setEntrypoint(module=True).build(),
+                         raiseExceptions=False)
+
+        self.assertIsInstance(getResults(environment).exception, MissingOutputDataException)
+
+    def testModuleMock(self):
+        self.setProgram(
+            "import json\n"
+            "json.dumps([1, 2])\n")
+
+        dumpsMock = SingleFunctionMock("dumps")
+
+        environment = self.buildEnvironment(builder=lambda x: x.addModuleMock("json", {"json.dumps": dumpsMock}))
+
+        runner = PythonRunnerBuilder(self.submission) \
+            .subscribeToMock("json.dumps") \
+            .setEntrypoint(module=True) \
+            .build()
+
+        Executor.execute(environment, runner)
+
+        getResults(environment).impl_results.mocks["json.dumps"].assertCalledWith([1, 2])
+
+    def testFunctionEntrypointNotSpawned(self):
+        self.setProgram("def run():\n    return 1\n")
+
+        environment = self.buildEnvironment()
+        runner = PythonRunnerBuilder(self.submission).setEntrypoint(function="run").build()
+
+        self.assertFalse(SpawnedSubmissionProcess.canSpawn(environment, runner))
+
+        Executor.execute(environment, runner)
+
+        self.assertEqual(1, getResults(environment).return_val)
+
+    def testStdoutBounded(self):
+        self.setProgram(
+            "for i in range(1000):\n"
+            "    print('debugging', i)\n"
+            "print('OUTPUT done')\n")
+
+        environment = self.buildEnvironment(builder=lambda x: x.setMaxCapturedStdout(50))
+
+        Executor.execute(environment, PythonRunnerBuilder(self.submission).setEntrypoint(module=True).build())
+
+        self.assertEqual(["done"], getResults(environment).stdout)
+        self.assertTrue(getResults(environment).impl_results.output.truncated)
+        self.assertEqual(1001, getResults(environment).impl_results.output.line_count)
+
+
+class TestPythonSpawnedProcessImport(unittest.TestCase):
+    def testImportWithoutFcntl(self):
+        # ie: windows. This is run in a new interpreter so that the modules that are already imported aren't affected
+        program = \
+            "import sys\n" \
+            "sys.modules['fcntl'] = None\n" \
+            "import autograder_platform.StudentSubmissionImpl.Python\n" \
+            "from autograder_platform.StudentSubmissionImpl.Python.PythonSpawnedProcess import SpawnedSubmissionProcess\n" \
+            "assert not SpawnedSubmissionProcess.isSupported()\n"
+
+        result = subprocess.run([sys.executable, "-c", program], capture_output=True, text=True)
+
+        self.assertEqual(0, result.returncode, result.stderr)
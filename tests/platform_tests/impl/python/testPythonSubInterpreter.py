@@ -0,0 +1,208 @@
+import os
+import shutil
+import time
+import unittest
+from concurrent.futures import CancelledError
+from unittest.mock import MagicMock
+
+from autograder_platform.Executors.Environment import ExecutionEnvironment, ExecutionEnvironmentBuilder, getResults
+from autograder_platform.Executors.Executor import Executor
+from autograder_platform.StudentSubmissionImpl.Python import PythonSubmission
+from autograder_platform.StudentSubmissionImpl.Python.PythonEnvironment import PythonEnvironment, \
+    PythonEnvironmentBuilder, PythonResults
+from autograder_platform.StudentSubmissionImpl.Python.PythonSubInterpreter import PythonSubInterpreterPool, \
+    SubInterpreterSubmissionProcess
+from autograder_platform.StudentSubmissionImpl.Python.Runners import PythonRunnerBuilder
+from autograder_platform.StudentSubmissionImpl.Python.SharedMemoryPool import SharedMemoryPool
+from autograder_platform.config.Config import AutograderConfigurationProvider
+
+
+@unittest.skipUnless(PythonSubInterpreterPool.isSupported(), "Sub-interpreters are not supported by this interpreter")
+class TestPythonSubInterpreter(unittest.TestCase):
+    PROGRAM = \
+        "import sys\n" \
+        "calls = []\n" \
+        "def double(x):\n" \
+        "    calls.append(x)\n" \
+        "    print('OUTPUT', x)\n" \
+        "    return x * 2\n" \
+        "def getCalls():\n" \
+        "    calls.append(None)\n" \
+        "    return len(calls)\n" \
+        "def spin():\n" \
+        "    while True:\n" \
+        "        try:\n" \
+        "            pass\n" \
+        "        except BaseException:\n" \
+        "            pass\n" \
+        "def write():\n" \
+        "    with open('sub_interpreter_out.txt', 'w') as w:\n" \
+        "        w.write('data')\n" \
+        "def block():\n" \
+        "    import time\n" \
+        "    time.sleep(3)\n"
+
+    @classmethod
+    def setUpClass(cls):
+        configMock = MagicMock()
+        configMock.config.python.buffer_size = 2 ** 16
+        configMock.config.python.use_zygote = False
+        configMock.config.python.preload_modules = []
+        AutograderConfigurationProvider.set(configMock)
+
+    @classmethod
+    def tearDownClass(cls):
+        AutograderConfigurationProvider.reset()
+        PythonSubInterpreterPool.clear()
+
+    def setUp(self) -> None:
+        self.submission = PythonSubmission()
+        code = compile(self.PROGRAM, "test_code", "exec")
+        self.submission.getExecutableSubmission = lambda: code
+
+    def tearDown(self) -> None:
+        if os.path.exists(ExecutionEnvironment.sandbox_location):
+            shutil.rmtree(ExecutionEnvironment.sandbox_location)
+
+    @staticmethod
+    def buildEnvironment(timeout: int = 10, useSubInterpreter: bool = True) \
+            -> ExecutionEnvironment[PythonEnvironment, PythonResults]:
+        return ExecutionEnvironmentBuilder[PythonEnvironment, PythonResults]() \
+            .setTimeout(timeout) \
+            .setImplEnvironment(PythonEnvironmentBuilder,
+                                lambda builder: builder.setUseSubInterpreter(useSubInterpreter).build()) \
+            .build()
+
+    def buildRunner(self, function: str, *parameters):
+        builder = PythonRunnerBuilder(self.submission).setEntrypoint(function=function)
+
+        for parameter in parameters:
+            builder.addParameter(parameter)
+
+        return builder.build()
+
+    def testFunctionRunInSubInterpreter(self):
+        environment = self.buildEnvironment()
+        runner = self.buildRunner("double", 21)
+
+        self.assertTrue(SubInterpreterSubmissionProcess.canRun(environment, runner))
+
+        Executor.execute(environment, runner)
+
+        self.assertEqual(42, getResults(environment).return_val)
+        self.assertEqual(["21"], getResults(environment).stdout)
+
+    def testSubInterpreterReused(self):
+        Executor.execute(self.buildEnvironment(), self.buildRunner("double", 1))
+
+        reused = PythonSubInterpreterPool.reused
+
+        environment = self.buildEnvironment()
+        Executor.execute(environment, self.buildRunner("getCalls"))
+
+        self.assertEqual(reused + 1, PythonSubInterpreterPool.reused)
+        # the submission is imported again for each run, so the first run's calls are gone
+        self.assertEqual(1, getResults(environment).return_val)
+
+    def testTimeoutInterruptsSubmission(self):
+        start = time.monotonic()
+
+        with self.assertRaises(AssertionError) as error:
+            Executor.execute(self.buildEnvironment(timeout=1), self.buildRunner("spin"))
+
+        self.assertIn("TimeoutError", str(error.exception))
+        self.assertLess(time.monotonic() - start, 1 + SubInterpreterSubmissionProcess.INTERRUPT_GRACE)
+
+        # the interrupted sub-interpreter is still able to be used
+        environment = self.buildEnvironment()
+        Executor.execute(environment, self.buildRunner("double", 2))
+
+        self.assertEqual(4, getResults(environment).return_val)
+
+    def testCancelInterruptsSubmission(self):
+        future = Executor.executeInBackground(self.buildEnvironment(timeout=60), self.buildRunner("spin"))
+
+        time.sleep(.5)
+
+        start = time.monotonic()
+        self.assertTrue(future.cancel())
+
+        with self.assertRaises(CancelledError):
+            future.result(timeout=10)
+
+        self.assertLess(time.monotonic() - start, 10)
+
+    def testBatchWithCallTimeout(self):
+        runner = PythonRunnerBuilder(self.submission) \
+            .setEntrypoint(function="double") \
+            .addParameterSet([1]) \
+            .addParameterSet([2]) \
+            .setCallTimeout(2) \
+            .build()
+
+        environment = self.buildEnvironment()
+
+        self.assertTrue(SubInterpreterSubmissionProcess.canRun(environment, runner))
+
+        Executor.execute(environment, runner)
+
+        callResults = getResults(environment).return_val
+
+        # the alarm isn't able to be set in a sub-interpreter, so the calls are only bounded by the overall timeout
+        self.assertEqual([None, None], [callResult["exception"] for callResult in callResults])
+        self.assertEqual([2, 4], [callResult["return_val"] for callResult in callResults])
+
+    def testFallsBackWhenNotEnabled(self):
+        self.assertFalse(SubInterpreterSubmissionProcess.canRun(self.buildEnvironment(useSubInterpreter=False),
+                                                                self.buildRunner("double", 1)))
+
+    def testFallsBackForFiles(self):
+        environment = self.buildEnvironment()
+        environment.files = {"data.txt": "data.txt"}
+
+        self.assertFalse(SubInterpreterSubmissionProcess.canRun(environment, self.buildRunner("double", 1)))
+
+    def testFallsBackForModuleEntrypoint(self):
+        runner = PythonRunnerBuilder(self.submission).setEntrypoint(module=True).build()
+
+        self.assertFalse(SubInterpreterSubmissionProcess.canRun(self.buildEnvironment(), runner))
+
+    def testProcessAfterSubInterpreter(self):
+        Executor.execute(self.buildEnvironment(), self.buildRunner("double", 1))
+
+        # forking while sub-interpreters exist hangs the child on 3.11, so the pool must be emptied first
+        environment = self.buildEnvironment(timeout=5, useSubInterpreter=False)
+        Executor.execute(environment, self.buildRunner("double", 3))
+
+        self.assertEqual(6, getResults(environment).return_val)
+        self.assertEqual([], PythonSubInterpreterPool.idle)
+
+    def testFileSystemGuarded(self):
+        with self.assertRaises(AssertionError) as error:
+            Executor.execute(self.buildEnvironment(), self.buildRunner("write"))
+
+        self.assertIn("PermissionError", str(error.exception))
+        self.assertFalse(os.path.exists("sub_interpreter_out.txt"))
+
+        # the guard is only active while the runner is running
+        environment = self.buildEnvironment()
+        Executor.execute(environment, self.buildRunner("double", 2))
+
+        self.assertEqual(4, getResults(environment).return_val)
+
+    def testAbandonedChannelsHeldUntilDestroyed(self):
+        SharedMemoryPool.clear()
+
+        with self.assertRaises(AssertionError):
+            Executor.execute(self.buildEnvironment(timeout=1), self.buildRunner("block"))
+
+        # the run is still sleeping, and it will write to its channels once it stops
+        self.assertEqual(1, PythonSubInterpreterPool.abandoned)
+        self.assertEqual(0, SharedMemoryPool.getIdleCount())
+
+        deadline = time.monotonic() + 10
+        while PythonSubInterpreterPool.abandoned and time.monotonic() < deadline:
+            time.sleep(.1)
+
+        self.assertEqual(0, PythonSubInterpreterPool.abandoned)
+        self.assertEqual(2, SharedMemoryPool.getIdleCount())
@@ -1,19 +1,25 @@
 import shutil
+import signal
+from typing import List
 from importlib import import_module
 import os
 import unittest
+import threading
 
 from autograder_platform.StudentSubmissionImpl.Python import PythonSubmission
 from autograder_platform.StudentSubmissionImpl.Python.PythonEnvironment import PythonEnvironment, PythonResults
 
 from autograder_platform.StudentSubmissionImpl.Python.PythonSubmissionProcess import RunnableStudentSubmission
 from autograder_platform.Executors.Environment import ExecutionEnvironment, Results, getResults
-from autograder_platform.StudentSubmissionImpl.Python.Runners import PythonRunnerBuilder, Parameter
+from autograder_platform.StudentSubmissionImpl.Python.Runners import PythonRunnerBuilder, Parameter, PythonTaskLibrary
 from autograder_platform.Tasks.TaskRunner import TaskRunner
 from autograder_platform.TestingFramework.SingleFunctionMock import SingleFunctionMock
-from autograder_platform.StudentSubmission.common import MissingFunctionDefinition
-from autograder_platform.Executors.common import MissingOutputDataException
+from autograder_platform.StudentSubmission.common import InvalidRunner, MissingFunctionDefinition
+from autograder_platform.Executors.common import CorruptOutputDataException, MissingOutputDataException
 from autograder_platform.StudentSubmissionImpl.Python.PythonModuleMockImportFactory import MockedModuleFinder
+from autograder_platform.StudentSubmissionImpl.Python.common import PythonCallResult, SerializationMethod
+from autograder_platform.StudentSubmissionImpl.Python.Serializer import FastPathSerializer
+from autograder_platform.StudentSubmissionImpl.Python.OutOfBandBuffers import OutOfBandWriter
 
 
 class TestPythonSubmissionProcess(unittest.TestCase):
@@ -54,6 +60,32 @@ class TestPythonSubmissionProcess(unittest.TestCase):
 
         self.assertEqual(self.environment.stdin, results.stdout)
 
+    def testStdoutBoundedAndFiltered(self):
+        program = \
+            "for i in range(10000):\n" \
+            "    print('debugging', i)\n" \
+            "print('OUTPUT done')\n"
+
+        self.submission.getExecutableSubmission = lambda: compile(program, "test_code", "exec")
+        runner = PythonRunnerBuilder(self.submission) \
+            .setEntrypoint(module=True) \
+            .build()
+
+        self.environment.impl_environment.max_captured_stdout = 100
+
+        results = self.runSubmission(runner)
+
+        self.assertEqual(["done"], results.stdout)
+
+        output = results.impl_results.output
+
+        self.assertTrue(output.truncated)
+        self.assertTrue(output.captured.startswith("debugging 0\n"))
+        self.assertLessEqual(len(output.captured), 100 + len("\n[output truncated]\n"))
+        self.assertEqual(10001, output.line_count)
+        self.assertEqual(sum(len(f"debugging {i}\n") for i in range(10000)) + len("OUTPUT done\n"),
+                         output.byte_count)
+
     def testStdIOWithMain(self):
         program = \
             "if __name__ == '__main__':\n" \
@@ -341,7 +373,7 @@ class TestPythonSubmissionProcess(unittest.TestCase):
         runnableSubmission = RunnableStudentSubmission()
         runnableSubmission.setup(self.environment, runner)
         runnableSubmission.run()
-        memToDeallocate = runnableSubmission.inputSharedMem, runnableSubmission.outputSharedMem
+        memToDeallocate = runnableSubmission.inputChannel, runnableSubmission.outputChannel
 
         runnableSubmission.setup(self.environment, runner)
         runnableSubmission.run()
@@ -546,10 +578,10 @@ class TestPythonSubmissionProcess(unittest.TestCase):
 
         self.assertIn("Failed to map 'autowireMe'", exceptionText)
 
-    def testOverrunDataBuffer(self):
+    def testOverrunDataBufferSpills(self):
         program = \
             "def runMe():" \
-            f"   return bytearray({self.environment.impl_environment.buffer_size + 1})"
+            f"   return 'a' * {self.environment.impl_environment.buffer_size + 1}"
 
 
         self.submission.getExecutableSubmission = lambda: compile(program, "test_code", "exec")
@@ -559,7 +591,238 @@ class TestPythonSubmissionProcess(unittest.TestCase):
 
         results: Results = self.runSubmission(runner)
 
-        self.assertIsNotNone(results.exception)
+        self.assertIsNone(results.exception)
+        self.assertEqual(self.environment.impl_environment.buffer_size + 1, len(results.return_val))  # type: ignore
 
-        with self.assertRaises(MissingOutputDataException):
-            raise results.exception
+    def testLargeBufferReturnedOutOfBand(self):
+        program = \
+            "def runMe():\n" \
+            f"    return bytearray(b'a' * {FastPathSerializer.OUT_OF_BAND_THRESHOLD * 4})\n"
+
+        self.submission.getExecutableSubmission = lambda: compile(program, "test_code", "exec")
+        runner = PythonRunnerBuilder(self.submission) \
+            .setEntrypoint(function="runMe") \
+            .build()
+
+        results: Results = self.runSubmission(runner)
+
+        self.assertIsNone(results.exception)
+        self.assertIsNotNone(self.runnableSubmission.outOfBandReader)
+        self.assertIn("return_val", self.runnableSubmission.outOfBandReader.fields)  # type: ignore
+        self.assertEqual(bytearray(b'a' * FastPathSerializer.OUT_OF_BAND_THRESHOLD * 4), results.return_val)
+
+    def testMissingOutOfBandFileReportedAsCorrupt(self):
+        program = \
+            "def runMe():\n" \
+            f"    return bytearray(b'a' * {FastPathSerializer.OUT_OF_BAND_THRESHOLD})\n"
+
+        self.submission.getExecutableSubmission = lambda: compile(program, "test_code", "exec")
+        runner = PythonRunnerBuilder(self.submission) \
+            .setEntrypoint(function="runMe") \
+            .build()
+
+        self.runnableSubmission.setup(self.environment, runner)
+        self.runnableSubmission.run()
+
+        outputChannel = self.runnableSubmission.outputChannel
+        os.remove(OutOfBandWriter.buildPath(outputChannel.owner, outputChannel.name))  # type: ignore
+
+        self.runnableSubmission.cleanup()
+
+        self.assertIsInstance(self.runnableSubmission.exception, CorruptOutputDataException)
+        # the channels are still given back
+        self.assertIsNone(self.runnableSubmission.inputChannel)
+        self.assertIsNone(self.runnableSubmission.outputChannel)
+
+    def testPlainReturnUsesPickle(self):
+        program = \
+            "def runMe():\n" \
+            "    return [1, 2, 3]\n"
+
+        self.submission.getExecutableSubmission = lambda: compile(program, "test_code", "exec")
+        runner = PythonRunnerBuilder(self.submission) \
+            .setEntrypoint(function="runMe") \
+            .build()
+
+        results: Results = self.runSubmission(runner)
+
+        self.assertEqual([1, 2, 3], results.return_val)
+        self.assertEqual(SerializationMethod.PICKLE,
+                         self.runnableSubmission.getSerializationMethods()["return_val"])
+
+    def testStudentFunctionReturnUsesDill(self):
+        program = \
+            "def addOne(x):\n" \
+            "    return x + 1\n\n" \
+            "def runMe():\n" \
+            "    return addOne\n"
+
+        self.submission.getExecutableSubmission = lambda: compile(program, "test_code", "exec")
+        runner = PythonRunnerBuilder(self.submission) \
+            .setEntrypoint(function="runMe") \
+            .build()
+
+        results: Results = self.runSubmission(runner)
+
+        self.assertEqual(2, results.return_val(1))  # type: ignore
+        self.assertEqual(SerializationMethod.DILL,
+                         self.runnableSubmission.getSerializationMethods()["return_val"])
+
+    def testBatchParameterSets(self):
+        program = \
+            "def add(a, b):\n" \
+            "    print('OUTPUT', a + b)\n" \
+            "    return a + b\n"
+
+        self.submission.getExecutableSubmission = lambda: compile(program, "test_code", "exec")
+        runner = PythonRunnerBuilder(self.submission) \
+            .setEntrypoint(function="add") \
+            .addParameterSet([1, 2]) \
+            .addParameterSet([Parameter(3), Parameter(4)]) \
+            .build()
+
+        results: Results = self.runSubmission(runner)
+
+        callResults: List[PythonCallResult] = results.return_val  # type: ignore
+
+        self.assertEqual([3, 7], [callResult["return_val"] for callResult in callResults])
+        self.assertEqual([["3"], ["7"]], [callResult["stdout"] for callResult in callResults])
+        self.assertEqual((3, 4), callResults[1]["parameters"])
+        self.assertEqual(["3", "7"], results.stdout)
+
+    def testBatchExceptionOnlyFailsCall(self):
+        program = \
+            "def divide(a, b):\n" \
+            "    return a / b\n"
+
+        self.submission.getExecutableSubmission = lambda: compile(program, "test_code", "exec")
+        runner = PythonRunnerBuilder(self.submission) \
+            .setEntrypoint(function="divide") \
+            .addParameterSet([1, 0]) \
+            .addParameterSet([4, 2]) \
+            .build()
+
+        results: Results = self.runSubmission(runner)
+
+        callResults: List[PythonCallResult] = results.return_val  # type: ignore
+
+        self.assertIsNone(results.exception)
+        self.assertIsInstance(callResults[0]["exception"], ZeroDivisionError)
+        self.assertEqual(2, callResults[1]["return_val"])
+
+    def testBatchExitOnlyFailsCall(self):
+        program = \
+            "import sys\n" \
+            "def check(a):\n" \
+            "    if a == 0:\n" \
+            "        sys.exit(1)\n" \
+            "    if a == 1:\n" \
+            "        raise KeyboardInterrupt()\n" \
+            "    return a\n"
+
+        self.submission.getExecutableSubmission = lambda: compile(program, "test_code", "exec")
+        runner = PythonRunnerBuilder(self.submission) \
+            .setEntrypoint(function="check") \
+            .addParameterSet([0]) \
+            .addParameterSet([1]) \
+            .addParameterSet([2]) \
+            .build()
+
+        results: Results = self.runSubmission(runner)
+
+        callResults: List[PythonCallResult] = results.return_val  # type: ignore
+
+        self.assertIsNone(results.exception)
+        self.assertIsInstance(callResults[0]["exception"], SystemExit)
+        self.assertIsInstance(callResults[1]["exception"], KeyboardInterrupt)
+        self.assertEqual(2, callResults[2]["return_val"])
+
+    @unittest.skipUnless(hasattr(signal, "setitimer"), "Per call timeouts require SIGALRM")
+    def testBatchCallTimeout(self):
+        program = \
+            "def spin(n):\n" \
+            "    while n:\n" \
+            "        pass\n" \
+            "    return n\n"
+
+        self.submission.getExecutableSubmission = lambda: compile(program, "test_code", "exec")
+        runner = PythonRunnerBuilder(self.submission) \
+            .setEntrypoint(function="spin") \
+            .addParameterSet([1]) \
+            .addParameterSet([0]) \
+            .setCallTimeout(.25) \
+            .build()
+
+        results: Results = self.runSubmission(runner)
+
+        callResults: List[PythonCallResult] = results.return_val  # type: ignore
+
+        self.assertIsInstance(callResults[0]["exception"], TimeoutError)
+        self.assertEqual(0, callResults[1]["return_val"])
+
+    def testCallTimeoutOffMainThread(self):
+        results = []
+
+        thread = threading.Thread(target=lambda: results.append(PythonTaskLibrary.callWithTimeout(lambda: 1, .25)))
+        thread.start()
+        thread.join()
+
+        # only the main thread is able to handle the alarm, so the call isn't bounded, but it still runs
+        self.assertEqual([1], results)
+
+    def testBatchIsolateCalls(self):
+        program = \
+            "calls = []\n" \
+            "def addCall():\n" \
+            "    calls.append(1)\n" \
+            "    return len(calls)\n"
+
+        self.submission.getExecutableSubmission = lambda: compile(program, "test_code", "exec")
+        builder = PythonRunnerBuilder(self.submission) \
+            .setEntrypoint(function="addCall") \
+            .addParameterSet([]) \
+            .addParameterSet([])
+
+        results: Results = self.runSubmission(builder.build())
+        self.assertEqual([1, 2], [callResult["return_val"] for callResult in results.return_val])  # type: ignore
+
+        self.runnableSubmission = RunnableStudentSubmission()
+        results = self.runSubmission(builder.setIsolateCalls().build())
+        self.assertEqual([1, 1], [callResult["return_val"] for callResult in results.return_val])  # type: ignore
+
+    def testBatchMocksResetBetweenCalls(self):
+        program = \
+            "def callMock(times):\n" \
+            "    for _ in range(times):\n" \
+            "        mockMe()\n"
+
+        self.submission.getExecutableSubmission = lambda: compile(program, "test_code", "exec")
+        runner = PythonRunnerBuilder(self.submission) \
+            .setEntrypoint(function="callMock") \
+            .addMock("mockMe", SingleFunctionMock("mockMe")) \
+            .addParameterSet([2]) \
+            .addParameterSet([1]) \
+            .build()
+
+        results: Results = self.runSubmission(runner)
+
+        callResults: List[PythonCallResult] = results.return_val  # type: ignore
+
+        callResults[0]["mocks"]["mockMe"].assertCalledTimes(2)
+        callResults[1]["mocks"]["mockMe"].assertCalledTimes(1)
+
+    def testBatchInvalidRunners(self):
+        self.submission.getExecutableSubmission = lambda: compile("def runMe(a):\n    pass\n", "test_code", "exec")
+
+        with self.assertRaises(InvalidRunner):
+            PythonRunnerBuilder(self.submission) \
+                .setEntrypoint(module=True) \
+                .addParameterSet([1]) \
+                .build()
+
+        with self.assertRaises(InvalidRunner):
+            PythonRunnerBuilder(self.submission) \
+                .setEntrypoint(function="runMe") \
+                .addParameter(1) \
+                .addParameterSet([1]) \
+                .build()
@@ -0,0 +1,190 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from autograder_platform.Executors.Environment import ExecutionEnvironment, Results, getResults
+from autograder_platform.StudentSubmissionImpl.Python import PythonSubmission
+from autograder_platform.StudentSubmissionImpl.Python.PythonEnvironment import PythonEnvironment, \
+    PythonEnvironmentBuilder
+from autograder_platform.StudentSubmissionImpl.Python.PythonSubmissionProcess import RunnableStudentSubmission
+from autograder_platform.StudentSubmissionImpl.Python.PythonSubmissionTemplate import PythonSubmissionTemplate
+from autograder_platform.StudentSubmissionImpl.Python.Runners import PythonRunnerBuilder
+from autograder_platform.Tasks.TaskRunner import TaskRunner
+from autograder_platform.TestingFramework.SingleFunctionMock import SingleFunctionMock
+
+
+@unittest.skipUnless(PythonSubmissionTemplate.isSupported(), "Submission templates require fork")
+class TestPythonSubmissionTemplate(unittest.TestCase):
+    PROGRAM = \
+        "import os\n" \
+        "import random\n" \
+        "print('OUTPUT imported')\n" \
+        "IMPORTED_IN = os.getpid()\n" \
+        "calls = []\n" \
+        "def getImportedIn():\n" \
+        "    return IMPORTED_IN\n" \
+        "def addCall():\n" \
+        "    calls.append(1)\n" \
+        "    print('OUTPUT called')\n" \
+        "    return len(calls)\n" \
+        "def roll():\n" \
+        "    return random.randint(1, 6)\n" \
+        "def spin():\n" \
+        "    while True:\n" \
+        "        pass\n" \
+        "def killTemplate():\n" \
+        "    os.kill(os.getppid(), 9)\n"
+
+    def setUp(self):
+        self.submission: PythonSubmission = PythonSubmission()
+        code = compile(self.PROGRAM, "test_code", "exec")
+        self.submission.getExecutableSubmission = lambda: code
+
+        self.template = PythonSubmissionTemplate(self.submission)
+
+    def tearDown(self):
+        self.template.stop()
+
+    def runSubmission(self, runner: TaskRunner, timeout: int = 10) -> Results:
+        environment = ExecutionEnvironment()
+        environment.sandbox_location = "."
+        environment.timeout = timeout
+        environment.impl_environment = PythonEnvironment(template=self.template)
+
+        runnableSubmission = RunnableStudentSubmission()
+        runnableSubmission.setup(environment, runner)
+        self.assertIs(self.template, runnableSubmission.template)
+
+        runnableSubmission.run()
+        runnableSubmission.cleanup()
+        runnableSubmission.populateResults(environment)
+
+        return getResults(environment)
+
+    def buildRunner(self, function: str) -> TaskRunner:
+        return PythonRunnerBuilder(self.submission) \
+            .setEntrypoint(function=function) \
+            .build()
+
+    def testImportedOnce(self):
+        self.assertTrue(self.template.start())
+
+        first = self.runSubmission(self.buildRunner("getImportedIn"))
+        second = self.runSubmission(self.buildRunner("getImportedIn"))
+
+        self.assertIsNone(first.exception)
+        self.assertEqual(self.template.process.pid, first.return_val)  # type: ignore
+        self.assertEqual(self.template.process.pid, second.return_val)  # type: ignore
+
+    def testTestsAreIsolated(self):
+        self.template.start()
+
+        first = self.runSubmission(self.buildRunner("addCall"))
+        second = self.runSubmission(self.buildRunner("addCall"))
+
+        self.assertEqual(1, first.return_val)
+        self.assertEqual(1, second.return_val)
+
+    def testImportOutputIncluded(self):
+        self.template.start()
+
+        results = self.runSubmission(self.buildRunner("addCall"))
+
+        self.assertEqual(["imported", "called"], results.stdout)
+
+    def testTimeoutKillsOnlyChild(self):
+        self.template.start()
+
+        results = self.runSubmission(self.buildRunner("spin"), timeout=1)
+
+        self.assertIsInstance(results.exception, TimeoutError)
+        self.assertTrue(self.template.isRunning())
+
+        results = self.runSubmission(self.buildRunner("addCall"))
+
+        self.assertEqual(1, results.return_val)
+
+    def testConcurrentRunsSerialized(self):
+        self.template.start()
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            results = list(pool.map(lambda _: self.runSubmission(self.buildRunner("addCall")), range(8)))
+
+        self.assertEqual([1] * 8, [result.return_val for result in results])
+        self.assertTrue(self.template.isRunning())
+        self.assertFalse(self.template.runLock.locked())
+
+    def testTemplateDiedRaisesEnvironmentError(self):
+        self.template.start()
+
+        environment = ExecutionEnvironment()
+        environment.sandbox_location = "."
+        environment.timeout = 10
+        environment.impl_environment = PythonEnvironment(template=self.template)
+
+        runnableSubmission = RunnableStudentSubmission()
+        runnableSubmission.setup(environment, self.buildRunner("killTemplate"))
+
+        try:
+            with self.assertRaises(EnvironmentError):
+                runnableSubmission.run()
+        finally:
+            runnableSubmission.cleanup()
+
+        self.assertFalse(self.template.isRunning())
+        self.assertIsNone(self.template.connection)
+
+    def testModuleEntrypointNotForked(self):
+        self.template.start()
+
+        runner = PythonRunnerBuilder(self.submission) \
+            .setEntrypoint(module=True) \
+            .build()
+
+        self.assertFalse(self.template.canRun(runner))
+
+    def testOtherSubmissionNotForked(self):
+        self.template.start()
+
+        otherSubmission = PythonSubmission()
+        otherSubmission.getExecutableSubmission = lambda: compile("def getImportedIn():\n    return 1\n", "other", "exec")
+
+        runner = PythonRunnerBuilder(otherSubmission) \
+            .setEntrypoint(function="getImportedIn") \
+            .build()
+
+        self.assertFalse(self.template.canRun(runner))
+
+    def testFailedImportStopsTemplate(self):
+        failingSubmission = PythonSubmission()
+        failingSubmission.getExecutableSubmission = lambda: compile("raise ValueError()\n", "failing", "exec")
+
+        template = PythonSubmissionTemplate(failingSubmission)
+
+        self.assertFalse(template.start())
+        self.assertFalse(template.isRunning())
+
+    def testDifferentModuleMocksNotForked(self):
+        self.template.start()
+
+        environment = ExecutionEnvironment()
+        environment.sandbox_location = "."
+        environment.timeout = 10
+        environment.impl_environment = PythonEnvironmentBuilder() \
+            .addModuleMock("random", {"random.randint": SingleFunctionMock("randint", [-1])}) \
+            .setTemplate(self.template) \
+            .build()
+
+        runner = self.buildRunner("roll")
+
+        self.assertFalse(self.template.canRun(runner, environment.impl_environment.import_loader))
+
+        runnableSubmission = RunnableStudentSubmission()
+        runnableSubmission.setup(environment, runner)
+        self.assertIsNone(runnableSubmission.template)
+
+        runnableSubmission.run()
+        runnableSubmission.cleanup()
+        runnableSubmission.populateResults(environment)
+
+        # the template imported the real random module, so forking from it would ignore the mock
+        self.assertEqual(-1, getResults(environment).return_val)
@@ -0,0 +1,127 @@
+import unittest
+from unittest.mock import patch
+
+from autograder_platform.Executors.Environment import ExecutionEnvironment, Results, getResults
+from autograder_platform.StudentSubmissionImpl.Python import PythonSubmission
+from autograder_platform.StudentSubmissionImpl.Python.PythonEnvironment import PythonEnvironment
+from autograder_platform.StudentSubmissionImpl.Python.PythonSubmissionProcess import RunnableStudentSubmission
+from autograder_platform.StudentSubmissionImpl.Python.PythonZygote import PythonZygote
+from autograder_platform.StudentSubmissionImpl.Python.Runners import PythonRunnerBuilder
+from autograder_platform.Tasks.TaskRunner import TaskRunner
+
+
+@unittest.skipUnless(PythonZygote.isSupported(), "Zygote is not supported on this platform")
+class TestPythonZygote(unittest.TestCase):
+    PRELOAD_MODULES = ["fractions", "this_module_does_not_exist"]
+
+    @classmethod
+    def setUpClass(cls):
+        # the zygote can't be restarted, so every test shares the one that is started here
+        PythonZygote.start(cls.PRELOAD_MODULES)
+
+    def setUp(self):
+        self.environment = ExecutionEnvironment()
+        self.environment.sandbox_location = "."
+        self.environment.impl_environment = PythonEnvironment()
+        self.environment.impl_environment.use_zygote = True
+        self.environment.impl_environment.preload_modules = self.PRELOAD_MODULES
+        self.submission: PythonSubmission = PythonSubmission()
+
+    def runSubmission(self, runner: TaskRunner, useful: bool = True) -> Results:
+        runnableSubmission = RunnableStudentSubmission()
+
+        # the zygote is only used where the default start method doesn't fork
+        with patch.object(PythonZygote, "isUseful", return_value=useful):
+            runnableSubmission.setup(self.environment, runner)
+
+        runnableSubmission.run()
+        runnableSubmission.cleanup()
+
+        runnableSubmission.populateResults(self.environment)
+
+        return getResults(self.environment)
+
+    def testStdIO(self):
+        program = \
+            "userIn = input()\n" \
+            "print('OUTPUT', userIn)\n"
+
+        self.submission.getExecutableSubmission = lambda: compile(program, "test_code", "exec")
+        runner = PythonRunnerBuilder(self.submission) \
+            .setEntrypoint(module=True) \
+            .build()
+
+        self.environment.stdin = ["this is input"]
+
+        results = self.runSubmission(runner)
+
+        self.assertTrue(PythonZygote.isRunning())
+        self.assertEqual(self.environment.stdin, results.stdout)
+
+    def testNotUsedWhenForking(self):
+        program = \
+            "print('OUTPUT', input())\n"
+
+        self.submission.getExecutableSubmission = lambda: compile(program, "test_code", "exec")
+        runner = PythonRunnerBuilder(self.submission) \
+            .setEntrypoint(module=True) \
+            .build()
+
+        self.environment.stdin = ["this is input"]
+
+        with patch.object(PythonZygote, "start") as start:
+            results = self.runSubmission(runner, useful=False)
+
+        start.assert_not_called()
+        self.assertEqual(self.environment.stdin, results.stdout)
+
+    def testPreloadedModuleAvailable(self):
+        program = \
+            "import sys\n" \
+            "def runMe():\n" \
+            "    return 'fractions' in sys.modules\n"
+
+        self.submission.getExecutableSubmission = lambda: compile(program, "test_code", "exec")
+        runner = PythonRunnerBuilder(self.submission) \
+            .setEntrypoint(function="runMe") \
+            .build()
+
+        results = self.runSubmission(runner)
+
+        self.assertIsNone(results.exception)
+        self.assertTrue(results.return_val)
+
+    def testNotRestartedWithNewModules(self):
+        PythonZygote.start(["colorsys"])
+
+        self.assertEqual(self.PRELOAD_MODULES, PythonZygote.preloadModules)
+
+    def testMissingPreloadedModuleIgnored(self):
+        program = \
+            "def runMe():\n" \
+            "    return 1\n"
+
+        self.submission.getExecutableSubmission = lambda: compile(program, "test_code", "exec")
+        runner = PythonRunnerBuilder(self.submission) \
+            .setEntrypoint(function="runMe") \
+            .build()
+
+        results = self.runSubmission(runner)
+
+        self.assertEqual(1, results.return_val)
+
+    def testTerminateInfiniteLoop(self):
+        program = \
+            "while True:\n" \
+            "    pass\n"
+
+        self.submission.getExecutableSubmission = lambda: compile(program, "test_code", "exec")
+        runner = PythonRunnerBuilder(self.submission) \
+            .setEntrypoint(module=True) \
+            .build()
+
+        self.environment.timeout = 1
+
+        results = self.runSubmission(runner)
+
+        self.assertIsInstance(results.exception, TimeoutError)
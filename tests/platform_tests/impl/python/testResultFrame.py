@@ -0,0 +1,63 @@
+import unittest
+
+import dill
+
+from autograder_platform.Executors.common import CorruptOutputDataException
+from autograder_platform.StudentSubmissionImpl.Python.ResultFrame import ResultFrame
+
+
+class TestResultFrame(unittest.TestCase):
+    def setUp(self) -> None:
+        self.data = {
+            "stdout": ["OUTPUT 1", "OUTPUT 2"],
+            "parameters": (1, 2),
+            "return_val": [1, 2, 3],
+            "exception": None,
+            "mocks": {},
+            "buffers": None,
+        }
+
+        self.encoded = ResultFrame.encode({field: dill.dumps(value) for field, value in self.data.items()})
+
+    def testRoundTrip(self):
+        frame = ResultFrame(self.encoded)
+
+        for field, value in self.data.items():
+            self.assertEqual(value, frame.decode(field, dill.loads))
+
+    def testOnlyAccessedFieldsDecoded(self):
+        frame = ResultFrame(self.encoded)
+
+        frame.decode("return_val", dill.loads)
+
+        self.assertEqual(["return_val"], list(frame.decoded.keys()))
+
+    def testGetFieldIsView(self):
+        frame = ResultFrame(self.encoded)
+
+        self.assertIsInstance(frame.getField("stdout"), memoryview)
+
+    def testMissingField(self):
+        frame = ResultFrame(self.encoded)
+
+        with self.assertRaises(AttributeError):
+            frame.getField("does_not_exist")
+
+    def testChecksumMismatch(self):
+        corrupted = bytearray(self.encoded)
+        corrupted[-1] ^= 0xFF
+
+        with self.assertRaises(CorruptOutputDataException):
+            ResultFrame(corrupted)
+
+    def testTruncatedFrame(self):
+        with self.assertRaises(CorruptOutputDataException):
+            ResultFrame(self.encoded[:-1])
+
+    def testInvalidHeader(self):
+        with self.assertRaises(CorruptOutputDataException):
+            ResultFrame(b"NOPE" + self.encoded[4:])
+
+    def testFrameSmallerThanHeader(self):
+        with self.assertRaises(CorruptOutputDataException):
+            ResultFrame(b"AG")
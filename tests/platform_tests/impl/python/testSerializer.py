@@ -0,0 +1,140 @@
+import os
+import pickle
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from autograder_platform.StudentSubmissionImpl.Python import Serializer
+from autograder_platform.StudentSubmissionImpl.Python.OutOfBandBuffers import OutOfBandReader, OutOfBandWriter
+from autograder_platform.StudentSubmissionImpl.Python.Serializer import AbstractSerializer, DillSerializer, FastPathSerializer
+from autograder_platform.StudentSubmissionImpl.Python.common import SerializationMethod
+
+
+class TestSerializer(unittest.TestCase):
+    def testPlainDataUsesPickle(self):
+        serializer = FastPathSerializer()
+        data = ["some", "words", 1, 2, {"a": (1, 2)}]
+
+        serialized = serializer.dumps(data)
+
+        self.assertEqual(SerializationMethod.PICKLE, serializer.getMethod(serialized))
+        self.assertEqual(data, serializer.loads(serialized))
+        self.assertEqual(1, serializer.getMethodCounts()[SerializationMethod.PICKLE])
+
+    def testLambdaFallsBackToDill(self):
+        serializer = FastPathSerializer()
+
+        serialized = serializer.dumps(lambda x: x + 1)
+
+        self.assertEqual(SerializationMethod.DILL, serializer.getMethod(serialized))
+        self.assertEqual(2, serializer.loads(serialized)(1))  # type: ignore
+        self.assertEqual(1, serializer.getMethodCounts()[SerializationMethod.DILL])
+
+    def testDillSerializerAlwaysUsesDill(self):
+        serializer = DillSerializer()
+
+        serialized = serializer.dumps([1, 2, 3])
+
+        self.assertEqual(SerializationMethod.DILL, serializer.getMethod(serialized))
+        self.assertEqual([1, 2, 3], serializer.loads(serialized))
+
+    def testLoadsFromOtherSerializer(self):
+        serialized = DillSerializer().dumps({"key": "value"})
+
+        self.assertEqual({"key": "value"}, FastPathSerializer().loads(serialized))
+
+    def testLoadsFromMemoryview(self):
+        serialized = FastPathSerializer().dumps("data")
+
+        self.assertEqual("data", AbstractSerializer.loads(memoryview(serialized)))
+
+    def testLargeBufferOutOfBand(self):
+        serializer = FastPathSerializer()
+        data = bytearray(b"a" * FastPathSerializer.OUT_OF_BAND_THRESHOLD)
+        outOfBand = []
+
+        serialized = serializer.dumps(data, outOfBand)
+
+        self.assertEqual(1, len(outOfBand))
+        self.assertLess(len(serialized), len(data))
+        self.assertEqual(data, serializer.loads(serialized, [buffer.raw() for buffer in outOfBand]))
+
+    def testSmallBufferInBand(self):
+        serializer = FastPathSerializer()
+        outOfBand = []
+
+        serialized = serializer.dumps(bytearray(b"a" * 16), outOfBand)
+
+        self.assertEqual([], outOfBand)
+        self.assertEqual(bytearray(b"a" * 16), serializer.loads(serialized))
+
+    def testOutOfBandRoundTrip(self):
+        serializer = FastPathSerializer()
+        data = {"return_val": bytearray(b"a" * FastPathSerializer.OUT_OF_BAND_THRESHOLD),
+                "parameters": (bytearray(b"b" * FastPathSerializer.OUT_OF_BAND_THRESHOLD), 1)}
+
+        writer = OutOfBandWriter()
+        serialized = {}
+
+        for field, value in data.items():
+            outOfBand = []
+            serialized[field] = serializer.dumps(value, outOfBand)
+            writer.add(field, outOfBand)
+
+        metadata = writer.write()
+        self.assertIsNotNone(metadata)
+
+        reader = OutOfBandReader(metadata, writer.path)
+
+        # the file is unlinked as soon as it is mapped
+        self.assertFalse(os.path.exists(writer.path))
+
+        for field, value in data.items():
+            self.assertEqual(value, serializer.loads(serialized[field], reader.getBuffers(field)))
+
+    def testOutOfBandPathFromMetadataIgnored(self):
+        writer = OutOfBandWriter()
+        writer.add("return_val", [pickle.PickleBuffer(bytearray(16))])
+        metadata = writer.write()
+
+        with tempfile.NamedTemporaryFile(delete=False) as victim:
+            victim.write(b"not a buffer")
+
+        try:
+            # ie: the student's code wrote its own path in to the metadata
+            metadata["path"] = victim.name  # type: ignore
+            reader = OutOfBandReader(metadata, writer.path)
+
+            self.assertTrue(os.path.exists(victim.name))
+            self.assertEqual([bytearray(16)], [bytearray(view) for view in reader.getBuffers("return_val")])  # type: ignore
+        finally:
+            os.remove(victim.name)
+
+    def testNoOutOfBandBuffers(self):
+        writer = OutOfBandWriter()
+        writer.add("return_val", [])
+
+        self.assertIsNone(writer.write())
+        self.assertIsNone(OutOfBandReader(None).getBuffers("return_val"))
+
+    def testOutOfBandPicklerOnlyForBytearrays(self):
+        serializer = FastPathSerializer()
+
+        with patch.object(Serializer, "_OutOfBandPickler", wraps=Serializer._OutOfBandPickler) as outOfBandPickler:
+            serializer.dumps(list(range(FastPathSerializer.OUT_OF_BAND_THRESHOLD)), [])
+            outOfBandPickler.assert_not_called()
+
+            serializer.dumps(bytearray(FastPathSerializer.OUT_OF_BAND_THRESHOLD), [])
+            outOfBandPickler.assert_called_once()
+
+    def testUnmappedFileDiscarded(self):
+        writer = OutOfBandWriter(channelName="agshm_1_test")
+        writer.add("return_val", [pickle.PickleBuffer(bytearray(16))])
+
+        writer.write()
+        self.assertTrue(os.path.exists(writer.path))
+
+        # ie: the child timed out before the parent read the metadata
+        OutOfBandWriter.discard(writer.owner, "agshm_1_test")
+
+        self.assertFalse(os.path.exists(writer.path))
@@ -0,0 +1,96 @@
+import os
+import tempfile
+import unittest
+
+from autograder_platform.StudentSubmissionImpl.Python.SharedMemoryChannel import SharedMemoryChannel
+
+
+class TestSharedMemoryChannel(unittest.TestCase):
+    def setUp(self) -> None:
+        self.channel = SharedMemoryChannel.create(2 ** 12)
+
+    def tearDown(self) -> None:
+        self.channel.discard()
+        self.channel.close()
+        self.channel.unlink()
+
+    def testEmptyChannel(self):
+        self.assertIsNone(self.channel.read())
+
+    def testInlineWrite(self):
+        data = b"this is some data"
+
+        self.channel.write(data)
+
+        self.assertFalse(self.channel.wasSpilled())
+        self.assertEqual(data, self.channel.read())
+
+    def testWriteExactlyCapacity(self):
+        data = b"a" * self.channel.capacity
+
+        self.channel.write(data)
+
+        self.assertFalse(self.channel.wasSpilled())
+        self.assertEqual(data, self.channel.read())
+
+    def testSpilledWrite(self):
+        data = os.urandom(self.channel.capacity * 4)
+
+        self.channel.write(data)
+
+        self.assertTrue(self.channel.wasSpilled())
+        self.assertEqual(data, self.channel.read())
+
+    def testReadFromAttachedChannel(self):
+        data = os.urandom(self.channel.capacity + 1)
+
+        attached = SharedMemoryChannel.attach(self.channel.name)
+        attached.write(data)
+        attached.close()
+
+        self.assertEqual(data, self.channel.read())
+
+    def testDiscardRemovesSpill(self):
+        self.channel.write(b"a" * (self.channel.capacity + 1))
+
+        _, length = self.channel._readHeader()
+        spillPath = self.channel._readBody(length).decode()
+
+        self.assertTrue(os.path.exists(spillPath))
+
+        self.channel.discard()
+
+        self.assertFalse(os.path.exists(spillPath))
+        self.assertIsNone(self.channel.read())
+
+    def testDiscardOnlyRemovesOwnSpill(self):
+        fd, otherPath = tempfile.mkstemp()
+        os.close(fd)
+
+        # ie: a submission that wrote someone else's path in to the channel
+        self.channel._writeBody(SharedMemoryChannel.SPILLED, otherPath.encode())
+        self.channel.discard()
+
+        self.assertTrue(os.path.exists(otherPath))
+        os.remove(otherPath)
+
+    def testDiscardRemovesPartialSpill(self):
+        # ie: the child was killed after it created the spill file, but before it wrote the header
+        with open(self.channel.spillPath, "wb") as w:
+            w.write(b"partial")
+
+        self.assertIsNone(self.channel.read())
+
+        self.channel.discard()
+
+        self.assertFalse(os.path.exists(self.channel.spillPath))
+
+    def testSpillPathOwnedByChannel(self):
+        spillPath = os.path.basename(self.channel.spillPath)
+
+        self.assertEqual(os.getpid(), SharedMemoryChannel.getOwner(spillPath, SharedMemoryChannel.SPILL_PREFIX))
+        self.assertIn(self.channel.name.lstrip("/"), spillPath)
+
+    def testChannelTooSmall(self):
+        with self.assertRaises(AttributeError):
+            SharedMemoryChannel.create(SharedMemoryChannel.HEADER.size)
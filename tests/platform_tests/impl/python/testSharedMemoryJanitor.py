@@ -0,0 +1,120 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+from autograder_platform.StudentSubmission.SubmissionProcessFactory import SubmissionProcessFactory
+from autograder_platform.StudentSubmissionImpl.Python.SharedMemoryChannel import SharedMemoryChannel
+from autograder_platform.StudentSubmissionImpl.Python.SharedMemoryJanitor import SharedMemoryJanitor
+
+
+@unittest.skipUnless(SharedMemoryJanitor.isSupported() and os.path.isdir(SharedMemoryJanitor.SHARED_MEMORY_DIRECTORY),
+                     "Janitor is only supported on platforms with /dev/shm")
+class TestSharedMemoryJanitor(unittest.TestCase):
+    @staticmethod
+    def getDeadPid() -> int:
+        process = subprocess.Popen([sys.executable, "-c", "pass"])
+        process.wait()
+        return process.pid
+
+    def createFile(self, directory: str, name: str, size: int) -> str:
+        path = os.path.join(directory, name)
+
+        with open(path, 'wb') as w:
+            w.write(b"\0" * size)
+
+        self.createdFiles.append(path)
+
+        return path
+
+    def setUp(self) -> None:
+        self.createdFiles = []
+
+    def tearDown(self) -> None:
+        SharedMemoryJanitor.stop()
+
+        for path in self.createdFiles:
+            if os.path.exists(path):
+                os.remove(path)
+
+    def testGetOwner(self):
+        name = SharedMemoryChannel.buildName(1234)
+
+        self.assertEqual(1234, SharedMemoryChannel.getOwner(name, SharedMemoryChannel.SEGMENT_PREFIX))
+        self.assertIsNone(SharedMemoryChannel.getOwner("psm_1234", SharedMemoryChannel.SEGMENT_PREFIX))
+        self.assertEqual((1234, SharedMemoryChannel.NAMESPACE),
+                         SharedMemoryChannel.getTag(name, SharedMemoryChannel.SEGMENT_PREFIX))
+        # the segment name must fit in the 31 characters that some platforms limit it to, including the leading slash
+        self.assertLessEqual(len("/" + SharedMemoryChannel.buildName(2 ** 22)), 31)
+
+    def testChannelTaggedWithOwner(self):
+        channel = SharedMemoryChannel.create(2 ** 12)
+
+        try:
+            self.assertTrue(channel.name.startswith(SharedMemoryChannel.SEGMENT_PREFIX))
+            self.assertEqual(os.getpid(), channel.owner)
+        finally:
+            channel.close()
+            channel.unlink()
+
+    def testReclaimDeadOwner(self):
+        segment = self.createFile(SharedMemoryJanitor.SHARED_MEMORY_DIRECTORY,
+                                  SharedMemoryChannel.buildName(self.getDeadPid()), 4096)
+        spill = self.createFile(tempfile.gettempdir(),
+                                f"{SharedMemoryChannel.SPILL_PREFIX}{SharedMemoryChannel.buildTag(self.getDeadPid())}_abc",
+                                100)
+
+        reclaimed = SharedMemoryJanitor.sweep()
+
+        self.assertFalse(os.path.exists(segment))
+        self.assertFalse(os.path.exists(spill))
+        self.assertGreaterEqual(reclaimed, 4096 + 100)
+
+    def testOtherNamespaceNotReclaimed(self):
+        # ie: a segment from another container, where the PID might be a live process that we aren't able to see
+        otherNamespace = "ffffff" if SharedMemoryChannel.NAMESPACE != "ffffff" else "eeeeee"
+        segment = self.createFile(SharedMemoryJanitor.SHARED_MEMORY_DIRECTORY,
+                                  f"{SharedMemoryChannel.SEGMENT_PREFIX}{self.getDeadPid()}_{otherNamespace}_abcd", 4096)
+        untagged = self.createFile(tempfile.gettempdir(), f"{SharedMemoryChannel.SPILL_PREFIX}{self.getDeadPid()}", 100)
+
+        SharedMemoryJanitor.sweep()
+
+        self.assertTrue(os.path.exists(segment))
+        self.assertTrue(os.path.exists(untagged))
+
+    def testLiveOwnerNotReclaimed(self):
+        segment = self.createFile(SharedMemoryJanitor.SHARED_MEMORY_DIRECTORY,
+                                  SharedMemoryChannel.buildName(), 4096)
+
+        SharedMemoryJanitor.sweep()
+
+        self.assertTrue(os.path.exists(segment))
+
+    def testStartSweepsAndRunsInBackground(self):
+        segment = self.createFile(SharedMemoryJanitor.SHARED_MEMORY_DIRECTORY,
+                                  SharedMemoryChannel.buildName(self.getDeadPid()), 4096)
+
+        reclaimed = SharedMemoryJanitor.start()
+
+        self.assertFalse(os.path.exists(segment))
+        self.assertGreaterEqual(reclaimed, 4096)
+        self.assertTrue(SharedMemoryJanitor.isRunning())
+
+        SharedMemoryJanitor.stop()
+
+        self.assertFalse(SharedMemoryJanitor.isRunning())
+
+    def testStartedByStartupHooks(self):
+        import autograder_platform.StudentSubmissionImpl.Python  # noqa: F401 - registers the hooks
+
+        self.assertEqual(1, SubmissionProcessFactory.startupHooks.count(SharedMemoryJanitor.startupHook))
+
+        self.createFile(SharedMemoryJanitor.SHARED_MEMORY_DIRECTORY,
+                        SharedMemoryChannel.buildName(self.getDeadPid()), 4096)
+
+        messages = SubmissionProcessFactory.runStartupHooks(MagicMock())
+
+        self.assertTrue(any("Reclaimed" in message for message in messages))
+        self.assertTrue(SharedMemoryJanitor.isRunning())
@@ -0,0 +1,83 @@
+import os
+import unittest
+
+from autograder_platform.StudentSubmissionImpl.Python.SharedMemoryPool import SharedMemoryPool
+
+
+class TestSharedMemoryPool(unittest.TestCase):
+    def setUp(self) -> None:
+        SharedMemoryPool.clear()
+        SharedMemoryPool.configure(maxIdle=SharedMemoryPool.DEFAULT_MAX_IDLE,
+                                   idleTimeout=SharedMemoryPool.DEFAULT_IDLE_TIMEOUT)
+
+    def tearDown(self) -> None:
+        SharedMemoryPool.clear()
+        SharedMemoryPool.configure(maxIdle=SharedMemoryPool.DEFAULT_MAX_IDLE,
+                                   idleTimeout=SharedMemoryPool.DEFAULT_IDLE_TIMEOUT)
+
+    def testBucketSize(self):
+        self.assertEqual(2 ** 12, SharedMemoryPool.getBucketSize(2 ** 12))
+        self.assertEqual(2 ** 13, SharedMemoryPool.getBucketSize(2 ** 12 + 1))
+
+    def testReleasedChannelIsReused(self):
+        channel = SharedMemoryPool.acquire(2 ** 12)
+        name = channel.name
+        SharedMemoryPool.release(channel)
+
+        reused = SharedMemoryPool.acquire(2 ** 12)
+
+        self.assertEqual(name, reused.name)
+        SharedMemoryPool.release(reused)
+
+    def testReusedChannelIsEmpty(self):
+        channel = SharedMemoryPool.acquire(2 ** 12)
+        channel.write(b"some data")
+        SharedMemoryPool.release(channel)
+
+        reused = SharedMemoryPool.acquire(2 ** 12)
+
+        self.assertIsNone(reused.read())
+        SharedMemoryPool.release(reused)
+
+    def testReleaseRemovesSpill(self):
+        channel = SharedMemoryPool.acquire(2 ** 12)
+        channel.write(b"a" * (channel.capacity + 1))
+
+        _, length = channel._readHeader()
+        spillPath = channel._readBody(length).decode()
+
+        SharedMemoryPool.release(channel)
+
+        self.assertFalse(os.path.exists(spillPath))
+
+    def testDifferentBucketsNotShared(self):
+        channel = SharedMemoryPool.acquire(2 ** 12)
+        name = channel.name
+        SharedMemoryPool.release(channel)
+
+        other = SharedMemoryPool.acquire(2 ** 14)
+
+        self.assertNotEqual(name, other.name)
+        SharedMemoryPool.release(other)
+
+    def testPoolIsCapped(self):
+        SharedMemoryPool.configure(maxIdle=1)
+
+        channels = [SharedMemoryPool.acquire(2 ** 12) for _ in range(3)]
+
+        for channel in channels:
+            SharedMemoryPool.release(channel)
+
+        self.assertEqual(1, SharedMemoryPool.getIdleCount())
+
+    def testIdleChannelsReclaimed(self):
+        SharedMemoryPool.configure(idleTimeout=0)
+
+        SharedMemoryPool.release(SharedMemoryPool.acquire(2 ** 12))
+
+        self.assertEqual(1, SharedMemoryPool.reclaimIdle())
+        self.assertEqual(0, SharedMemoryPool.getIdleCount())
+
+    def testInvalidConfiguration(self):
+        with self.assertRaises(AttributeError):
+            SharedMemoryPool.configure(maxIdle=-1)
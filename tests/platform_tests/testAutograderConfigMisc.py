@@ -1,5 +1,6 @@
 from dataclasses import dataclass, field
 import os
+import threading
 import shutil
 from typing import Dict, List
 import unittest
@@ -160,3 +161,25 @@ class TestAutograderConfigurationProvider(unittest.TestCase):
         self.assertEqual(self.CONFIG, AutograderConfigurationProvider.get())
 
         AutograderConfigurationProvider.config = None
+
+    def testScopedConfig(self):
+        AutograderConfigurationProvider.set(self.CONFIG)  # type: ignore
+        scopedConfig = MockConfiguration("scoped!", 20)
+
+        with AutograderConfigurationProvider.scoped(scopedConfig):  # type: ignore
+            self.assertIs(scopedConfig, AutograderConfigurationProvider.get())
+
+        self.assertEqual(self.CONFIG, AutograderConfigurationProvider.get())
+
+        AutograderConfigurationProvider.config = None
+
+    def testScopedConfigNotSharedBetweenThreads(self):
+        scopedConfig = MockConfiguration("scoped!", 20)
+        seenInThread = []
+
+        with AutograderConfigurationProvider.scoped(scopedConfig):  # type: ignore
+            thread = threading.Thread(target=lambda: seenInThread.append(AutograderConfigurationProvider.scopedConfig.get()))
+            thread.start()
+            thread.join()
+
+        self.assertEqual([None], seenInThread)
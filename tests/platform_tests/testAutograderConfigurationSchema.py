@@ -46,6 +46,11 @@ class TestAutograderConfigurationSchema(unittest.TestCase):
         actual = schema.validate(self.configFile)
         self.assertIn("extra_packages", actual["config"]["python"])
         self.assertIn("buffer_size", actual["config"]["python"])
+        self.assertFalse(actual["config"]["python"]["use_zygote"])
+        self.assertEqual([], actual["config"]["python"]["preload_modules"])
+        self.assertIsNone(actual["config"]["python"]["package_snapshot"])
+        self.assertEqual([], actual["config"]["python"]["snapshot_packages"])
+        self.assertFalse(actual["config"]["python"]["offline_package_lookup"])
 
     def testInvalidOptionalFields(self):
         schema = self.createAutograderConfigurationSchema()
@@ -1,7 +1,7 @@
 import os
 import shutil
 import unittest
-from unittest.mock import Mock
+from unittest.mock import Mock, patch
 
 from autograder_cli.build_autograder import Build, FilesEnum
 
@@ -36,6 +36,7 @@ class TestBuildFileDiscovery(unittest.TestCase):
         self.config.build.starter_code_source = "."
         self.config.build.use_data_files = False
         self.config.build.data_files_source = self.DATA_SOURCE_ROOT
+        self.config.config.python.package_snapshot = None
 
 
     def tearDown(self) -> None:
@@ -157,5 +158,26 @@ class TestBuildFileDiscovery(unittest.TestCase):
 
         self.assertEqual(1, len(result[FilesEnum.STARTER_CODE]))
 
+    def testNoPackageSnapshot(self):
+        build = Build(self.config, ".", "./bin", "1.0.0")
+
+        with patch("autograder_platform.StudentSubmissionImpl.Python.PythonValidators.PackageValidator.buildSnapshot") as buildSnapshot:
+            build.buildPackageSnapshot()
+
+        buildSnapshot.assert_not_called()
+        self.assertEqual([], build.discoverFiles()[FilesEnum.PACKAGE_SNAPSHOT])
+
+    def testAddsPackageSnapshot(self):
+        self.config.config.python.package_snapshot = "snapshot.json"
+        self.config.config.python.extra_packages = [{"name": "numpy", "version": "1.0"}]
+        self.config.config.python.snapshot_packages = ["pandas"]
+
+        build = Build(self.config, self.SANDBOX, "./bin", "1.0.0")
+
+        with patch("autograder_platform.StudentSubmissionImpl.Python.PythonValidators.PackageValidator.buildSnapshot") as buildSnapshot:
+            build.buildPackageSnapshot()
 
+        snapshotPath = os.path.join(self.SANDBOX, "snapshot.json")
 
+        buildSnapshot.assert_called_once_with(["numpy", "pandas"], snapshotPath)
+        self.assertEqual([snapshotPath], build.discoverFiles()[FilesEnum.PACKAGE_SNAPSHOT])
@@ -0,0 +1,162 @@
+import os
+import shutil
+import stat
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from autograder_platform.Executors.DataFileStore import Capabilities, DataFileStore
+from autograder_platform.Executors.Environment import ExecutionEnvironmentBuilder
+from autograder_platform.Executors.Executor import Executor
+
+
+class TestDataFileStore(unittest.TestCase):
+    def setUp(self) -> None:
+        self.root = tempfile.mkdtemp()
+        self.sandbox = os.path.join(self.root, "sandbox")
+        os.mkdir(self.sandbox)
+
+        self.dataFile = os.path.join(self.root, "data.csv")
+        self.writeDataFile("a,b,c\n1,2,3\n")
+
+        DataFileStore.configure(self.root)
+
+    def tearDown(self) -> None:
+        DataFileStore.clear()
+
+        shutil.rmtree(self.root)
+
+    def writeDataFile(self, contents: str):
+        with open(self.dataFile, "w") as w:
+            w.write(contents)
+
+    @staticmethod
+    def readFile(path: str) -> str:
+        with open(path, "r") as r:
+            return r.read()
+
+    def testFileStoredOnce(self):
+        bytesStored = DataFileStore.bytesStored
+
+        storedPath = DataFileStore.add(self.dataFile)
+
+        self.assertEqual(storedPath, DataFileStore.add(self.dataFile))
+        self.assertEqual(bytesStored + os.path.getsize(self.dataFile), DataFileStore.bytesStored)
+        self.assertEqual(DataFileStore.hash(self.dataFile), os.path.basename(storedPath))
+
+    def testIdenticalFilesShareStorage(self):
+        otherFile = os.path.join(self.root, "other.csv")
+        shutil.copy(self.dataFile, otherFile)
+
+        self.assertEqual(DataFileStore.add(self.dataFile), DataFileStore.add(otherFile))
+
+    def testChangedSourceStoredAgain(self):
+        storedPath = DataFileStore.add(self.dataFile)
+
+        self.writeDataFile("changed, and a different size\n")
+
+        newStoredPath = DataFileStore.add(self.dataFile)
+
+        self.assertNotEqual(storedPath, newStoredPath)
+        self.assertEqual("changed, and a different size\n", self.readFile(newStoredPath))
+
+    def testSharedFileLinked(self):
+        linked = DataFileStore.linked
+        bytesCopied = DataFileStore.bytesCopied
+        dest = os.path.join(self.sandbox, "data.csv")
+
+        DataFileStore.materialize(self.dataFile, dest, shared=True)
+
+        self.assertEqual(linked + 1, DataFileStore.linked)
+        self.assertEqual(bytesCopied, DataFileStore.bytesCopied)
+        self.assertEqual(os.stat(DataFileStore.add(self.dataFile)).st_ino, os.stat(dest).st_ino)
+        self.assertFalse(os.stat(dest).st_mode & stat.S_IWUSR)
+
+    def testFileNotLinked(self):
+        dest = os.path.join(self.sandbox, "data.csv")
+
+        DataFileStore.materialize(self.dataFile, dest)
+
+        self.assertNotEqual(os.stat(DataFileStore.add(self.dataFile)).st_ino, os.stat(dest).st_ino)
+        self.assertTrue(os.stat(dest).st_mode & stat.S_IWUSR)
+
+        with open(dest, "a") as w:
+            w.write("4,5,6\n")
+
+        self.assertEqual("a,b,c\n1,2,3\n", self.readFile(DataFileStore.add(self.dataFile)))
+
+    @patch.object(DataFileStore, "_probe", return_value=Capabilities(canLink=False, canReflink=False))
+    def testCopiedWithoutStoring(self, _):
+        bytesStored = DataFileStore.bytesStored
+        copied = DataFileStore.copied
+        dest = os.path.join(self.sandbox, "data.csv")
+
+        DataFileStore.materialize(self.dataFile, dest, shared=True)
+
+        self.assertEqual("a,b,c\n1,2,3\n", self.readFile(dest))
+        self.assertEqual(copied + 1, DataFileStore.copied)
+        # nothing was hashed or stored, as it couldn't have been linked
+        self.assertEqual(bytesStored, DataFileStore.bytesStored)
+        self.assertEqual({}, DataFileStore.sources)
+
+    def testCapabilitiesProbedOnce(self):
+        with patch.object(DataFileStore, "_probe", wraps=DataFileStore._probe) as probe:
+            DataFileStore.materialize(self.dataFile, os.path.join(self.sandbox, "data.csv"))
+            DataFileStore.materialize(self.dataFile, os.path.join(self.sandbox, "other.csv"), shared=True)
+
+            probe.assert_called_once()
+
+    def testChangedLinkStoredAgain(self):
+        dest = os.path.join(self.sandbox, "data.csv")
+
+        DataFileStore.materialize(self.dataFile, dest, shared=True)
+
+        # ie: a submission that is running as root
+        os.chmod(dest, stat.S_IRUSR | stat.S_IWUSR)
+        with open(dest, "a") as w:
+            w.write("4,5,6\n")
+
+        otherDest = os.path.join(self.sandbox, "other.csv")
+        DataFileStore.materialize(self.dataFile, otherDest, shared=True)
+
+        self.assertEqual("a,b,c\n1,2,3\n", self.readFile(otherDest))
+
+    def testSandboxFilledFromStore(self):
+        environment = ExecutionEnvironmentBuilder() \
+            .setDataRoot(self.root) \
+            .addFile("data.csv", "data.csv") \
+            .build()
+
+        Executor.prepareSandbox(environment)
+
+        self.assertEqual("a,b,c\n1,2,3\n", self.readFile(os.path.join(environment.sandbox_location, "data.csv")))
+
+        Executor.cleanup(environment)
+
+    def testSandboxFileWritableByDefault(self):
+        environment = ExecutionEnvironmentBuilder() \
+            .setDataRoot(self.root) \
+            .addFile("data.csv", "data.csv") \
+            .build()
+
+        self.assertEqual(set(), environment.shared_files)
+
+        Executor.prepareSandbox(environment)
+
+        self.assertTrue(os.stat(os.path.join(environment.sandbox_location, "data.csv")).st_mode & stat.S_IWUSR)
+
+        Executor.cleanup(environment)
+
+    def testSharedSandboxFile(self):
+        environment = ExecutionEnvironmentBuilder() \
+            .setDataRoot(self.root) \
+            .addFile("data.csv", "data.csv", shared=True) \
+            .build()
+
+        self.assertEqual({self.dataFile}, environment.shared_files)
+
+        Executor.prepareSandbox(environment)
+
+        self.assertFalse(os.stat(os.path.join(environment.sandbox_location, "data.csv")).st_mode & stat.S_IWUSR)
+
+        Executor.cleanup(environment)
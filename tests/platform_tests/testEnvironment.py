@@ -2,7 +2,8 @@ import os
 import shutil
 import unittest
 
-from autograder_platform.Executors.Environment import ExecutionEnvironment, ExecutionEnvironmentBuilder, Results, getResults
+from autograder_platform.Executors.Environment import DeferredResult, ExecutionEnvironment, ExecutionEnvironmentBuilder, Results, getResults
+from autograder_platform.Executors.Executor import Executor
 
 
 class TestEnvironmentBuilder(unittest.TestCase):
@@ -121,3 +122,91 @@ class TestEnvironmentGetResults(unittest.TestCase):
         exceptionText = str(error.exception)
 
         self.assertIn("No OUTPUT was created by the student's submission.", exceptionText)
+
+    def testDeferredResultOnlyLoadedOnce(self):
+        calls = []
+
+        def loader():
+            calls.append(1)
+            return 5
+
+        self.environment.resultData = Results(return_val=DeferredResult(loader))
+
+        self.assertEqual([], calls)
+        self.assertEqual(5, getResults(self.environment).return_val)
+        self.assertEqual(5, getResults(self.environment).return_val)
+        self.assertEqual(1, len(calls))
+
+    def writeOutputFile(self, contents: bytes):
+        with open(self.OUTPUT_FILE_LOCATION, 'wb') as wb:
+            wb.write(contents)
+
+        self.environment.resultData = Results(file_out={
+            os.path.basename(self.OUTPUT_FILE_LOCATION): self.OUTPUT_FILE_LOCATION
+        })
+
+        return getResults(self.environment).file_out
+
+    def testOutputFileCached(self):
+        fileOut = self.writeOutputFile(b"line 1\r\nline 2\n")
+
+        self.assertEqual("line 1\nline 2\n", fileOut[os.path.basename(self.OUTPUT_FILE_LOCATION)])
+
+        # the contents were cached, so changing the file doesn't change them
+        self.writeOutputFile(b"changed")
+        self.assertIs(fileOut.open(os.path.basename(self.OUTPUT_FILE_LOCATION)),
+                      fileOut.open(os.path.basename(self.OUTPUT_FILE_LOCATION)))
+        self.assertEqual("line 1\nline 2\n", fileOut[os.path.basename(self.OUTPUT_FILE_LOCATION)])
+
+    def testBinaryOutputFile(self):
+        fileOut = self.writeOutputFile(b"\x89PNG\r\n\x1a\n\x00\x00")
+
+        handle = fileOut.open(os.path.basename(self.OUTPUT_FILE_LOCATION))
+
+        self.assertTrue(handle.isBinary())
+        self.assertEqual(b"\x89PNG\r\n\x1a\n\x00\x00", handle.read())
+
+    def testEmptyOutputFile(self):
+        fileOut = self.writeOutputFile(b"")
+
+        handle = fileOut.open(os.path.basename(self.OUTPUT_FILE_LOCATION))
+
+        self.assertEqual(0, handle.size)
+        self.assertEqual("", handle.read())
+        self.assertEqual([], list(handle.iterLines()))
+
+    def testOutputFileOverMaxSize(self):
+        fileOut = self.writeOutputFile(b"line\n" * 100)
+
+        handle = fileOut.open(os.path.basename(self.OUTPUT_FILE_LOCATION))
+        handle.maxSize = 10
+
+        with self.assertRaises(AssertionError) as error:
+            handle.read()
+
+        self.assertIn("larger than the max", str(error.exception))
+
+        # lines are still able to be streamed
+        self.assertEqual(["line"] * 100, list(handle.iterLines()))
+
+    def testOutputFileLines(self):
+        fileOut = self.writeOutputFile(b"a\r\nb\n\nc")
+
+        self.assertEqual(["a", "b", "", "c"],
+                         list(fileOut.open(os.path.basename(self.OUTPUT_FILE_LOCATION)).iterLines()))
+
+    def testOutputFilesClosedOnCleanup(self):
+        fileOut = self.writeOutputFile(b"line 1\nline 2\n")
+
+        read = fileOut.open(os.path.basename(self.OUTPUT_FILE_LOCATION))
+        read.read()
+
+        self.environment.sandbox_location = os.path.join(self.DATA_DIRECTORY, "sandbox")
+        Executor.cleanup(self.environment)
+
+        self.assertIsNone(read._map)
+        # contents that were decoded before the cleanup are kept
+        self.assertEqual("line 1\nline 2\n", read.read())
+
+        with self.assertRaises(AssertionError):
+            list(read.iterLines())
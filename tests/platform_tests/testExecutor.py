@@ -129,6 +129,19 @@ class TestExecutor(unittest.TestCase):
 
         self.assertIn("this_is_alais.txt", os.listdir(self.environment.sandbox_location))
 
+    def testSandboxSnapshotTaken(self):
+        self.environment.files = {
+            self.TEST_FILE_LOCATION: self.OUTPUT_FILE_LOCATION
+        }
+
+        with open(self.TEST_FILE_LOCATION, 'w') as w:
+            w.write("this is a line in the file")
+
+        Executor.setup(self.environment, self.runner, self.config)
+
+        self.assertIsNotNone(self.environment.sandbox_snapshot)
+        self.assertIn(os.path.basename(self.TEST_FILE_LOCATION), self.environment.sandbox_snapshot)
+
     def testExceptionRaised(self):
 
         AutograderConfigurationProvider.set(MagicMock())
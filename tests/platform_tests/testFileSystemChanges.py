@@ -0,0 +1,112 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from autograder_platform.Executors.Environment import Results
+from autograder_platform.Executors.common import detectFileSystemChanges, diffFileSystem, snapshotFileSystem
+
+
+class TestFileSystemChanges(unittest.TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.directory)
+
+    def writeFile(self, path: str, contents: str = "data"):
+        path = os.path.join(self.directory, path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        with open(path, "w") as w:
+            w.write(contents)
+
+    def testCreatedFilesInSubfolders(self):
+        snapshot = snapshotFileSystem(self.directory)
+
+        self.writeFile("out.txt")
+        self.writeFile(os.path.join("sub", "nested", "out.txt"))
+
+        changes = diffFileSystem(self.directory, snapshot)
+
+        self.assertEqual({"out.txt", os.path.join("sub", "nested", "out.txt")}, changes.created.keys())
+        self.assertEqual({}, changes.modified)
+        self.assertEqual(set(), changes.deleted)
+
+    def testModifiedAndDeletedFiles(self):
+        self.writeFile("modified.txt")
+        self.writeFile("unchanged.txt")
+        self.writeFile(os.path.join("sub", "deleted.txt"))
+
+        snapshot = snapshotFileSystem(self.directory)
+
+        # the size changes, so this is found even if the mtime doesn't
+        self.writeFile("modified.txt", "more data")
+        os.unlink(os.path.join(self.directory, "sub", "deleted.txt"))
+
+        changes = diffFileSystem(self.directory, snapshot)
+
+        self.assertEqual({}, changes.created)
+        self.assertEqual({"modified.txt"}, changes.modified.keys())
+        self.assertEqual({os.path.join("sub", "deleted.txt")}, changes.deleted)
+
+    def testReplacedFileModified(self):
+        self.writeFile("replaced.txt")
+
+        snapshot = snapshotFileSystem(self.directory)
+
+        self.writeFile("new.txt")
+        os.replace(os.path.join(self.directory, "new.txt"), os.path.join(self.directory, "replaced.txt"))
+
+        self.assertEqual({"replaced.txt"}, diffFileSystem(self.directory, snapshot).modified.keys())
+
+    def testIgnoredFiles(self):
+        self.writeFile(".hidden")
+        self.writeFile(os.path.join("__pycache__", "mod.pyc"))
+        self.writeFile(os.path.join(".git", "HEAD"))
+
+        self.assertEqual({}, diffFileSystem(self.directory, {}).created)
+
+    def testNoSnapshotExcludesInputFiles(self):
+        self.writeFile("input.txt")
+        self.writeFile("output.txt")
+
+        outputFiles = detectFileSystemChanges([os.path.join(self.directory, "input.txt")], self.directory)
+
+        self.assertEqual({"output.txt": os.path.join(self.directory, "output.txt")}, outputFiles)
+
+    def testScanTruncated(self):
+        snapshot = snapshotFileSystem(self.directory)
+
+        for i in range(20):
+            self.writeFile(f"file{i}.txt")
+
+        start = time.monotonic()
+        changes = diffFileSystem(self.directory, snapshot, maxEntries=5)
+
+        self.assertTrue(changes.truncated)
+        self.assertEqual(5, len(changes.created))
+        self.assertLess(time.monotonic() - start, 1)
+
+    def testTruncatedScanDoesntReportDeleted(self):
+        for i in range(20):
+            self.writeFile(f"file{i}.txt")
+
+        snapshot = snapshotFileSystem(self.directory)
+
+        self.assertEqual(set(), diffFileSystem(self.directory, snapshot, maxEntries=5).deleted)
+
+    def testResultsFromChanges(self):
+        self.writeFile("deleted.txt")
+
+        snapshot = snapshotFileSystem(self.directory)
+
+        self.writeFile(os.path.join("sub", "out.txt"), "written")
+        os.unlink(os.path.join(self.directory, "deleted.txt"))
+
+        results: Results = Results(file_out=diffFileSystem(self.directory, snapshot))
+
+        self.assertEqual("written", results.file_out[os.path.join("sub", "out.txt")])
+        self.assertTrue(results.file_out.wasDeleted("deleted.txt"))
+        self.assertFalse(results.file_out.truncated)
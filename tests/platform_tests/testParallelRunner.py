@@ -0,0 +1,128 @@
+import io
+import json
+import os
+import shutil
+import sys
+import unittest
+
+from autograder_utils.ResultBuilders import gradescopeResultBuilder
+from autograder_utils.ResultFinalizers import gradescopeResultFinalizer
+
+from autograder_platform.parallel_runner import ParallelJSONTestRunner
+
+
+class TestParallelRunner(unittest.TestCase):
+    TEST_DIRECTORY = "./parallel_tests"
+
+    TEST_FILES = {
+        "test_a.py":
+            "import unittest\n"
+            "from autograder_utils.Decorators import Weight\n"
+            "class TestA(unittest.TestCase):\n"
+            "    @Weight(2)\n"
+            "    def test1(self):\n"
+            "        print('hello from a')\n"
+            "    @Weight(3)\n"
+            "    def test2(self):\n"
+            "        self.fail('a failed')\n",
+        "test_b.py":
+            "import unittest\n"
+            "from autograder_utils.Decorators import Weight\n"
+            "class TestB(unittest.TestCase):\n"
+            "    @Weight(5)\n"
+            "    def test1(self):\n"
+            "        pass\n"
+            "class TestC(unittest.TestCase):\n"
+            "    @Weight(1)\n"
+            "    def test1(self):\n"
+            "        raise RuntimeError('c errored')\n",
+        "test_broken.py":
+            "import this_module_does_not_exist\n",
+    }
+
+    def setUp(self) -> None:
+        if os.path.exists(self.TEST_DIRECTORY):
+            shutil.rmtree(self.TEST_DIRECTORY)
+
+        os.mkdir(self.TEST_DIRECTORY)
+
+        for name, contents in self.TEST_FILES.items():
+            with open(os.path.join(self.TEST_DIRECTORY, name), 'w') as w:
+                w.write(contents)
+
+    def tearDown(self) -> None:
+        for name in self.TEST_FILES.keys():
+            sys.modules.pop(name[:-3], None)
+
+        if os.path.abspath(self.TEST_DIRECTORY) in sys.path:
+            sys.path.remove(os.path.abspath(self.TEST_DIRECTORY))
+
+        if os.path.exists(self.TEST_DIRECTORY):
+            shutil.rmtree(self.TEST_DIRECTORY)
+
+    def runTests(self, jobs: int, failfast: bool = False):
+        tests = unittest.loader.TestLoader().discover(self.TEST_DIRECTORY)
+        stream = io.StringIO()
+
+        runner = ParallelJSONTestRunner(jobs=jobs, failfast=failfast, visibility='visible', stream=stream,
+                                        result_builder=gradescopeResultBuilder,
+                                        result_finalizer=gradescopeResultFinalizer)
+
+        result = runner.run(tests)
+        results = json.loads(stream.getvalue())
+        results.pop("execution_time")
+
+        return result, results
+
+    def testGroupTests(self):
+        tests = unittest.loader.TestLoader().discover(self.TEST_DIRECTORY)
+
+        groups = ParallelJSONTestRunner.groupTests(tests)
+
+        self.assertEqual(4, len(groups))
+        self.assertEqual([2, 1, 1, 1], sorted([len(group) for group in groups], reverse=True))
+
+    def testMatchesSerial(self):
+        serialResult, serialResults = self.runTests(1)
+        parallelResult, parallelResults = self.runTests(2)
+
+        self.assertEqual(serialResults, parallelResults)
+        self.assertEqual(serialResult.testsRun, parallelResult.testsRun)
+        self.assertEqual(len(serialResult.failures), len(parallelResult.failures))
+        self.assertEqual(len(serialResult.errors), len(parallelResult.errors))
+        self.assertFalse(parallelResult.wasSuccessful())
+
+    def testScoreAndOutputMerged(self):
+        _, results = self.runTests(4)
+
+        self.assertEqual(7, results["score"])
+        self.assertEqual(5, len(results["tests"]))
+        self.assertIn("hello from a", results["tests"][0]["output"])
+
+    def testUnloadableTestsRunLocally(self):
+        tests = unittest.loader.TestLoader().discover(self.TEST_DIRECTORY)
+
+        groups = ParallelJSONTestRunner.groupTests(tests)
+
+        loadable = [ParallelJSONTestRunner.isLoadableByName(group[0]) for group in groups]
+
+        self.assertEqual(1, loadable.count(False))
+
+    def testFailuresAreTestCases(self):
+        result, _ = self.runTests(2)
+
+        self.assertEqual(["test_a.TestA.test2"], [test.id() for test, _ in result.failures])
+        self.assertEqual(["test_b.TestC.test1"],
+                         [test.id() for test, _ in result.errors if not test.id().startswith("unittest.loader")])
+
+        for test, error in result.failures + result.errors:
+            self.assertIsInstance(test, unittest.TestCase)
+            self.assertIsInstance(error, str)
+
+    def testFailfastMatchesSerial(self):
+        serialResult, serialResults = self.runTests(1, failfast=True)
+        parallelResult, parallelResults = self.runTests(2, failfast=True)
+
+        self.assertEqual(serialResults, parallelResults)
+        self.assertEqual(serialResult.testsRun, parallelResult.testsRun)
+        self.assertTrue(parallelResult.shouldStop)
@@ -0,0 +1,164 @@
+import gc
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+from autograder_platform.Executors.Environment import ExecutionEnvironment, ExecutionEnvironmentBuilder, Results, \
+    getResults
+from autograder_platform.Executors.Executor import Executor
+from autograder_platform.Executors.SandboxManager import SandboxManager
+
+
+class TestSandboxManager(unittest.TestCase):
+    def setUp(self) -> None:
+        self.previousRoot = SandboxManager._getRoot()
+        self.root = tempfile.mkdtemp()
+
+        SandboxManager.configure(root=self.root, maxPooled=SandboxManager.DEFAULT_MAX_POOLED)
+
+    def tearDown(self) -> None:
+        SandboxManager.removeQuota()
+        SandboxManager.configure(root=self.previousRoot, maxPooled=SandboxManager.DEFAULT_MAX_POOLED)
+        SandboxManager.flush()
+
+        shutil.rmtree(self.root)
+
+    def testSandboxCreatedInRoot(self):
+        path = SandboxManager.acquire()
+
+        self.assertEqual(self.root, os.path.dirname(path))
+        self.assertTrue(os.path.isdir(path))
+        self.assertTrue(SandboxManager.isManaged(path))
+
+        SandboxManager.release(path)
+
+    def testReleasedSandboxRecycled(self):
+        path = SandboxManager.acquire()
+
+        with open(os.path.join(path, "file.txt"), "w") as w:
+            w.write("data")
+
+        os.makedirs(os.path.join(path, "sub"))
+
+        self.assertTrue(SandboxManager.release(path))
+        self.assertFalse(os.path.exists(path))
+
+        SandboxManager.flush()
+        self.assertEqual(1, SandboxManager.getPooledCount())
+
+        reused = SandboxManager.reused
+        newPath = SandboxManager.acquire()
+
+        self.assertEqual(reused + 1, SandboxManager.reused)
+        self.assertNotEqual(path, newPath)
+        self.assertEqual([], os.listdir(newPath))
+
+        SandboxManager.release(newPath)
+
+    def testSandboxDeletedWhenPoolFull(self):
+        SandboxManager.configure(maxPooled=0)
+
+        SandboxManager.release(SandboxManager.acquire())
+        SandboxManager.flush()
+
+        self.assertEqual(0, SandboxManager.getPooledCount())
+        self.assertEqual([], os.listdir(self.root))
+
+    def testReleaseUnmanagedSandbox(self):
+        self.assertFalse(SandboxManager.release(self.root))
+        self.assertTrue(os.path.exists(self.root))
+
+    def testDoubleRelease(self):
+        path = SandboxManager.acquire()
+
+        self.assertTrue(SandboxManager.release(path))
+        self.assertFalse(SandboxManager.release(path))
+
+    def testReleasedWhenOwnerCollected(self):
+        environment = ExecutionEnvironment()
+        path = SandboxManager.acquire(owner=environment)
+
+        del environment
+        gc.collect()
+
+        self.assertFalse(SandboxManager.isManaged(path))
+        self.assertFalse(os.path.exists(path))
+
+    def testQuotaEnforced(self):
+        SandboxManager.configure(quotaBytes=16)
+
+        path = SandboxManager.acquire()
+
+        with open(os.path.join(path, "file.txt"), "w") as w:
+            w.write("a" * 32)
+
+        self.assertEqual(32, SandboxManager.getLiveBytes())
+
+        with self.assertRaises(EnvironmentError):
+            SandboxManager.acquire()
+
+        SandboxManager.release(path)
+
+        # the pending deletion is waited for rather than counted against the quota
+        SandboxManager.release(SandboxManager.acquire())
+
+    def testInvalidConfiguration(self):
+        with self.assertRaises(AttributeError):
+            SandboxManager.configure(maxPooled=-1)
+
+        with self.assertRaises(AttributeError):
+            SandboxManager.configure(quotaBytes=0)
+
+        with self.assertRaises(EnvironmentError):
+            SandboxManager.configure(root=os.path.join(self.root, "does_not_exist"))
+
+    def testEnvironmentSandboxReleasedOnCleanup(self):
+        environment = ExecutionEnvironmentBuilder().build()
+
+        self.assertEqual(self.root, os.path.dirname(environment.sandbox_location))
+        live = SandboxManager.getLiveCount()
+
+        Executor.cleanup(environment)
+
+        self.assertEqual(live - 1, SandboxManager.getLiveCount())
+        self.assertFalse(os.path.exists(environment.sandbox_location))
+
+    def testFindTmpfsRoot(self):
+        root = SandboxManager.findTmpfsRoot()
+
+        if root is not None:
+            self.assertIn(root, SandboxManager.TMPFS_ROOTS)
+            self.assertTrue(os.path.isdir(root))
+
+    def testResultsKeepSandbox(self):
+        environment = ExecutionEnvironmentBuilder().build()
+        path = environment.sandbox_location
+        outputFile = os.path.join(path, "out.txt")
+
+        with open(outputFile, "w") as w:
+            w.write("data")
+
+        def populateResults(env):
+            env.resultData = Results(file_out={"out.txt": outputFile})
+
+        submissionProcess = MagicMock()
+        submissionProcess.populateResults.side_effect = populateResults
+
+        Executor.postRun(environment, submissionProcess, raiseExceptions=False)
+        # the mock keeps what it was called with
+        del submissionProcess
+
+        # ie: a helper that only returns the results
+        fileOut = getResults(environment).file_out
+        del environment
+        gc.collect()
+
+        self.assertEqual("data", fileOut["out.txt"])
+        self.assertTrue(SandboxManager.isManaged(path))
+
+        del fileOut
+        gc.collect()
+
+        self.assertFalse(SandboxManager.isManaged(path))
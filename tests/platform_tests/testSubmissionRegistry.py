@@ -0,0 +1,142 @@
+import os
+import shutil
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+from autograder_platform.StudentSubmission.SubmissionRegistry import SubmissionRegistry
+from autograder_platform.StudentSubmission.common import ValidationError
+from autograder_platform.StudentSubmissionImpl.Python import PythonSubmission
+
+
+class TestSubmissionRegistry(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.initalDirectory = os.getcwd()
+        cls.TEST_DIR = os.path.join(cls.initalDirectory, "sandbox")
+
+    def setUp(self) -> None:
+        if os.path.exists(self.TEST_DIR):
+            shutil.rmtree(self.TEST_DIR)
+
+        os.mkdir(self.TEST_DIR)
+        os.chdir(self.TEST_DIR)
+
+        SubmissionRegistry.clear()
+
+    def tearDown(self) -> None:
+        os.chdir(self.initalDirectory)
+
+        if os.path.exists(self.TEST_DIR):
+            shutil.rmtree(self.TEST_DIR)
+
+        SubmissionRegistry.clear()
+
+    @staticmethod
+    def writeFile(path: str, contents: str) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        with open(path, 'w') as w:
+            w.write(contents)
+
+    def testSameSubmissionBuiltOnce(self):
+        self.writeFile("./submission/main.py", "print('hello')\n")
+
+        first = SubmissionRegistry.getOrBuild(PythonSubmission().setSubmissionRoot("./submission"))
+        second = SubmissionRegistry.getOrBuild(PythonSubmission().setSubmissionRoot("./submission"))
+
+        self.assertIs(first, second)
+        self.assertEqual(1, SubmissionRegistry.misses)
+        self.assertEqual(1, SubmissionRegistry.hits)
+
+    def testChangedContentsRebuilt(self):
+        self.writeFile("./submission/main.py", "print('hello')\n")
+
+        first = SubmissionRegistry.getOrBuild(PythonSubmission().setSubmissionRoot("./submission"))
+
+        self.writeFile("./submission/main.py", "print('goodbye')\n")
+
+        second = SubmissionRegistry.getOrBuild(PythonSubmission().setSubmissionRoot("./submission"))
+
+        self.assertIsNot(first, second)
+        self.assertEqual(2, SubmissionRegistry.misses)
+
+    def testCacheIgnored(self):
+        self.writeFile("./submission/main.py", "print('hello')\n")
+
+        first = SubmissionRegistry.getOrBuild(PythonSubmission().setSubmissionRoot("./submission"))
+
+        self.writeFile("./submission/__pycache__/main.cpython.pyc", "garbage")
+
+        second = SubmissionRegistry.getOrBuild(PythonSubmission().setSubmissionRoot("./submission"))
+
+        self.assertIs(first, second)
+
+    def testSettingsAreKeyed(self):
+        self.writeFile("./submission/main.py", "print('hello')\n")
+
+        first = SubmissionRegistry.getOrBuild(PythonSubmission().setSubmissionRoot("./submission"))
+        second = SubmissionRegistry.getOrBuild(
+            PythonSubmission().setSubmissionRoot("./submission").enableLooseMainMatching())
+
+        self.assertIsNot(first, second)
+        self.assertTrue(second.getLooseMainMatchingEnabled())
+
+    def testValidationErrorMemoized(self):
+        self.writeFile("./submission/notMain.py", "print('hello')\n")
+
+        with self.assertRaises(ValidationError) as first:
+            SubmissionRegistry.getOrBuild(PythonSubmission().setSubmissionRoot("./submission"))
+
+        with self.assertRaises(ValidationError) as second:
+            SubmissionRegistry.getOrBuild(PythonSubmission().setSubmissionRoot("./submission"))
+
+        self.assertIs(first.exception, second.exception)
+        self.assertEqual(1, SubmissionRegistry.misses)
+        self.assertEqual(1, SubmissionRegistry.hits)
+
+    def testDifferentSubmissionsBuiltConcurrently(self):
+        self.writeFile("./first/main.py", "print('hello')\n")
+        self.writeFile("./second/main.py", "print('goodbye')\n")
+
+        barrier = threading.Barrier(2, timeout=5)
+        load = PythonSubmission.load
+
+        def waitForOtherBuild(submission):
+            # this is only passed if both submissions are being loaded at the same time
+            barrier.wait()
+            return load(submission)
+
+        with patch.object(PythonSubmission, "load", waitForOtherBuild), ThreadPoolExecutor(max_workers=2) as executor:
+            futures = [executor.submit(SubmissionRegistry.getOrBuild, PythonSubmission().setSubmissionRoot(root))
+                       for root in ("./first", "./second")]
+
+            first, second = [future.result() for future in futures]
+
+        self.assertIsNot(first, second)
+        self.assertEqual(2, SubmissionRegistry.misses)
+
+    def testConcurrentBuildsOfSameSubmissionWait(self):
+        self.writeFile("./submission/main.py", "print('hello')\n")
+
+        building = threading.Event()
+        finish = threading.Event()
+        load = PythonSubmission.load
+
+        def blockedLoad(submission):
+            building.set()
+            finish.wait(5)
+            return load(submission)
+
+        with patch.object(PythonSubmission, "load", blockedLoad), ThreadPoolExecutor(max_workers=2) as executor:
+            first = executor.submit(SubmissionRegistry.getOrBuild, PythonSubmission().setSubmissionRoot("./submission"))
+            building.wait(5)
+
+            second = executor.submit(SubmissionRegistry.getOrBuild, PythonSubmission().setSubmissionRoot("./submission"))
+            finish.set()
+
+            self.assertIs(first.result(), second.result())
+
+        self.assertEqual(1, SubmissionRegistry.misses)
+        self.assertEqual(1, SubmissionRegistry.hits)
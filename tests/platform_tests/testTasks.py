@@ -1,7 +1,7 @@
 import unittest
 from autograder_platform.Tasks.Task import Task
 from autograder_platform.Tasks.TaskRunner import TaskRunner
-from autograder_platform.Tasks.common import TaskStatus, FailedToLoadSuppliers, TaskAlreadyExists
+from autograder_platform.Tasks.common import TaskStatus, FailedToLoadSuppliers, TaskAlreadyExists, TaskDoesNotExist
 
 
 class TestTasks(unittest.TestCase):
@@ -97,3 +97,19 @@ class TestTasks(unittest.TestCase):
         self.assertEqual(None, actual)
         self.assertFalse(runner.wasSuccessful())
         self.assertEqual(1, len(runner.getAllErrors()))
+
+    def testReplaceTaskKeepsOrder(self):
+        runner = TaskRunner(None)  # type: ignore
+
+        runner.add(Task("1", TestTasks.returnBoi, [lambda: 1]))
+        runner.add(Task("2", TestTasks.returnBoi, [lambda: runner.getResult("1")]), isOverallResultTask=True)
+
+        runner.replace(Task("1", TestTasks.returnBoi, [lambda: 2]))
+
+        self.assertEqual(2, runner.run())
+
+    def testReplaceTaskDoesNotExist(self):
+        runner = TaskRunner(None)  # type: ignore
+
+        with self.assertRaises(TaskDoesNotExist):
+            runner.replace(Task("1", TestTasks.returnBoi, [lambda: 1]))